@@ -1 +1,380 @@
-#এই মডিউলে সেন্ট্রাল ডিসিশন মেকিং ক্লাস থাকবে যা ইনপুট প্রসেস করে LLM কল করে ডিসিশন নেবে এবং আউটপুট পাঠাবে; এটি AI-এর 'ব্রেইন' হিসেবে তৈরি, সব মডিউলের কোর লজিক ইন্টিগ্রেট করে।
+"""
+NeoMate AI Brain Module
+
+This module is the central decision maker of NeoMate AI. It takes a user query, asks
+the local LLM or an online API for an answer and hands the answer to the output
+modules. Answers are streamed end to end: tokens flow from the model as an async
+iterator, are split into sentences and spoken while the rest of the answer is still
+being generated, so the user hears the first sentence after roughly one sentence of
+generation instead of after the whole answer.
+
+Features:
+- Streaming "think -> speak" pipeline from LLM tokens to audio
+- Backend selection through the fallback router: latency-aware, hedged and
+  circuit-broken, preferring ``llm.primary_provider``
+- Structured actions (JSON) detected from the first tokens and not spoken
+- Speech failures never lose the answer; barge-in is recorded in the context
+- Token-budgeted conversation context with rolling summaries (ContextManager)
+- Long-term memory: past turns are remembered and relevant ones recalled into the prompt
+- Time-to-first-token and time-to-first-audio reporting, with a stub benchmark
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+from src.core.context_manager import ContextManager
+from src.models.local_llm.query_processor import QueryProcessor
+from src.models.local_llm.request_scheduler import LLMScheduler, RequestPriority
+from src.models.online_llm.fallback_manager import FallbackRouter, LLMRequest, RouteBackend
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+LOCAL_PROVIDERS = ('local', 'ollama')
+
+
+@dataclass
+class BrainResponse:
+    """Outcome of one query."""
+
+    text: str
+    action: Optional[Dict[str, Any]]
+    source: str
+    first_token_s: Optional[float] = None
+    first_audio_s: Optional[float] = None
+    total_s: float = 0.0
+    # The user cut the spoken answer off (barge-in)
+    interrupted: bool = False
+
+
+class Brain:
+    """
+    Routes queries to a language model and streams the answer to voice output.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        query_processor: Optional[QueryProcessor] = None,
+        api_handler: Optional[Any] = None,
+        voice_output: Optional[Any] = None,
+        router: Optional[FallbackRouter] = None,
+        model_registry: Optional[Any] = None,
+        context_manager: Optional[ContextManager] = None,
+        user_preferences: Optional[Any] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
+        """
+        Initialize the Brain.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            query_processor: Local LLM query processor. Created if None.
+            api_handler: Online LLM APIHandler. Created on first online request if None.
+            voice_output: VoiceOutput used to speak answers. Created on first use if None.
+            router: Backend router. If None, one is created with the local model and
+                    the configured online providers.
+            model_registry: Optional ModelRegistry used to pin the local LLM while
+                            it generates.
+            context_manager: Session context. Created from the ``context`` configuration if None.
+            user_preferences: Optional initialized UserPreferences. Its profile is the
+                              context prefix, answered turns are remembered and
+                              relevant memories are recalled into new prompts.
+            scheduler: Local LLM scheduler shared with the agents. Created around
+                       ``query_processor`` if None.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        self._primary_provider = self.config_loader.accessor('llm.primary_provider', 'local')
+        self.query_processor = query_processor or QueryProcessor(self.config_loader, model_registry=model_registry)
+        self.scheduler = scheduler or LLMScheduler(self.config_loader, self.query_processor)
+        self.api_handler = api_handler
+        self.voice_output = voice_output
+        self.user_preferences = user_preferences
+        self.context_manager = context_manager or ContextManager(
+            self.config_loader, recall=user_preferences.recall_texts if user_preferences is not None else None
+        )
+        if user_preferences is not None:
+            self.context_manager.set_profile(user_preferences.profile_text())
+        self._remembering: Set[asyncio.Task] = set()
+        # 'local' or the online provider that produced the last answer
+        self.last_source: Optional[str] = None
+
+        self.router = router or FallbackRouter(self.config_loader)
+        if not self.router.backends:
+            self._register_backends()
+
+        log.info("Brain initialized successfully")
+
+    def _get_api_handler(self) -> Any:
+        if self.api_handler is None:
+            from src.models.online_llm.api_handler import APIHandler
+            self.api_handler = APIHandler(self.config_loader)
+        return self.api_handler
+
+    def _get_voice_output(self) -> Any:
+        if self.voice_output is None:
+            from src.output.voice_output import VoiceOutput
+            self.voice_output = VoiceOutput(self.config_loader)
+        return self.voice_output
+
+    def _local_stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        # Voice answers take the interactive class so agent and background work
+        # on the same local model never delays them
+        return self.scheduler.stream(
+            request.query, request.context, agent='voice', priority=RequestPriority.INTERACTIVE, **request.params
+        )
+
+    def _online_stream(self, request: LLMRequest, provider: str) -> AsyncIterator[str]:
+        messages = [{'role': 'system', 'content': self.query_processor.system_prompt}]
+        messages += request.context
+        messages.append({'role': 'user', 'content': request.query})
+        return self._get_api_handler().stream_chat(messages, provider=provider)
+
+    def _register_backends(self) -> None:
+        """Add the local model and the configured online providers to the router."""
+        names = {backend.name for backend in self.router.backends}
+        if 'local' not in names:
+            self.router.add_backend(RouteBackend('local', self._local_stream))
+        primary = self._primary_provider()
+        online = list(self.config.get('fallback', {}).get('online_providers', ()))
+        if not online:
+            online = [self.config.get('online_llm', {}).get('default_provider', 'groq')]
+        if primary not in LOCAL_PROVIDERS and primary not in online:
+            online.insert(0, primary)
+        for provider in online:
+            if provider not in names:
+                self.router.add_backend(
+                    RouteBackend(provider, lambda request, p=provider: self._online_stream(request, p))
+                )
+
+    def _apply_preference(self) -> None:
+        """Move the configured primary provider to the front (follows config reloads)."""
+        primary = self._primary_provider()
+        name = 'local' if primary in LOCAL_PROVIDERS else primary
+        if self.router.backends and self.router.backends[0].name != name:
+            if name not in {backend.name for backend in self.router.backends}:
+                self._register_backends()
+            self.router.backends.sort(key=lambda backend: backend.name != name)
+
+    async def think_stream(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_cache: bool = True,
+        deadline_s: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream the model's answer to a query.
+
+        The fallback router picks the backend (local model or online provider) by
+        observed latency and health, preferring ``llm.primary_provider`` on ties,
+        hedges slow requests and skips backends whose circuit is open. Failures
+        after the first token are raised, since part of the answer was already
+        consumed.
+
+        Args:
+            query: User query.
+            context: Previous turns. Defaults to the session context assembled
+                     within the token budget.
+            use_cache: Whether the local response cache may be used.
+            deadline_s: Time budget for the first token. Defaults to ``fallback.deadline_s``.
+
+        Yields:
+            str: Answer text fragments.
+        """
+        if context is None:
+            context = (await self.context_manager.abuild(query)).messages
+        self._apply_preference()
+        request = LLMRequest(query, context, {'use_cache': use_cache})
+        self.last_source = None
+        async for token in self.router.stream(request, deadline_s):
+            self.last_source = request.served_by
+            yield token
+
+    async def respond(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        speak: bool = True,
+        use_cache: bool = True
+    ) -> BrainResponse:
+        """
+        Answer a query, speaking the answer while it is generated.
+
+        If the answer starts with a JSON object or code block it is treated as an
+        action: it is collected in full, parsed and not spoken. If speech fails the
+        answer is still returned. If the user interrupts it (barge-in), generation
+        stops and the context records the spoken part as interrupted.
+
+        Args:
+            query: User query.
+            context: Previous turns. Defaults to the session context.
+            speak: Whether to speak the answer.
+            use_cache: Whether the local response cache may be used.
+
+        Returns:
+            BrainResponse: Answer text, parsed action and latencies.
+        """
+        started = time.perf_counter()
+        parts: List[str] = []
+        first_token_s: Optional[float] = None
+        tokens = self.think_stream(query, context, use_cache)
+
+        # Look at the first non-whitespace text to decide between speech and action
+        head = ''
+        async for token in tokens:
+            if first_token_s is None:
+                first_token_s = time.perf_counter() - started
+            parts.append(token)
+            head += token
+            if head.strip():
+                break
+        is_action = head.lstrip().startswith(('{', '```'))
+
+        token_error: Optional[BaseException] = None
+
+        async def remaining() -> AsyncIterator[str]:
+            nonlocal token_error
+            yield head
+            try:
+                async for token in tokens:
+                    parts.append(token)
+                    yield token
+            except Exception as e:
+                token_error = e
+                raise
+
+        first_audio_s = None
+        spoken: Optional[List[str]] = None
+        stream = remaining()
+        if speak and not is_action and head.strip():
+            try:
+                result = await self._get_voice_output().speak_stream(stream, started_at=started)
+                first_audio_s = result.first_audio_s
+                if result.interrupted:
+                    spoken = result.sentences
+            except Exception as e:
+                if token_error is not None:
+                    raise token_error from None
+                # A speech failure must not lose the answer; it is still returned
+                log.error(f"Speaking the answer failed, returning it as text: {e}")
+        if spoken is not None:
+            # Barge-in: stop generating, the rest of the answer will not be heard
+            await stream.aclose()
+            await tokens.aclose()
+        else:
+            async for _ in stream:
+                pass
+
+        raw = ''.join(parts)
+        text, action = self.query_processor.parse_response(raw)
+        if spoken is not None:
+            self.context_manager.add_turn(query, ' '.join(spoken), interrupted=True)
+        else:
+            self.context_manager.add_turn(query, raw.strip())
+        if self.user_preferences is not None and text:
+            # Indexing and storing the turn happen off the response path
+            task = asyncio.create_task(self.user_preferences.remember(f"User: {query}\nAssistant: {text}"))
+            self._remembering.add(task)
+            task.add_done_callback(self._remembering.discard)
+
+        response = BrainResponse(
+            text=text,
+            action=action,
+            source=self.last_source or 'none',
+            first_token_s=first_token_s,
+            first_audio_s=first_audio_s,
+            total_s=time.perf_counter() - started,
+            interrupted=spoken is not None
+        )
+        log.info(
+            f"Answered via {response.source}: first token {first_token_s or 0:.3f} s, "
+            f"first audio {first_audio_s or 0:.3f} s, total {response.total_s:.3f} s"
+        )
+        return response
+
+    async def cleanup(self) -> None:
+        """Stop speaking, finish storing memories and release model clients."""
+        if self._remembering:
+            await asyncio.gather(*self._remembering, return_exceptions=True)
+        if self.voice_output is not None:
+            await self.voice_output.cleanup()
+        if self.api_handler is not None:
+            await self.api_handler.close()
+        self.query_processor.close()
+
+
+async def benchmark_time_to_first_audio(
+    first_token_s: float = 0.3,
+    tokens_per_s: float = 8.0,
+    tts_realtime_factor: float = 0.3
+) -> Dict[str, float]:
+    """
+    Measure time-to-first-audio with stub model and TTS backends, streaming versus
+    generating the full answer before synthesizing it.
+
+    Args:
+        first_token_s: Stub model delay before the first token.
+        tokens_per_s: Stub model generation speed.
+        tts_realtime_factor: Stub TTS synthesis time per second of audio.
+
+    Returns:
+        Dict[str, float]: Time-to-first-audio and total time for both modes.
+    """
+    from src.models.local_llm.model_loader import StubModelLoader
+    from src.models.local_llm.response_cache import ResponseCache
+    from src.output.voice_output import SilentPlayer, StubTTSBackend, VoiceOutput
+
+    answer = (
+        "Sure, I can help with that. The weather today is sunny with a light breeze. "
+        "আজ বিকেলে বৃষ্টি হতে পারে। Remember to take an umbrella if you go out later."
+    )
+    model = StubModelLoader(answer, first_token_s=first_token_s, tokens_per_s=tokens_per_s)
+    backend = StubTTSBackend(realtime_factor=tts_realtime_factor)
+    # Shorten playback so the benchmark finishes quickly; only the first audio matters
+    backend.chars_per_s = 60.0
+    voice = VoiceOutput(backend=backend, player=SilentPlayer())
+    brain = Brain(
+        query_processor=QueryProcessor(model_loader=model, cache=ResponseCache()),
+        voice_output=voice
+    )
+    brain._primary_provider = lambda: 'local'
+
+    streamed = await brain.respond("What's the weather?", speak=True, use_cache=False)
+
+    # Request/response baseline: full generation, then synthesis, then playback
+    started = time.perf_counter()
+    text = await model.generate("What's the weather?")
+    audio = await asyncio.to_thread(backend.synthesize, text)
+    blocking_first_audio = time.perf_counter() - started
+    await asyncio.to_thread(voice.player.play, audio, backend.sample_rate)
+    blocking_total = time.perf_counter() - started
+
+    return {
+        'streaming_first_token_s': streamed.first_token_s,
+        'streaming_first_audio_s': streamed.first_audio_s,
+        'streaming_total_s': streamed.total_s,
+        'blocking_first_audio_s': blocking_first_audio,
+        'blocking_total_s': blocking_total,
+    }
+
+
+async def main():
+    """
+    Run the time-to-first-audio benchmark.
+    """
+    results = await benchmark_time_to_first_audio()
+    print("Time to first audio (stub model 8 tok/s, stub TTS 0.3x realtime)")
+    for name, value in results.items():
+        print(f"  {name:<26} {value:7.3f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
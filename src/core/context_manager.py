@@ -1 +1,598 @@
-#এই মডিউলে কনটেক্সট ট্র্যাকিং ক্লাস থাকবে যা সেশন হিস্ট্রি মেইনটেইন করে LLM-কে কনটেক্সট প্রোভাইড করবে; এটি কনভার্সেশন কনটিনিউটি নিশ্চিত করার জন্য তৈরি, মেমোরি ইন্টিগ্রেশন করে।
+"""
+NeoMate AI Context Manager Module
+
+This module keeps the conversation history of a session and assembles the context
+sent to the LLM within a token budget. Every message carries its token count, and
+the window total is updated incrementally, so assembling a prompt never re-counts
+the history. The profile prefix is rendered once and kept byte-stable, and the
+recent-turn window only grows by appending between summarization folds, so
+consecutive prompts share a long common prefix that backend KV/prefix caches
+(Ollama, llama.cpp, hosted APIs) can reuse. When the window fills up, the oldest
+turns are folded into a rolling summary by a background task, not on the request
+path. Optionally, memories from earlier sessions that are relevant to the query are
+recalled (e.g. from the long-term memory vector index) and placed after the summary.
+
+Features:
+- Per-message token counts with an incremental window total
+- Token-budgeted assembly: profile, rolling summary, recalled memories, recent turns
+- Async recall hook with its own token budget
+- Byte-stable profile prefix and append-only window between folds
+- Background rolling summarization (extractive by default, or the local LLM)
+- Truncation fallback that keeps requests within budget while a fold is pending
+- Session history bounded by the token budget: folded messages are released, and the
+  oldest turns are dropped if summarization cannot keep up
+- Recalled memories already present in the window (e.g. stored exchanges) are skipped
+- Approximate token counting for English and Bengali, or a pluggable tokenizer
+- 500-turn benchmark of prompt size, assembly time and prefix reuse
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+# Latin words and numbers, runs of other letters (e.g. Bengali) with their vowel signs, or single symbols
+_TOKEN_PIECES = re.compile(r'[A-Za-z0-9]+|[^\sA-Za-z0-9\W]+[ঀ-৿]*|[ঀ-৿]+|[^\s]')
+_SENTENCE_END = re.compile(r'(?<=[.!?।])\s+')
+# Speaker labels of stored exchanges ("User: ...\nAssistant: ...")
+_SPEAKER = re.compile(r'^\s*(?:User|Assistant):\s*', re.MULTILINE)
+
+# Appended to an answer the user cut off while it was being spoken
+INTERRUPTED_MARKER = "[interrupted by the user]"
+
+Summarizer = Callable[[str, List['ContextMessage'], int], Awaitable[str]]
+Recall = Callable[[str], Awaitable[List[str]]]
+
+
+def approx_token_count(text: str) -> int:
+    """
+    Estimate the number of tokens of a text for typical BPE tokenizers.
+
+    English words count about one token per six characters; Bengali and other
+    non-Latin words, which tokenizers split much more finely, one per two characters.
+
+    Args:
+        text: Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    tokens = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        if piece.isascii():
+            tokens += 1 + len(piece) // 6
+        else:
+            tokens += max(1, (len(piece) + 1) // 2)
+    return tokens
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and case so equal texts compare equal."""
+    return ' '.join(text.split()).casefold()
+
+
+def truncate_to_tokens(text: str, max_tokens: int, count: Callable[[str], int] = approx_token_count) -> str:
+    """
+    Keep the end of a text within a token budget, cutting at sentence boundaries.
+
+    Args:
+        text: Text to shorten.
+        max_tokens: Token budget.
+        count: Token counting function.
+
+    Returns:
+        str: The newest sentences that fit.
+    """
+    if count(text) <= max_tokens:
+        return text
+    kept: List[str] = []
+    used = 0
+    for sentence in reversed(_SENTENCE_END.split(text)):
+        tokens = count(sentence)
+        if used + tokens > max_tokens:
+            break
+        kept.append(sentence)
+        used += tokens
+    return ' '.join(reversed(kept))
+
+
+@dataclass
+class ContextMessage:
+    """One message of the session with its cached token count."""
+
+    role: str
+    content: str
+    tokens: int
+    turn: int
+    created: float = field(default_factory=time.time)
+
+    def __post_init__(self) -> None:
+        # Built once and shared by every prompt that includes the message
+        self.as_dict = {'role': self.role, 'content': self.content}
+        # Used to recognize recalled memories that repeat the message
+        self.key = normalize_text(self.content)
+
+
+@dataclass
+class AssembledContext:
+    """Context for one request, ready for ``QueryProcessor`` or the online APIs."""
+
+    messages: List[Dict[str, str]]
+    tokens: int
+    prefix_tokens: int
+    history_messages: int
+    truncated: int = 0
+    recalled: int = 0
+
+
+async def extractive_summary(previous: str, messages: List[ContextMessage], max_tokens: int) -> str:
+    """
+    Fold messages into a summary by keeping the first sentence of each.
+
+    Args:
+        previous: Summary so far.
+        messages: Messages to fold in, oldest first.
+        max_tokens: Token budget of the result.
+
+    Returns:
+        str: Updated summary; the oldest sentences are dropped first.
+    """
+    lines = [previous] if previous else []
+    for message in messages:
+        first = _SENTENCE_END.split(message.content.strip(), maxsplit=1)[0]
+        if first:
+            lines.append(f"{'User' if message.role == 'user' else 'Assistant'}: {first}")
+    return truncate_to_tokens(' '.join(lines), max_tokens)
+
+
+def llm_summarizer(generate: Callable[[str], Awaitable[str]]) -> Summarizer:
+    """
+    Build a summarizer that asks the local LLM to update the summary.
+
+    Args:
+        generate: Async function prompt -> text, e.g. a background-priority
+                  ``LLMScheduler.generate`` or ``QueryProcessor.process`` wrapper.
+
+    Returns:
+        Summarizer: Function usable as the ContextManager summarizer.
+    """
+    async def summarize(previous: str, messages: List[ContextMessage], max_tokens: int) -> str:
+        transcript = "\n".join(f"{m.role}: {m.content}" for m in messages)
+        prompt = (
+            f"Update the summary of a conversation in at most {max_tokens} tokens. Keep names, "
+            f"facts, decisions and open requests; drop small talk.\n\n"
+            f"Current summary:\n{previous or '(none)'}\n\nNew messages:\n{transcript}\n\nUpdated summary:"
+        )
+        return truncate_to_tokens((await generate(prompt)).strip(), max_tokens)
+
+    return summarize
+
+
+class ContextManager:
+    """
+    Session history with token-budgeted, cache-friendly prompt assembly.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        summarizer: Optional[Summarizer] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+        recall: Optional[Recall] = None
+    ):
+        """
+        Initialize the ContextManager.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            summarizer: Async function (previous summary, messages, max tokens) -> summary.
+                        Defaults to ``extractive_summary``.
+            token_counter: Function text -> token count, e.g. the model tokenizer.
+                           Defaults to ``approx_token_count``.
+            recall: Async function query -> relevant memory texts, best first, e.g.
+                    ``UserPreferences.recall_texts``. Used by ``abuild``.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        context_config = self.config.get('context', {})
+
+        self.count_tokens = token_counter or approx_token_count
+        self.summarizer = summarizer or extractive_summary
+        self.recall = recall
+        # Model context window and the part of it kept free for the system prompt and answer
+        self.max_tokens = context_config.get('max_tokens', 4096)
+        self.reserve_tokens = context_config.get('reserve_tokens', 1024)
+        self.summary_tokens = context_config.get('summary_tokens', 256)
+        self.recall_tokens = context_config.get('recall_tokens', 256)
+        # Fold when the window reaches this share of its budget, folding this share of it
+        self.fold_at = context_config.get('fold_at', 0.75)
+        self.fold_fraction = context_config.get('fold_fraction', 0.5)
+
+        # Messages not folded into the summary yet, oldest first
+        self.messages: List[ContextMessage] = []
+        # Messages removed from the front so far; folds address messages by this offset
+        self._dropped = 0
+        self._window_tokens = 0
+        self._turn = 0
+
+        self._profile_message: Optional[Dict[str, str]] = None
+        self._profile_tokens = 0
+        self.summary = ''
+        self._summary_message: Optional[Dict[str, str]] = None
+        self._summary_tokens = 0
+
+        self._fold_task: Optional[asyncio.Task] = None
+        self.folds = 0
+        self.truncations = 0
+        self.trimmed = 0
+
+    @property
+    def window_tokens(self) -> int:
+        """Tokens of the messages not folded into the summary yet."""
+        return self._window_tokens
+
+    @property
+    def prefix_tokens(self) -> int:
+        """Tokens of the profile and summary messages."""
+        return self._profile_tokens + self._summary_tokens
+
+    def history_budget(self, query_tokens: int = 0) -> int:
+        """Tokens available to recent turns for a query of the given size."""
+        return max(0, self.max_tokens - self.reserve_tokens - self.prefix_tokens - query_tokens)
+
+    def set_profile(self, profile: str) -> None:
+        """
+        Set the user profile / standing instructions placed before the history.
+
+        The rendered message is kept as is until the profile text changes, so the
+        prompt prefix stays byte-identical across requests.
+
+        Args:
+            profile: Profile text; empty to remove it.
+        """
+        profile = profile.strip()
+        if self._profile_message is not None and self._profile_message['content'] == profile:
+            return
+        self._profile_message = {'role': 'system', 'content': profile} if profile else None
+        self._profile_tokens = self.count_tokens(profile) if profile else 0
+
+    def add_message(self, role: str, content: str) -> ContextMessage:
+        """
+        Append a message, counting its tokens once.
+
+        Args:
+            role: 'user' or 'assistant'.
+            content: Message text.
+
+        Returns:
+            ContextMessage: The stored message.
+        """
+        if role == 'user':
+            self._turn += 1
+        message = ContextMessage(role, content, self.count_tokens(content), self._turn)
+        self.messages.append(message)
+        self._window_tokens += message.tokens
+        self._maybe_fold()
+        self._trim()
+        return message
+
+    def _drop_front(self, count: int) -> List[ContextMessage]:
+        dropped = self.messages[:count]
+        del self.messages[:count]
+        self._dropped += len(dropped)
+        self._window_tokens -= sum(message.tokens for message in dropped)
+        return dropped
+
+    def _trim(self) -> None:
+        """
+        Drop the oldest turns while the window exceeds what any prompt could hold.
+
+        Folding normally keeps the window far below this; the trim only bounds
+        memory when no event loop runs folds or summarization keeps failing.
+        """
+        limit = self.max_tokens - self.reserve_tokens
+        if self._window_tokens <= limit:
+            return
+        tokens, end = self._window_tokens, 0
+        while tokens > limit and end < len(self.messages) - 1:
+            tokens -= self.messages[end].tokens
+            end += 1
+        # Keep the window starting on a user message
+        while end < len(self.messages) - 1 and self.messages[end].role != 'user':
+            end += 1
+        self.trimmed += len(self._drop_front(end))
+        log.debug(f"Context window over {limit} tokens, dropped the {end} oldest messages")
+
+    def add_turn(self, user: str, assistant: str, interrupted: bool = False) -> None:
+        """
+        Append a user message and the assistant's answer.
+
+        Args:
+            user: User message.
+            assistant: Assistant answer (for an interrupted answer, the part the
+                       user heard).
+            interrupted: Whether the user cut the answer off (barge-in). The answer
+                         is marked so the model knows the rest was never heard.
+        """
+        self.add_message('user', user)
+        if interrupted:
+            assistant = f"{assistant} {INTERRUPTED_MARKER}".strip()
+        self.add_message('assistant', assistant)
+
+    def _recall_message(self, recalled: Sequence[str]) -> Optional[Dict[str, str]]:
+        """Render recalled memories within ``recall_tokens``, skipping ones already in the window."""
+        in_window = {message.key for message in self.messages}
+        lines: List[str] = []
+        used = self.count_tokens("Relevant memories:")
+        for text in recalled:
+            # A stored exchange is a duplicate if every one of its messages is in the window
+            parts = [normalize_text(part) for part in _SPEAKER.split(text)]
+            if all(part in in_window for part in parts if part):
+                continue
+            tokens = self.count_tokens(text) + 1
+            if used + tokens > self.recall_tokens:
+                break
+            lines.append(f"- {text}")
+            used += tokens
+        if not lines:
+            return None
+        return {'role': 'system', 'content': "Relevant memories:\n" + "\n".join(lines)}
+
+    def build(self, query: str = '', recalled: Sequence[str] = ()) -> AssembledContext:
+        """
+        Assemble the context for a request within the token budget.
+
+        The cost depends on the window size (bounded by the budget), not on the
+        length of the session.
+
+        Args:
+            query: The upcoming user query, counted against the budget.
+            recalled: Memory texts to include after the summary, best first.
+
+        Returns:
+            AssembledContext: Messages in prompt order and their token count.
+        """
+        query_tokens = self.count_tokens(query) if query else 0
+        recall_message = self._recall_message(recalled) if recalled else None
+        recall_tokens = self.count_tokens(recall_message['content']) if recall_message else 0
+        budget = max(0, self.history_budget(query_tokens) - recall_tokens)
+        start, tokens = 0, self._window_tokens
+        if tokens > budget:
+            # A fold has not caught up yet: leave the oldest turns out of this prompt
+            self._maybe_fold(force=True)
+            while tokens > budget and start < len(self.messages):
+                tokens -= self.messages[start].tokens
+                start += 1
+            # Start on a user message so the model never sees an orphaned answer
+            while start < len(self.messages) and self.messages[start].role != 'user':
+                tokens -= self.messages[start].tokens
+                start += 1
+            self.truncations += 1
+
+        # Recalled memories change per query, so they go after the stable prefix
+        prefix = [m for m in (self._profile_message, self._summary_message, recall_message) if m is not None]
+        history = [message.as_dict for message in self.messages[start:]]
+        return AssembledContext(
+            messages=prefix + history,
+            tokens=self.prefix_tokens + recall_tokens + tokens,
+            prefix_tokens=self.prefix_tokens,
+            history_messages=len(history),
+            truncated=start,
+            recalled=recall_message['content'].count('\n- ') if recall_message else 0
+        )
+
+    async def abuild(self, query: str = '') -> AssembledContext:
+        """
+        Assemble the context like ``build``, adding memories from the ``recall`` hook.
+
+        A failing recall is logged and the context is built without memories.
+
+        Args:
+            query: The upcoming user query.
+
+        Returns:
+            AssembledContext: Messages in prompt order and their token count.
+        """
+        recalled: List[str] = []
+        if self.recall is not None and query:
+            try:
+                recalled = await self.recall(query)
+            except Exception as e:
+                log.warning(f"Memory recall failed: {e}")
+        return self.build(query, recalled)
+
+    def _fold_end(self) -> int:
+        """Index after the oldest turns holding ``fold_fraction`` of the window."""
+        target = self._window_tokens * self.fold_fraction
+        folded = 0
+        end = 0
+        last_user = len(self.messages) - 1
+        while last_user > 0 and self.messages[last_user].role != 'user':
+            last_user -= 1
+        # Never fold the newest exchange
+        while end < last_user and folded < target:
+            folded += self.messages[end].tokens
+            end += 1
+        while end < last_user and self.messages[end].role != 'user':
+            end += 1
+        return end
+
+    def _maybe_fold(self, force: bool = False) -> None:
+        if self._fold_task is not None and not self._fold_task.done():
+            return
+        if not force and self._window_tokens < self.fold_at * self.history_budget():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop: requests stay within budget through truncation in build()
+            return
+        end = self._fold_end()
+        if end > 0:
+            self._fold_task = loop.create_task(self._fold(self._dropped + end))
+
+    async def _fold(self, end: int) -> None:
+        # ``end`` counts from the first message ever added, so it stays valid if
+        # messages are trimmed while summarizing
+        chunk = self.messages[:max(0, end - self._dropped)]
+        started = time.perf_counter()
+        try:
+            summary = await self.summarizer(self.summary, chunk, self.summary_tokens)
+        except Exception as e:
+            log.warning(f"Context summarization failed, keeping the full window: {e}")
+            return
+
+        # Only the start moves: messages appended meanwhile stay in the window
+        self.summary = summary
+        self._summary_message = {'role': 'system', 'content': f"Summary of the earlier conversation: {summary}"}
+        self._summary_tokens = self.count_tokens(self._summary_message['content'])
+        self._drop_front(max(0, end - self._dropped))
+        self.folds += 1
+        log.debug(
+            f"Folded {len(chunk)} messages into the summary in {time.perf_counter() - started:.3f} s "
+            f"(window {self._window_tokens} tokens, summary {self._summary_tokens} tokens)"
+        )
+        # A long burst may need another fold right away
+        self._fold_task = None
+        self._maybe_fold()
+
+    async def wait_idle(self) -> None:
+        """Wait until no summarization is running."""
+        while self._fold_task is not None and not self._fold_task.done():
+            await asyncio.shield(self._fold_task)
+
+    def clear(self) -> None:
+        """Forget the session history and summary (the profile is kept)."""
+        if self._fold_task is not None:
+            self._fold_task.cancel()
+            self._fold_task = None
+        self._dropped += len(self.messages)
+        self.messages.clear()
+        self._window_tokens = 0
+        self._turn = 0
+        self.summary = ''
+        self._summary_message = None
+        self._summary_tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get context statistics.
+
+        Returns:
+            Dict[str, Any]: Message counts, token counts, folds, truncations and
+                            trimmed messages.
+        """
+        return {
+            'turns': self._turn,
+            'messages': self._dropped + len(self.messages),
+            'window_messages': len(self.messages),
+            'window_tokens': self._window_tokens,
+            'profile_tokens': self._profile_tokens,
+            'summary_tokens': self._summary_tokens,
+            'folds': self.folds,
+            'truncations': self.truncations,
+            'trimmed': self.trimmed,
+        }
+
+
+async def benchmark(turns: int = 500) -> List[Dict[str, float]]:
+    """
+    Compare re-sending the full history with the context manager over a long session.
+
+    Args:
+        turns: Number of user/assistant exchanges.
+
+    Returns:
+        List[Dict[str, float]]: Prompt tokens, assembly time and prefix reuse at checkpoints.
+    """
+    import random
+
+    from src.models.local_llm.model_loader import StubModelLoader
+    from src.models.local_llm.query_processor import QueryProcessor
+    from src.models.local_llm.response_cache import ResponseCache
+
+    rng = random.Random(5)
+    topics = ['the weather', 'my calendar', 'a Python error', 'the news', 'music', 'আজকের আবহাওয়া', 'আমার ইমেইল']
+    processor = QueryProcessor(model_loader=StubModelLoader(), cache=ResponseCache())
+    manager = ContextManager()
+    manager.set_profile("The user is Rahim, a developer in Dhaka who prefers short answers in Bengali or English.")
+    naive: List[Dict[str, str]] = []
+
+    def common_prefix(a: str, b: str) -> int:
+        limit = min(len(a), len(b))
+        low, high = 0, limit
+        while low < high:
+            mid = (low + high + 1) // 2
+            if a[:mid] == b[:mid]:
+                low = mid
+            else:
+                high = mid - 1
+        return low
+
+    rows = []
+    previous_prompt = ''
+    reuse_total = 0.0
+    for turn in range(1, turns + 1):
+        topic = rng.choice(topics)
+        query = f"Turn {turn}: can you tell me more about {topic}? " + "Please include details. " * rng.randint(0, 3)
+        answer = f"Here is what I found about {topic}. " + "It is an interesting subject with many aspects. " * rng.randint(2, 8)
+
+        started = time.perf_counter()
+        naive_prompt = processor.build_prompt(query, list(naive))
+        naive_s = time.perf_counter() - started
+
+        started = time.perf_counter()
+        assembled = manager.build(query)
+        prompt = processor.build_prompt(query, assembled.messages)
+        managed_s = time.perf_counter() - started
+
+        # Share of the previous prompt the backend's prefix cache can reuse
+        if previous_prompt:
+            reuse_total += common_prefix(previous_prompt, prompt) / len(previous_prompt)
+        previous_prompt = prompt
+
+        if turn in (1, 10, 50, 100, 250, 500) or turn == turns:
+            rows.append({
+                'turn': turn,
+                'naive_tokens': approx_token_count(naive_prompt),
+                'naive_us': naive_s * 1e6,
+                'managed_tokens': approx_token_count(prompt),
+                'managed_us': managed_s * 1e6,
+                'prefix_reuse': reuse_total / max(1, turn - 1),
+            })
+
+        naive += [{'role': 'user', 'content': query}, {'role': 'assistant', 'content': answer}]
+        manager.add_turn(query, answer)
+        # Give the background fold a chance to run, as the gap between turns would
+        await asyncio.sleep(0)
+
+    await manager.wait_idle()
+    processor.close()
+    rows[-1]['folds'] = manager.folds
+    rows[-1]['truncations'] = manager.truncations
+    return rows
+
+
+async def main():
+    """
+    Run the 500-turn context benchmark.
+    """
+    rows = await benchmark()
+    print(f"{'turn':>5} {'naive tokens':>13} {'naive us':>9} {'managed tokens':>15} {'managed us':>11} {'prefix reuse':>13}")
+    for row in rows:
+        print(f"{row['turn']:>5} {row['naive_tokens']:>13} {row['naive_us']:>9.0f} "
+              f"{row['managed_tokens']:>15} {row['managed_us']:>11.0f} {row['prefix_reuse']:>12.1%}")
+    print(f"folds {rows[-1]['folds']}, truncated prompts {rows[-1]['truncations']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
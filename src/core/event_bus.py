@@ -0,0 +1,510 @@
+"""
+NeoMate AI Event Bus Module
+
+This module provides the event-driven core of NeoMate AI. Input producers (wake word,
+speech-to-text, screen capture, audio analyzer) publish typed events; consumers such as
+the brain and the output system receive them through bounded per-priority queues served
+by supervised worker tasks. A burst of low-priority events can never delay a
+higher-priority one: workers always take the most urgent event available, and each
+priority class has its own bounded queue and overflow policy.
+
+Features:
+- Typed events with priority, topic, trace ID and optional coalescing key
+- Bounded queue per priority class and consumer with drop-oldest, coalesce or block policy
+- Topic-based fan-out to consumer groups with configurable concurrency
+- Supervised worker tasks that survive handler errors and restart after crashes, with
+  a backoff that resets once a worker has run stably
+- Per-priority queueing delay histograms, drop and coalesce counters
+- Synthetic load generator measuring queueing delay per priority class
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from enum import Enum, IntEnum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.instrumentation import Histogram, current_trace_id
+from src.utils.logger import log
+
+
+class EventPriority(IntEnum):
+    """Priority classes; lower values are served first."""
+
+    CRITICAL = 0
+    VOICE = 1
+    AUDIO = 2
+    SCREEN = 3
+    BACKGROUND = 4
+
+
+class OverflowPolicy(Enum):
+    """What a full priority queue does with a new event."""
+
+    DROP_OLDEST = 'drop_oldest'
+    COALESCE = 'coalesce'
+    BLOCK = 'block'
+
+
+@dataclass
+class Event:
+    """
+    An event travelling through the bus.
+
+    Events with the same ``coalesce_key`` replace each other in COALESCE queues, so
+    only the latest state (e.g. the newest screen frame) is processed.
+    """
+
+    topic: str
+    payload: Any = None
+    priority: EventPriority = EventPriority.BACKGROUND
+    coalesce_key: Optional[str] = None
+    trace_id: Optional[str] = None
+    created_ns: int = field(default_factory=time.perf_counter_ns)
+
+    def __post_init__(self) -> None:
+        if self.trace_id is None:
+            self.trace_id = current_trace_id()
+
+
+# Default queue sizes and policies per priority class
+DEFAULT_QUEUE_POLICIES: Dict[EventPriority, Tuple[int, OverflowPolicy]] = {
+    EventPriority.CRITICAL: (64, OverflowPolicy.BLOCK),
+    EventPriority.VOICE: (64, OverflowPolicy.BLOCK),
+    EventPriority.AUDIO: (128, OverflowPolicy.DROP_OLDEST),
+    EventPriority.SCREEN: (32, OverflowPolicy.COALESCE),
+    EventPriority.BACKGROUND: (256, OverflowPolicy.DROP_OLDEST),
+}
+
+
+class PriorityClassQueue:
+    """
+    Bounded FIFO for one priority class with an overflow policy.
+    """
+
+    def __init__(self, maxsize: int, policy: OverflowPolicy):
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._items: 'OrderedDict[Any, Event]' = OrderedDict()
+        self._seq = 0
+        self._space = asyncio.Event()
+        self._space.set()
+        self.dropped = 0
+        self.coalesced = 0
+        self.delay = Histogram()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def offer(self, event: Event) -> bool:
+        """
+        Add an event without waiting.
+
+        Args:
+            event: Event to enqueue.
+
+        Returns:
+            bool: False if the event could not be queued (BLOCK policy and full).
+        """
+        if self.policy is OverflowPolicy.COALESCE and event.coalesce_key is not None:
+            key = ('k', event.coalesce_key)
+            if key in self._items:
+                # Keep the queue position, replace the content with the newest event
+                self._items[key] = event
+                self.coalesced += 1
+                return True
+        else:
+            key = ('s', self._seq)
+            self._seq += 1
+
+        if len(self._items) >= self.maxsize:
+            if self.policy is OverflowPolicy.BLOCK:
+                self._space.clear()
+                return False
+            self._items.popitem(last=False)
+            self.dropped += 1
+
+        self._items[key] = event
+        return True
+
+    async def put(self, event: Event) -> None:
+        """
+        Add an event, waiting for space if the policy is BLOCK.
+
+        Args:
+            event: Event to enqueue.
+        """
+        while not self.offer(event):
+            await self._space.wait()
+
+    def pop(self) -> Event:
+        """Remove and return the oldest event, recording its queueing delay."""
+        _, event = self._items.popitem(last=False)
+        self.delay.record(time.perf_counter_ns() - event.created_ns)
+        if not self._space.is_set():
+            self._space.set()
+        return event
+
+
+Handler = Callable[[Event], Awaitable[None]]
+
+# A worker that ran this long before crashing restarts with the initial backoff
+HEALTHY_RUN_S = 30.0
+
+
+class ConsumerGroup:
+    """
+    A named consumer with its own priority queues and supervised worker tasks.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Handler,
+        topics: Iterable[str],
+        concurrency: int = 1,
+        policies: Optional[Dict[EventPriority, Tuple[int, OverflowPolicy]]] = None
+    ):
+        """
+        Initialize the ConsumerGroup.
+
+        Args:
+            name: Consumer name used in logs and stats.
+            handler: Coroutine function called for every event.
+            topics: Topics to receive; '*' receives everything.
+            concurrency: Number of worker tasks handling events in parallel.
+            policies: Queue size and overflow policy per priority class.
+        """
+        self.name = name
+        self.handler = handler
+        self.topics = frozenset(topics)
+        self.concurrency = max(1, concurrency)
+        policies = {**DEFAULT_QUEUE_POLICIES, **(policies or {})}
+        self.queues = {p: PriorityClassQueue(*policies[p]) for p in EventPriority}
+        self._ordered = [self.queues[p] for p in sorted(EventPriority)]
+        self._available = asyncio.Event()
+        self._workers: List[asyncio.Task] = []
+        self._supervisor: Optional[asyncio.Task] = None
+        self.handled = 0
+        self.errors = 0
+        self.restarts = 0
+        self.healthy_run_s = HEALTHY_RUN_S
+
+    def accepts(self, topic: str) -> bool:
+        """Whether this consumer subscribes to the topic."""
+        return '*' in self.topics or topic in self.topics
+
+    def offer(self, event: Event) -> bool:
+        accepted = self.queues[event.priority].offer(event)
+        if accepted:
+            self._available.set()
+        return accepted
+
+    async def put(self, event: Event) -> None:
+        await self.queues[event.priority].put(event)
+        self._available.set()
+
+    def _next_event(self) -> Optional[Event]:
+        for queue in self._ordered:
+            if queue:
+                return queue.pop()
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            event = self._next_event()
+            if event is None:
+                self._available.clear()
+                await self._available.wait()
+                continue
+            try:
+                await self.handler(event)
+                self.handled += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += 1
+                log.error(f"Consumer '{self.name}' failed on '{event.topic}' event: {e}")
+
+    async def _supervise(self) -> None:
+        """Keep ``concurrency`` workers alive, restarting any that die."""
+        loop = asyncio.get_running_loop()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        started = [loop.time()] * self.concurrency
+        backoff = 0.1
+        try:
+            while True:
+                done, _ = await asyncio.wait(self._workers, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    index = self._workers.index(task)
+                    if not task.cancelled() and task.exception() is not None:
+                        log.error(f"Consumer '{self.name}' worker crashed: {task.exception()}")
+                    if loop.time() - started[index] >= self.healthy_run_s:
+                        # Not a crash loop: the worker was healthy until now
+                        backoff = 0.1
+                    self.restarts += 1
+                    await asyncio.sleep(backoff)
+                    backoff = min(backoff * 2, 5.0)
+                    self._workers[index] = asyncio.create_task(self._worker())
+                    started[index] = loop.time()
+        finally:
+            for task in self._workers:
+                task.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+
+    def start(self) -> None:
+        if self._supervisor is None:
+            self._supervisor = asyncio.create_task(self._supervise(), name=f"consumer:{self.name}")
+
+    async def stop(self) -> None:
+        if self._supervisor is not None:
+            self._supervisor.cancel()
+            await asyncio.gather(self._supervisor, return_exceptions=True)
+            self._supervisor = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'handled': self.handled,
+            'errors': self.errors,
+            'restarts': self.restarts,
+            'queues': {
+                p.name: {
+                    'depth': len(q),
+                    'dropped': q.dropped,
+                    'coalesced': q.coalesced,
+                    'delay': q.delay.summary(),
+                }
+                for p, q in self.queues.items()
+            },
+        }
+
+
+class EventBus:
+    """
+    Priority event bus with backpressure for NeoMate AI.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the EventBus.
+
+        Args:
+            config: Optional ``event_bus`` configuration section, e.g.::
+
+                queues:
+                  screen: {size: 16, policy: coalesce}
+                consumers:
+                  brain: {concurrency: 2}
+        """
+        self.config = config or {}
+        self.consumers: Dict[str, ConsumerGroup] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.running = False
+        self.published = 0
+        self.rejected = 0
+        self._policies = self._parse_policies(self.config.get('queues', {}))
+
+    @staticmethod
+    def _parse_policies(queues: Dict[str, Any]) -> Dict[EventPriority, Tuple[int, OverflowPolicy]]:
+        policies = dict(DEFAULT_QUEUE_POLICIES)
+        for name, spec in (queues or {}).items():
+            try:
+                priority = EventPriority[name.upper()]
+                size, policy = policies[priority]
+                policies[priority] = (
+                    int(spec.get('size', size)),
+                    OverflowPolicy(spec.get('policy', policy.value))
+                )
+            except (KeyError, ValueError, AttributeError) as e:
+                log.warning(f"Ignoring invalid event bus queue config '{name}': {e}")
+        return policies
+
+    def subscribe(
+        self,
+        name: str,
+        handler: Handler,
+        topics: Iterable[str] = ('*',),
+        concurrency: Optional[int] = None
+    ) -> ConsumerGroup:
+        """
+        Register a consumer group.
+
+        Args:
+            name: Consumer name.
+            handler: Coroutine function called with each Event.
+            topics: Topics to receive ('*' for all).
+            concurrency: Worker tasks; defaults to ``consumers.<name>.concurrency`` or 1.
+
+        Returns:
+            ConsumerGroup: The registered consumer.
+
+        Raises:
+            ValueError: If a consumer with this name already exists.
+        """
+        if name in self.consumers:
+            raise ValueError(f"Consumer '{name}' is already registered")
+        if concurrency is None:
+            concurrency = self.config.get('consumers', {}).get(name, {}).get('concurrency', 1)
+        group = ConsumerGroup(name, handler, topics, concurrency, self._policies)
+        self.consumers[name] = group
+        if self.running:
+            group.start()
+        return group
+
+    async def start(self) -> None:
+        """Start all consumer workers."""
+        self._loop = asyncio.get_running_loop()
+        self.running = True
+        for group in self.consumers.values():
+            group.start()
+        log.info(f"Event bus started with {len(self.consumers)} consumers")
+
+    async def stop(self) -> None:
+        """Stop all consumer workers; queued events are discarded."""
+        self.running = False
+        await asyncio.gather(*(group.stop() for group in self.consumers.values()))
+        log.info("Event bus stopped")
+
+    async def publish(self, event: Event) -> None:
+        """
+        Publish an event, waiting if a BLOCK queue is full.
+
+        Args:
+            event: Event to publish.
+        """
+        self.published += 1
+        for group in self.consumers.values():
+            if group.accepts(event.topic):
+                await group.put(event)
+
+    def publish_nowait(self, event: Event) -> bool:
+        """
+        Publish an event without waiting.
+
+        Args:
+            event: Event to publish.
+
+        Returns:
+            bool: False if any consumer rejected the event because its BLOCK queue was full.
+        """
+        self.published += 1
+        accepted = True
+        for group in self.consumers.values():
+            if group.accepts(event.topic) and not group.offer(event):
+                accepted = False
+        if not accepted:
+            self.rejected += 1
+        return accepted
+
+    def publish_threadsafe(self, event: Event) -> None:
+        """
+        Publish from a non-asyncio thread (e.g. the audio or capture threads).
+
+        Args:
+            event: Event to publish.
+        """
+        if self._loop is None:
+            raise RuntimeError("Event bus is not started")
+        self._loop.call_soon_threadsafe(self.publish_nowait, event)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get bus and per-consumer statistics.
+
+        Returns:
+            Dict[str, Any]: Publish counters and per-consumer queue stats.
+        """
+        return {
+            'published': self.published,
+            'rejected': self.rejected,
+            'consumers': {name: group.stats() for name, group in self.consumers.items()},
+        }
+
+
+async def simulate_load(
+    duration_s: float = 5.0,
+    voice_rate_hz: float = 2.0,
+    screen_burst_size: int = 500,
+    screen_burst_every_s: float = 0.5,
+    audio_rate_hz: float = 50.0,
+    handler_cost_s: float = 0.002,
+    concurrency: int = 2
+) -> Dict[str, Dict[str, float]]:
+    """
+    Drive the bus with a synthetic mix of voice, audio and bursty screen events.
+
+    Args:
+        duration_s: Length of the simulation.
+        voice_rate_hz: Voice command events per second.
+        screen_burst_size: Screen events per burst (all sharing one coalescing key per region).
+        screen_burst_every_s: Seconds between screen bursts.
+        audio_rate_hz: Audio analyzer events per second.
+        handler_cost_s: Simulated processing time per event.
+        concurrency: Brain worker tasks.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Queueing delay summary, drops and coalesces per priority.
+    """
+    bus = EventBus()
+
+    async def brain(event: Event) -> None:
+        await asyncio.sleep(handler_cost_s)
+
+    group = bus.subscribe('brain', brain, concurrency=concurrency)
+    await bus.start()
+
+    async def periodic(rate: float, make: Callable[[int], Event]) -> None:
+        i = 0
+        period = 1.0 / rate
+        while True:
+            await bus.publish(make(i))
+            i += 1
+            await asyncio.sleep(period)
+
+    async def screen_bursts() -> None:
+        while True:
+            for i in range(screen_burst_size):
+                bus.publish_nowait(Event(
+                    'screen', i, EventPriority.SCREEN, coalesce_key=f"region-{i % 16}"
+                ))
+            await asyncio.sleep(screen_burst_every_s)
+
+    producers = [
+        asyncio.create_task(periodic(voice_rate_hz, lambda i: Event('transcript', i, EventPriority.VOICE))),
+        asyncio.create_task(periodic(audio_rate_hz, lambda i: Event('audio', i, EventPriority.AUDIO))),
+        asyncio.create_task(screen_bursts()),
+    ]
+    await asyncio.sleep(duration_s)
+    for task in producers:
+        task.cancel()
+    await asyncio.gather(*producers, return_exceptions=True)
+    await bus.stop()
+
+    return {
+        p.name: {**q.delay.summary(), 'dropped': q.dropped, 'coalesced': q.coalesced}
+        for p, q in group.queues.items()
+        if q.delay.count or q.dropped
+    }
+
+
+# Standalone execution for load testing
+async def main():
+    """
+    Run the synthetic load generator and print queueing delay per priority class.
+    """
+    results = await simulate_load()
+    print(f"{'priority':>10}  {'count':>6}  {'p50 ms':>8}  {'p99 ms':>8}  {'max ms':>8}  {'dropped':>7}  {'coalesced':>9}")
+    for name, r in results.items():
+        print(
+            f"{name:>10}  {r['count']:>6}  {r['p50_ms']:>8.2f}  {r['p99_ms']:>8.2f}  "
+            f"{r['max_ms']:>8.2f}  {r['dropped']:>7}  {r['coalesced']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,222 @@
+"""
+NeoMate AI Subsystem Registry Module
+
+This module provides lazy loading for NeoMate AI subsystems. Heavy subsystems (wake
+word, speech-to-text, vision, LLMs) are registered by import path and are only
+imported and initialized the first time they are requested, or in the background once
+the application is responsive. Imports run off the event loop and concurrent requests
+for the same subsystem share a single load.
+
+Features:
+- Registration by 'module:attribute' path, nothing imported up front
+- Dependency injection between subsystems (e.g. the audio hub into the wake word detector)
+- Async, deduplicated loading with optional ``initialize()`` call
+- Background preloading after the first prompt is ready
+- Import and init timing per subsystem, reported through the startup profiler
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import importlib
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from src.utils.logger import log
+
+
+@dataclass
+class SubsystemSpec:
+    """How to build one subsystem."""
+
+    name: str
+    target: str
+    dependencies: Dict[str, str] = field(default_factory=dict)
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    init_method: Optional[str] = 'initialize'
+    background: bool = False
+    import_s: float = 0.0
+    init_s: float = 0.0
+
+
+class SubsystemRegistry:
+    """
+    Lazy-loading registry of application subsystems.
+    """
+
+    def __init__(self, profiler: Optional[Any] = None):
+        """
+        Initialize the SubsystemRegistry.
+
+        Args:
+            profiler: Optional StartupProfiler that receives import/init phases.
+        """
+        self.profiler = profiler
+        self.specs: Dict[str, SubsystemSpec] = {}
+        self._instances: Dict[str, Any] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._background: Optional[asyncio.Task] = None
+
+    def register(
+        self,
+        name: str,
+        target: str,
+        dependencies: Optional[Dict[str, str]] = None,
+        init_method: Optional[str] = 'initialize',
+        background: bool = False,
+        **kwargs: Any
+    ) -> None:
+        """
+        Register a subsystem without importing it.
+
+        Args:
+            name: Subsystem name.
+            target: 'package.module:Attribute' of a class or factory callable.
+            dependencies: Constructor keyword -> subsystem name to inject.
+            init_method: Method to await (or call) after construction; None to skip.
+                         A falsy return value is treated as a failed initialization.
+            background: Preload this subsystem in the background after startup.
+            **kwargs: Extra constructor keyword arguments.
+        """
+        self.specs[name] = SubsystemSpec(
+            name=name,
+            target=target,
+            dependencies=dependencies or {},
+            kwargs=kwargs,
+            init_method=init_method,
+            background=background
+        )
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the subsystem has been loaded."""
+        return name in self._instances
+
+    def peek(self, name: str) -> Optional[Any]:
+        """Get a subsystem only if it is already loaded."""
+        return self._instances.get(name)
+
+    async def get(self, name: str) -> Any:
+        """
+        Get a subsystem, importing and initializing it on first use.
+
+        Args:
+            name: Subsystem name.
+
+        Returns:
+            Any: The subsystem instance.
+
+        Raises:
+            KeyError: If the subsystem is not registered.
+            RuntimeError: If its initialization reports failure.
+        """
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self.specs:
+            raise KeyError(f"Unknown subsystem '{name}'")
+        task = self._loading.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._load(self.specs[name]))
+            self._loading[name] = task
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if task.done():
+                self._loading.pop(name, None)
+
+    async def _load(self, spec: SubsystemSpec) -> Any:
+        module_name, _, attribute = spec.target.partition(':')
+
+        started = time.perf_counter()
+        module = await asyncio.to_thread(importlib.import_module, module_name)
+        spec.import_s = time.perf_counter() - started
+        factory = getattr(module, attribute)
+
+        dependencies = {}
+        for keyword, dependency in spec.dependencies.items():
+            dependencies[keyword] = await self.get(dependency)
+
+        started = time.perf_counter()
+        instance = factory(**dependencies, **spec.kwargs)
+        if inspect.isawaitable(instance):
+            instance = await instance
+        if spec.init_method:
+            result = getattr(instance, spec.init_method)()
+            if inspect.isawaitable(result):
+                result = await result
+            if result is False:
+                raise RuntimeError(f"Subsystem '{spec.name}' failed to initialize")
+        spec.init_s = time.perf_counter() - started
+
+        if self.profiler is not None:
+            self.profiler.record(f"import:{spec.name}", spec.import_s)
+            self.profiler.record(f"init:{spec.name}", spec.init_s)
+        log.info(f"Subsystem '{spec.name}' loaded (import {spec.import_s:.3f} s, init {spec.init_s:.3f} s)")
+
+        self._instances[spec.name] = instance
+        return instance
+
+    def preload_background(self, names: Optional[List[str]] = None) -> asyncio.Task:
+        """
+        Load subsystems in the background, one after another.
+
+        Failures are logged and do not affect the application; the subsystem is
+        retried on its next ``get``.
+
+        Args:
+            names: Subsystems to load. Defaults to those registered with ``background=True``.
+
+        Returns:
+            asyncio.Task: The background loading task.
+        """
+        names = names if names is not None else [s.name for s in self.specs.values() if s.background]
+
+        async def run() -> None:
+            for name in names:
+                if name in self._instances:
+                    continue
+                try:
+                    await self.get(name)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    log.warning(f"Background load of subsystem '{name}' failed: {e}")
+
+        self._background = asyncio.create_task(run(), name="subsystem-preload")
+        return self._background
+
+    async def shutdown(self) -> None:
+        """
+        Cancel background loading and clean up loaded subsystems in reverse load order.
+        """
+        if self._background and not self._background.done():
+            self._background.cancel()
+            await asyncio.gather(self._background, return_exceptions=True)
+        for name in reversed(list(self._instances)):
+            instance = self._instances.pop(name)
+            for method_name in ('cleanup', 'stop', 'shutdown', 'close'):
+                method = getattr(instance, method_name, None)
+                if callable(method):
+                    try:
+                        result = method()
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as e:
+                        log.error(f"Error shutting down subsystem '{name}': {e}")
+                    break
+
+    def timings(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get import and init time of every loaded subsystem.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Seconds per subsystem.
+        """
+        return {
+            name: {'import_s': spec.import_s, 'init_s': spec.init_s}
+            for name, spec in self.specs.items()
+            if name in self._instances
+        }
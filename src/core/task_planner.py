@@ -1 +1,669 @@
-#এই মডিউলে LangChain-ভিত্তিক টাস্ক প্ল্যানার ক্লাস থাকবে যা কমপ্লেক্স টাস্ক ভেঙে স্টেপস তৈরি করবে এবং এক্সিকিউট করবে; এটি মাল্টি-স্টেপ টাস্ক হ্যান্ডলিংয়ের জন্য তৈরি, অটোনমাস অপারেশন সাপোর্ট করে।
+"""
+NeoMate AI Task Planner Module
+
+This module runs multi-step tasks. A complex request ("open the browser and search
+for the weather") becomes a plan of steps with dependencies between them, a DAG.
+Running the steps strictly in order wastes time when some are independent, such as
+a web lookup and an app launch. The executor therefore starts every step as soon
+as its dependencies have finished, up to a bound on parallel steps. Plans can be
+built in code or parsed from the JSON an LLM produces.
+
+Features:
+- Plans as dependency DAGs with validation (unknown steps, cycles)
+- Step arguments that reference earlier results ("$search")
+- Event-driven asyncio execution with bounded parallelism
+- Per-step timeouts; retries with exponential backoff for side-effect-free or
+  opted-in actions only
+- Timed-out sync actions are signalled to stop and never retried while still running
+- Downstream cancellation on failure; independent branches keep running
+- Result cache with TTL for side-effect-free actions, shared by concurrent steps
+  and plans through one shielded task
+- Simulator with stub actions comparing makespan with serial execution
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import inspect
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+Action = Callable[..., Any]
+
+
+class PlanError(RuntimeError):
+    """Raised for invalid plans: unknown actions or steps, or dependency cycles."""
+
+
+class StepFailed(RuntimeError):
+    """Raised by ``PlanResult.raise_for_failure`` when a step failed."""
+
+
+class _StillRunning(asyncio.TimeoutError):
+    """A sync action timed out and its worker thread has not stopped yet."""
+
+
+@dataclass
+class _SharedCall:
+    """An in-flight side-effect-free call and the number of steps waiting for it."""
+
+    task: asyncio.Task
+    waiters: int = 0
+
+
+@dataclass
+class PlanStep:
+    """One step of a plan."""
+
+    name: str
+    action: str
+    args: Dict[str, Any] = field(default_factory=dict)
+    depends_on: List[str] = field(default_factory=list)
+    timeout_s: Optional[float] = None
+    retries: Optional[int] = None
+
+
+@dataclass
+class StepResult:
+    """Outcome of one step."""
+
+    name: str
+    status: str = 'pending'
+    result: Any = None
+    error: Optional[str] = None
+    attempts: int = 0
+    cached: bool = False
+    started: float = 0.0
+    finished: float = 0.0
+
+    @property
+    def duration_s(self) -> float:
+        return max(0.0, self.finished - self.started)
+
+
+@dataclass
+class PlanResult:
+    """Outcome of a plan."""
+
+    steps: Dict[str, StepResult]
+    makespan_s: float
+
+    @property
+    def succeeded(self) -> bool:
+        return all(step.status == 'done' for step in self.steps.values())
+
+    def output(self, name: str) -> Any:
+        """Result of a step."""
+        return self.steps[name].result
+
+    def raise_for_failure(self) -> None:
+        """
+        Raise if any step did not complete.
+
+        Raises:
+            StepFailed: Naming the failed and cancelled steps.
+        """
+        failed = [f"{s.name}: {s.error}" for s in self.steps.values() if s.status == 'failed']
+        cancelled = [s.name for s in self.steps.values() if s.status == 'cancelled']
+        if failed or cancelled:
+            raise StepFailed(f"Failed: {'; '.join(failed) or '-'}; cancelled: {', '.join(cancelled) or '-'}")
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    """Mark a finished future's exception as retrieved."""
+    if not future.cancelled():
+        future.exception()
+
+
+class TaskPlan:
+    """
+    A DAG of steps.
+    """
+
+    def __init__(self, steps: Iterable[PlanStep] = ()):
+        """
+        Initialize the plan.
+
+        Args:
+            steps: Initial steps.
+        """
+        self.steps: Dict[str, PlanStep] = {}
+        for step in steps:
+            self.steps[step.name] = step
+
+    def add(
+        self,
+        name: str,
+        action: str,
+        args: Optional[Dict[str, Any]] = None,
+        depends_on: Sequence[str] = (),
+        timeout_s: Optional[float] = None,
+        retries: Optional[int] = None
+    ) -> 'TaskPlan':
+        """
+        Add a step.
+
+        Args:
+            name: Unique step name.
+            action: Registered action name.
+            args: Action keyword arguments; a string '$other' is replaced by the result
+                  of step 'other', which then is an implicit dependency.
+            depends_on: Steps that must finish first.
+            timeout_s: Per-attempt timeout; the planner default if None.
+            retries: Retries after a failed attempt; the planner default if None.
+
+        Returns:
+            TaskPlan: The plan, for chaining.
+
+        Raises:
+            PlanError: If the name is already used.
+        """
+        if name in self.steps:
+            raise PlanError(f"Duplicate step '{name}'")
+        self.steps[name] = PlanStep(name, action, dict(args or {}), list(depends_on), timeout_s, retries)
+        return self
+
+    @staticmethod
+    def _references(step: PlanStep) -> List[str]:
+        return [value[1:] for value in step.args.values() if isinstance(value, str) and value.startswith('$')]
+
+    def dependencies(self, name: str) -> List[str]:
+        """Explicit and argument-reference dependencies of a step."""
+        step = self.steps[name]
+        return list(dict.fromkeys(step.depends_on + self._references(step)))
+
+    def order(self) -> List[str]:
+        """
+        Validate the plan and return its steps in a topological order.
+
+        Returns:
+            List[str]: Step names, every step after its dependencies.
+
+        Raises:
+            PlanError: On unknown dependencies or a cycle.
+        """
+        pending = {}
+        dependents: Dict[str, List[str]] = {name: [] for name in self.steps}
+        for name in self.steps:
+            dependencies = self.dependencies(name)
+            for dependency in dependencies:
+                if dependency not in self.steps:
+                    raise PlanError(f"Step '{name}' depends on unknown step '{dependency}'")
+                dependents[dependency].append(name)
+            pending[name] = len(dependencies)
+        ready = [name for name, count in pending.items() if count == 0]
+        order = []
+        while ready:
+            name = ready.pop()
+            order.append(name)
+            for dependent in dependents[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+        if len(order) < len(self.steps):
+            raise PlanError(f"Dependency cycle among steps: {sorted(set(self.steps) - set(order))}")
+        return order
+
+    @classmethod
+    def from_dicts(cls, steps: Iterable[Dict[str, Any]]) -> 'TaskPlan':
+        """
+        Build a plan from step dictionaries, e.g. an LLM's JSON plan.
+
+        Args:
+            steps: Dicts with 'name', 'action' and optional 'args', 'depends_on',
+                   'timeout_s' and 'retries'.
+
+        Returns:
+            TaskPlan: The plan.
+
+        Raises:
+            PlanError: If a step is not a dict, lacks a name or action, or has
+                       malformed 'args' or 'depends_on'.
+        """
+        if isinstance(steps, (str, bytes, dict)) or not isinstance(steps, Iterable):
+            raise PlanError(f"Plan steps must be a list, not {type(steps).__name__}")
+        plan = cls()
+        for raw in steps:
+            if not isinstance(raw, dict):
+                raise PlanError(f"Plan step must be an object, not {type(raw).__name__}: {raw!r}")
+            if not isinstance(raw.get('name'), str) or not isinstance(raw.get('action'), str):
+                raise PlanError(f"Plan step needs string 'name' and 'action': {raw}")
+            if not isinstance(raw.get('args') or {}, dict):
+                raise PlanError(f"Arguments of step '{raw['name']}' must be an object")
+            depends_on = raw.get('depends_on', ())
+            if not isinstance(depends_on, (list, tuple)) or not all(isinstance(d, str) for d in depends_on):
+                raise PlanError(f"'depends_on' of step '{raw['name']}' must be a list of step names")
+            plan.add(raw['name'], raw['action'], raw.get('args'), raw.get('depends_on', ()),
+                     raw.get('timeout_s'), raw.get('retries'))
+        return plan
+
+    @classmethod
+    def from_json(cls, text: str) -> 'TaskPlan':
+        """
+        Parse a plan from JSON: a list of steps or {"steps": [...]}.
+
+        Args:
+            text: JSON text.
+
+        Returns:
+            TaskPlan: The plan.
+
+        Raises:
+            PlanError: If the JSON is invalid or not shaped like a plan.
+        """
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise PlanError(f"Invalid plan JSON: {e}") from e
+        if isinstance(data, dict):
+            if 'steps' not in data:
+                raise PlanError("Plan JSON object has no 'steps'")
+            data = data['steps']
+        if not isinstance(data, list):
+            raise PlanError(f"Plan steps must be a list, not {type(data).__name__}")
+        return cls.from_dicts(data)
+
+
+class TaskPlanner:
+    """
+    Executes task plans on asyncio with bounded parallelism.
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None):
+        """
+        Initialize the TaskPlanner.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        planner_config = self.config.get('task_planner', {})
+
+        self.max_parallel = planner_config.get('max_parallel', 4)
+        self.step_timeout_s = planner_config.get('step_timeout_s', 30.0)
+        self.retries = planner_config.get('retries', 1)
+        self.retry_backoff_s = planner_config.get('retry_backoff_s', 0.5)
+        self.cache_ttl_s = planner_config.get('cache_ttl_s', 300.0)
+        self.cache_entries = planner_config.get('cache_entries', 256)
+
+        # Name -> (callable, side-effect free, retryable)
+        self.actions: Dict[str, Tuple[Action, bool, bool]] = {}
+        self._cache: 'OrderedDict[str, Tuple[float, Any]]' = OrderedDict()
+        self._inflight: Dict[str, _SharedCall] = {}
+        self.cache_hits = 0
+        # Sync actions still running in a worker thread after their timeout
+        self.abandoned_threads = 0
+
+    def register_action(
+        self,
+        name: str,
+        action: Action,
+        side_effect_free: bool = False,
+        retryable: Optional[bool] = None
+    ) -> None:
+        """
+        Register an action steps can use.
+
+        Args:
+            name: Action name used in plans.
+            action: Async or sync callable taking the step's arguments; sync
+                    callables run in a worker thread. A sync callable with a
+                    ``cancelled`` parameter receives a threading.Event that is set
+                    when its step times out or is cancelled.
+            side_effect_free: Whether results may be cached and shared
+                              (lookups, reads, searches; never clicks or sends).
+            retryable: Whether failed attempts are retried. Defaults to
+                       ``side_effect_free``; pass True only for actions that are
+                       safe to repeat (idempotent).
+        """
+        self.actions[name] = (action, side_effect_free, side_effect_free if retryable is None else retryable)
+
+    def _cache_key(self, step: PlanStep, args: Dict[str, Any]) -> str:
+        return json.dumps([step.action, args], sort_keys=True, default=str)
+
+    def _cached(self, key: str) -> Tuple[bool, Any]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] < time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, entry[1]
+
+    def _store(self, key: str, value: Any) -> None:
+        self._cache[key] = (time.monotonic() + self.cache_ttl_s, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_entries:
+            self._cache.popitem(last=False)
+
+    async def _call(self, action: Action, args: Dict[str, Any], timeout_s: Optional[float]) -> Any:
+        if inspect.iscoroutinefunction(action):
+            return await asyncio.wait_for(action(**args), timeout_s)
+
+        # A thread cannot be killed: on timeout the action is asked to stop and the
+        # caller is told whether it is still running
+        cancelled = threading.Event()
+        if 'cancelled' in inspect.signature(action).parameters:
+            args = {**args, 'cancelled': cancelled}
+        worker = asyncio.ensure_future(asyncio.to_thread(action, **args))
+        try:
+            return await asyncio.wait_for(asyncio.shield(worker), timeout_s)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            cancelled.set()
+            if worker.done():
+                raise
+            self.abandoned_threads += 1
+            worker.add_done_callback(_retrieve)
+            log.warning(f"Sync action {getattr(action, '__name__', action)} is still running after its timeout")
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            raise _StillRunning() from e
+
+    async def _attempts(self, step: PlanStep, args: Dict[str, Any], result: StepResult) -> Any:
+        action, _, retryable = self.actions[step.action]
+        timeout_s = step.timeout_s if step.timeout_s is not None else self.step_timeout_s
+        # Repeating an action with side effects (a click, a sent message) needs an opt-in
+        retries = (step.retries if step.retries is not None else self.retries) if retryable else 0
+        for attempt in range(retries + 1):
+            result.attempts = attempt + 1
+            try:
+                return await self._call(action, args, timeout_s)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                error = f"timed out after {timeout_s} s" if isinstance(e, asyncio.TimeoutError) else f"{type(e).__name__}: {e}"
+                if isinstance(e, _StillRunning):
+                    # Retrying would run the action twice at the same time
+                    raise StepFailed(f"{error}, still running") from e
+                if attempt == retries:
+                    raise StepFailed(error) from e
+                log.warning(f"Step '{step.name}' attempt {attempt + 1} failed ({error}), retrying")
+                await asyncio.sleep(self.retry_backoff_s * 2 ** attempt)
+
+    async def _run_step(self, step: PlanStep, args: Dict[str, Any], result: StepResult) -> Any:
+        if not self.actions[step.action][1]:
+            return await self._attempts(step, args, result)
+        key = self._cache_key(step, args)
+        hit, value = self._cached(key)
+        if hit:
+            result.cached = True
+            self.cache_hits += 1
+            return value
+        shared = self._inflight.get(key)
+        if shared is None:
+            # The call runs in its own task that every waiting step shields, so a
+            # cancelled step (or plan) does not cancel it for the others
+            task = asyncio.create_task(self._compute(key, step, args, result), name=f"plan-call-{step.action}")
+            shared = self._inflight[key] = _SharedCall(task)
+            task.add_done_callback(lambda done: self._finish_shared(key, shared))
+        else:
+            result.cached = True
+        shared.waiters += 1
+        try:
+            return await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            if not shared.waiters and not shared.task.done():
+                # The last waiting step is gone
+                shared.task.cancel()
+
+    async def _compute(self, key: str, step: PlanStep, args: Dict[str, Any], result: StepResult) -> Any:
+        value = await self._attempts(step, args, result)
+        self._store(key, value)
+        return value
+
+    def _finish_shared(self, key: str, shared: _SharedCall) -> None:
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+        _retrieve(shared.task)
+
+    async def execute(self, plan: TaskPlan, max_parallel: Optional[int] = None) -> PlanResult:
+        """
+        Run a plan: each step starts once its dependencies are done, at most
+        ``max_parallel`` at a time. When a step fails, the steps that depend on it
+        are cancelled and independent steps continue.
+
+        Args:
+            plan: Plan to run.
+            max_parallel: Parallel step limit (``task_planner.max_parallel``).
+
+        Returns:
+            PlanResult: Per-step outcome and the plan's makespan.
+
+        Raises:
+            PlanError: If the plan is invalid or uses unknown actions.
+        """
+        plan.order()
+        unknown = sorted({step.action for step in plan.steps.values()} - set(self.actions))
+        if unknown:
+            raise PlanError(f"Unknown actions: {unknown}")
+
+        limit = asyncio.Semaphore(max_parallel or self.max_parallel)
+        results = {name: StepResult(name) for name in plan.steps}
+        waiting = {name: set(plan.dependencies(name)) for name in plan.steps}
+        dependents: Dict[str, List[str]] = {name: [] for name in plan.steps}
+        for name, dependencies in waiting.items():
+            for dependency in dependencies:
+                dependents[dependency].append(name)
+        running: Dict[asyncio.Task, str] = {}
+        started = time.perf_counter()
+
+        async def run(name: str) -> Any:
+            step = plan.steps[name]
+            args = {
+                key: results[value[1:]].result if isinstance(value, str) and value.startswith('$') else value
+                for key, value in step.args.items()
+            }
+            async with limit:
+                results[name].started = time.perf_counter() - started
+                try:
+                    return await self._run_step(step, args, results[name])
+                finally:
+                    results[name].finished = time.perf_counter() - started
+
+        def launch(name: str) -> None:
+            results[name].status = 'running'
+            running[asyncio.create_task(run(name), name=f"plan-step-{name}")] = name
+
+        def cancel_downstream(name: str) -> None:
+            stack = list(dependents[name])
+            while stack:
+                dependent = stack.pop()
+                if results[dependent].status == 'pending':
+                    results[dependent].status = 'cancelled'
+                    results[dependent].error = f"dependency '{name}' failed"
+                    stack.extend(dependents[dependent])
+
+        for name, dependencies in waiting.items():
+            if not dependencies:
+                launch(name)
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    name = running.pop(task)
+                    try:
+                        results[name].result = task.result()
+                        results[name].status = 'done'
+                    except Exception as e:
+                        results[name].status = 'failed'
+                        results[name].error = str(e)
+                        log.warning(f"Plan step '{name}' failed: {e}")
+                        cancel_downstream(name)
+                        continue
+                    for dependent in dependents[name]:
+                        waiting[dependent].discard(name)
+                        if not waiting[dependent] and results[dependent].status == 'pending':
+                            launch(dependent)
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+        return PlanResult(results, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache and worker counters.
+
+        Returns:
+            Dict[str, Any]: Registered actions, cached results, cache hits and
+                            sync workers abandoned after a timeout.
+        """
+        return {
+            'actions': len(self.actions), 'cached_results': len(self._cache), 'cache_hits': self.cache_hits,
+            'abandoned_threads': self.abandoned_threads,
+        }
+
+
+# Simulated action durations in seconds (before ``time_scale``) and whether they are side-effect free
+STUB_ACTIONS: Dict[str, Tuple[float, bool]] = {
+    'open_browser': (1.2, False),
+    'web_search': (0.8, True),
+    'launch_app': (1.5, False),
+    'read_file': (0.3, True),
+    'weather_lookup': (0.6, True),
+    'news_lookup': (0.9, True),
+    'calendar_lookup': (0.4, True),
+    'summarize': (2.0, True),
+    'speak': (0.7, False),
+    'send_email': (0.5, False),
+    'flaky_sync': (0.4, False),
+}
+
+
+def register_stub_actions(planner: TaskPlanner, time_scale: float = 0.1, flaky_failures: int = 1) -> None:
+    """
+    Register stub actions that sleep for their simulated duration.
+
+    Args:
+        planner: Planner to register on.
+        time_scale: Factor applied to every duration.
+        flaky_failures: How many calls of 'flaky_sync' fail before it succeeds.
+    """
+    failures = [flaky_failures]
+
+    def make(name: str, seconds: float) -> Action:
+        async def action(**args: Any) -> str:
+            await asyncio.sleep(seconds * time_scale)
+            if name == 'flaky_sync' and failures[0] > 0:
+                failures[0] -= 1
+                raise ConnectionError("sync server unavailable")
+            return f"{name}({', '.join(f'{k}={str(v)[:20]}' for k, v in sorted(args.items()))})"
+
+        return action
+
+    for name, (seconds, side_effect_free) in STUB_ACTIONS.items():
+        # Syncing is idempotent, so the flaky sync opts in to retries
+        planner.register_action(name, make(name, seconds), side_effect_free, retryable=side_effect_free or name == 'flaky_sync')
+
+
+def sample_plans() -> Dict[str, TaskPlan]:
+    """
+    Plans of typical requests.
+
+    Returns:
+        Dict[str, TaskPlan]: Plan per request.
+    """
+    plans = {}
+    plans['open browser and search'] = (
+        TaskPlan()
+        .add('browser', 'open_browser')
+        .add('search', 'web_search', {'query': 'dhaka weather'})
+        .add('show', 'speak', {'text': '$search'}, depends_on=['browser'])
+    )
+    plans['morning briefing'] = (
+        TaskPlan()
+        .add('weather', 'weather_lookup', {'city': 'Dhaka'})
+        .add('news', 'news_lookup', {'topic': 'bangladesh'})
+        .add('calendar', 'calendar_lookup', {'day': 'today'})
+        .add('summary', 'summarize', {'weather': '$weather', 'news': '$news', 'calendar': '$calendar'})
+        .add('say', 'speak', {'text': '$summary'})
+    )
+    plans['prepare report'] = (
+        TaskPlan()
+        .add('editor', 'launch_app', {'app': 'writer'})
+        .add('notes', 'read_file', {'path': 'notes.txt'})
+        .add('figures', 'read_file', {'path': 'figures.csv'})
+        .add('background', 'web_search', {'query': 'market size'})
+        .add('sync', 'flaky_sync', {'folder': 'reports'})
+        .add('draft', 'summarize', {'notes': '$notes', 'figures': '$figures', 'background': '$background'})
+        .add('send', 'send_email', {'to': 'team', 'body': '$draft'}, depends_on=['editor', 'sync'])
+    )
+    return plans
+
+
+def critical_path_s(plan: TaskPlan, time_scale: float = 0.1) -> float:
+    """Longest dependency chain of a plan in simulated seconds (the makespan lower bound)."""
+    finish: Dict[str, float] = {}
+    for name in plan.order():
+        start = max((finish[d] for d in plan.dependencies(name)), default=0.0)
+        finish[name] = start + STUB_ACTIONS[plan.steps[name].action][0] * time_scale
+    return max(finish.values(), default=0.0)
+
+
+async def simulate(time_scale: float = 0.1, max_parallel: int = 4) -> Dict[str, Dict[str, float]]:
+    """
+    Run the sample plans serially, in parallel, and in parallel again with a warm cache.
+
+    Args:
+        time_scale: Factor applied to the simulated action durations.
+        max_parallel: Parallel step limit.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per plan: serial, parallel and cached makespans,
+        the critical path and whether every step succeeded.
+    """
+    results = {}
+    for title in sample_plans():
+        row = {}
+        for mode, parallel in (('serial', 1), ('parallel', max_parallel)):
+            planner = TaskPlanner()
+            planner.retry_backoff_s = 0.05
+            register_stub_actions(planner, time_scale)
+            outcome = await planner.execute(sample_plans()[title], parallel)
+            row[mode] = outcome.makespan_s
+            row['succeeded'] = outcome.succeeded
+            if mode == 'parallel':
+                outcome = await planner.execute(sample_plans()[title], parallel)
+                row['cached'] = outcome.makespan_s
+        row['critical_path'] = critical_path_s(sample_plans()[title], time_scale)
+        results[title] = row
+    return results
+
+
+async def main():
+    """
+    Run the simulator and show failure handling.
+    """
+    results = await simulate()
+    for title, row in results.items():
+        print(f"{title:25s} serial {row['serial']:5.2f} s  parallel {row['parallel']:5.2f} s "
+              f"({row['serial'] / row['parallel']:.1f}x, critical path {row['critical_path']:.2f} s)  "
+              f"rerun with cache {row['cached']:5.2f} s  ok={row['succeeded']}")
+
+    planner = TaskPlanner()
+    planner.retry_backoff_s = 0.05
+    register_stub_actions(planner, 0.1, flaky_failures=5)
+    outcome = await planner.execute(sample_plans()['prepare report'])
+    print({name: (step.status, step.attempts) for name, step in outcome.steps.items()})
+
+    timeout_plan = TaskPlan().add('slow', 'summarize', timeout_s=0.05, retries=1).add('say', 'speak', {'text': '$slow'})
+    outcome = await planner.execute(timeout_plan)
+    print({name: (step.status, step.error) for name, step in outcome.steps.items()})
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,614 @@
+"""
+NeoMate AI Audio Capture Hub Module
+
+This module owns the microphone (or a replayed recording) for the whole application.
+A single dedicated capture thread writes fixed-size chunks into a preallocated NumPy
+ring buffer, and every consumer (wake word detector, speech-to-text, audio analyzer)
+subscribes with its own read cursor and reads array views of that ring without copying.
+
+Features:
+- One capture thread and one open device for every audio consumer
+- Preallocated, chunk-aligned int16 ring buffer with zero-copy chunk views
+- Independent per-subscriber cursors with overrun detection and drop accounting
+- Sync (blocking with timeout) and async (awaitable / async iterator) consumption
+- Pre-roll snapshots of recently captured audio for hand-off between consumers
+- PyAudio microphone, WAV file replay and in-memory array sources
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from src.utils.logger import log
+
+
+class AudioSource:
+    """
+    Base class for audio sources feeding the AudioCaptureHub.
+
+    A source produces mono int16 PCM at the hub's sample rate and writes it
+    directly into the ring buffer slot handed to ``read_into``.
+    """
+
+    #: Live sources (microphones) never wait for slow consumers; replayed
+    #: sources apply backpressure so no frame is lost.
+    is_live: bool = False
+
+    def open(self, sample_rate: int, chunk_size: int) -> None:
+        """
+        Prepare the source for reading.
+
+        Args:
+            sample_rate: Sample rate expected by the hub in Hz.
+            chunk_size: Number of frames requested per read.
+        """
+
+    def read_into(self, out: np.ndarray) -> int:
+        """
+        Fill ``out`` with the next frames.
+
+        Args:
+            out: Writable int16 view of the ring buffer slot.
+
+        Returns:
+            int: Number of frames written; fewer than ``len(out)`` means end of stream.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the source."""
+
+
+class PyAudioSource(AudioSource):
+    """
+    Microphone source backed by a blocking PyAudio input stream.
+    """
+
+    is_live = True
+
+    def __init__(self, device_index: Optional[int] = None):
+        """
+        Initialize the microphone source.
+
+        Args:
+            device_index: Optional PyAudio input device index. Uses the default device if None.
+        """
+        self.device_index = device_index
+        self._audio = None
+        self._stream = None
+
+    def open(self, sample_rate: int, chunk_size: int) -> None:
+        import pyaudio
+
+        self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=chunk_size
+        )
+
+    def read_into(self, out: np.ndarray) -> int:
+        data = self._stream.read(len(out), exception_on_overflow=False)
+        samples = np.frombuffer(data, dtype=np.int16)
+        out[:len(samples)] = samples
+        return len(samples)
+
+    def close(self) -> None:
+        if self._stream:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._stream = None
+        if self._audio:
+            self._audio.terminate()
+            self._audio = None
+
+
+class ArraySource(AudioSource):
+    """
+    In-memory source replaying an int16 sample array, mainly for tests and benchmarks.
+    """
+
+    def __init__(self, samples: np.ndarray, realtime: bool = False, loop: bool = False):
+        """
+        Initialize the array source.
+
+        Args:
+            samples: Mono int16 samples to replay.
+            realtime: If True, pace reads at the real-time chunk rate (behaves like a live source).
+            loop: If True, restart from the beginning when the end is reached.
+        """
+        self.samples = np.ascontiguousarray(samples, dtype=np.int16)
+        self.realtime = realtime
+        self.loop = loop
+        self.is_live = realtime
+        self._pos = 0
+        self._chunk_period = 0.0
+        self._next_deadline = 0.0
+
+    def open(self, sample_rate: int, chunk_size: int) -> None:
+        self._pos = 0
+        self._chunk_period = chunk_size / sample_rate
+        self._next_deadline = time.perf_counter()
+
+    def _pace(self) -> None:
+        if not self.realtime:
+            return
+        self._next_deadline += self._chunk_period
+        delay = self._next_deadline - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+    def read_into(self, out: np.ndarray) -> int:
+        self._pace()
+        written = 0
+        total = len(self.samples)
+        while written < len(out):
+            if self._pos >= total:
+                if not self.loop or total == 0:
+                    break
+                self._pos = 0
+            n = min(len(out) - written, total - self._pos)
+            out[written:written + n] = self.samples[self._pos:self._pos + n]
+            self._pos += n
+            written += n
+        return written
+
+
+class WavFileSource(AudioSource):
+    """
+    Replays a 16-bit PCM WAV file, optionally at real-time speed.
+    """
+
+    def __init__(self, path: Union[str, Path], realtime: bool = False, loop: bool = False):
+        """
+        Initialize the WAV replay source.
+
+        Args:
+            path: Path to a 16-bit PCM WAV file recorded at the hub sample rate.
+            realtime: If True, pace reads at the real-time chunk rate (behaves like a live source).
+            loop: If True, restart from the beginning when the end is reached.
+        """
+        self.path = Path(path)
+        self.realtime = realtime
+        self.loop = loop
+        self.is_live = realtime
+        self._wav: Optional[wave.Wave_read] = None
+        self._channels = 1
+        self._chunk_period = 0.0
+        self._next_deadline = 0.0
+
+    def open(self, sample_rate: int, chunk_size: int) -> None:
+        self._wav = wave.open(str(self.path), 'rb')
+        if self._wav.getsampwidth() != 2:
+            raise ValueError(f"{self.path} must be 16-bit PCM, got {self._wav.getsampwidth() * 8}-bit")
+        if self._wav.getframerate() != sample_rate:
+            raise ValueError(
+                f"{self.path} is sampled at {self._wav.getframerate()} Hz, expected {sample_rate} Hz"
+            )
+        self._channels = self._wav.getnchannels()
+        self._chunk_period = chunk_size / sample_rate
+        self._next_deadline = time.perf_counter()
+
+    def read_into(self, out: np.ndarray) -> int:
+        if self.realtime:
+            self._next_deadline += self._chunk_period
+            delay = self._next_deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+        written = 0
+        while written < len(out):
+            data = self._wav.readframes(len(out) - written)
+            if not data:
+                if not self.loop:
+                    break
+                self._wav.rewind()
+                continue
+            samples = np.frombuffer(data, dtype=np.int16)
+            if self._channels > 1:
+                samples = samples.reshape(-1, self._channels).mean(axis=1).astype(np.int16)
+            out[written:written + len(samples)] = samples
+            written += len(samples)
+        return written
+
+    def close(self) -> None:
+        if self._wav:
+            self._wav.close()
+            self._wav = None
+
+
+class AudioSubscription:
+    """
+    A consumer's read cursor into the AudioCaptureHub ring buffer.
+
+    Chunks are returned as views into the ring buffer. A view stays valid until the
+    capture thread laps it, i.e. for roughly ``capacity_seconds`` minus one chunk;
+    consumers that need to keep audio longer must copy it.
+    """
+
+    def __init__(self, hub: 'AudioCaptureHub', name: str, cursor: int):
+        self.name = name
+        self.cursor = cursor
+        self.overruns = 0
+        self.dropped_frames = 0
+        self.chunks_read = 0
+        self.closed = False
+        self._hub = hub
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._waiting = False
+
+    def available(self) -> int:
+        """
+        Get the number of complete chunks ready to be read.
+
+        Returns:
+            int: Number of unread chunks (including ones that will be reported as overrun).
+        """
+        return (self._hub._write_pos - self.cursor) // self._hub.chunk_size
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether no further chunk will ever be returned (closed, or source ended and fully read)."""
+        return self.closed or (self._hub.finished and self.cursor >= self._hub._write_pos)
+
+    def _take(self) -> Optional[np.ndarray]:
+        hub = self._hub
+        write_pos = hub._write_pos
+        if self.cursor >= write_pos:
+            return None
+
+        # The slot at write_pos is being overwritten, so one chunk of the ring is unreadable
+        oldest = write_pos - hub._capacity + hub.chunk_size
+        if self.cursor < oldest:
+            dropped = oldest - self.cursor
+            self.overruns += 1
+            self.dropped_frames += dropped
+            self.cursor = oldest
+            log.warning(f"Audio subscriber '{self.name}' overran, dropped {dropped} frames")
+
+        start = self.cursor % hub._capacity
+        self.cursor += hub.chunk_size
+        self.chunks_read += 1
+        if not hub._live:
+            hub._notify_writer()
+        return hub._ring_view[start:start + hub.chunk_size]
+
+    def read_chunk(self, timeout: Optional[float] = None) -> Optional[np.ndarray]:
+        """
+        Read the next chunk, blocking until it is captured.
+
+        Args:
+            timeout: Maximum seconds to wait. None waits indefinitely, 0 never blocks.
+
+        Returns:
+            Optional[np.ndarray]: Read-only int16 view of the chunk, or None on timeout,
+            end of stream or after the subscription was closed.
+        """
+        chunk = self._take()
+        if chunk is not None or timeout == 0:
+            return chunk
+
+        hub = self._hub
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with hub._cond:
+            while self.cursor >= hub._write_pos and not self.closed and not hub.finished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                hub._cond.wait(remaining)
+        return self._take()
+
+    async def next_chunk(self) -> Optional[np.ndarray]:
+        """
+        Await the next chunk without hopping to a worker thread.
+
+        Returns:
+            Optional[np.ndarray]: Read-only int16 view of the chunk, or None at end of stream.
+        """
+        if self._event is None:
+            self._loop = asyncio.get_running_loop()
+            self._event = asyncio.Event()
+
+        while True:
+            chunk = self._take()
+            if chunk is not None:
+                return chunk
+            if self.closed or self._hub.finished:
+                return None
+            self._event.clear()
+            # Publish interest before re-checking so the capture thread cannot miss us
+            self._waiting = True
+            if self.cursor < self._hub._write_pos or self._hub.finished:
+                self._waiting = False
+                continue
+            await self._event.wait()
+
+    def _wake(self) -> None:
+        if self._waiting:
+            self._waiting = False
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                # Event loop already closed
+                pass
+
+    def __aiter__(self) -> 'AudioSubscription':
+        return self
+
+    async def __anext__(self) -> np.ndarray:
+        chunk = await self.next_chunk()
+        if chunk is None:
+            raise StopAsyncIteration
+        return chunk
+
+    def close(self) -> None:
+        """
+        Detach this subscriber from the hub.
+        """
+        self.closed = True
+        self._hub._unsubscribe(self)
+        self._wake()
+
+
+class AudioCaptureHub:
+    """
+    Shared audio capture hub for NeoMate AI.
+
+    Opens the audio source once and fans captured chunks out to any number of
+    subscribers through a preallocated ring buffer.
+    """
+
+    def __init__(
+        self,
+        source: Optional[AudioSource] = None,
+        sample_rate: int = 16000,
+        chunk_size: int = 1280,
+        capacity_seconds: float = 10.0
+    ):
+        """
+        Initialize the AudioCaptureHub.
+
+        Args:
+            source: Audio source to capture from. Defaults to the system microphone.
+            sample_rate: Capture sample rate in Hz.
+            chunk_size: Frames per chunk (1280 frames = 80 ms at 16 kHz, as openwakeword expects).
+            capacity_seconds: Ring buffer length; bounds pre-roll and how far a consumer may lag.
+        """
+        self.source = source or PyAudioSource()
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+
+        n_chunks = max(4, int(np.ceil(capacity_seconds * sample_rate / chunk_size)))
+        self._capacity = n_chunks * chunk_size
+        self._ring = np.zeros(self._capacity, dtype=np.int16)
+        # Consumers only ever get read-only views
+        self._ring_view = self._ring.view()
+        self._ring_view.flags.writeable = False
+
+        self._write_pos = 0
+        self._live = self.source.is_live
+        self._cond = threading.Condition()
+        self._subscribers: List[AudioSubscription] = []
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.finished = False
+        self.error: Optional[BaseException] = None
+
+        log.info(f"AudioCaptureHub initialized ({n_chunks} chunks x {chunk_size} frames)")
+
+    @property
+    def write_position(self) -> int:
+        """Absolute index of the next frame to be captured."""
+        return self._write_pos
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the capture thread is active."""
+        return self._running
+
+    def start(self) -> None:
+        """
+        Open the source and start the capture thread. Calling start twice is a no-op.
+        """
+        if self._running:
+            return
+        self.source.open(self.sample_rate, self.chunk_size)
+        self._live = self.source.is_live
+        self._running = True
+        self.finished = False
+        self._thread = threading.Thread(target=self._capture_loop, name="AudioCaptureHub", daemon=True)
+        self._thread.start()
+        log.info("AudioCaptureHub capture thread started")
+
+    def stop(self) -> None:
+        """
+        Stop the capture thread and close the source.
+        """
+        if not self._running and self._thread is None:
+            return
+        self._running = False
+        self._notify_writer()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        try:
+            self.source.close()
+        except Exception as e:
+            log.error(f"Error closing audio source: {e}")
+        self._finish()
+        log.info("AudioCaptureHub stopped")
+
+    def subscribe(
+        self,
+        name: str,
+        from_start: bool = False,
+        start_frame: Optional[int] = None
+    ) -> AudioSubscription:
+        """
+        Register a new consumer.
+
+        Args:
+            name: Consumer name used in logs and stats.
+            from_start: If True, start at the oldest frame still buffered instead of the newest.
+            start_frame: Absolute chunk-aligned frame index to start at, e.g. the point where
+                         another consumer handed off. Clamped to what is still buffered.
+
+        Returns:
+            AudioSubscription: The consumer's cursor.
+        """
+        with self._cond:
+            oldest = max(0, self._write_pos - self._capacity + self.chunk_size)
+            cursor = self._write_pos
+            if start_frame is not None:
+                aligned = start_frame - start_frame % self.chunk_size
+                cursor = min(max(aligned, oldest), self._write_pos)
+            elif from_start:
+                cursor = oldest
+            subscription = AudioSubscription(self, name, cursor)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription: AudioSubscription) -> None:
+        with self._cond:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            self._cond.notify_all()
+
+    def snapshot(self, frames: int, end: Optional[int] = None) -> np.ndarray:
+        """
+        Copy recently captured audio, e.g. as pre-roll for a downstream consumer.
+
+        Args:
+            frames: Number of frames to return (clamped to what is still buffered).
+            end: Absolute frame index to end at (exclusive). Defaults to the write position.
+
+        Returns:
+            np.ndarray: Contiguous int16 copy of the requested audio.
+        """
+        write_pos = self._write_pos
+        end = write_pos if end is None else min(end, write_pos)
+        start = max(0, end - frames, write_pos - self._capacity + self.chunk_size)
+        if start >= end:
+            return np.zeros(0, dtype=np.int16)
+        a, b = start % self._capacity, end % self._capacity
+        if a < b or b == 0:
+            return self._ring[a:b or self._capacity].copy()
+        return np.concatenate((self._ring[a:], self._ring[:b]))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get per-subscriber read statistics.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Lag, overrun and drop counters by subscriber name.
+        """
+        with self._cond:
+            subscribers = list(self._subscribers)
+        return {
+            s.name: {
+                'lag_frames': self._write_pos - s.cursor,
+                'chunks_read': s.chunks_read,
+                'overruns': s.overruns,
+                'dropped_frames': s.dropped_frames,
+            }
+            for s in subscribers
+        }
+
+    def _notify_writer(self) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def _wait_for_slowest(self) -> None:
+        """Backpressure for replayed sources: never overwrite unread audio."""
+        # After this write the next slot becomes unreadable too, hence two chunks of headroom
+        limit = self._write_pos + 2 * self.chunk_size - self._capacity
+        with self._cond:
+            while self._running and any(s.cursor < limit for s in self._subscribers):
+                self._cond.wait(0.1)
+
+    def _finish(self) -> None:
+        with self._cond:
+            self.finished = True
+            self._cond.notify_all()
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._wake()
+
+    def _capture_loop(self) -> None:
+        chunk = self.chunk_size
+        ring = self._ring
+        try:
+            while self._running:
+                start = self._write_pos % self._capacity
+                if not self._live:
+                    self._wait_for_slowest()
+                    if not self._running:
+                        break
+
+                slot = ring[start:start + chunk]
+                n = self.source.read_into(slot)
+                if n <= 0:
+                    break
+                if n < chunk:
+                    slot[n:] = 0
+
+                with self._cond:
+                    self._write_pos += chunk
+                    self._cond.notify_all()
+                    subscribers = list(self._subscribers)
+                for subscription in subscribers:
+                    subscription._wake()
+
+                if n < chunk:
+                    break
+        except Exception as e:
+            self.error = e
+            log.error(f"AudioCaptureHub capture failed: {e}")
+        finally:
+            self._running = False
+            self._finish()
+
+
+# Standalone execution for testing
+async def main():
+    """
+    Replay a WAV file through the hub and print per-subscriber statistics.
+    """
+    import sys
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.input.audio_capture <file.wav>")
+        return
+
+    hub = AudioCaptureHub(WavFileSource(sys.argv[1]))
+    first = hub.subscribe("first")
+    second = hub.subscribe("second")
+    hub.start()
+
+    async def drain(subscription: AudioSubscription) -> int:
+        count = 0
+        async for _ in subscription:
+            count += 1
+        return count
+
+    counts = await asyncio.gather(drain(first), drain(second))
+    print(f"Chunks read: {counts}")
+    print(f"Stats: {hub.stats()}")
+    hub.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,476 @@
+"""
+NeoMate AI Multi-Stream Wake Word Module
+
+This module serves wake word detection for many audio endpoints on one host. The
+OpenWakeWord weights are loaded once; each stream only keeps its small streaming
+feature buffers. On every tick the 1280-sample chunks of all ready streams are stacked
+into one batch array and pushed through the melspectrogram, embedding and wake word
+models in a single vectorized call per stage.
+
+Features:
+- One shared model instance for N streams
+- Per-stream streaming state (raw audio tail, mel frames, embeddings) in stacked arrays
+- One batched prediction per tick, falling back to per-row calls on fixed-batch backends
+- Per-stream detection events with a refractory window
+- Streams can be added and removed while serving; their model state is only touched
+  by the serving thread, between ticks
+- CPU-per-stream benchmark to verify sublinear scaling with stream count
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from src.input.audio_capture import ArraySource, AudioCaptureHub, AudioSubscription
+from src.input.wake_word_detector import WakeWordDetector
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+
+CHUNK_SIZE = 1280
+SAMPLE_RATE = 16000
+# Streaming context used by openwakeword: 3 hops of 160 samples before each chunk
+_RAW_CONTEXT = 160 * 3
+_MEL_WINDOW = 76
+_MEL_BINS = 32
+_EMBEDDING_DIM = 96
+
+
+@dataclass
+class WakeWordStages:
+    """
+    The three model stages of the wake word pipeline, as callables taking a batch.
+    """
+
+    melspectrogram: Callable[[np.ndarray], Any]
+    embedding: Callable[[np.ndarray], Any]
+    classifiers: Dict[str, Callable[[np.ndarray], Any]]
+    # Classifier name -> number of embedding frames it reads
+    classifier_frames: Dict[str, int]
+
+    @classmethod
+    def from_openwakeword(cls, model: Any) -> 'WakeWordStages':
+        """
+        Take the stages from a loaded openwakeword Model.
+
+        openwakeword has no public batched API, so this is the only place that reads
+        its internals; an incompatible version fails here with a clear error.
+
+        Args:
+            model: openwakeword.Model instance.
+
+        Returns:
+            WakeWordStages: The model's stages.
+
+        Raises:
+            RuntimeError: If the openwakeword version does not expose the expected stages.
+        """
+        try:
+            features = model.preprocessor
+            return cls(
+                melspectrogram=features._get_melspectrogram,
+                embedding=features.embedding_model_predict,
+                classifiers={name: model.model_prediction_function[name] for name in model.models},
+                classifier_frames={name: int(model.model_inputs[name]) for name in model.models}
+            )
+        except (AttributeError, KeyError, TypeError) as e:
+            raise RuntimeError(f"Unsupported openwakeword version for batched inference: {e}") from e
+
+
+class BatchedWakeWordModel:
+    """
+    Batched streaming front-end over a single OpenWakeWord model.
+
+    Reproduces openwakeword's streaming feature pipeline with an extra leading
+    stream dimension on every buffer so a whole tick runs as one batch. The state
+    arrays are not locked: only one thread may call ``allocate``, ``reset`` and
+    ``predict_batch``.
+    """
+
+    def __init__(self, inference_framework: str = 'tflite', stages: Optional[WakeWordStages] = None):
+        """
+        Load the OpenWakeWord model once.
+
+        Args:
+            inference_framework: OpenWakeWord backend ('tflite' or 'onnx').
+            stages: Optional model stages. If None, the pretrained OpenWakeWord
+                    models are loaded.
+        """
+        self.model = None
+        if stages is None:
+            self.model = WakeWordDetector.create_model(inference_framework)
+            stages = WakeWordStages.from_openwakeword(self.model)
+        self.stages = stages
+        self.model_names = list(stages.classifiers)
+        self.model_frames = dict(stages.classifier_frames)
+        self._max_frames = max(self.model_frames.values())
+        # Stage name -> whether the backend accepted a batch dimension
+        self._batch_ok: Dict[str, bool] = {}
+
+        self._raw_tail = np.zeros((0, _RAW_CONTEXT), dtype=np.int16)
+        self._mel = np.zeros((0, _MEL_WINDOW, _MEL_BINS), dtype=np.float32)
+        self._embeddings = np.zeros((0, self._max_frames, _EMBEDDING_DIM), dtype=np.float32)
+
+    def allocate(self, n_streams: int) -> None:
+        """
+        Grow the per-stream state arrays to hold ``n_streams`` slots.
+
+        Args:
+            n_streams: Total number of stream slots.
+        """
+        grow = n_streams - len(self._raw_tail)
+        if grow <= 0:
+            return
+        self._raw_tail = np.concatenate((self._raw_tail, np.zeros((grow, _RAW_CONTEXT), dtype=np.int16)))
+        # openwakeword starts its mel buffer at ones
+        self._mel = np.concatenate((self._mel, np.ones((grow, _MEL_WINDOW, _MEL_BINS), dtype=np.float32)))
+        self._embeddings = np.concatenate(
+            (self._embeddings, np.zeros((grow, self._max_frames, _EMBEDDING_DIM), dtype=np.float32))
+        )
+
+    def reset(self, slot: int) -> None:
+        """
+        Clear the streaming state of one slot.
+
+        Args:
+            slot: Stream slot index.
+        """
+        self._raw_tail[slot] = 0
+        self._mel[slot] = 1.0
+        self._embeddings[slot] = 0.0
+
+    def _run(self, stage: str, fn: Callable[[np.ndarray], Any], x: np.ndarray) -> np.ndarray:
+        """
+        Run one stage batched, or row by row if the backend has a fixed batch size of 1.
+        """
+        if self._batch_ok.get(stage, True):
+            try:
+                out = np.asarray(fn(x))
+                if out.size % len(x) == 0:
+                    self._batch_ok[stage] = True
+                    return out.reshape(len(x), -1)
+            except Exception as e:
+                log.debug(f"Batched '{stage}' stage unsupported by backend, using per-row calls: {e}")
+            self._batch_ok[stage] = False
+        return np.stack([np.asarray(fn(x[i:i + 1])).reshape(-1) for i in range(len(x))])
+
+    def predict_batch(self, chunks: np.ndarray, slots: np.ndarray) -> np.ndarray:
+        """
+        Advance the given streams by one chunk each and score them.
+
+        Args:
+            chunks: int16 array of shape (k, CHUNK_SIZE).
+            slots: Stream slot index for each row of ``chunks``.
+
+        Returns:
+            np.ndarray: float32 scores of shape (k, n_models).
+        """
+        k = len(slots)
+
+        # 1. Melspectrogram over chunk + context for every stream at once
+        raw = np.concatenate((self._raw_tail[slots], chunks), axis=1).astype(np.float32)
+        self._raw_tail[slots] = chunks[:, -_RAW_CONTEXT:]
+        mel = self._run('melspectrogram', self.stages.melspectrogram, raw)
+        mel = mel.reshape(k, -1, _MEL_BINS).astype(np.float32)
+        n_new = mel.shape[1]
+        mel_window = np.concatenate((self._mel[slots][:, n_new:], mel), axis=1)
+        self._mel[slots] = mel_window
+
+        # 2. One embedding per stream from the last 76 mel frames
+        embedding = self._run(
+            'embedding',
+            self.stages.embedding,
+            mel_window[:, :, :, None]
+        ).reshape(k, _EMBEDDING_DIM)
+        emb_window = np.concatenate((self._embeddings[slots][:, 1:], embedding[:, None, :]), axis=1)
+        self._embeddings[slots] = emb_window
+
+        # 3. Every wake word model on the stacked embedding windows
+        scores = np.empty((k, len(self.model_names)), dtype=np.float32)
+        for j, name in enumerate(self.model_names):
+            frames = self.model_frames[name]
+            x = np.ascontiguousarray(emb_window[:, -frames:])
+            scores[:, j] = self._run(name, self.stages.classifiers[name], x)[:, 0]
+        return scores
+
+
+@dataclass
+class StreamHandle:
+    """A stream registered with the MultiStreamWakeWordServer."""
+
+    stream_id: str
+    slot: int
+    subscription: AudioSubscription
+    detection_event: asyncio.Event = field(default_factory=asyncio.Event)
+    last_detection: Optional[Dict[str, Any]] = None
+    detections: int = 0
+    chunks: int = 0
+    refractory_until: int = 0
+
+
+class MultiStreamWakeWordServer:
+    """
+    Serves wake word detection for many streams with one model and one worker thread.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        model: Optional[BatchedWakeWordModel] = None,
+        confidence_threshold: Optional[float] = None,
+        refractory_s: float = 2.0
+    ):
+        """
+        Initialize the MultiStreamWakeWordServer.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+            model: Optional preloaded batched model. Loaded lazily if None.
+            confidence_threshold: Detection threshold. Read from configuration if None.
+            refractory_s: Seconds a stream is muted after a detection.
+        """
+        if confidence_threshold is None:
+            config = (config_loader or ConfigLoader()).get_config()
+            confidence_threshold = config.get('wake_word', {}).get('confidence_threshold', 0.5)
+        self.confidence_threshold = confidence_threshold
+
+        self.model = model
+        self.refractory_chunks = max(1, int(refractory_s * SAMPLE_RATE / CHUNK_SIZE))
+        self.tick_period = CHUNK_SIZE / SAMPLE_RATE
+
+        self.streams: Dict[str, StreamHandle] = {}
+        self._lock = threading.Lock()
+        # Slots of newly added streams, reset by the serving thread before its next tick
+        self._pending_resets: List[int] = []
+        self._batch = np.zeros((0, CHUNK_SIZE), dtype=np.int16)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.is_serving = False
+
+        # Stats
+        self.ticks = 0
+        self.batched_chunks = 0
+        self.inference_cpu_s = 0.0
+
+        log.info("MultiStreamWakeWordServer initialized successfully")
+
+    def add_stream(self, stream_id: str, subscription: AudioSubscription) -> StreamHandle:
+        """
+        Register a stream.
+
+        Args:
+            stream_id: Unique stream identifier.
+            subscription: Subscription to the stream's AudioCaptureHub.
+
+        Returns:
+            StreamHandle: Handle exposing the stream's ``detection_event``.
+
+        Raises:
+            ValueError: If the stream id is already registered.
+        """
+        with self._lock:
+            if stream_id in self.streams:
+                raise ValueError(f"Stream '{stream_id}' is already registered")
+            used = {h.slot for h in self.streams.values()}
+            slot = next(i for i in range(len(used) + 1) if i not in used)
+            handle = StreamHandle(stream_id=stream_id, slot=slot, subscription=subscription)
+            self.streams[stream_id] = handle
+            # The serving thread may be inside predict_batch, which writes the state
+            # arrays; it grows and resets them itself between ticks
+            self._pending_resets.append(slot)
+        log.info(f"Wake word stream '{stream_id}' registered in slot {slot}")
+        return handle
+
+    def remove_stream(self, stream_id: str) -> None:
+        """
+        Unregister a stream and close its subscription.
+
+        Args:
+            stream_id: Stream identifier.
+        """
+        with self._lock:
+            handle = self.streams.pop(stream_id, None)
+        if handle:
+            handle.subscription.close()
+
+    async def serve(self) -> None:
+        """
+        Run the batched detection loop until ``stop`` is called or every stream ends.
+        """
+        if self.model is None:
+            self.model = await asyncio.to_thread(BatchedWakeWordModel)
+        self._loop = asyncio.get_running_loop()
+        self.is_serving = True
+        log.info(f"MultiStreamWakeWordServer serving {len(self.streams)} streams")
+        try:
+            await asyncio.to_thread(self._serve_loop)
+        finally:
+            self.is_serving = False
+
+    def stop(self) -> None:
+        """
+        Stop the detection loop after the current tick.
+        """
+        self.is_serving = False
+
+    def _gather(self, handles: List[StreamHandle]) -> List[StreamHandle]:
+        """Collect one chunk per stream into the batch array, waiting at most one tick."""
+        if len(self._batch) < len(handles):
+            self._batch = np.zeros((len(handles), CHUNK_SIZE), dtype=np.int16)
+
+        deadline = time.monotonic() + self.tick_period
+        ready = []
+        for handle in handles:
+            remaining = max(0.0, deadline - time.monotonic())
+            chunk = handle.subscription.read_chunk(timeout=remaining)
+            if chunk is None:
+                continue
+            self._batch[len(ready)] = chunk
+            ready.append(handle)
+        return ready
+
+    def _serve_loop(self) -> None:
+        while self.is_serving:
+            with self._lock:
+                self._apply_pending()
+                handles = list(self.streams.values())
+            handles = [h for h in handles if not h.subscription.exhausted]
+            if not handles:
+                break
+
+            ready = self._gather(handles)
+            if not ready:
+                continue
+
+            slots = np.fromiter((h.slot for h in ready), dtype=np.intp, count=len(ready))
+            cpu_start = time.thread_time()
+            scores = self.model.predict_batch(self._batch[:len(ready)], slots)
+            self.inference_cpu_s += time.thread_time() - cpu_start
+            self.ticks += 1
+            self.batched_chunks += len(ready)
+
+            best = scores.argmax(axis=1)
+            peak = scores[np.arange(len(ready)), best]
+            for i in np.flatnonzero(peak > self.confidence_threshold):
+                self._dispatch(ready[i], self.model.model_names[best[i]], float(peak[i]))
+            for handle in ready:
+                handle.chunks += 1
+
+    def _apply_pending(self) -> None:
+        """Grow and reset the model state for streams added since the last tick."""
+        if not self._pending_resets:
+            return
+        self.model.allocate(max(self._pending_resets) + 1)
+        for slot in self._pending_resets:
+            self.model.reset(slot)
+        self._pending_resets.clear()
+
+    def _dispatch(self, handle: StreamHandle, model_name: str, confidence: float) -> None:
+        if handle.chunks < handle.refractory_until:
+            return
+        handle.refractory_until = handle.chunks + self.refractory_chunks
+        handle.detections += 1
+        handle.last_detection = {
+            'model': model_name,
+            'confidence': confidence,
+            'frame': handle.subscription.cursor,
+        }
+        log.info(f"Wake word detected on stream '{handle.stream_id}': {model_name} (confidence: {confidence:.2f})")
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(handle.detection_event.set)
+            except RuntimeError:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get batching and CPU statistics.
+
+        Returns:
+            Dict[str, Any]: Tick count, mean batch size, inference CPU and per-stream counters.
+        """
+        return {
+            'ticks': self.ticks,
+            'mean_batch_size': self.batched_chunks / self.ticks if self.ticks else 0.0,
+            'inference_cpu_s': self.inference_cpu_s,
+            'streams': {
+                h.stream_id: {'chunks': h.chunks, 'detections': h.detections}
+                for h in self.streams.values()
+            },
+        }
+
+
+async def benchmark_scaling(
+    stream_counts: tuple = (1, 2, 4, 8, 16, 32),
+    seconds: float = 10.0,
+    inference_framework: str = 'onnx'
+) -> List[Dict[str, float]]:
+    """
+    Measure process CPU time against stream count on synthetic audio.
+
+    Args:
+        stream_counts: Stream counts to measure.
+        seconds: Seconds of audio replayed per stream.
+        inference_framework: OpenWakeWord backend.
+
+    Returns:
+        List[Dict[str, float]]: CPU seconds, CPU per stream and real-time factor per count.
+    """
+    model = await asyncio.to_thread(BatchedWakeWordModel, inference_framework)
+    rng = np.random.default_rng(0)
+    samples = (rng.standard_normal(int(seconds * SAMPLE_RATE)) * 1000).astype(np.int16)
+
+    results = []
+    for n in stream_counts:
+        server = MultiStreamWakeWordServer(model=model, confidence_threshold=1.0)
+        hubs = []
+        for i in range(n):
+            hub = AudioCaptureHub(ArraySource(samples), capacity_seconds=2.0)
+            server.add_stream(f"stream-{i}", hub.subscribe(f"stream-{i}"))
+            hubs.append(hub)
+        for hub in hubs:
+            hub.start()
+
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        await server.serve()
+        cpu = time.process_time() - cpu_start
+        wall = time.perf_counter() - wall_start
+        for hub in hubs:
+            hub.stop()
+
+        results.append({
+            'streams': n,
+            'cpu_s': cpu,
+            'cpu_per_stream_s': cpu / n,
+            'inference_cpu_s': server.inference_cpu_s,
+            'real_time_factor': cpu / seconds,
+            'wall_s': wall,
+            'mean_batch_size': server.stats()['mean_batch_size'],
+        })
+    return results
+
+
+# Standalone execution for benchmarking
+async def main():
+    """
+    Print how CPU cost scales with the number of served streams.
+    """
+    results = await benchmark_scaling()
+    print(f"{'streams':>7}  {'cpu s':>7}  {'cpu/stream':>10}  {'RTF':>6}  {'batch':>5}")
+    for r in results:
+        print(
+            f"{r['streams']:>7}  {r['cpu_s']:>7.2f}  {r['cpu_per_stream_s']:>10.3f}  "
+            f"{r['real_time_factor']:>6.3f}  {r['mean_batch_size']:>5.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
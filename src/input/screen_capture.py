@@ -1 +1,582 @@
-#এই মডিউলে OpenCV ব্যবহার করে স্ক্রিন ক্যাপচার এবং অ্যানালাইসিস ফাংশন থাকবে যা ইমেজ প্রসেস করে অবজেক্ট/টেক্সট আইডেন্টিফাই করবে; এটি ভিজ্যুয়াল ইনপুট হ্যান্ডল করার জন্য তৈরি, অটোনমাস স্ক্রিন-বেসড টাস্কের জন্য।
+"""
+NeoMate AI Screen Capture Module
+
+This module watches the screen and passes only the parts that changed to the vision
+modules (OpenCV analysis, OCR, object detection). Frames are grabbed into NumPy
+views of the capture buffer without copying. Each frame is divided into tiles, and
+changed tiles are found with one vectorized comparison against a strided sample of
+the previous frame. Adjacent changed tiles are merged into rectangles, and only
+those regions are copied and published. The capture rate rises while the screen is
+changing and backs off while it is static, so a mostly idle desktop costs almost
+nothing.
+
+Features:
+- mss screen source with zero-copy NumPy views of the grabbed BGRA pixels
+- Synthetic desktop and recorded-frame sources for tests and benchmarks
+- Tile change detection on a strided sample (whole pixels compared as uint32)
+  or per-channel difference threshold for noisy sources
+- Dirty tiles merged into rectangles; only those regions are copied downstream
+- Adaptive capture rate between ``min_fps`` and ``max_fps`` with periodic full refresh
+- Capture thread publishing 'screen' events to the event bus or a callback
+- Failed grabs retried with exponential backoff; only an exhausted source stops capture
+- Benchmark of detection frames/s, capture CPU and forwarded pixels
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+
+class FrameSource:
+    """
+    Base class for frame sources feeding ScreenCapture.
+
+    ``grab`` returns an (height, width, 4) uint8 BGRA array. It may be a view of a
+    buffer the source reuses, valid until the next ``grab``.
+    """
+
+    def open(self) -> None:
+        """Acquire the underlying device or resources."""
+
+    def grab(self) -> Optional[np.ndarray]:
+        """
+        Grab the current frame.
+
+        Returns:
+            Optional[np.ndarray]: BGRA frame, or None when the source is exhausted.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release the underlying device or resources."""
+
+
+class MSSSource(FrameSource):
+    """
+    Screen grabs through mss (X11, Windows, macOS).
+    """
+
+    def __init__(self, monitor: int = 1):
+        """
+        Initialize the mss source.
+
+        Args:
+            monitor: mss monitor index (0 = all monitors combined, 1 = primary).
+        """
+        self.monitor = monitor
+        self._sct = None
+        self._region: Optional[Dict[str, int]] = None
+
+    def open(self) -> None:
+        import mss
+
+        self._sct = mss.mss()
+        self._region = self._sct.monitors[self.monitor]
+
+    def grab(self) -> Optional[np.ndarray]:
+        shot = self._sct.grab(self._region)
+        # View the BGRA bytes mss captured into; no pixel copy
+        return np.frombuffer(shot.raw, dtype=np.uint8).reshape(shot.height, shot.width, 4)
+
+    def close(self) -> None:
+        if self._sct is not None:
+            self._sct.close()
+            self._sct = None
+
+
+class FrameArraySource(FrameSource):
+    """
+    Replays recorded frames, e.g. a (n, height, width, 4) array loaded with
+    ``np.load(path, mmap_mode='r')``.
+    """
+
+    def __init__(self, frames: Sequence[np.ndarray], loop: bool = False):
+        """
+        Initialize the replay source.
+
+        Args:
+            frames: BGRA frames.
+            loop: Restart from the first frame at the end.
+        """
+        self.frames = frames
+        self.loop = loop
+        self._pos = 0
+
+    def open(self) -> None:
+        self._pos = 0
+
+    def grab(self) -> Optional[np.ndarray]:
+        if self._pos >= len(self.frames):
+            if not self.loop or not len(self.frames):
+                return None
+            self._pos = 0
+        frame = self.frames[self._pos]
+        self._pos += 1
+        return frame
+
+
+class SyntheticDesktopSource(FrameSource):
+    """
+    A mostly static desktop: a blinking text cursor, a clock that changes every
+    second and occasional typing, drawn in place into one reused buffer.
+    """
+
+    def __init__(
+        self,
+        width: int = 1920,
+        height: int = 1080,
+        clock: Optional[Callable[[], float]] = None,
+        typing_every_s: float = 10.0,
+        typing_for_s: float = 2.0,
+        seed: int = 0
+    ):
+        """
+        Initialize the synthetic source.
+
+        Args:
+            width: Frame width.
+            height: Frame height.
+            clock: Time function driving the content; defaults to time.monotonic.
+                   Pass a simulated clock to generate frames faster than real time.
+            typing_every_s: Period of typing bursts.
+            typing_for_s: Length of each typing burst.
+            seed: Random seed of the background.
+        """
+        self.width = width
+        self.height = height
+        self.clock = clock or time.monotonic
+        self.typing_every_s = typing_every_s
+        self.typing_for_s = typing_for_s
+        rng = np.random.default_rng(seed)
+        self._background = np.empty((height, width, 4), dtype=np.uint8)
+        self._background[...] = (rng.integers(0, 256, (height // 8 + 1, width // 8 + 1, 4), dtype=np.uint8)
+                                 .repeat(8, axis=0).repeat(8, axis=1)[:height, :width])
+        self._background[..., 3] = 255
+        self._frame = self._background.copy()
+        self._started = 0.0
+        self._typed = 0
+
+    def open(self) -> None:
+        self._started = self.clock()
+        self._typed = 0
+        np.copyto(self._frame, self._background)
+
+    def grab(self) -> Optional[np.ndarray]:
+        t = self.clock() - self._started
+        frame = self._frame
+        # Cursor: 2x18 px, on for half of every second
+        cursor_x = min(self.width - 2, 200 + 9 * self._typed)
+        frame[300:318, cursor_x:cursor_x + 2] = 255 if int(t * 2) % 2 == 0 else self._background[300:318, cursor_x:cursor_x + 2]
+        # Clock: an 80x20 px area redrawn once per second
+        second = int(t)
+        frame[self.height - 30:self.height - 10, self.width - 100:self.width - 20] = (second * 37) % 256
+        # Typing burst: one 9x18 px glyph per 100 ms on the text line, which is
+        # cleared when the next burst starts
+        phase = t % self.typing_every_s
+        if phase < self.typing_for_s:
+            typed = int(phase * 10)
+            if typed < self._typed:
+                frame[300:318] = self._background[300:318]
+                self._typed = 0
+            while self._typed < typed and 200 + 9 * (self._typed + 1) < self.width:
+                x = 200 + 9 * self._typed
+                frame[300:318, x:x + 9] = (self._typed * 53) % 256
+                self._typed += 1
+        return frame
+
+
+@dataclass
+class ScreenRegion:
+    """A changed screen area passed downstream."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    image: np.ndarray
+    frame_id: int
+    timestamp: float = field(default_factory=time.time)
+    full_frame: bool = False
+
+
+class TileChangeDetector:
+    """
+    Finds the tiles that changed since the previous frame.
+    """
+
+    def __init__(self, tile_size: int = 64, downsample: int = 2, threshold: int = 0):
+        """
+        Initialize the detector.
+
+        Args:
+            tile_size: Tile edge in pixels.
+            downsample: Compare every n-th pixel in each direction (1 = every pixel).
+                        Changes smaller than the stride can be missed until the
+                        periodic full refresh.
+            threshold: 0 compares pixels exactly; a positive value ignores per-channel
+                       differences up to it (compressed or noisy sources).
+        """
+        if tile_size % downsample:
+            raise ValueError("tile_size must be a multiple of downsample")
+        self.tile_size = tile_size
+        self.downsample = downsample
+        self.threshold = threshold
+        self._previous: Optional[np.ndarray] = None
+
+    def _sample(self, frame: np.ndarray) -> np.ndarray:
+        step = self.downsample
+        if self.threshold == 0 and frame.flags.c_contiguous:
+            # One uint32 per BGRA pixel, so each comparison covers all four channels
+            pixels = frame.view(np.uint32).reshape(frame.shape[:2])
+            return pixels[::step, ::step]
+        # Green channel carries most of the luminance
+        return frame[::step, ::step, 1]
+
+    def grid_shape(self, frame: np.ndarray) -> Tuple[int, int]:
+        """Tile rows and columns of a frame."""
+        return -(-frame.shape[0] // self.tile_size), -(-frame.shape[1] // self.tile_size)
+
+    def reset(self) -> None:
+        """Forget the previous frame, so the next one is entirely dirty."""
+        self._previous = None
+
+    def detect(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Compare a frame with the previous one.
+
+        Args:
+            frame: BGRA frame.
+
+        Returns:
+            np.ndarray: (tile rows, tile cols) boolean mask of changed tiles.
+        """
+        sample = self._sample(frame)
+        previous = self._previous
+        if previous is None or previous.shape != sample.shape or previous.dtype != sample.dtype:
+            self._previous = sample.copy()
+            return np.ones(self.grid_shape(frame), dtype=bool)
+
+        if self.threshold == 0:
+            changed = sample != previous
+        else:
+            changed = np.abs(sample.astype(np.int16) - previous) > self.threshold
+        step = self.tile_size // self.downsample
+        rows = np.arange(0, changed.shape[0], step)
+        cols = np.arange(0, changed.shape[1], step)
+        tiles = np.logical_or.reduceat(np.logical_or.reduceat(changed, rows, axis=0), cols, axis=1)
+        np.copyto(previous, sample)
+        return tiles
+
+
+def merge_tiles(mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    """
+    Merge dirty tiles into rectangles: horizontal runs per row, extended downwards
+    while the next row has a run with the same span.
+
+    Args:
+        mask: (rows, cols) boolean tile mask.
+
+    Returns:
+        List[Tuple[int, int, int, int]]: (row, col, rows, cols) rectangles in tiles.
+    """
+    rects: List[Tuple[int, int, int, int]] = []
+    open_runs: Dict[Tuple[int, int], int] = {}
+    for row in range(mask.shape[0] + 1):
+        runs: List[Tuple[int, int]] = []
+        if row < mask.shape[0] and mask[row].any():
+            edges = np.diff(np.concatenate(([0], mask[row].view(np.int8), [0])))
+            runs = list(zip(np.flatnonzero(edges == 1).tolist(), np.flatnonzero(edges == -1).tolist()))
+        continued: Dict[Tuple[int, int], int] = {}
+        for run in runs:
+            continued[run] = open_runs.pop(run, row)
+        for (start, end), first_row in open_runs.items():
+            rects.append((first_row, start, row - first_row, end - start))
+        open_runs = continued
+    return rects
+
+
+class ScreenCapture:
+    """
+    Capture thread that publishes changed screen regions at an adaptive rate.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        source: Optional[FrameSource] = None,
+        event_bus: Optional[Any] = None,
+        on_regions: Optional[Callable[[List[ScreenRegion]], None]] = None
+    ):
+        """
+        Initialize ScreenCapture.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            source: Frame source. Defaults to the primary monitor through mss.
+            event_bus: Optional EventBus; each region is published as a 'screen' event.
+            on_regions: Optional callback receiving each frame's regions (called on
+                        the capture thread).
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        capture_config = self.config.get('screen_capture', {})
+
+        self.source = source or MSSSource(capture_config.get('monitor', 1))
+        self.event_bus = event_bus
+        self.on_regions = on_regions
+        self.detector = TileChangeDetector(
+            tile_size=capture_config.get('tile_size', 64),
+            downsample=capture_config.get('downsample', 2),
+            threshold=capture_config.get('threshold', 0)
+        )
+        self.min_interval_s = 1.0 / capture_config.get('max_fps', 10.0)
+        self.max_interval_s = 1.0 / capture_config.get('min_fps', 1.0)
+        # Interval growth per unchanged frame while backing off
+        self.backoff = capture_config.get('backoff', 1.5)
+        # Resend the whole screen this often so consumers can resync (0 = never)
+        self.full_refresh_s = capture_config.get('full_refresh_s', 30.0)
+        # Wait after a failed grab, doubling per consecutive failure up to the maximum
+        self.retry_s = capture_config.get('retry_s', 0.5)
+        self.max_retry_s = capture_config.get('max_retry_s', 30.0)
+
+        self.interval_s = self.min_interval_s
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._wake = threading.Event()
+        self._last_full = 0.0
+
+        self.frames = 0
+        self.dirty_tiles = 0
+        self.total_tiles = 0
+        self.pixels_forwarded = 0
+        self.pixels_captured = 0
+        self.capture_cpu_s = 0.0
+        self.grab_errors = 0
+
+    def process(self, frame: np.ndarray, now: Optional[float] = None) -> List[ScreenRegion]:
+        """
+        Detect the changed regions of a frame and adapt the capture interval.
+
+        Args:
+            frame: BGRA frame.
+            now: Current time (monotonic); defaults to time.monotonic().
+
+        Returns:
+            List[ScreenRegion]: Changed regions with copies of their pixels.
+        """
+        now = time.monotonic() if now is None else now
+        full = self.full_refresh_s > 0 and now - self._last_full >= self.full_refresh_s
+        if full:
+            self.detector.reset()
+            self._last_full = now
+        mask = self.detector.detect(frame)
+        self.frames += 1
+        self.total_tiles += mask.size
+        self.pixels_captured += frame.shape[0] * frame.shape[1]
+
+        dirty = int(mask.sum())
+        self.dirty_tiles += dirty
+        if dirty:
+            self.interval_s = self.min_interval_s
+        else:
+            self.interval_s = min(self.max_interval_s, self.interval_s * self.backoff)
+            return []
+
+        tile = self.detector.tile_size
+        regions = []
+        for row, col, rows, cols in merge_tiles(mask):
+            y, x = row * tile, col * tile
+            image = frame[y:y + rows * tile, x:x + cols * tile].copy()
+            self.pixels_forwarded += image.shape[0] * image.shape[1]
+            regions.append(ScreenRegion(x, y, image.shape[1], image.shape[0], image, self.frames, full_frame=full))
+        return regions
+
+    def _publish(self, regions: List[ScreenRegion]) -> None:
+        if self.on_regions is not None:
+            self.on_regions(regions)
+        if self.event_bus is not None:
+            from src.core.event_bus import Event, EventPriority
+
+            for region in regions:
+                # A newer update of the same area replaces a queued older one
+                self.event_bus.publish_threadsafe(Event(
+                    'screen', region, EventPriority.SCREEN,
+                    coalesce_key=f"screen-{region.x}-{region.y}-{region.width}-{region.height}"
+                ))
+
+    def _capture_loop(self) -> None:
+        cpu_started = time.thread_time()
+        next_grab = time.monotonic()
+        failures = 0
+        while self._running:
+            delay = next_grab - time.monotonic()
+            if delay > 0 and self._wake.wait(delay):
+                self._wake.clear()
+            if not self._running:
+                break
+            started = time.monotonic()
+            try:
+                frame = self.source.grab()
+            except Exception as e:
+                # A transient failure (display reconfigured, session locked) must not
+                # end capture for good; only a source returning None is exhausted
+                failures += 1
+                self.grab_errors += 1
+                retry_s = min(self.max_retry_s, self.retry_s * 2 ** (failures - 1))
+                log.error(f"Screen grab failed ({failures} in a row), retrying in {retry_s:.1f}s: {e}")
+                next_grab = started + retry_s
+                continue
+            if frame is None:
+                break
+            if failures:
+                log.info(f"Screen grab recovered after {failures} failures")
+                failures = 0
+            regions = self.process(frame, started)
+            if regions:
+                try:
+                    self._publish(regions)
+                except Exception as e:
+                    log.error(f"Publishing screen regions failed: {e}")
+            next_grab = started + self.interval_s
+        self.capture_cpu_s += time.thread_time() - cpu_started
+        self._running = False
+
+    def start(self) -> None:
+        """Open the source and start the capture thread. Calling start twice is a no-op."""
+        if self._running:
+            return
+        self.source.open()
+        self.detector.reset()
+        self._last_full = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="ScreenCapture", daemon=True)
+        self._thread.start()
+        log.info("ScreenCapture started")
+
+    def poke(self) -> None:
+        """Capture now and return to the fastest rate, e.g. after user input."""
+        self.interval_s = self.min_interval_s
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Stop the capture thread and close the source."""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self._thread = None
+        try:
+            self.source.close()
+        except Exception as e:
+            log.error(f"Error closing screen source: {e}")
+        log.info("ScreenCapture stopped")
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get capture statistics.
+
+        Returns:
+            Dict[str, float]: Frames, dirty tile share, forwarded pixel share,
+                              current interval and failed grabs.
+        """
+        return {
+            'frames': self.frames,
+            'dirty_tile_ratio': self.dirty_tiles / self.total_tiles if self.total_tiles else 0.0,
+            'forwarded_ratio': self.pixels_forwarded / self.pixels_captured if self.pixels_captured else 0.0,
+            'interval_s': self.interval_s,
+            'capture_cpu_s': self.capture_cpu_s,
+            'grab_errors': self.grab_errors,
+        }
+
+
+def benchmark_detection(frames: int = 600, width: int = 1920, height: int = 1080) -> Dict[str, Dict[str, float]]:
+    """
+    Measure change detection speed on a synthetic desktop at 10 simulated frames/s,
+    against forwarding every full frame.
+
+    Args:
+        frames: Frames to process.
+        width: Frame width.
+        height: Frame height.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per detector setting: frames/s, CPU ms per
+                                     frame and share of pixels forwarded.
+    """
+    results = {}
+    settings = {'stride 1 (exact)': (1, 0), 'stride 2': (2, 0), 'stride 4': (4, 0), 'stride 2, threshold 8': (2, 8)}
+    for name, (downsample, threshold) in settings.items():
+        now = [0.0]
+        source = SyntheticDesktopSource(width, height, clock=lambda: now[0])
+        source.open()
+        capture = ScreenCapture(source=source)
+        capture.detector = TileChangeDetector(64, downsample, threshold)
+        capture.full_refresh_s = 0
+        cpu_started, started = time.process_time(), time.perf_counter()
+        for _ in range(frames):
+            capture.process(source.grab(), now[0])
+            now[0] += 0.1
+        elapsed, cpu = time.perf_counter() - started, time.process_time() - cpu_started
+        results[name] = {
+            'fps': frames / elapsed,
+            'cpu_ms_per_frame': cpu / frames * 1000,
+            'forwarded_ratio': capture.stats()['forwarded_ratio'],
+        }
+    return results
+
+
+def benchmark_live(seconds: float = 6.0) -> Dict[str, float]:
+    """
+    Run the capture thread in real time on the synthetic desktop.
+
+    Args:
+        seconds: Wall-clock duration.
+
+    Returns:
+        Dict[str, float]: Captured frames/s, capture thread CPU share and forwarded pixels.
+    """
+    forwarded = [0]
+
+    def count(regions: List[ScreenRegion]) -> None:
+        forwarded[0] += sum(region.width * region.height for region in regions)
+
+    capture = ScreenCapture(source=SyntheticDesktopSource(typing_every_s=4.0, typing_for_s=1.0), on_regions=count)
+    capture.start()
+    time.sleep(seconds)
+    capture.stop()
+    stats = capture.stats()
+    return {
+        'fps': stats['frames'] / seconds,
+        'cpu_percent': stats['capture_cpu_s'] / seconds * 100,
+        'forwarded_mpix_per_s': forwarded[0] / seconds / 1e6,
+        'full_frame_mpix_per_s': 1920 * 1080 * 10 / 1e6,
+    }
+
+
+def main():
+    """
+    Run the screen capture benchmarks on a synthetic 1080p desktop.
+    """
+    print("Change detection, 600 frames (60 simulated seconds at 10 fps):")
+    for name, result in benchmark_detection().items():
+        print(f"  {name:<24} {result['fps']:7.0f} frames/s  {result['cpu_ms_per_frame']:6.2f} ms CPU/frame  "
+              f"forwarded {result['forwarded_ratio'] * 100:6.3f}% of pixels")
+    live = benchmark_live()
+    print(f"Live capture thread: {live['fps']:.1f} frames/s, {live['cpu_percent']:.1f}% CPU, "
+          f"{live['forwarded_mpix_per_s']:.3f} Mpx/s forwarded "
+          f"(full frames at 10 fps: {live['full_frame_mpix_per_s']:.1f} Mpx/s)")
+
+
+if __name__ == "__main__":
+    main()
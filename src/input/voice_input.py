@@ -1 +1,478 @@
-#এই মডিউলে Whisper মডেল ব্যবহার করে ভয়েস রেকগনিশন ফাংশন থাকবে যা অডিও ক্যাপচার করে টেক্সটে কনভার্ট করবে, বাংলা/ইংরেজি সাপোর্ট সহ; এটি প্রাইমারি ইনপুট মেথড হিসেবে তৈরি, রিয়েল-টাইম ভয়েস প্রসেসিংয়ের জন্য।
+"""
+NeoMate AI Voice Input Module
+
+This module provides streaming speech-to-text for NeoMate AI. Audio is read from the
+shared AudioCaptureHub, a voice-activity detector cuts it into speech segments, and a
+Whisper-based transcriber emits partial transcripts while the user is still speaking
+and a final transcript as soon as the segment ends. Bengali and English are supported.
+
+Features:
+- Vectorized energy-based VAD with an adaptive noise floor
+- Speech segmentation with onset padding and end-of-speech hangover
+- Partial and final transcripts as an async iterator; an utterance cut off by the end
+  of the audio or by stop_listening still gets its final transcript
+- Gapless pre-roll hand-off from the wake word detector (no lost or duplicated audio)
+- End-of-speech to final-transcript latency measured per segment
+- Replay of WAV files for latency measurement without a microphone
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, List, Optional
+
+import numpy as np
+
+from src.input.audio_capture import AudioCaptureHub, AudioSubscription
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+@dataclass
+class TranscriptEvent:
+    """A partial or final transcript for one speech segment."""
+
+    text: str
+    is_final: bool
+    segment_id: int
+    audio_s: float
+    # Seconds from the last speech frame to this transcript being emitted (finals only)
+    latency_s: Optional[float] = None
+    # Seconds spent inside the transcriber for this event
+    transcribe_s: float = 0.0
+
+
+class EnergyVAD:
+    """
+    Frame-level voice activity detector based on short-term energy.
+
+    Each chunk is reshaped into fixed-length frames and scored in one vectorized
+    pass; the noise floor tracks non-speech frames so the detector adapts to fans,
+    keyboards and room tone.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_ms: int = 20,
+        margin_db: float = 12.0,
+        min_speech_db: float = -50.0,
+        noise_adapt: float = 0.05
+    ):
+        """
+        Initialize the EnergyVAD.
+
+        Args:
+            sample_rate: Audio sample rate in Hz.
+            frame_ms: Analysis frame length in milliseconds.
+            margin_db: How far above the noise floor a frame must be to count as speech.
+            min_speech_db: Absolute floor (dBFS) below which a frame is never speech.
+            noise_adapt: Smoothing factor for the noise floor estimate.
+        """
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.frame_s = frame_ms / 1000.0
+        self.margin_db = margin_db
+        self.min_speech_db = min_speech_db
+        self.noise_adapt = noise_adapt
+        self.noise_floor_db = -60.0
+
+    def __call__(self, chunk: np.ndarray) -> np.ndarray:
+        """
+        Classify the frames of a chunk.
+
+        Args:
+            chunk: int16 audio; trailing samples that do not fill a frame are ignored.
+
+        Returns:
+            np.ndarray: Boolean speech flag per frame.
+        """
+        n = len(chunk) // self.frame_length
+        frames = chunk[:n * self.frame_length].reshape(n, self.frame_length).astype(np.float32)
+        power = np.mean(frames * frames, axis=1) / (32768.0 * 32768.0)
+        energy_db = 10.0 * np.log10(power + 1e-10)
+
+        threshold = max(self.noise_floor_db + self.margin_db, self.min_speech_db)
+        speech = energy_db > threshold
+
+        quiet = energy_db[~speech]
+        if len(quiet):
+            # Exponential smoothing over the quiet frames of this chunk
+            weight = (1.0 - self.noise_adapt) ** len(quiet)
+            self.noise_floor_db = weight * self.noise_floor_db + (1.0 - weight) * float(quiet.mean())
+        return speech
+
+
+class WhisperTranscriber:
+    """
+    Speech-to-text backend using openai-whisper on CPU.
+    """
+
+    def __init__(self, model_name: str = 'base', language: Optional[str] = None, model_registry: Optional[Any] = None):
+        """
+        Initialize the WhisperTranscriber.
+
+        Args:
+            model_name: Whisper model size (tiny, base, small, ...).
+            language: Language code ('bn', 'en') or None for auto-detection.
+            model_registry: Optional ModelRegistry. If it has an 'stt' model, the
+                            Whisper model is taken from it and pinned per call, so
+                            it can be preloaded and evicted with the other models.
+        """
+        self.model_name = model_name
+        self.language = language
+        self.model_registry = model_registry
+        self._model: Any = None
+
+    @staticmethod
+    def load_model(model_name: str) -> Any:
+        """
+        Load a Whisper model on CPU.
+
+        Args:
+            model_name: Whisper model size.
+
+        Returns:
+            Any: The Whisper model.
+        """
+        import whisper
+
+        model = whisper.load_model(model_name, device='cpu')
+        log.info(f"Whisper model '{model_name}' loaded")
+        return model
+
+    def _uses_registry(self) -> bool:
+        return self.model_registry is not None and 'stt' in self.model_registry
+
+    def load(self) -> None:
+        """Load the Whisper model if it is not loaded yet."""
+        if self._uses_registry():
+            with self.model_registry.hold('stt'):
+                return
+        if self._model is None:
+            self._model = self.load_model(self.model_name)
+
+    def transcribe(self, audio: np.ndarray, partial: bool = False) -> str:
+        """
+        Transcribe mono float32 audio at 16 kHz.
+
+        Args:
+            audio: Audio samples in [-1, 1].
+            partial: If True, favour speed (greedy decoding, no fallback).
+
+        Returns:
+            str: Transcribed text.
+        """
+        options = {'language': self.language, 'fp16': False, 'condition_on_previous_text': False}
+        if partial:
+            options.update(temperature=0.0, without_timestamps=True)
+        if self._uses_registry():
+            with self.model_registry.hold('stt') as model:
+                result = model.transcribe(audio, **options)
+        else:
+            self.load()
+            result = self._model.transcribe(audio, **options)
+        return result.get('text', '').strip()
+
+
+class StreamingSpeechRecognizer:
+    """
+    VAD-gated streaming speech recognizer for NeoMate AI.
+    """
+
+    def __init__(
+        self,
+        audio_hub: AudioCaptureHub,
+        transcriber: Optional[Any] = None,
+        config_loader: Optional[ConfigLoader] = None,
+        vad: Optional[EnergyVAD] = None,
+        model_registry: Optional[Any] = None
+    ):
+        """
+        Initialize the StreamingSpeechRecognizer.
+
+        Args:
+            audio_hub: Shared AudioCaptureHub to read audio from.
+            transcriber: Object with ``transcribe(audio, partial=False) -> str``.
+                         Defaults to a WhisperTranscriber built from configuration.
+            config_loader: Optional ConfigLoader instance for configuration.
+            vad: Optional voice activity detector. Defaults to EnergyVAD.
+            model_registry: Optional ModelRegistry passed to the default transcriber.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        stt_config = self.config.get('speech_to_text', {})
+
+        self.audio_hub = audio_hub
+        self.sample_rate = audio_hub.sample_rate
+        self.transcriber = transcriber or WhisperTranscriber(
+            model_name=stt_config.get('model', 'base'),
+            language=stt_config.get('language'),
+            model_registry=model_registry
+        )
+        self.vad = vad or EnergyVAD(sample_rate=self.sample_rate)
+
+        # Segmentation parameters
+        self.min_speech_s = stt_config.get('min_speech_ms', 60) / 1000.0
+        self.end_silence_s = stt_config.get('end_silence_ms', 600) / 1000.0
+        self.onset_pad_s = stt_config.get('onset_pad_ms', 200) / 1000.0
+        self.max_segment_s = stt_config.get('max_segment_s', 20.0)
+        self.partial_interval_s = stt_config.get('partial_interval_ms', 800) / 1000.0
+        self.no_speech_timeout_s = stt_config.get('no_speech_timeout_s', 6.0)
+
+        # Wake words to strip when the pre-roll carries the tail of the wake phrase
+        keywords = self.config.get('wake_word', {}).get('keywords', [])
+        self._wake_prefix = self._compile_prefix(keywords)
+
+        self.subscription: Optional[AudioSubscription] = None
+        self.is_listening = False
+
+        log.info("StreamingSpeechRecognizer initialized successfully")
+
+    @staticmethod
+    def _compile_prefix(keywords: List[str]) -> Optional['re.Pattern[str]']:
+        words = sorted((k for k in keywords if isinstance(k, str) and k.strip()), key=len, reverse=True)
+        if not words:
+            return None
+        alternatives = '|'.join(re.escape(w.strip()) for w in words)
+        return re.compile(rf'^\s*(?:{alternatives})[\s,.!?।]*', re.IGNORECASE)
+
+    def _clean(self, text: str) -> str:
+        if self._wake_prefix is not None:
+            text = self._wake_prefix.sub('', text, count=1)
+        return text.strip()
+
+    async def stream(
+        self,
+        pre_roll: Optional[np.ndarray] = None,
+        start_frame: Optional[int] = None,
+        single_utterance: bool = True
+    ) -> AsyncIterator[TranscriptEvent]:
+        """
+        Stream transcripts as the user speaks.
+
+        Args:
+            pre_roll: int16 audio captured before ``start_frame`` (e.g. from
+                      ``WakeWordDetector.get_pre_roll()``); processed first.
+            start_frame: Hub frame to continue from after the pre-roll (e.g.
+                         ``WakeWordDetector.last_detection_frame``). Defaults to now.
+            single_utterance: If True, stop after the first final transcript.
+
+        Yields:
+            TranscriptEvent: Partial transcripts, then a final one per segment.
+        """
+        self.subscription = self.audio_hub.subscribe("speech_to_text", start_frame=start_frame)
+        if start_frame is not None and self.subscription.cursor != start_frame - start_frame % self.audio_hub.chunk_size:
+            log.warning("Speech-to-text hand-off point is no longer buffered; some audio was lost")
+        self.is_listening = True
+
+        sr = self.sample_rate
+        frame_length = self.vad.frame_length
+        max_samples = int(self.max_segment_s * sr)
+        segment = np.zeros(max_samples, dtype=np.float32)
+        seg_len = 0
+        onset = np.zeros(int(self.onset_pad_s * sr), dtype=np.float32)
+
+        in_speech = False
+        speech_run = 0.0
+        silence_run = 0.0
+        last_speech_wall = 0.0
+        last_partial_at = 0.0
+        segment_id = 0
+        waited_s = 0.0
+        partial_task: Optional[asyncio.Task] = None
+
+        async def chunks() -> AsyncIterator[np.ndarray]:
+            if pre_roll is not None and len(pre_roll):
+                usable = len(pre_roll) - len(pre_roll) % frame_length
+                for i in range(0, usable, self.audio_hub.chunk_size):
+                    yield pre_roll[i:min(i + self.audio_hub.chunk_size, usable)]
+            async for chunk in self.subscription:
+                yield chunk
+
+        try:
+            async for chunk in chunks():
+                if not self.is_listening:
+                    break
+                flags = self.vad(chunk)
+                audio = chunk[:len(flags) * frame_length].astype(np.float32) / 32768.0
+                now = time.perf_counter()
+
+                if not in_speech:
+                    # Look for a speech onset; ``onset`` holds the audio before this chunk
+                    if flags.all():
+                        speech_run += len(flags) * self.vad.frame_s
+                    else:
+                        # Only speech frames at the end of the chunk continue into the next one
+                        speech_run = float(np.argmax(~flags[::-1])) * self.vad.frame_s
+                    if speech_run >= self.min_speech_s:
+                        in_speech = True
+                        silence_run = 0.0
+                        seg_len = len(onset)
+                        segment[:seg_len] = onset
+                        # The onset chunk itself belongs to the segment
+                        n = min(len(audio), max_samples - seg_len)
+                        segment[seg_len:seg_len + n] = audio[:n]
+                        seg_len += n
+                        last_speech_wall = now
+                        last_partial_at = now
+                        continue
+                    if len(onset):
+                        onset = np.concatenate((onset, audio))[-len(onset):]
+                    waited_s += len(audio) / sr
+                    if single_utterance and waited_s >= self.no_speech_timeout_s:
+                        log.info("No speech detected, stopping speech-to-text")
+                        break
+                    continue
+
+                # Inside a segment: append and track trailing silence
+                n = min(len(audio), max_samples - seg_len)
+                segment[seg_len:seg_len + n] = audio[:n]
+                seg_len += n
+                if flags.any():
+                    last_speech_wall = now
+                    silence_run = float(np.argmax(flags[::-1])) * self.vad.frame_s
+                else:
+                    silence_run += len(flags) * self.vad.frame_s
+
+                if silence_run >= self.end_silence_s or seg_len >= max_samples:
+                    if partial_task and not partial_task.done():
+                        partial_task.cancel()
+                    yield await self._final(segment[:seg_len], silence_run, segment_id, last_speech_wall)
+
+                    segment_id += 1
+                    in_speech = False
+                    speech_run = 0.0
+                    waited_s = 0.0
+                    seg_len = 0
+                    onset[:] = 0.0
+                    if single_utterance:
+                        break
+                    continue
+
+                # Emit a partial at most every partial_interval_s, one in flight at a time
+                if partial_task is not None and partial_task.done():
+                    result = partial_task.result() if not partial_task.cancelled() else None
+                    partial_task = None
+                    if result:
+                        yield result
+                if partial_task is None and now - last_partial_at >= self.partial_interval_s:
+                    last_partial_at = now
+                    partial_task = asyncio.create_task(self._partial(segment[:seg_len].copy(), segment_id))
+
+            if in_speech and seg_len:
+                # The audio ended or listening was stopped mid-utterance; the user's
+                # last words still get a final transcript
+                if partial_task and not partial_task.done():
+                    partial_task.cancel()
+                yield await self._final(segment[:seg_len], silence_run, segment_id, last_speech_wall)
+        finally:
+            if partial_task and not partial_task.done():
+                partial_task.cancel()
+            self.is_listening = False
+            self.subscription.close()
+            self.subscription = None
+
+    async def _final(
+        self,
+        audio: np.ndarray,
+        silence_s: float,
+        segment_id: int,
+        last_speech_wall: float
+    ) -> TranscriptEvent:
+        # Trim the hangover silence before the final pass
+        end = max(0, len(audio) - int(max(0.0, silence_s - 0.1) * self.sample_rate))
+        started = time.perf_counter()
+        text = await asyncio.to_thread(self.transcriber.transcribe, audio[:end].copy())
+        done = time.perf_counter()
+        event = TranscriptEvent(
+            text=self._clean(text),
+            is_final=True,
+            segment_id=segment_id,
+            audio_s=end / self.sample_rate,
+            latency_s=done - last_speech_wall,
+            transcribe_s=done - started
+        )
+        log.info(f"Final transcript ({event.latency_s * 1000:.0f} ms after speech): {event.text}")
+        return event
+
+    async def _partial(self, audio: np.ndarray, segment_id: int) -> Optional[TranscriptEvent]:
+        started = time.perf_counter()
+        try:
+            text = await asyncio.to_thread(self.transcriber.transcribe, audio, True)
+        except Exception as e:
+            log.warning(f"Partial transcription failed: {e}")
+            return None
+        return TranscriptEvent(
+            text=self._clean(text),
+            is_final=False,
+            segment_id=segment_id,
+            audio_s=len(audio) / self.sample_rate,
+            transcribe_s=time.perf_counter() - started
+        )
+
+    async def listen_once(
+        self,
+        pre_roll: Optional[np.ndarray] = None,
+        start_frame: Optional[int] = None
+    ) -> Optional[str]:
+        """
+        Listen for a single utterance and return its final transcript.
+
+        Args:
+            pre_roll: Optional pre-roll audio from the wake word detector.
+            start_frame: Hub frame to continue from after the pre-roll.
+
+        Returns:
+            Optional[str]: Final transcript, or None if no speech was detected.
+        """
+        async for event in self.stream(pre_roll=pre_roll, start_frame=start_frame):
+            if event.is_final:
+                return event.text
+        return None
+
+    async def stop_listening(self):
+        """
+        Stop streaming after the current chunk.
+        """
+        self.is_listening = False
+
+
+# Standalone execution for latency measurement
+async def main():
+    """
+    Replay a WAV file in real time and print partial/final transcripts with latency.
+    """
+    import sys
+
+    from src.input.audio_capture import WavFileSource
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.input.voice_input <file.wav>")
+        return
+
+    hub = AudioCaptureHub(WavFileSource(sys.argv[1], realtime=True))
+    recognizer = StreamingSpeechRecognizer(hub)
+    await asyncio.to_thread(recognizer.transcriber.load)
+    hub.start()
+
+    latencies = []
+    try:
+        async for event in recognizer.stream(single_utterance=False):
+            kind = "FINAL" if event.is_final else "partial"
+            print(f"[{kind} #{event.segment_id} {event.audio_s:.1f}s] {event.text}")
+            if event.is_final:
+                latencies.append(event.latency_s)
+    finally:
+        hub.stop()
+
+    if latencies:
+        print(f"End-of-speech to final transcript: mean {np.mean(latencies) * 1000:.0f} ms, "
+              f"max {np.max(latencies) * 1000:.0f} ms over {len(latencies)} segments")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
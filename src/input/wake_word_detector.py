@@ -7,7 +7,7 @@ and triggers when predefined wake words (e.g., "Hey NeoMate") are detected.
 
 Features:
 - Offline wake word detection using openwakeword library
-- Real-time audio processing with pyaudio
+- Real-time audio from the shared AudioCaptureHub (one microphone stream for all consumers)
 - Configurable confidence threshold
 - Asynchronous operation for integration with asyncio-based architecture
 - Comprehensive logging and error handling
@@ -20,10 +20,9 @@ License: MIT
 
 import asyncio
 import numpy as np
-import pyaudio
 from typing import Optional, Dict, Any
-import openwakeword
 
+from src.input.audio_capture import AudioCaptureHub, AudioSubscription, PyAudioSource
 from src.utils.config_loader import ConfigLoader
 from src.utils.logger import log
 
@@ -34,39 +33,63 @@ class WakeWordDetector:
 
     This class encapsulates the wake word detection functionality, providing
     an interface to initialize, start listening, and clean up resources.
+    Audio is read from a shared AudioCaptureHub so the microphone is opened
+    once for every consumer.
     """
 
-    def __init__(self, config_loader: Optional[ConfigLoader] = None):
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        audio_hub: Optional[AudioCaptureHub] = None
+    ):
         """
         Initialize the WakeWordDetector.
 
         Args:
             config_loader: Optional ConfigLoader instance for configuration.
                           If None, a new instance will be created.
+            audio_hub: Optional shared AudioCaptureHub. If None, the detector
+                       creates and owns a hub on the default microphone.
         """
         self.config_loader = config_loader or ConfigLoader()
         self.config = self.config_loader.get_config()
 
-        # Wake word detection parameters
-        self.confidence_threshold = self.config.get('wake_word', {}).get('confidence_threshold', 0.5)
+        # Wake word detection parameters (read through a live accessor so a
+        # configuration hot reload takes effect on the next audio chunk)
+        self._confidence_threshold = self.config_loader.accessor('wake_word.confidence_threshold', 0.5)
 
         # Audio parameters
         self.chunk_size = 1280
         self.sample_rate = 16000
-        self.format = pyaudio.paInt16
         self.channels = 1
 
         # Audio components
-        self.audio = None
-        self.stream = None
+        self.audio_hub = audio_hub
+        self._owns_hub = audio_hub is None
+        self.subscription: Optional[AudioSubscription] = None
         self.oww_model = None
 
+        # Absolute hub frame index at which the last wake word was detected,
+        # used by downstream consumers to fetch pre-roll audio
+        self.last_detection_frame: Optional[int] = None
+        self.last_detection: Optional[Dict[str, Any]] = None
+
         # Control flags
         self.is_listening = False
         self.detection_event = asyncio.Event()
 
         log.info("WakeWordDetector initialized successfully")
 
+    @property
+    def confidence_threshold(self) -> float:
+        """Current detection threshold, following configuration reloads."""
+        return self._confidence_threshold()
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value: float) -> None:
+        """Pin the detection threshold, ignoring later configuration reloads."""
+        self._confidence_threshold = lambda: value
+
     async def initialize(self) -> bool:
         """
         Initialize audio components and wake word model.
@@ -75,26 +98,23 @@ class WakeWordDetector:
             bool: True if initialization successful, False otherwise.
         """
         try:
-            # Initialize PyAudio
-            self.audio = pyaudio.PyAudio()
-
-            # Open audio stream
-            self.stream = self.audio.open(
-                format=self.format,
-                channels=self.channels,
-                rate=self.sample_rate,
-                input=True,
-                frames_per_buffer=self.chunk_size
-            )
-
-            # Get pretrained model paths
-            model_paths = openwakeword.get_pretrained_model_paths()
-
-            # Initialize OpenWakeWord model
-            self.oww_model = openwakeword.Model(
-                wakeword_models=model_paths,
-                inference_framework='tflite'
-            )
+            # Create the capture hub if none was shared with us
+            if self.audio_hub is None:
+                self.audio_hub = AudioCaptureHub(
+                    PyAudioSource(),
+                    sample_rate=self.sample_rate,
+                    chunk_size=self.chunk_size
+                )
+                self._owns_hub = True
+
+            if self.oww_model is None:
+                self.oww_model = self.create_model()
+
+            # Subscribe before starting so no audio is missed
+            if self.subscription is None or self.subscription.closed:
+                self.subscription = self.audio_hub.subscribe("wake_word")
+            if not self.audio_hub.is_running:
+                await asyncio.to_thread(self.audio_hub.start)
 
             log.info("WakeWordDetector components initialized successfully")
             return True
@@ -104,12 +124,36 @@ class WakeWordDetector:
             await self.cleanup()
             return False
 
+    @staticmethod
+    def create_model(inference_framework: str = 'tflite') -> Any:
+        """
+        Load the OpenWakeWord model with the pretrained wake word models.
+
+        Args:
+            inference_framework: OpenWakeWord backend ('tflite' or 'onnx').
+
+        Returns:
+            openwakeword.Model: Ready-to-use model instance.
+        """
+        # Imported here so loading this module stays cheap until a model is needed
+        import openwakeword
+
+        # Get pretrained model paths
+        model_paths = openwakeword.get_pretrained_model_paths()
+
+        # Initialize OpenWakeWord model
+        return openwakeword.Model(
+            wakeword_models=model_paths,
+            inference_framework=inference_framework
+        )
+
     async def listen(self) -> bool:
         """
         Start listening for wake words asynchronously.
 
-        This method runs an infinite loop that continuously processes audio
-        chunks and checks for wake word detection.
+        Detection runs in a single worker thread for the whole listening session,
+        consuming chunks straight from the capture hub, so there is no thread hop
+        per audio chunk.
 
         Returns:
             bool: True if wake word detected, False if error occurred.
@@ -120,31 +164,9 @@ class WakeWordDetector:
         self.is_listening = True
         log.info("WakeWordDetector started listening")
 
+        loop = asyncio.get_running_loop()
         try:
-            while self.is_listening:
-                # Read audio chunk
-                audio_data = await asyncio.to_thread(
-                    self.stream.read,
-                    self.chunk_size,
-                    exception_on_overflow=False
-                )
-
-                # Convert to numpy array
-                audio_np = np.frombuffer(audio_data, dtype=np.int16)
-
-                # Run wake word detection in thread
-                predictions = await asyncio.to_thread(self.oww_model.predict, audio_np)
-
-                # Check for wake word detection
-                for model_name, confidence in predictions.items():
-                    if confidence > self.confidence_threshold:
-                        log.info(f"Wake word detected: {model_name} (confidence: {confidence:.2f})")
-                        self.detection_event.set()
-                        return True
-
-                # Small delay to prevent excessive CPU usage
-                await asyncio.sleep(0.01)
-
+            return await asyncio.to_thread(self._detection_loop, loop)
         except asyncio.CancelledError:
             log.info("Wake word listening cancelled")
         except Exception as e:
@@ -152,9 +174,64 @@ class WakeWordDetector:
             return False
         finally:
             self.is_listening = False
+            # Detach so a stale cursor never holds back a replayed source; the next
+            # listen subscribes again at the current position
+            if self.subscription is not None:
+                self.subscription.close()
+                self.subscription = None
+
+        return False
+
+    def _detection_loop(self, loop: asyncio.AbstractEventLoop) -> bool:
+        """
+        Blocking detection loop run on a worker thread.
+
+        Args:
+            loop: Event loop owning ``detection_event``.
+
+        Returns:
+            bool: True if wake word detected, False if listening stopped or audio ended.
+        """
+        subscription = self.subscription
+        while self.is_listening:
+            audio_np = subscription.read_chunk(timeout=0.5)
+            if audio_np is None:
+                if subscription.closed or self.audio_hub.finished:
+                    break
+                continue
+
+            predictions = self.oww_model.predict(audio_np)
+
+            # Check for wake word detection
+            for model_name, confidence in predictions.items():
+                if confidence > self.confidence_threshold:
+                    log.info(f"Wake word detected: {model_name} (confidence: {confidence:.2f})")
+                    self.last_detection_frame = subscription.cursor
+                    self.last_detection = {'model': model_name, 'confidence': float(confidence)}
+                    # Clear the model's audio buffer and score history, or the same
+                    # utterance triggers again on the next listen
+                    reset = getattr(self.oww_model, 'reset', None)
+                    if callable(reset):
+                        reset()
+                    loop.call_soon_threadsafe(self.detection_event.set)
+                    return True
 
         return False
 
+    def get_pre_roll(self, seconds: float = 1.5) -> np.ndarray:
+        """
+        Get the audio captured up to the last wake word detection.
+
+        Args:
+            seconds: Length of pre-roll to return.
+
+        Returns:
+            np.ndarray: int16 copy of the buffered audio ending at the detection point.
+        """
+        if self.audio_hub is None or self.last_detection_frame is None:
+            return np.zeros(0, dtype=np.int16)
+        return self.audio_hub.snapshot(int(seconds * self.sample_rate), end=self.last_detection_frame)
+
     async def stop_listening(self):
         """
         Stop the listening process gracefully.
@@ -167,14 +244,15 @@ class WakeWordDetector:
         Clean up resources and close audio components.
         """
         try:
-            if self.stream:
-                await asyncio.to_thread(self.stream.stop_stream)
-                await asyncio.to_thread(self.stream.close)
-                self.stream = None
-
-            if self.audio:
-                await asyncio.to_thread(self.audio.terminate)
-                self.audio = None
+            self.is_listening = False
+
+            if self.subscription:
+                self.subscription.close()
+                self.subscription = None
+
+            if self.audio_hub and self._owns_hub:
+                await asyncio.to_thread(self.audio_hub.stop)
+                self.audio_hub = None
 
             if self.oww_model:
                 # OpenWakeWord model cleanup if available
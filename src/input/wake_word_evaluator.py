@@ -0,0 +1,364 @@
+"""
+NeoMate AI Wake Word Evaluator Module
+
+This module provides an offline evaluation and throughput benchmark for the wake word
+detector. It replays directories of recorded WAV files through the same OpenWakeWord
+model used by WakeWordDetector, sharding the files across a process pool, and reports
+CPU cost and detection quality for a sweep of confidence thresholds.
+
+Features:
+- Positive (contains wake word) and negative (background) WAV corpora
+- Process pool sharded across CPU cores, one model instance per worker
+- Real-time factor and per-chunk latency percentiles
+- False accepts per hour and miss rate for each threshold in a sweep
+- Plain-text table and JSON report output
+
+Usage:
+    python -m src.input.wake_word_evaluator --positive data/wake/pos --negative data/wake/neg \
+        --thresholds 0.3 0.4 0.5 0.6 0.7 --json report.json
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.input.audio_capture import WavFileSource
+from src.input.wake_word_detector import WakeWordDetector
+from src.utils.logger import log
+
+
+SAMPLE_RATE = 16000
+CHUNK_SIZE = 1280
+DEFAULT_THRESHOLDS = (0.3, 0.4, 0.5, 0.6, 0.7, 0.8)
+
+# Per-process model instance, created by the pool initializer
+_worker_model: Any = None
+
+
+@dataclass
+class FileScore:
+    """Per-file scoring result produced by a worker process."""
+
+    path: str
+    positive: bool
+    duration_s: float
+    processing_s: float
+    scores: np.ndarray
+    latencies_us: np.ndarray
+
+
+@dataclass
+class ThresholdResult:
+    """Detection quality at a single confidence threshold."""
+
+    threshold: float
+    false_accepts: int
+    false_accepts_per_hour: float
+    misses: int
+    miss_rate: float
+
+
+@dataclass
+class EvaluationReport:
+    """Aggregate benchmark and evaluation report."""
+
+    files: int
+    audio_hours: float
+    negative_hours: float
+    positive_files: int
+    workers: int
+    wall_time_s: float
+    real_time_factor: float
+    streams_per_core: float
+    latency_us: Dict[str, float]
+    thresholds: List[ThresholdResult] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the report to a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+def _init_worker(inference_framework: str) -> None:
+    """Process pool initializer: load the model once per worker."""
+    global _worker_model
+    _worker_model = WakeWordDetector.create_model(inference_framework)
+
+
+def _read_wav(path: Path) -> np.ndarray:
+    """
+    Read a WAV file into a chunk-aligned int16 array.
+
+    Args:
+        path: WAV file path.
+
+    Returns:
+        np.ndarray: Array of shape (n_chunks, CHUNK_SIZE), zero padded at the end.
+    """
+    source = WavFileSource(path)
+    source.open(SAMPLE_RATE, CHUNK_SIZE)
+    try:
+        chunks = []
+        while True:
+            chunk = np.zeros(CHUNK_SIZE, dtype=np.int16)
+            n = source.read_into(chunk)
+            if n == 0:
+                break
+            chunks.append(chunk)
+            if n < CHUNK_SIZE:
+                break
+    finally:
+        source.close()
+    if not chunks:
+        return np.zeros((0, CHUNK_SIZE), dtype=np.int16)
+    return np.stack(chunks)
+
+
+def _score_file(path: str, positive: bool) -> FileScore:
+    """
+    Run the model over one file, recording max confidence and latency per chunk.
+
+    Args:
+        path: WAV file path.
+        positive: Whether the file is expected to contain the wake word.
+
+    Returns:
+        FileScore: Scores and timings for the file.
+    """
+    model = _worker_model
+    if hasattr(model, 'reset'):
+        model.reset()
+
+    chunks = _read_wav(Path(path))
+    scores = np.zeros(len(chunks), dtype=np.float32)
+    latencies = np.zeros(len(chunks), dtype=np.float64)
+
+    started = time.perf_counter()
+    for i, chunk in enumerate(chunks):
+        t0 = time.perf_counter_ns()
+        predictions = model.predict(chunk)
+        latencies[i] = (time.perf_counter_ns() - t0) / 1000.0
+        if predictions:
+            scores[i] = max(predictions.values())
+    processing = time.perf_counter() - started
+
+    return FileScore(
+        path=path,
+        positive=positive,
+        duration_s=len(chunks) * CHUNK_SIZE / SAMPLE_RATE,
+        processing_s=processing,
+        scores=scores,
+        latencies_us=latencies
+    )
+
+
+def count_activations(scores: np.ndarray, threshold: float, refractory_chunks: int) -> int:
+    """
+    Count distinct detections, ignoring re-triggers inside the refractory window.
+
+    Args:
+        scores: Per-chunk maximum confidence.
+        threshold: Confidence threshold (detection when score > threshold).
+        refractory_chunks: Chunks to ignore after each detection.
+
+    Returns:
+        int: Number of detections.
+    """
+    count = 0
+    next_allowed = 0
+    for index in np.flatnonzero(scores > threshold):
+        if index >= next_allowed:
+            count += 1
+            next_allowed = index + refractory_chunks
+    return count
+
+
+def sweep_thresholds(
+    results: Sequence[FileScore],
+    thresholds: Sequence[float],
+    refractory_s: float = 2.0
+) -> List[ThresholdResult]:
+    """
+    Compute false-accept rate and miss rate for each threshold.
+
+    Args:
+        results: Scored files.
+        thresholds: Confidence thresholds to evaluate.
+        refractory_s: Minimum spacing between two counted false accepts.
+
+    Returns:
+        List[ThresholdResult]: One entry per threshold.
+    """
+    refractory_chunks = max(1, int(refractory_s * SAMPLE_RATE / CHUNK_SIZE))
+    negatives = [r for r in results if not r.positive]
+    positives = [r for r in results if r.positive]
+    negative_hours = sum(r.duration_s for r in negatives) / 3600.0
+    peak_positive = np.array([r.scores.max() if len(r.scores) else 0.0 for r in positives])
+
+    report = []
+    for threshold in thresholds:
+        false_accepts = sum(count_activations(r.scores, threshold, refractory_chunks) for r in negatives)
+        misses = int(np.count_nonzero(peak_positive <= threshold))
+        report.append(ThresholdResult(
+            threshold=threshold,
+            false_accepts=false_accepts,
+            false_accepts_per_hour=false_accepts / negative_hours if negative_hours else 0.0,
+            misses=misses,
+            miss_rate=misses / len(positives) if positives else 0.0
+        ))
+    return report
+
+
+def evaluate(
+    positive_dirs: Sequence[Path] = (),
+    negative_dirs: Sequence[Path] = (),
+    thresholds: Optional[Sequence[float]] = None,
+    workers: Optional[int] = None,
+    inference_framework: str = 'tflite',
+    refractory_s: float = 2.0
+) -> EvaluationReport:
+    """
+    Evaluate the wake word model over WAV corpora.
+
+    Args:
+        positive_dirs: Directories of recordings that each contain the wake word.
+        negative_dirs: Directories of background recordings without the wake word.
+        thresholds: Confidence thresholds to sweep. Defaults to DEFAULT_THRESHOLDS.
+        workers: Worker processes. Defaults to the number of CPU cores.
+        inference_framework: OpenWakeWord backend ('tflite' or 'onnx').
+        refractory_s: Minimum spacing between two counted false accepts.
+
+    Returns:
+        EvaluationReport: Throughput, latency and threshold sweep results.
+
+    Raises:
+        ValueError: If no WAV files are found.
+    """
+    jobs = [(str(p), True) for d in positive_dirs for p in sorted(Path(d).rglob('*.wav'))]
+    jobs += [(str(p), False) for d in negative_dirs for p in sorted(Path(d).rglob('*.wav'))]
+    if not jobs:
+        raise ValueError("No WAV files found in the given corpus directories")
+
+    workers = workers or os.cpu_count() or 1
+    thresholds = list(thresholds or DEFAULT_THRESHOLDS)
+    log.info(f"Evaluating {len(jobs)} files on {workers} worker processes")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(inference_framework,)
+    ) as executor:
+        paths, labels = zip(*jobs)
+        # Larger shards amortize IPC; keep enough shards to balance uneven file lengths
+        chunksize = max(1, len(jobs) // (workers * 4))
+        results = list(executor.map(_score_file, paths, labels, chunksize=chunksize))
+    wall_time = time.perf_counter() - started
+
+    audio_s = sum(r.duration_s for r in results)
+    processing_s = sum(r.processing_s for r in results)
+    latencies = np.concatenate([r.latencies_us for r in results]) if results else np.zeros(0)
+    percentiles = np.percentile(latencies, [50, 90, 99]) if len(latencies) else np.zeros(3)
+    rtf = processing_s / audio_s if audio_s else 0.0
+
+    return EvaluationReport(
+        files=len(results),
+        audio_hours=audio_s / 3600.0,
+        negative_hours=sum(r.duration_s for r in results if not r.positive) / 3600.0,
+        positive_files=sum(1 for r in results if r.positive),
+        workers=workers,
+        wall_time_s=wall_time,
+        real_time_factor=rtf,
+        streams_per_core=1.0 / rtf if rtf else 0.0,
+        latency_us={
+            'p50': float(percentiles[0]),
+            'p90': float(percentiles[1]),
+            'p99': float(percentiles[2]),
+            'max': float(latencies.max()) if len(latencies) else 0.0,
+        },
+        thresholds=sweep_thresholds(results, thresholds, refractory_s)
+    )
+
+
+def format_report(report: EvaluationReport) -> str:
+    """
+    Render a report as a plain-text table.
+
+    Args:
+        report: Evaluation report.
+
+    Returns:
+        str: Human-readable summary.
+    """
+    lines = [
+        f"Files: {report.files} ({report.positive_files} positive), "
+        f"audio: {report.audio_hours:.2f} h, workers: {report.workers}, wall: {report.wall_time_s:.1f} s",
+        f"Real-time factor: {report.real_time_factor:.4f} "
+        f"(~{report.streams_per_core:.0f} streams per core)",
+        "Chunk latency (us): " + ", ".join(f"{k}={v:.0f}" for k, v in report.latency_us.items()),
+        "",
+        f"{'threshold':>9}  {'FA':>5}  {'FA/hour':>8}  {'misses':>6}  {'miss rate':>9}",
+    ]
+    for r in report.thresholds:
+        lines.append(
+            f"{r.threshold:>9.2f}  {r.false_accepts:>5}  {r.false_accepts_per_hour:>8.2f}  "
+            f"{r.misses:>6}  {r.miss_rate:>9.2%}"
+        )
+    return "\n".join(lines)
+
+
+def _default_thresholds() -> List[float]:
+    """Sweep around the configured threshold, if configuration is available."""
+    thresholds = set(DEFAULT_THRESHOLDS)
+    try:
+        from src.utils.config_loader import ConfigLoader
+
+        configured = ConfigLoader().get_config().get('wake_word', {}).get('confidence_threshold')
+        if configured is not None:
+            thresholds.add(float(configured))
+    except Exception as e:
+        log.warning(f"Could not read configured wake word threshold: {e}")
+    return sorted(thresholds)
+
+
+def main():
+    """
+    Command-line entry point for the wake word evaluator.
+    """
+    parser = argparse.ArgumentParser(description="Offline wake word evaluation and benchmark")
+    parser.add_argument('--positive', type=Path, nargs='*', default=[], help="Directories with wake word recordings")
+    parser.add_argument('--negative', type=Path, nargs='*', default=[], help="Directories with background recordings")
+    parser.add_argument('--thresholds', type=float, nargs='*', help="Confidence thresholds to sweep")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument('--framework', default='tflite', choices=['tflite', 'onnx'])
+    parser.add_argument('--refractory', type=float, default=2.0, help="Seconds between counted false accepts")
+    parser.add_argument('--json', type=Path, help="Write the report as JSON to this path")
+    args = parser.parse_args()
+
+    report = evaluate(
+        positive_dirs=args.positive,
+        negative_dirs=args.negative,
+        thresholds=args.thresholds or _default_thresholds(),
+        workers=args.workers,
+        inference_framework=args.framework,
+        refractory_s=args.refractory
+    )
+    print(format_report(report))
+
+    if args.json:
+        args.json.write_text(json.dumps(report.to_dict(), indent=2), encoding='utf-8')
+        print(f"Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,25 +13,44 @@ or "brain" to life.
 Features:
 - Async application bootstrap
 - Configuration and logging initialization
-- Main application loop with graceful shutdown
+- Event-driven main loop on a priority event bus with graceful shutdown
 - Error handling and signal management
+- Lazy subsystem loading and a --profile-startup mode checked against the startup budget
+- RAM-budgeted model registry with idle preloading of the LLM and speech-to-text models
 
 Author: NeoMate AI Team
 Version: 1.0.0
 License: MIT
 """
 
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
 import asyncio
 import signal
 import sys
 from pathlib import Path
 
-# Add src to path for imports
-sys.path.insert(0, str(Path(__file__).parent))
+# Add the project root to path so every module is imported once, as src.*
+# (importing the same file as both utils.* and src.utils.* would duplicate
+# the configuration and logger singletons)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+from src.utils.helpers import PROJECT_ROOT
+from src.core.event_bus import Event, EventBus, EventPriority
+from src.core.subsystem_registry import SubsystemRegistry
+from src.models.model_registry import ModelRegistry
+from src.utils.instrumentation import span, start_trace
+from src.utils.startup_profiler import StartupProfiler
+
+_IMPORTS_DONE = time.perf_counter()
 
-from utils.config_loader import ConfigLoader
-from utils.logger import log
-from utils.helpers import PROJECT_ROOT
+# Approximate resident size of each Whisper model on CPU (fp32 weights)
+WHISPER_MODEL_MB = {'tiny': 160, 'base': 300, 'small': 980, 'medium': 3100, 'large': 6200}
 
 
 class NeoMateApp:
@@ -42,10 +61,21 @@ class NeoMateApp:
     and main execution loop.
     """
 
-    def __init__(self):
+    def __init__(self, profiler: StartupProfiler = None):
+        self.profiler = profiler
         self.config_loader = ConfigLoader()
         self.config = None
         self.running = False
+        self.event_bus = None
+        self.subsystems = SubsystemRegistry(profiler)
+        self.models = None
+        # Number of queries being answered; models are only preloaded while zero
+        self._responding = 0
+        self._stop_event = asyncio.Event()
+        # Set while no wake word is being followed up, so the detector waits for
+        # the current utterance before listening again
+        self._utterance_done = asyncio.Event()
+        self._utterance_done.set()
 
     async def initialize(self) -> bool:
         """
@@ -59,11 +89,27 @@ class NeoMateApp:
             self.config = self.config_loader.get_config()
             log.info("Configuration loaded successfully")
 
+            # Hot reload: edits to settings.yaml / wake_words.yaml are applied
+            # without a restart by subsystems reading through accessors
+            reload_config = self.config.get('config', {})
+            if reload_config.get('hot_reload', True):
+                self.config_loader.start_watching(reload_config.get('poll_interval', 1.0))
+
             # Log application startup
             app_name = self.config.get('application', {}).get('name', 'NeoMate AI')
             app_version = self.config.get('application', {}).get('version', '1.0.0')
             log.info(f"Starting {app_name} version {app_version}...")
 
+            # Event bus: input producers publish, the brain and outputs consume
+            self.event_bus = EventBus(self.config.get('event_bus', {}))
+            self.subscribe_consumers()
+
+            # Heavy subsystems are only registered here; they are imported and
+            # initialized on first use or in the background once the loop is up
+            self.models = ModelRegistry(self.config_loader)
+            self.register_models()
+            self.register_subsystems()
+
             # Initialize other components here in the future
             # - Input modules (voice, vision, etc.)
             # - Processing modules (LLM, reasoning, etc.)
@@ -77,29 +123,270 @@ class NeoMateApp:
             log.error(f"Failed to initialize application: {e}")
             return False
 
+    def subscribe_consumers(self):
+        """
+        Register the event bus consumers.
+
+        The speech consumer turns a wake word into transcripts; the brain consumer
+        answers final transcripts and records the other input events.
+        """
+        self.event_bus.subscribe('speech', self.handle_wake_word, topics=('wake_word',))
+        self.event_bus.subscribe('brain', self.handle_event, topics=('transcript', 'screen', 'audio'))
+
+    def register_subsystems(self):
+        """
+        Register the lazily loaded subsystems.
+        """
+        self.subsystems.register(
+            'audio_hub',
+            'src.input.audio_capture:AudioCaptureHub',
+            init_method=None
+        )
+        self.subsystems.register(
+            'wake_word',
+            'src.input.wake_word_detector:WakeWordDetector',
+            dependencies={'audio_hub': 'audio_hub'},
+            background=True
+        )
+        self.subsystems.register(
+            'speech_to_text',
+            'src.input.voice_input:StreamingSpeechRecognizer',
+            dependencies={'audio_hub': 'audio_hub'},
+            init_method=None,
+            background=True,
+            model_registry=self.models
+        )
+        self.subsystems.register(
+            'user_preferences',
+            'src.memory.user_preferences:UserPreferences',
+            background=True
+        )
+        # Vision and translation models load through the model registry on first use
+        self.subsystems.register(
+            'object_detector',
+            'src.models.vision.object_detection:ObjectDetector',
+            init_method=None,
+            model_registry=self.models
+        )
+        self.subsystems.register(
+            'text_recognizer',
+            'src.models.vision.text_recognition:TextRecognizer',
+            init_method=None,
+            model_registry=self.models
+        )
+        self.subsystems.register(
+            'translator',
+            'src.models.nlp.language_translator:LanguageTranslator',
+            init_method=None,
+            model_registry=self.models
+        )
+        self.subsystems.register(
+            'brain',
+            'src.core.brain:Brain',
+            dependencies={'user_preferences': 'user_preferences'},
+            init_method=None,
+            model_registry=self.models
+        )
+
+    def register_models(self):
+        """
+        Register the models shared through the RAM-budgeted model registry.
+
+        Nothing is imported or loaded here; the LLM and speech-to-text models are
+        preloaded while the assistant is idle, other models load on first use.
+        """
+        stt_config = self.config.get('speech_to_text', {})
+        stt_model = stt_config.get('model', 'base')
+
+        def load_stt():
+            from src.input.voice_input import WhisperTranscriber
+            return WhisperTranscriber.load_model(stt_model)
+
+        async def load_llm():
+            brain = await self.subsystems.get('brain')
+            loader = brain.query_processor.model_loader
+            if not await loader.load():
+                raise RuntimeError(f"local model '{loader.model}' did not load")
+            return loader
+
+        self.models.register(
+            'llm',
+            loader=load_llm,
+            unloader=lambda loader: loader.unload(),
+            size_mb=self.config.get('local_llm', {}).get('size_mb', 4400),
+            priority=100
+        )
+        self.models.register(
+            'stt',
+            loader=load_stt,
+            size_mb=stt_config.get('size_mb', WHISPER_MODEL_MB.get(stt_model.split('.')[0], 1000)),
+            priority=90
+        )
+
+    def models_idle(self) -> bool:
+        """
+        Whether models can be preloaded: no query is being answered and the wake
+        word detector (if loaded) has not fired.
+        """
+        if self._responding:
+            return False
+        wake_word = self.subsystems.peek('wake_word')
+        return wake_word is None or not wake_word.detection_event.is_set()
+
+    async def handle_event(self, event: Event):
+        """
+        Brain consumer for input events.
+
+        Final transcripts are answered by the brain, which streams the answer to
+        voice output; other events are only recorded for now.
+
+        Args:
+            event: Event published by an input producer.
+        """
+        log.debug(f"Brain received '{event.topic}' event (priority {event.priority.name}, trace {event.trace_id})")
+        if event.topic == 'transcript':
+            payload = event.payload
+            text = payload.get('text', '') if isinstance(payload, dict) else getattr(payload, 'text', '')
+            is_final = payload.get('is_final', True) if isinstance(payload, dict) else getattr(payload, 'is_final', True)
+            if is_final and text.strip():
+                self._responding += 1
+                try:
+                    brain = await self.subsystems.get('brain')
+                    # Continue the wake word's trace, or start one for a typed query
+                    with start_trace(event.trace_id):
+                        await brain.respond(text)
+                finally:
+                    self._responding -= 1
+
+    async def handle_wake_word(self, event: Event):
+        """
+        Speech consumer: transcribe the utterance following a wake word.
+
+        Every transcript is published on the bus for the brain; the detector is
+        re-armed once the utterance has ended.
+
+        Args:
+            event: 'wake_word' event with the detection frame and pre-roll audio.
+        """
+        payload = event.payload or {}
+        try:
+            stt = await self.subsystems.get('speech_to_text')
+            with start_trace(event.trace_id), span('listen'):
+                async for transcript in stt.stream(
+                    pre_roll=payload.get('pre_roll'),
+                    start_frame=payload.get('frame')
+                ):
+                    # Published inside the trace, so the transcript carries its ID
+                    await self.event_bus.publish(Event(
+                        'transcript',
+                        payload=transcript,
+                        priority=EventPriority.VOICE
+                    ))
+        except Exception as e:
+            log.error(f"Speech-to-text failed after wake word: {e}")
+        finally:
+            wake_word = self.subsystems.peek('wake_word')
+            if wake_word is not None:
+                wake_word.reset_detection_event()
+            self._utterance_done.set()
+
+    async def run_wake_word(self):
+        """
+        Wake word producer: publish a 'wake_word' event for every detection.
+
+        Listening pauses while the utterance after a detection is transcribed.
+        If the detector cannot listen (e.g. no microphone) it is retried with
+        exponential backoff from ``wake_word.retry_s`` up to ``wake_word.max_retry_s``.
+        The backoff starts over once the detector has listened for
+        ``wake_word.restart_reset_s`` seconds, so a failure after a long healthy
+        run is retried quickly.
+        """
+        loop = asyncio.get_running_loop()
+        wake_config = (self.config or {}).get('wake_word', {})
+        initial_backoff_s = wake_config.get('retry_s', 1.0)
+        max_backoff_s = wake_config.get('max_retry_s', 30.0)
+        healthy_s = wake_config.get('restart_reset_s', 60.0)
+        backoff_s = initial_backoff_s
+        while not self._stop_event.is_set():
+            started = loop.time()
+            try:
+                wake_word = await self.subsystems.get('wake_word')
+                detected = await wake_word.listen()
+            except Exception as e:
+                log.error(f"Wake word detector unavailable: {e}")
+                detected = False
+
+            if not detected:
+                if loop.time() - started >= healthy_s:
+                    # It ran stably before stopping, so this is not a crash loop
+                    backoff_s = initial_backoff_s
+                log.warning(f"Wake word listening stopped, retrying in {backoff_s:.1f} s")
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=backoff_s)
+                except asyncio.TimeoutError:
+                    pass
+                backoff_s = min(backoff_s * 2, max_backoff_s)
+                continue
+            backoff_s = initial_backoff_s
+
+            # Each wake word starts a turn; its trace follows the events through
+            # speech-to-text and the brain
+            with start_trace() as trace:
+                log.debug(f"Wake word detected, trace {trace.trace_id}")
+                self._utterance_done.clear()
+                await self.event_bus.publish(Event(
+                    'wake_word',
+                    payload={
+                        'detection': wake_word.last_detection,
+                        'frame': wake_word.last_detection_frame,
+                        'pre_roll': wake_word.get_pre_roll()
+                    },
+                    priority=EventPriority.VOICE
+                ))
+                await self._utterance_done.wait()
+
     async def run_main_loop(self):
         """
         Main application loop.
 
-        This loop will eventually implement the core "listen -> think -> act" cycle.
-        Currently, it's a placeholder that demonstrates the async structure.
+        Starts the event bus consumers and the wake word producer, then waits until
+        shutdown is requested. Producers publish onto the bus; the supervised
+        consumers implement the core "listen -> think -> act" cycle.
         """
         log.info("Entering main application loop")
 
+        producers = []
         try:
-            while self.running:
-                # Placeholder for main application logic
-                # Future: Listen for inputs, process them, generate responses
-                log.debug("Main loop iteration - listening for inputs...")
+            await self.event_bus.start()
+
+            # The first prompt can be served now; load the rest in the background
+            if self.config.get('startup', {}).get('background_preload', True):
+                self.subsystems.preload_background()
+
+            # Keep the models needed right after a wake word warm while idle
+            if self.config.get('models', {}).get('idle_preload', True):
+                self.models.preload_when_idle(['stt', 'llm'], self.models_idle)
+
+            # Voice input: the wake word detector is the producer that starts each turn
+            if self.config.get('wake_word', {}).get('enabled', True):
+                producers.append(asyncio.create_task(self.run_wake_word()))
 
-                # Simulate processing time
-                await asyncio.sleep(10)
+            await self._stop_event.wait()
 
         except asyncio.CancelledError:
             log.info("Main loop cancelled")
         except Exception as e:
             log.error(f"Error in main loop: {e}")
         finally:
+            # The detector swallows cancellation, so stop it before cancelling its task
+            self._stop_event.set()
+            wake_word = self.subsystems.peek('wake_word')
+            if wake_word is not None:
+                await wake_word.stop_listening()
+            for task in producers:
+                task.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+            await self.event_bus.stop()
             log.info("Exited main application loop")
 
     async def shutdown(self):
@@ -109,9 +396,14 @@ class NeoMateApp:
         log.info("Initiating application shutdown...")
 
         self.running = False
+        self._stop_event.set()
 
         # Shutdown components in reverse order
-        # Future: Clean up resources, save state, etc.
+        await self.subsystems.shutdown()
+        if self.models is not None:
+            await self.models.shutdown()
+        self.config_loader.stop_watching()
+        # Future: Save state, etc.
 
         app_name = self.config.get('application', {}).get('name', 'NeoMate AI') if self.config else 'NeoMate AI'
         log.info(f"{app_name} shutdown complete. Goodbye!")
@@ -121,12 +413,19 @@ class NeoMateApp:
         Run the complete application lifecycle.
         """
         # Setup signal handlers for graceful shutdown
-        def signal_handler(signum, frame):
+        # (registered on the event loop so a signal wakes the idle loop immediately)
+        loop = asyncio.get_running_loop()
+
+        def signal_handler(signum, frame=None):
             log.info(f"Received signal {signum}, initiating shutdown...")
-            asyncio.create_task(self.shutdown())
+            loop.call_soon_threadsafe(self._stop_event.set)
 
-        signal.signal(signal.SIGINT, signal_handler)
-        signal.signal(signal.SIGTERM, signal_handler)
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, signal_handler, signum)
+            except NotImplementedError:
+                # Windows event loops do not support add_signal_handler
+                signal.signal(signum, signal_handler)
 
         # Initialize application
         if not await self.initialize():
@@ -145,17 +444,67 @@ class NeoMateApp:
             await self.shutdown()
 
 
-async def main():
+async def profile_startup(budget_s: float) -> int:
+    """
+    Measure startup and subsystem load times against the startup budget.
+
+    Args:
+        budget_s: Allowed seconds from process start until the app is ready.
+
+    Returns:
+        int: Process exit code, 1 if the budget was exceeded.
+    """
+    profiler = StartupProfiler(budget_s=budget_s, started_at=_PROCESS_START)
+    profiler.record("core imports", _IMPORTS_DONE - _PROCESS_START)
+    profiler.install_import_hook()
+
+    app = NeoMateApp(profiler)
+    with profiler.phase("initialize"):
+        initialized = await app.initialize()
+    if not initialized:
+        print("Application initialization failed")
+        return 1
+    with profiler.phase("event bus start"):
+        await app.event_bus.start()
+    profiler.mark_ready()
+
+    # Load every subsystem in turn so each one's import and init cost is attributed
+    for name in app.subsystems.specs:
+        try:
+            await app.subsystems.get(name)
+        except Exception as e:
+            profiler.record(f"failed:{name}", 0.0)
+            log.warning(f"Subsystem '{name}' could not be loaded while profiling: {e}")
+
+    profiler.remove_import_hook()
+    await app.event_bus.stop()
+    await app.subsystems.shutdown()
+    print(profiler.report())
+    return 0 if profiler.within_budget() else 1
+
+
+async def main() -> int:
     """
     Main entry point for NeoMate AI.
     """
+    parser = argparse.ArgumentParser(description="NeoMate AI")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Report import and init time per subsystem against the startup budget")
+    parser.add_argument('--startup-budget', type=float, default=5.0,
+                        help="Startup budget in seconds (default: 5.0)")
+    args = parser.parse_args()
+
+    if args.profile_startup:
+        return await profile_startup(args.startup_budget)
+
     app = NeoMateApp()
     await app.run()
+    return 0
 
 
 if __name__ == "__main__":
     try:
-        asyncio.run(main())
+        sys.exit(asyncio.run(main()))
     except KeyboardInterrupt:
         # Graceful exit on Ctrl+C
         pass
@@ -1 +1,668 @@
-#এই মডিউলে SQLite ডেটাবেস ইন্টারফেস ক্লাস থাকবে যা এনক্রিপ্টেড কোয়েরি এক্সিকিউট করবে (cryptography ব্যবহার করে); এটি লোকাল স্টোরেজের জন্য তৈরি, সিকিউর ডেটা পার্সিস্টেন্স প্রোভাইড করে।
+"""
+NeoMate AI Local Database Module
+
+This module is NeoMate's local SQLite storage with field-level encryption. The
+database runs in WAL mode. Reads go to a pool of read-only connections on worker
+threads, and all writes go to one writer thread that groups whatever is queued
+into a single transaction. Many async callers therefore share one fsync per batch
+instead of one per insert. Sensitive columns are encrypted with AES-GCM using
+per-column keys derived once from the master key and cached; encryption and
+decryption run on the writer and reader threads, never on the event loop.
+
+Features:
+- WAL journal, synchronous=NORMAL and tuned pragmas
+- Single writer thread with group commit; one savepoint per operation, so a
+  failing write does not abort its batch
+- Pool of read-only connections with per-thread connections
+- Prepared statement reuse (sqlite3 statement cache, generated SQL cached per table)
+- Field-level AES-GCM; keys derived with HKDF per table/column and cached
+- Master key from a parameter, NEOMATE_DB_KEY, or a generated key file
+- Async API: execute, insert, insert_many, fetch_all, fetch_one
+- Benchmark of writes/s and read latency with encryption on and off
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import base64
+import functools
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import DATA_DIR
+from src.utils.logger import log
+
+# Encrypted value layout: format byte, 12-byte nonce, ciphertext + 16-byte tag
+_FORMAT_STR = 1
+_FORMAT_BYTES = 2
+_FORMAT_JSON = 3
+_NONCE_BYTES = 12
+
+
+class DatabaseError(RuntimeError):
+    """Raised when the local database cannot be opened or used."""
+
+
+class FieldCipher:
+    """
+    AES-256-GCM encryption of individual column values.
+
+    Each table/column gets its own key, derived from the master key with HKDF and
+    cached, and the table/column name is bound as associated data, so a value
+    copied into another column does not decrypt.
+    """
+
+    def __init__(self, master_key: bytes):
+        """
+        Initialize the FieldCipher.
+
+        Args:
+            master_key: 32-byte master key.
+        """
+        if len(master_key) != 32:
+            raise ValueError("The database master key must be 32 bytes")
+        self._master_key = master_key
+        # One AEAD per 'table.column', owned by this cipher (and its key)
+        self._aeads: Dict[str, Any] = {}
+
+    def _aead(self, context: str) -> Any:
+        aead = self._aeads.get(context)
+        if aead is None:
+            aead = self._aeads[context] = self._derive(context)
+        return aead
+
+    def _derive(self, context: str) -> Any:
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+        from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+
+        key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b'neomate-db:' + context.encode()).derive(self._master_key)
+        return AESGCM(key)
+
+    def encrypt(self, context: str, value: Any) -> Optional[bytes]:
+        """
+        Encrypt a value for a column.
+
+        Args:
+            context: 'table.column'.
+            value: str, bytes or a JSON-serializable value; None stays None.
+
+        Returns:
+            Optional[bytes]: Encrypted value.
+        """
+        if value is None:
+            return None
+        if isinstance(value, str):
+            fmt, data = _FORMAT_STR, value.encode('utf-8')
+        elif isinstance(value, (bytes, bytearray, memoryview)):
+            fmt, data = _FORMAT_BYTES, bytes(value)
+        else:
+            fmt, data = _FORMAT_JSON, json.dumps(value).encode('utf-8')
+        nonce = os.urandom(_NONCE_BYTES)
+        header = bytes((fmt,))
+        return header + nonce + self._aead(context).encrypt(nonce, data, header + context.encode())
+
+    def decrypt(self, context: str, blob: Optional[bytes]) -> Any:
+        """
+        Decrypt a value produced by ``encrypt`` for the same column.
+
+        Args:
+            context: 'table.column'.
+            blob: Encrypted value or None.
+
+        Returns:
+            Any: The original value.
+        """
+        if blob is None:
+            return None
+        header, nonce, sealed = blob[:1], blob[1:1 + _NONCE_BYTES], blob[1 + _NONCE_BYTES:]
+        data = self._aead(context).decrypt(nonce, sealed, header + context.encode())
+        fmt = header[0]
+        if fmt == _FORMAT_STR:
+            return data.decode('utf-8')
+        if fmt == _FORMAT_BYTES:
+            return data
+        return json.loads(data)
+
+
+def load_master_key(key_path: Union[str, Path]) -> bytes:
+    """
+    Get the database master key from NEOMATE_DB_KEY (base64) or a key file,
+    creating the key file with owner-only permissions on first use.
+
+    Args:
+        key_path: Key file location.
+
+    Returns:
+        bytes: 32-byte master key.
+    """
+    env_key = os.environ.get('NEOMATE_DB_KEY')
+    if env_key:
+        return base64.b64decode(env_key)
+    key_path = Path(key_path)
+    if key_path.exists():
+        return base64.b64decode(key_path.read_bytes())
+    key_path.parent.mkdir(parents=True, exist_ok=True)
+    key = os.urandom(32)
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as handle:
+        handle.write(base64.b64encode(key))
+    log.info(f"Generated a new database key at {key_path}")
+    return key
+
+
+class _WriteOp:
+    """A queued write and the future waiting for its result."""
+
+    __slots__ = ('run', 'future', 'loop')
+
+    def __init__(self, run: Callable[[sqlite3.Connection], Any], future: asyncio.Future, loop: asyncio.AbstractEventLoop):
+        self.run = run
+        self.future = future
+        self.loop = loop
+
+
+def _split_statements(script: str) -> List[str]:
+    """
+    Split an SQL script into complete statements.
+
+    Semicolons inside string literals, comments and trigger bodies do not end a
+    statement; ``sqlite3.complete_statement`` decides where each one ends.
+
+    Args:
+        script: SQL statements separated by semicolons.
+
+    Returns:
+        List[str]: Statements, each ending with its semicolon.
+    """
+    statements = []
+    pending = ''
+    for piece in script.split(';'):
+        pending += piece + ';'
+        if sqlite3.complete_statement(pending):
+            if pending.strip(' \t\r\n;'):
+                statements.append(pending.strip())
+            pending = ''
+    # The split adds one ';' too many; whatever is left is an unterminated statement
+    rest = pending[:-1].strip()
+    if rest:
+        statements.append(rest)
+    return statements
+
+
+def _resolve(future: asyncio.Future, result: Any, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class LocalDatabase:
+    """
+    Async SQLite access with a single batching writer and encrypted columns.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        path: Optional[Union[str, Path]] = None,
+        encrypted_fields: Optional[Dict[str, Iterable[str]]] = None,
+        master_key: Optional[bytes] = None,
+        encryption: Optional[bool] = None
+    ):
+        """
+        Initialize the LocalDatabase. Call ``open`` before use.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            path: Database file. Defaults to ``database.path`` or data/neomate.db.
+            encrypted_fields: Table -> columns stored encrypted. Defaults to
+                              ``database.encryption.fields``.
+            master_key: 32-byte master key. Defaults to NEOMATE_DB_KEY or the key file.
+            encryption: Whether encrypted columns are encrypted. Defaults to
+                        ``database.encryption.enabled`` (True).
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        db_config = self.config.get('database', {})
+        encryption_config = db_config.get('encryption', {})
+
+        self.path = Path(path or db_config.get('path', DATA_DIR / "neomate.db"))
+        self.readers = max(1, db_config.get('read_connections', 4))
+        self.max_batch = db_config.get('max_batch', 512)
+        # Extra time the writer waits for more writes before committing (0 = commit what is queued)
+        self.batch_window_s = db_config.get('batch_window_ms', 0) / 1000.0
+        self.cache_size_kb = db_config.get('cache_size_kb', 16384)
+
+        fields = encrypted_fields if encrypted_fields is not None else encryption_config.get('fields', {})
+        self.encrypted_fields: Dict[str, Set[str]] = {table: set(columns) for table, columns in fields.items()}
+        self.encryption = encryption_config.get('enabled', True) if encryption is None else encryption
+        self.cipher: Optional[FieldCipher] = None
+        if self.encryption and self.encrypted_fields:
+            key_path = encryption_config.get('key_file', DATA_DIR / "keys" / "local_db.key")
+            self.cipher = FieldCipher(master_key or load_master_key(key_path))
+
+        self._writes: 'queue.SimpleQueue[Optional[_WriteOp]]' = queue.SimpleQueue()
+        self._writer: Optional[threading.Thread] = None
+        self._reader_pool: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._reader_connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self.batches = 0
+        self.writes = 0
+
+    def _connect(self, readonly: bool) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            str(self.path),
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        connection.execute('PRAGMA busy_timeout = 5000')
+        connection.execute(f'PRAGMA cache_size = -{int(self.cache_size_kb)}')
+        connection.execute('PRAGMA temp_store = MEMORY')
+        if readonly:
+            connection.execute('PRAGMA query_only = ON')
+        else:
+            connection.execute('PRAGMA journal_mode = WAL')
+            # In WAL mode NORMAL only risks the last transactions on power loss, never corruption
+            connection.execute('PRAGMA synchronous = NORMAL')
+            connection.execute('PRAGMA foreign_keys = ON')
+        return connection
+
+    async def open(self) -> None:
+        """Open the database and start the writer thread and reader pool."""
+        if self._writer is not None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        ready: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._writer = threading.Thread(target=self._writer_loop, args=(ready, asyncio.get_running_loop()),
+                                        name='db-writer', daemon=True)
+        self._writer.start()
+        await ready
+        self._reader_pool = ThreadPoolExecutor(self.readers, thread_name_prefix='db-reader')
+        log.info(f"Local database opened at {self.path} (encryption {'on' if self.cipher else 'off'})")
+
+    def _writer_loop(self, ready: asyncio.Future, loop: asyncio.AbstractEventLoop) -> None:
+        try:
+            connection = self._connect(readonly=False)
+        except Exception as e:
+            loop.call_soon_threadsafe(_resolve, ready, None, DatabaseError(f"Cannot open database {self.path}: {e}"))
+            return
+        loop.call_soon_threadsafe(_resolve, ready, None, None)
+
+        stopping = False
+        while not stopping:
+            op = self._writes.get()
+            if op is None:
+                break
+            batch = [op]
+            deadline = time.monotonic() + self.batch_window_s
+            # Group commit: take everything already queued (and, with a window, what arrives in it)
+            while len(batch) < self.max_batch:
+                try:
+                    remaining = deadline - time.monotonic()
+                    op = self._writes.get(timeout=remaining) if remaining > 0 else self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if op is None:
+                    stopping = True
+                    break
+                batch.append(op)
+            self._commit_batch(connection, batch)
+        connection.close()
+
+    def _commit_batch(self, connection: sqlite3.Connection, batch: List[_WriteOp]) -> None:
+        results: List[Tuple[_WriteOp, Any, Optional[BaseException]]] = []
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            for op in batch:
+                connection.execute('SAVEPOINT op')
+                try:
+                    results.append((op, op.run(connection), None))
+                    connection.execute('RELEASE op')
+                except Exception as e:
+                    connection.execute('ROLLBACK TO op')
+                    connection.execute('RELEASE op')
+                    results.append((op, None, e))
+            connection.execute('COMMIT')
+        except Exception as e:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            error = DatabaseError(f"Write batch failed: {e}")
+            results = [(op, None, error) for op in batch]
+        self.batches += 1
+        self.writes += len(batch)
+        for op, result, error in results:
+            op.loop.call_soon_threadsafe(_resolve, op.future, result, error)
+
+    def _submit(self, run: Callable[[sqlite3.Connection], Any]) -> asyncio.Future:
+        if self._writer is None:
+            raise DatabaseError("Database is not open")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._writes.put(_WriteOp(run, future, loop))
+        return future
+
+    def _encrypt_row(self, table: str, row: Dict[str, Any]) -> Dict[str, Any]:
+        columns = self.encrypted_fields.get(table)
+        if self.cipher is None or not columns:
+            return row
+        return {
+            name: self.cipher.encrypt(f"{table}.{name}", value) if name in columns else value
+            for name, value in row.items()
+        }
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _insert_sql(table: str, columns: Tuple[str, ...], or_replace: bool) -> str:
+        verb = 'INSERT OR REPLACE' if or_replace else 'INSERT'
+        names = ', '.join(f'"{name}"' for name in columns)
+        marks = ', '.join('?' * len(columns))
+        return f'{verb} INTO "{table}" ({names}) VALUES ({marks})'
+
+    async def execute(self, sql: str, params: Sequence[Any] = ()) -> int:
+        """
+        Run a write statement in the next batch.
+
+        Values are passed as is; use ``insert`` for tables with encrypted columns.
+
+        Args:
+            sql: SQL statement.
+            params: Statement parameters.
+
+        Returns:
+            int: Number of rows changed.
+        """
+        return await self._submit(lambda connection: connection.execute(sql, params).rowcount)
+
+    async def executescript(self, script: str) -> None:
+        """
+        Run a schema script (CREATE TABLE, CREATE INDEX, ...) in the writer.
+
+        The statements run one by one inside the write batch (``sqlite3``'s own
+        ``executescript`` would commit the batch first).
+
+        Args:
+            script: SQL statements separated by semicolons.
+        """
+        statements = _split_statements(script)
+
+        def run(connection: sqlite3.Connection) -> None:
+            for statement in statements:
+                connection.execute(statement)
+
+        await self._submit(run)
+
+    async def insert(self, table: str, row: Dict[str, Any], or_replace: bool = False) -> int:
+        """
+        Insert a row, encrypting its configured columns on the writer thread.
+
+        Args:
+            table: Table name.
+            row: Column -> value.
+            or_replace: Use INSERT OR REPLACE.
+
+        Returns:
+            int: Row ID of the inserted row.
+        """
+        columns = tuple(row)
+        sql = self._insert_sql(table, columns, or_replace)
+
+        def run(connection: sqlite3.Connection) -> int:
+            values = self._encrypt_row(table, row)
+            return connection.execute(sql, [values[name] for name in columns]).lastrowid
+
+        return await self._submit(run)
+
+    async def insert_many(self, table: str, rows: List[Dict[str, Any]], or_replace: bool = False) -> int:
+        """
+        Insert rows with the same columns in one operation.
+
+        Args:
+            table: Table name.
+            rows: Rows as column -> value.
+            or_replace: Use INSERT OR REPLACE.
+
+        Returns:
+            int: Number of rows inserted.
+        """
+        if not rows:
+            return 0
+        columns = tuple(rows[0])
+        sql = self._insert_sql(table, columns, or_replace)
+
+        def run(connection: sqlite3.Connection) -> int:
+            encrypted = (self._encrypt_row(table, row) for row in rows)
+            return connection.executemany(sql, ([values[name] for name in columns] for values in encrypted)).rowcount
+
+        return await self._submit(run)
+
+    def _reader(self) -> sqlite3.Connection:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = self._connect(readonly=True)
+            with self._connections_lock:
+                self._reader_connections.append(connection)
+        return connection
+
+    def _read(self, sql: str, params: Sequence[Any], table: Optional[str], limit: Optional[int]) -> List[Dict[str, Any]]:
+        cursor = self._reader().execute(sql, params)
+        rows = cursor.fetchmany(limit) if limit is not None else cursor.fetchall()
+        names = [description[0] for description in cursor.description or ()]
+        cursor.close()
+        encrypted = self.encrypted_fields.get(table, ()) if table is not None else ()
+        decrypt = [
+            (index, f"{table}.{name}") for index, name in enumerate(names)
+            if name in encrypted and self.cipher is not None
+        ]
+        result = []
+        for row in rows:
+            values = list(row)
+            for index, context in decrypt:
+                values[index] = self.cipher.decrypt(context, values[index])
+            result.append(dict(zip(names, values)))
+        return result
+
+    async def fetch_all(self, sql: str, params: Sequence[Any] = (), table: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Run a query on a reader connection.
+
+        Args:
+            sql: SELECT statement.
+            params: Statement parameters.
+            table: Table whose encrypted columns should be decrypted in the result
+                   (matched by result column name).
+
+        Returns:
+            List[Dict[str, Any]]: Rows as column -> value.
+        """
+        if self._reader_pool is None:
+            raise DatabaseError("Database is not open")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._reader_pool, self._read, sql, params, table, None)
+
+    async def fetch_one(self, sql: str, params: Sequence[Any] = (), table: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Run a query and return its first row; see ``fetch_all``.
+
+        Returns:
+            Optional[Dict[str, Any]]: First row, or None.
+        """
+        if self._reader_pool is None:
+            raise DatabaseError("Database is not open")
+        loop = asyncio.get_running_loop()
+        rows = await loop.run_in_executor(self._reader_pool, self._read, sql, params, table, 1)
+        return rows[0] if rows else None
+
+    async def close(self) -> None:
+        """Commit pending writes, stop the writer and close all connections."""
+        if self._writer is not None:
+            self._writes.put(None)
+            await asyncio.to_thread(self._writer.join)
+            self._writer = None
+        if self._reader_pool is not None:
+            self._reader_pool.shutdown(wait=True)
+            self._reader_pool = None
+        with self._connections_lock:
+            for connection in self._reader_connections:
+                connection.close()
+            self._reader_connections.clear()
+        self._local = threading.local()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get write batching statistics.
+
+        Returns:
+            Dict[str, Any]: Writes, batches and mean batch size.
+        """
+        return {
+            'writes': self.writes,
+            'batches': self.batches,
+            'mean_batch': self.writes / self.batches if self.batches else 0.0,
+            'encryption': self.cipher is not None,
+        }
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    created REAL NOT NULL,
+    role TEXT NOT NULL,
+    content BLOB
+);
+CREATE INDEX IF NOT EXISTS messages_session ON messages (session_id, created)
+"""
+
+
+async def benchmark(
+    encryption: bool,
+    writers: int = 64,
+    writes_per_writer: int = 200,
+    reads: int = 2000,
+    directory: Optional[Path] = None
+) -> Dict[str, float]:
+    """
+    Measure concurrent insert throughput and read latency.
+
+    Args:
+        encryption: Encrypt the message content column.
+        writers: Concurrent async writers.
+        writes_per_writer: Inserts per writer.
+        reads: Point queries measured while nothing else runs.
+        directory: Where to create the database.
+
+    Returns:
+        Dict[str, float]: writes/s, mean batch size and read latency percentiles.
+    """
+    import statistics
+
+    db = LocalDatabase(
+        path=Path(directory) / f"bench_{'enc' if encryption else 'plain'}.db",
+        encrypted_fields={'messages': ['content']},
+        master_key=os.urandom(32),
+        encryption=encryption
+    )
+    await db.open()
+    await db.executescript(SCHEMA)
+    text = "Remind me to call the bank tomorrow at ten, আর বাজারের তালিকাটা পাঠিয়ে দিও। " * 3
+
+    async def writer(index: int) -> None:
+        for i in range(writes_per_writer):
+            await db.insert('messages', {
+                'session_id': f"s{index}", 'created': time.time(), 'role': 'user', 'content': text
+            })
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(i) for i in range(writers)))
+    write_s = time.perf_counter() - started
+
+    latencies = []
+    for i in range(reads):
+        started = time.perf_counter()
+        await db.fetch_all(
+            'SELECT id, content FROM messages WHERE session_id = ? ORDER BY created DESC LIMIT 20',
+            (f"s{i % writers}",), table='messages'
+        )
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    stats = db.stats()
+    await db.close()
+    return {
+        'writes_per_s': writers * writes_per_writer / write_s,
+        'mean_batch': stats['mean_batch'],
+        'read_p50_ms': statistics.median(latencies) * 1000,
+        'read_p99_ms': latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+async def benchmark_commit_per_insert(writers: int = 64, writes_per_writer: int = 200, directory: Optional[Path] = None) -> float:
+    """
+    Baseline: every insert commits on its own (shared connection, same pragmas).
+
+    Returns:
+        float: writes/s.
+    """
+    path = Path(directory) / "bench_naive.db"
+    connection = sqlite3.connect(str(path), isolation_level=None, check_same_thread=False)
+    connection.execute('PRAGMA journal_mode = WAL')
+    connection.execute('PRAGMA synchronous = NORMAL')
+    for statement in SCHEMA.split(';'):
+        connection.execute(statement)
+    lock = threading.Lock()
+
+    def insert(session_id: str) -> None:
+        with lock:
+            connection.execute('BEGIN')
+            connection.execute(
+                'INSERT INTO messages (session_id, created, role, content) VALUES (?, ?, ?, ?)',
+                (session_id, time.time(), 'user', 'hello')
+            )
+            connection.execute('COMMIT')
+
+    async def writer(index: int) -> None:
+        for _ in range(writes_per_writer):
+            await asyncio.to_thread(insert, f"s{index}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer(i) for i in range(writers)))
+    elapsed = time.perf_counter() - started
+    connection.close()
+    return writers * writes_per_writer / elapsed
+
+
+async def main():
+    """
+    Run the database benchmark with encryption off and on.
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        naive = await benchmark_commit_per_insert(directory=directory)
+        print(f"commit per insert (plain)     {naive:9,.0f} writes/s")
+        for encryption in (False, True):
+            result = await benchmark(encryption, directory=directory)
+            label = 'batched, encrypted' if encryption else 'batched, plain'
+            print(f"{label:<29} {result['writes_per_s']:9,.0f} writes/s  "
+                  f"(mean batch {result['mean_batch']:.0f})  "
+                  f"read p50 {result['read_p50_ms']:.3f} ms  p99 {result['read_p99_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1 +1,587 @@
-#এই মডিউলে ৭-দিনের মেমোরি স্টোরেজ ক্লাস থাকবে যা সেশন ডেটা সেভ/রিট্রিভ করবে এবং অটো-ক্লিনআপ করবে; এটি টেম্পোরারি মেমোরি ম্যানেজ করার জন্য তৈরি, প্রাইভেসি নিশ্চিত করে।
+"""
+NeoMate AI Short-Term Memory Module
+
+This module stores what happened in recent sessions (messages, actions, screen and
+audio observations) for seven days and forgets it afterwards. Records are kept in
+time partitions (one per day or hour); expiring old data means dropping whole
+partitions, so cleanup cost depends on the number of partitions, not the number of
+records, and never stalls the app. Within a partition records are indexed by session
+and time, so lookups by session and time range only touch the matching records.
+
+Features:
+- Compact ``__slots__`` records
+- Day or hour partitions with O(1) expiry by dropping a partition
+- Per-session, time-ordered indexes with binary search on time ranges
+- Session -> partition index so session queries skip unrelated days
+- Automatic expiry by one periodic background sweeper
+- Optional persistence as one JSON file per partition (expiry deletes the file)
+- Benchmark with millions of records: insert, query and expiry cost
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import json
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import DATA_DIR
+from src.utils.logger import log
+
+PARTITION_SECONDS = {'hour': 3600, 'day': 86400}
+
+
+class MemoryRecord:
+    """One remembered item."""
+
+    __slots__ = ('timestamp', 'session_id', 'kind', 'content', 'metadata')
+
+    def __init__(
+        self,
+        timestamp: float,
+        session_id: str,
+        kind: str,
+        content: Any,
+        metadata: Optional[Dict[str, Any]] = None
+    ):
+        self.timestamp = timestamp
+        self.session_id = session_id
+        self.kind = kind
+        self.content = content
+        self.metadata = metadata
+
+    def __repr__(self) -> str:
+        return f"MemoryRecord({self.timestamp!r}, {self.session_id!r}, {self.kind!r}, {self.content!r})"
+
+    def to_tuple(self) -> tuple:
+        return (self.timestamp, self.session_id, self.kind, self.content, self.metadata)
+
+
+class _TimeIndex:
+    """Records with a parallel array of timestamps, kept in time order."""
+
+    __slots__ = ('times', 'records')
+
+    def __init__(self) -> None:
+        self.times = array('d')
+        self.records: List[MemoryRecord] = []
+
+    def add(self, record: MemoryRecord) -> None:
+        if not self.times or record.timestamp >= self.times[-1]:
+            self.times.append(record.timestamp)
+            self.records.append(record)
+        else:
+            # Late arrival: insert in place (rare, records mostly come in order)
+            index = bisect_right(self.times, record.timestamp)
+            self.times.insert(index, record.timestamp)
+            self.records.insert(index, record)
+
+    def range(self, start: Optional[float], end: Optional[float]) -> List[MemoryRecord]:
+        low = 0 if start is None else bisect_left(self.times, start)
+        high = len(self.times) if end is None else bisect_left(self.times, end)
+        return self.records[low:high]
+
+
+class TimePartition:
+    """All records of one day or hour, indexed by session."""
+
+    __slots__ = ('bucket', 'all', 'sessions', 'dirty')
+
+    def __init__(self, bucket: int):
+        self.bucket = bucket
+        self.all = _TimeIndex()
+        self.sessions: Dict[str, _TimeIndex] = {}
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self.all.records)
+
+    def add(self, record: MemoryRecord) -> None:
+        self.all.add(record)
+        index = self.sessions.get(record.session_id)
+        if index is None:
+            index = self.sessions[record.session_id] = _TimeIndex()
+        index.add(record)
+        self.dirty = True
+
+
+def _dispose(partitions: List[TimePartition]) -> None:
+    """
+    Free expired partitions in small slices. Run on the sweeper thread, this keeps
+    any single GIL hold short, so freeing a day of records does not stall the app.
+    """
+    for partition in partitions:
+        for index in (*partition.sessions.values(), partition.all):
+            while index.records:
+                del index.records[-4096:]
+        partition.sessions.clear()
+
+
+class ShortTermMemory:
+    """
+    Time-partitioned session memory with a retention window.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        path: Optional[Union[str, Path]] = None,
+        retention_days: Optional[float] = None,
+        partition: Optional[str] = None,
+        persist: Optional[bool] = None,
+        sweep_interval_s: Optional[float] = None
+    ):
+        """
+        Initialize the ShortTermMemory.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            path: Directory for partition files. Defaults to ``short_term_memory.path``
+                  or data/memory/short_term.
+            retention_days: Days to keep records. Defaults to
+                            ``short_term_memory.retention_days`` (7).
+            partition: 'day' or 'hour'. Defaults to ``short_term_memory.partition`` ('day').
+            persist: Whether partitions are saved to and loaded from disk.
+                     Defaults to ``short_term_memory.persist`` (True).
+            sweep_interval_s: Seconds between expiry sweeps on the background
+                              sweeper thread (0 disables it; call ``expire`` yourself).
+                              Defaults to ``short_term_memory.sweep_interval_s`` (60).
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        memory_config = self.config.get('short_term_memory', {})
+
+        if retention_days is None:
+            retention_days = memory_config.get('retention_days', 7)
+        self.retention_s = retention_days * 86400.0
+        partition = partition or memory_config.get('partition', 'day')
+        if partition not in PARTITION_SECONDS:
+            raise ValueError(f"Unknown partition size '{partition}', expected one of {list(PARTITION_SECONDS)}")
+        self.partition_s = PARTITION_SECONDS[partition]
+
+        if persist is None:
+            persist = memory_config.get('persist', True)
+        if persist:
+            self.path: Optional[Path] = Path(path or memory_config.get('path', DATA_DIR / "memory" / "short_term"))
+        else:
+            self.path = None
+        if sweep_interval_s is None:
+            sweep_interval_s = memory_config.get('sweep_interval_s', 60.0)
+        self.sweep_interval_s = sweep_interval_s
+
+        self.partitions: Dict[int, TimePartition] = {}
+        # Sorted bucket numbers: expiry order and range lookups
+        self._buckets: List[int] = []
+        self._session_buckets: Dict[str, Set[int]] = {}
+        # Buckets up to this one have been expired; late records for them are refused
+        self._expired_through: Optional[int] = None
+        self.count = 0
+        self.expired = 0
+        # Guards the partition maps against the sweeper thread
+        self._lock = threading.RLock()
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_sweeper = threading.Event()
+
+        if self.path is not None:
+            self._load()
+
+    def _bucket(self, timestamp: float) -> int:
+        return int(timestamp // self.partition_s)
+
+    def _partition(self, bucket: int) -> TimePartition:
+        partition = self.partitions.get(bucket)
+        if partition is None:
+            partition = self.partitions[bucket] = TimePartition(bucket)
+            if not self._buckets or bucket > self._buckets[-1]:
+                self._buckets.append(bucket)
+            else:
+                insort(self._buckets, bucket)
+        return partition
+
+    def add(
+        self,
+        session_id: str,
+        content: Any,
+        kind: str = 'message',
+        timestamp: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> Optional[MemoryRecord]:
+        """
+        Remember an item.
+
+        Args:
+            session_id: Session the item belongs to.
+            content: Item content (text or any JSON-serializable value; other
+                     values are persisted as their string form).
+            kind: Item type, e.g. 'message', 'action', 'screen'.
+            timestamp: Unix time; defaults to now.
+            metadata: Optional extra fields.
+
+        Returns:
+            Optional[MemoryRecord]: The stored record, or None if it is already
+            older than the retention window.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        bucket = self._bucket(timestamp)
+        if self._sweeper is None and self.sweep_interval_s > 0:
+            self.start_sweeper()
+        with self._lock:
+            if self._expired_through is not None and bucket <= self._expired_through:
+                return None
+
+            record = MemoryRecord(timestamp, session_id, kind, content, metadata)
+            self._partition(bucket).add(record)
+            buckets = self._session_buckets.get(session_id)
+            if buckets is None:
+                buckets = self._session_buckets[session_id] = set()
+            buckets.add(bucket)
+            self.count += 1
+        return record
+
+    def start_sweeper(self) -> None:
+        """Start the background thread that expires old partitions. Calling it twice is a no-op."""
+        with self._lock:
+            if self._sweeper is not None or self.sweep_interval_s <= 0:
+                return
+            self._stop_sweeper.clear()
+            self._sweeper = threading.Thread(target=self._sweep_loop, name='stm-sweeper', daemon=True)
+            self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_sweeper.wait(self.sweep_interval_s):
+            try:
+                self.expire()
+            except Exception as e:
+                log.error(f"Short-term memory sweep failed: {e}")
+
+    def close(self) -> None:
+        """Stop the sweeper and write unsaved partitions."""
+        self._stop_sweeper.set()
+        sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None and sweeper is not threading.current_thread():
+            sweeper.join(timeout=2.0)
+        self.flush()
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """
+        Drop partitions that are entirely older than the retention window.
+
+        The cost under the lock is proportional to the number of dropped
+        partitions and the sessions in them, independent of how many records they
+        hold; the records themselves are freed afterwards, in small slices. The
+        sweeper thread calls this periodically.
+
+        Args:
+            now: Reference time; defaults to now.
+
+        Returns:
+            int: Number of records dropped.
+        """
+        dropped, removed = self._drop_expired(now)
+        if removed:
+            _dispose(removed)
+        return dropped
+
+    def _drop_expired(self, now: Optional[float] = None) -> Tuple[int, List[TimePartition]]:
+        """Unlink expired partitions; returns (records dropped, partitions to free)."""
+        cutoff = (time.time() if now is None else now) - self.retention_s
+        # A partition expires once its last second is older than the cutoff
+        last_expired = self._bucket(cutoff) - 1
+        dropped = 0
+        removed: List[TimePartition] = []
+        with self._lock:
+            if self._expired_through is None or last_expired > self._expired_through:
+                self._expired_through = last_expired
+            while self._buckets and self._buckets[0] <= last_expired:
+                bucket = self._buckets.pop(0)
+                partition = self.partitions.pop(bucket)
+                removed.append(partition)
+                for session_id in partition.sessions:
+                    buckets = self._session_buckets.get(session_id)
+                    if buckets is not None:
+                        buckets.discard(bucket)
+                        if not buckets:
+                            del self._session_buckets[session_id]
+                dropped += len(partition)
+                if self.path is not None:
+                    self._partition_file(bucket).unlink(missing_ok=True)
+            if dropped:
+                self.count -= dropped
+                self.expired += dropped
+        if dropped:
+            log.debug(f"Short-term memory expired {dropped} records")
+        return dropped, removed
+
+    def query(
+        self,
+        session_id: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False
+    ) -> List[MemoryRecord]:
+        """
+        Find records by session and time range.
+
+        Args:
+            session_id: Only records of this session.
+            start: Inclusive start time.
+            end: Exclusive end time.
+            kind: Only records of this type.
+            limit: Maximum number of records.
+            newest_first: Return the newest records first (with ``limit``: the latest N).
+
+        Returns:
+            List[MemoryRecord]: Matching records in time order (or reverse).
+        """
+        return list(self.iter_records(session_id, start, end, kind, limit, newest_first))
+
+    def iter_records(
+        self,
+        session_id: Optional[str] = None,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        kind: Optional[str] = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False
+    ) -> Iterator[MemoryRecord]:
+        """Lazy version of ``query``; see it for the arguments."""
+        with self._lock:
+            if session_id is not None:
+                buckets = sorted(self._session_buckets.get(session_id, ()))
+            else:
+                buckets = list(self._buckets)
+        low = 0 if start is None else bisect_left(buckets, self._bucket(start))
+        high = len(buckets) if end is None else bisect_right(buckets, self._bucket(end))
+        selected = buckets[low:high]
+        if newest_first:
+            selected = reversed(selected)
+
+        remaining = limit
+        for bucket in selected:
+            partition = self.partitions.get(bucket)
+            if partition is None:
+                # Expired by the sweeper while iterating
+                continue
+            index = partition.all if session_id is None else partition.sessions.get(session_id)
+            if index is None:
+                continue
+            records = index.range(start, end)
+            if newest_first:
+                records = reversed(records)
+            for record in records:
+                if kind is not None and record.kind != kind:
+                    continue
+                yield record
+                if remaining is not None:
+                    remaining -= 1
+                    if remaining <= 0:
+                        return
+
+    def recent(self, session_id: str, n: int = 20) -> List[MemoryRecord]:
+        """
+        Get the latest records of a session, oldest first.
+
+        Args:
+            session_id: Session ID.
+            n: Number of records.
+
+        Returns:
+            List[MemoryRecord]: Up to ``n`` records in time order.
+        """
+        return self.query(session_id, limit=n, newest_first=True)[::-1]
+
+    def sessions(self) -> List[str]:
+        """IDs of the sessions with remembered records."""
+        return list(self._session_buckets)
+
+    def forget_session(self, session_id: str) -> int:
+        """
+        Delete every record of a session (e.g. on user request).
+
+        Args:
+            session_id: Session ID.
+
+        Returns:
+            int: Number of records deleted.
+        """
+        removed = 0
+        with self._lock:
+            for bucket in self._session_buckets.pop(session_id, ()):
+                partition = self.partitions[bucket]
+                index = partition.sessions.pop(session_id, None)
+                if index is None:
+                    continue
+                removed += len(index.records)
+                keep = _TimeIndex()
+                for record in partition.all.records:
+                    if record.session_id != session_id:
+                        keep.times.append(record.timestamp)
+                        keep.records.append(record)
+                partition.all = keep
+                partition.dirty = True
+            self.count -= removed
+        return removed
+
+    def _partition_file(self, bucket: int) -> Path:
+        return self.path / f"{bucket * self.partition_s}.json"
+
+    def flush(self) -> int:
+        """
+        Write partitions changed since the last flush to disk.
+
+        Returns:
+            int: Number of partition files written.
+        """
+        if self.path is None:
+            return 0
+        self.path.mkdir(parents=True, exist_ok=True)
+        written = 0
+        with self._lock:
+            dirty = [(bucket, partition) for bucket, partition in self.partitions.items() if partition.dirty]
+            for bucket, partition in dirty:
+                rows = [record.to_tuple() for record in partition.all.records]
+                target = self._partition_file(bucket)
+                tmp = target.with_suffix('.tmp')
+                with open(tmp, 'w', encoding='utf-8') as handle:
+                    json.dump(rows, handle, ensure_ascii=False, default=str)
+                os.replace(tmp, target)
+                partition.dirty = False
+                written += 1
+        return written
+
+    def _load(self) -> None:
+        if not self.path.is_dir():
+            return
+        legacy = list(self.path.glob('*.pickle'))
+        if legacy:
+            # Pickle files can run code when loaded, so the old format is never read
+            log.warning(f"Ignoring {len(legacy)} short-term memory partitions in the old pickle format")
+        cutoff = time.time() - self.retention_s
+        for file in sorted(self.path.glob('*.json'), key=lambda f: int(f.stem)):
+            start = int(file.stem)
+            if start + self.partition_s <= cutoff:
+                file.unlink(missing_ok=True)
+                continue
+            try:
+                with open(file, encoding='utf-8') as handle:
+                    rows = json.load(handle)
+            except (OSError, ValueError) as e:
+                log.warning(f"Skipping unreadable short-term memory partition {file.name}: {e}")
+                continue
+            for row in rows:
+                self.add(row[1], row[3], kind=row[2], timestamp=row[0], metadata=row[4])
+        for partition in self.partitions.values():
+            partition.dirty = False
+        if self.count:
+            log.info(f"Short-term memory loaded {self.count} records from {len(self.partitions)} partitions")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dict[str, Any]: Record, partition and session counts.
+        """
+        return {
+            'records': self.count,
+            'partitions': len(self.partitions),
+            'sessions': len(self._session_buckets),
+            'expired': self.expired,
+            'oldest': self._buckets[0] * self.partition_s if self._buckets else None,
+        }
+
+
+def benchmark(records: int = 2_000_000, days: int = 10, sessions: int = 2000, seed: int = 11) -> Dict[str, float]:
+    """
+    Measure insert, query and expiry cost, and compare expiry with a scan-and-delete
+    over a flat record list.
+
+    Args:
+        records: Records to insert, spread evenly over ``days``.
+        days: Days of history (more than the 7-day retention, so expiry has work).
+        sessions: Number of distinct sessions.
+        seed: Random seed.
+
+    Returns:
+        Dict[str, float]: Timings.
+    """
+    import random
+
+    rng = random.Random(seed)
+    memory = ShortTermMemory(retention_days=365, persist=False, sweep_interval_s=0)
+    session_ids = [f"session-{i}" for i in range(sessions)]
+    contents = [f"message {i}" for i in range(1000)]
+    start = 19675 * 86400.0  # a day boundary, so each day is one partition
+    step = days * 86400.0 / records
+
+    started = time.perf_counter()
+    for i in range(records):
+        memory.add(session_ids[rng.randrange(sessions)], contents[i % 1000], timestamp=start + i * step)
+    insert_s = time.perf_counter() - started
+
+    queries = 2000
+    started = time.perf_counter()
+    found = 0
+    for _ in range(queries):
+        t0 = start + rng.random() * days * 86400.0
+        found += len(memory.query(session_ids[rng.randrange(sessions)], t0, t0 + 6 * 3600.0))
+    query_s = (time.perf_counter() - started) / queries
+
+    started = time.perf_counter()
+    for _ in range(queries):
+        memory.recent(session_ids[rng.randrange(sessions)], 20)
+    recent_s = (time.perf_counter() - started) / queries
+
+    # Baseline: flat list, periodic scan-and-delete of the oldest day
+    flat = [record for partition in memory.partitions.values() for record in partition.all.records]
+    cutoff = start + 86400.0
+    started = time.perf_counter()
+    flat = [record for record in flat if record.timestamp >= cutoff]
+    scan_s = time.perf_counter() - started
+
+    memory.retention_s = (days - 1) * 86400.0
+    started = time.perf_counter()
+    # Time the unlinking only; freeing the records is the sweeper thread's work
+    dropped, _ = memory._drop_expired(start + days * 86400.0)
+    expire_s = time.perf_counter() - started
+
+    return {
+        'records': records,
+        'insert_per_s': records / insert_s,
+        'query_us': query_s * 1e6,
+        'avg_hits': found / queries,
+        'recent_us': recent_s * 1e6,
+        'expire_ms': expire_s * 1e3,
+        'expired_records': dropped,
+        'scan_delete_ms': scan_s * 1e3,
+    }
+
+
+def main():
+    """
+    Run the short-term memory benchmark.
+    """
+    import sys
+
+    records = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    result = benchmark(records)
+    print(f"records               {result['records']:>12,}")
+    print(f"insert                {result['insert_per_s']:>12,.0f} records/s")
+    print(f"session + 6h range    {result['query_us']:>12.1f} us  ({result['avg_hits']:.1f} records)")
+    print(f"session latest 20     {result['recent_us']:>12.1f} us")
+    print(f"expire one day        {result['expire_ms']:>12.2f} ms  ({result['expired_records']:,} records)")
+    print(f"scan-and-delete       {result['scan_delete_ms']:>12.2f} ms  (flat list baseline)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1 +1,299 @@
-#এই মডিউলে ইউজার প্রোফাইল ম্যানেজমেন্ট ফাংশন থাকবে যা প্রেফারেন্স (e.g., ভাষা, মোড) সেভ/লোড করবে; এটি পার্সোনালাইজেশনের জন্য তৈরি, ইউজার এক্সপেরিয়েন্স ইমপ্রুভ করে।
+"""
+NeoMate AI User Preferences Module
+
+This module keeps what NeoMate knows about its user across sessions. It holds
+settings such as language and mode, plus a long-term memory of past interactions
+that can be searched by meaning. Both are stored in the encrypted local database.
+Memory texts are embedded and indexed in the on-disk vector index. Recall therefore
+scans a few index lists instead of every past interaction, and filters by user,
+kind or time.
+
+Features:
+- Preference get/set with an in-memory copy and encrypted persistence
+- Profile text for the context manager's stable prompt prefix
+- remember / forget / recall over long-term memory
+- Filtered recall by kind and time range for the current user
+- Pluggable embedder (hashed n-grams by default, e.g. a model-backed one instead)
+- Embedding, index and database work kept off the event loop
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.memory.local_database import LocalDatabase
+from src.memory.vector_index import HashingEmbedder, VectorIndex
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import DATA_DIR
+from src.utils.logger import log
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS preferences (
+    user TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB,
+    updated REAL NOT NULL,
+    PRIMARY KEY (user, key)
+);
+CREATE TABLE IF NOT EXISTS memories (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    created REAL NOT NULL,
+    content BLOB
+)
+"""
+
+ENCRYPTED_FIELDS = {'preferences': ['value'], 'memories': ['content']}
+
+DEFAULT_PREFERENCES = {
+    'language': 'bn',
+    'mode': 'assistant',
+}
+
+Embedder = Callable[[Sequence[str]], np.ndarray]
+
+
+class UserPreferences:
+    """
+    Per-user preferences and semantically searchable long-term memory.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        database: Optional[LocalDatabase] = None,
+        index: Optional[VectorIndex] = None,
+        embedder: Optional[Embedder] = None,
+        user: Optional[str] = None
+    ):
+        """
+        Initialize UserPreferences. Call ``initialize`` before use.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            database: Local database. Created with the preference and memory
+                      columns encrypted if None.
+            index: Vector index for memories. Opened under data/memory/vectors if None.
+            embedder: Function texts -> (n, dim) vectors. Defaults to HashingEmbedder.
+            user: User name (``user.name``, default 'default').
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        memory_config = self.config.get('long_term_memory', {})
+
+        self.user = user or self.config.get('user', {}).get('name', 'default')
+        self.embedder = embedder or HashingEmbedder(memory_config.get('embedding_dim', 256))
+        self.database = database or LocalDatabase(self.config_loader, encrypted_fields=ENCRYPTED_FIELDS)
+        self._index = index
+        self.index_path = memory_config.get('index_path', DATA_DIR / "memory" / "vectors")
+        self.recall_k = memory_config.get('recall_k', 4)
+        # Memories less similar than this are not worth putting in a prompt
+        self.min_score = memory_config.get('min_score', 0.3)
+        self.flush_every = memory_config.get('flush_every', 32)
+
+        self.preferences: Dict[str, Any] = dict(DEFAULT_PREFERENCES)
+        self._unflushed = 0
+
+    @property
+    def index(self) -> VectorIndex:
+        """The memory vector index."""
+        if self._index is None:
+            raise RuntimeError("UserPreferences is not initialized")
+        return self._index
+
+    async def initialize(self) -> bool:
+        """
+        Open the database and index and load this user's preferences.
+
+        Returns:
+            bool: True once loaded.
+        """
+        await self.database.open()
+        await self.database.executescript(SCHEMA)
+        if self._index is None:
+            dim = int(self.embedder(['']).shape[1])
+            self._index = await asyncio.to_thread(VectorIndex, self.index_path, dim, self.config_loader)
+        rows = await self.database.fetch_all(
+            'SELECT key, value FROM preferences WHERE user = ?', (self.user,), table='preferences'
+        )
+        self.preferences.update({row['key']: row['value'] for row in rows})
+        log.info(f"Loaded {len(rows)} preferences and {len(self.index)} memories for '{self.user}'")
+        return True
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Get a preference.
+
+        Args:
+            key: Preference name.
+            default: Value if the preference is not set.
+
+        Returns:
+            Any: Preference value.
+        """
+        return self.preferences.get(key, default)
+
+    async def set(self, key: str, value: Any) -> None:
+        """
+        Set and persist a preference.
+
+        Args:
+            key: Preference name.
+            value: JSON-serializable value.
+        """
+        self.preferences[key] = value
+        await self.database.insert(
+            'preferences', {'user': self.user, 'key': key, 'value': value, 'updated': time.time()}, or_replace=True
+        )
+
+    def profile_text(self) -> str:
+        """
+        Render the preferences as profile text for ``ContextManager.set_profile``.
+
+        Returns:
+            str: One 'key: value' line per preference, sorted so the text is stable.
+        """
+        lines = [f"{key}: {value}" for key, value in sorted(self.preferences.items())]
+        return "User preferences:\n" + "\n".join(lines)
+
+    def _add_vectors(self, texts: List[str], kind: str, timestamp: float) -> np.ndarray:
+        ids = self.index.add(self.embedder(texts), user=self.user, kind=kind, timestamps=timestamp)
+        self._unflushed += len(ids)
+        if self._unflushed >= self.flush_every:
+            self.index.flush()
+            self._unflushed = 0
+        return ids
+
+    async def remember(self, text: str, kind: str = 'conversation', timestamp: Optional[float] = None) -> int:
+        """
+        Store a memory and index it for recall.
+
+        Args:
+            text: Memory text.
+            kind: Memory type, e.g. 'conversation', 'fact' or 'task'.
+            timestamp: When it happened; defaults to now.
+
+        Returns:
+            int: Memory id.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        ids = await asyncio.to_thread(self._add_vectors, [text], kind, timestamp)
+        memory_id = int(ids[0])
+        await self.database.insert('memories', {
+            'id': memory_id, 'user': self.user, 'kind': kind, 'created': timestamp, 'content': text
+        })
+        return memory_id
+
+    async def forget(self, memory_id: int) -> None:
+        """
+        Delete a memory.
+
+        Args:
+            memory_id: Id returned by ``remember``.
+        """
+        await asyncio.to_thread(self.index.delete, memory_id)
+        await self.database.execute('DELETE FROM memories WHERE id = ?', (memory_id,))
+
+    async def recall(
+        self,
+        query: str,
+        k: Optional[int] = None,
+        kinds: Optional[Sequence[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        min_score: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Find this user's memories most similar to a query.
+
+        Args:
+            query: Text to match.
+            k: Maximum number of memories (``long_term_memory.recall_k``).
+            kinds: Only these kinds.
+            since: Only memories from this time on.
+            until: Only memories before this time.
+            min_score: Minimum cosine similarity (``long_term_memory.min_score``).
+
+        Returns:
+            List[Dict[str, Any]]: Memories (id, kind, created, content, score), best first.
+        """
+        k = k or self.recall_k
+        min_score = self.min_score if min_score is None else min_score
+
+        def search():
+            vector = self.embedder([query])[0]
+            return self.index.search(vector, k, user=self.user, kinds=kinds, since=since, until=until)
+
+        ids, scores = await asyncio.to_thread(search)
+        keep = scores >= min_score
+        ids, scores = ids[keep], scores[keep]
+        if not len(ids):
+            return []
+        marks = ', '.join('?' * len(ids))
+        rows = await self.database.fetch_all(
+            f'SELECT id, kind, created, content FROM memories WHERE id IN ({marks})',
+            [int(i) for i in ids], table='memories'
+        )
+        by_id = {row['id']: row for row in rows}
+        # Ids without a row were indexed but not stored (e.g. a crash in between)
+        return [{**by_id[int(i)], 'score': float(s)} for i, s in zip(ids, scores) if int(i) in by_id]
+
+    async def recall_texts(self, query: str) -> List[str]:
+        """
+        Recall memory texts for a prompt; used as the ContextManager ``recall`` hook.
+
+        Args:
+            query: User query.
+
+        Returns:
+            List[str]: Memory texts, best first.
+        """
+        return [memory['content'] for memory in await self.recall(query)]
+
+    async def close(self) -> None:
+        """Flush the index and close the database."""
+        if self._index is not None:
+            await asyncio.to_thread(self._index.close)
+        await self.database.close()
+
+
+async def main():
+    """
+    Demonstrate preferences and memory recall in a temporary directory.
+    """
+    import os
+    import tempfile
+    from pathlib import Path
+
+    with tempfile.TemporaryDirectory() as directory:
+        database = LocalDatabase(
+            path=Path(directory) / "demo.db", encrypted_fields=ENCRYPTED_FIELDS, master_key=os.urandom(32)
+        )
+        index = VectorIndex(Path(directory) / "vectors", dim=256)
+        preferences = UserPreferences(database=database, index=index, user='demo')
+        await preferences.initialize()
+        await preferences.set('language', 'en')
+        for text in (
+            "User asked to remind them about the dentist appointment on Friday",
+            "User prefers dark mode in the code editor",
+            "আমার মায়ের জন্মদিন ১২ মার্চ",
+            "User's favourite music is Rabindra Sangeet",
+        ):
+            await preferences.remember(text, kind='fact')
+        print(preferences.profile_text())
+        for query in ("when is the dentist", "editor theme", "মায়ের জন্মদিন কবে"):
+            memories = await preferences.recall(query, min_score=0.0, k=2)
+            print(f"{query!r}: {[(m['content'], round(m['score'], 2)) for m in memories]}")
+        await preferences.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
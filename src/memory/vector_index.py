@@ -0,0 +1,683 @@
+"""
+NeoMate AI Vector Index Module
+
+This module is NeoMate's in-process approximate nearest neighbour index for semantic
+recall over long-term memory. It is an IVF (inverted file) index over NumPy
+arrays. Vectors are grouped by their nearest k-means centroid, and a search only
+scans the few groups closest to the query. Vectors and metadata live in
+memory-mapped files that grow in place. Opening an existing index maps the files
+and regroups ids with one sort, with no re-training or re-insertion. Rows added
+after the last flush (e.g. before a crash) are recovered from the metadata file,
+so ids are never handed out twice.
+
+Features:
+- Cosine similarity over normalized float32 vectors
+- Incremental inserts and deletes (tombstones, skipped at search time)
+- Exact search until enough vectors exist to train the centroids
+- Filtered search by user, kind and time range, evaluated on candidates only;
+  probes more lists and finally falls back to exact search for selective filters
+- Memory-mapped persistence: vectors.f32, meta.bin, centroids.npy, state.json
+- HashingEmbedder: dependency-free, stable text embeddings (hashed n-grams)
+- Benchmark of recall@k and latency against brute force
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+META_DTYPE = np.dtype([
+    ('user', np.int32),
+    ('kind', np.int16),
+    ('alive', np.uint8),
+    ('list', np.int32),
+    ('time', np.float64),
+])
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    Scale rows to unit length (zero rows stay zero).
+
+    Args:
+        vectors: (n, dim) or (dim,) array.
+
+    Returns:
+        np.ndarray: float32 array of the same shape.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k highest scores, best first."""
+    if len(scores) > k:
+        part = np.argpartition(scores, -k)[-k:]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind='stable')]
+
+
+class HashingEmbedder:
+    """
+    Text embeddings from hashed word and character n-grams.
+
+    No model is needed and the result is the same in every process (CRC32, not
+    Python's salted ``hash``), so persisted vectors stay comparable. It captures
+    lexical rather than deep semantic similarity; pass a model-backed embedder to
+    the callers for that.
+    """
+
+    def __init__(self, dim: int = 256, char_ngrams: Tuple[int, ...] = (3, 4)):
+        """
+        Initialize the HashingEmbedder.
+
+        Args:
+            dim: Output dimension.
+            char_ngrams: Character n-gram sizes used besides whole words.
+        """
+        self.dim = dim
+        self.char_ngrams = char_ngrams
+
+    def _features(self, text: str) -> Iterable[str]:
+        for word in _TOKEN.findall(text.lower()):
+            yield word
+            padded = f' {word} '
+            for n in self.char_ngrams:
+                for i in range(len(padded) - n + 1):
+                    yield padded[i:i + n]
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed.
+
+        Returns:
+            np.ndarray: (len(texts), dim) normalized float32 vectors.
+        """
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                h = zlib.crc32(feature.encode('utf-8'))
+                out[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        return normalize_rows(out)
+
+
+class VectorIndex:
+    """
+    Persistent IVF index with metadata filters.
+
+    Ids are the row numbers returned by ``add``; callers keep their own id -> payload
+    mapping. All methods are thread-safe.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        dim: Optional[int] = None,
+        config_loader: Optional[ConfigLoader] = None,
+        nlist: Optional[int] = None,
+        nprobe: Optional[int] = None
+    ):
+        """
+        Open or create an index directory.
+
+        Args:
+            path: Index directory.
+            dim: Vector dimension; required when creating an index.
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            nlist: Number of centroids (``vector_index.nlist``, default 1024).
+            nprobe: Lists scanned per search (``vector_index.nprobe``, default 16).
+
+        Raises:
+            ValueError: If a new index is created without ``dim`` or an existing one
+                        has a different dimension.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        index_config = self.config.get('vector_index', {})
+
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.nlist = nlist or index_config.get('nlist', 1024)
+        self.nprobe = nprobe or index_config.get('nprobe', 16)
+        # Train once this many vectors per list exist; search is exact until then
+        self.train_per_list = index_config.get('train_per_list', 16)
+        # Filtered searches that cannot fill k results within this many probes go exact
+        self.max_probe_factor = index_config.get('max_probe_factor', 8)
+
+        self._lock = threading.RLock()
+        self._users: Dict[str, int] = {}
+        self._kinds: Dict[str, int] = {}
+        self.count = 0
+        self.deleted = 0
+        self.centroids: Optional[np.ndarray] = None
+        self._lists: List[np.ndarray] = []
+        self._list_sizes = np.zeros(0, dtype=np.int64)
+
+        state_path = self.path / 'state.json'
+        if state_path.exists():
+            state = json.loads(state_path.read_text(encoding='utf-8'))
+            if dim is not None and dim != state['dim']:
+                raise ValueError(f"Index at {self.path} has dimension {state['dim']}, not {dim}")
+            self.dim = state['dim']
+            self.count = state['count']
+            self.deleted = state.get('deleted', 0)
+            self.nlist = state.get('nlist', self.nlist)
+            self._users = state.get('users', {})
+            self._kinds = state.get('kinds', {})
+            capacity = state['capacity']
+            # The files may have grown after the last flush
+            meta_path = self.path / 'meta.bin'
+            if meta_path.exists():
+                capacity = max(capacity, meta_path.stat().st_size // META_DTYPE.itemsize)
+        elif dim is None:
+            raise ValueError("dim is required to create a vector index")
+        else:
+            self.dim = dim
+            capacity = 1024
+
+        self._capacity = 0
+        self._vectors: np.ndarray = np.zeros((0, self.dim), dtype=np.float32)
+        self._meta: np.ndarray = np.zeros(0, dtype=META_DTYPE)
+        self._map(capacity)
+        recovered = self._recover()
+
+        centroids_path = self.path / 'centroids.npy'
+        if self.count and centroids_path.exists():
+            self.centroids = np.load(centroids_path)
+            self._rebuild_lists()
+            # Recovered rows were never assigned to a list
+            unassigned = np.flatnonzero(np.asarray(self._meta['list'][:self.count]) < 0)
+            if len(unassigned):
+                self._assign(unassigned)
+        if recovered:
+            log.warning(f"Vector index at {self.path} recovered {recovered} vectors added after its last flush")
+            self.flush()
+        log.info(f"Vector index at {self.path}: {self.count} vectors, dim {self.dim}, "
+                 f"{'trained' if self.centroids is not None else 'exact'}")
+
+    # ------------------------------------------------------------------ storage
+
+    def _map(self, capacity: int) -> None:
+        """Map (and if needed grow) the vector and metadata files."""
+        for name, row_bytes in (('vectors.f32', self.dim * 4), ('meta.bin', META_DTYPE.itemsize)):
+            file = self.path / name
+            with open(file, 'ab') as handle:
+                if handle.tell() < capacity * row_bytes:
+                    handle.truncate(capacity * row_bytes)
+        self._vectors = np.memmap(self.path / 'vectors.f32', dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+        self._meta = np.memmap(self.path / 'meta.bin', dtype=META_DTYPE, mode='r+', shape=(capacity,))
+        self._capacity = capacity
+
+    def _recover(self) -> int:
+        """
+        Extend ``count`` over rows written after the last flush and recount deletions.
+
+        Every written row has a timestamp or is alive, while never-written rows are
+        all zeros, so the last non-zero row ends the index.
+
+        Returns:
+            int: Number of rows recovered.
+        """
+        tail = self._meta[self.count:]
+        written = np.flatnonzero((tail['time'] != 0) | (tail['alive'] != 0))
+        recovered = int(written[-1]) + 1 if len(written) else 0
+        self.count += recovered
+        self.deleted = self.count - int(np.count_nonzero(self._meta['alive'][:self.count]))
+        return recovered
+
+    def _reserve(self, extra: int) -> None:
+        if self.count + extra <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < self.count + extra:
+            capacity *= 2
+        self._vectors.flush()
+        self._meta.flush()
+        self._map(capacity)
+
+    def _rebuild_lists(self) -> None:
+        """Group ids by list with one sort over the persisted assignments."""
+        assignments = np.asarray(self._meta['list'][:self.count])
+        order = np.argsort(assignments, kind='stable')
+        bounds = np.searchsorted(assignments[order], np.arange(self.nlist + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]].copy() for i in range(self.nlist)]
+        self._list_sizes = np.diff(bounds).astype(np.int64)
+
+    def flush(self) -> None:
+        """Write the mapped arrays and index state to disk."""
+        with self._lock:
+            self._vectors.flush()
+            self._meta.flush()
+            if self.centroids is not None:
+                np.save(self.path / 'centroids.npy', self.centroids)
+            self._write_state()
+
+    def _write_state(self) -> None:
+        with self._lock:
+            state = {
+                'dim': self.dim, 'count': self.count, 'deleted': self.deleted, 'capacity': self._capacity,
+                'nlist': self.nlist, 'users': self._users, 'kinds': self._kinds,
+            }
+            temp = self.path / 'state.json.tmp'
+            temp.write_text(json.dumps(state), encoding='utf-8')
+            os.replace(temp, self.path / 'state.json')
+
+    # ------------------------------------------------------------------ writes
+
+    @staticmethod
+    def _code(table: Dict[str, int], name: Optional[str]) -> int:
+        if name is None:
+            return -1
+        code = table.get(name)
+        if code is None:
+            code = table[name] = len(table)
+        return code
+
+    def add(
+        self,
+        vectors: np.ndarray,
+        user: Optional[str] = None,
+        kind: Optional[str] = None,
+        timestamps: Optional[Union[float, Sequence[float]]] = None
+    ) -> np.ndarray:
+        """
+        Add vectors sharing a user and kind.
+
+        Args:
+            vectors: (n, dim) or (dim,) vectors; normalized on insert.
+            user: User the vectors belong to.
+            kind: Record type, e.g. 'preference' or 'message'.
+            timestamps: One timestamp or one per vector; defaults to now.
+
+        Returns:
+            np.ndarray: Ids of the added vectors.
+        """
+        vectors = normalize_rows(np.atleast_2d(vectors))
+        n = len(vectors)
+        with self._lock:
+            self._reserve(n)
+            start, end = self.count, self.count + n
+            self._vectors[start:end] = vectors
+            meta = self._meta[start:end]
+            known = len(self._users) + len(self._kinds)
+            meta['user'] = self._code(self._users, user)
+            meta['kind'] = self._code(self._kinds, kind)
+            if len(self._users) + len(self._kinds) != known:
+                # Codes only live in state.json; a lost name would misfile the rows
+                self._write_state()
+            meta['alive'] = 1
+            meta['time'] = time.time() if timestamps is None else timestamps
+            meta['list'] = -1
+            self.count = end
+            ids = np.arange(start, end)
+            if self.centroids is not None:
+                self._assign(ids)
+            elif self.count >= self.nlist * self.train_per_list:
+                self.train()
+        return ids
+
+    def delete(self, ids: Union[int, Sequence[int]]) -> int:
+        """
+        Delete vectors. Their rows stay in the files and are skipped by searches.
+
+        Args:
+            ids: Id or ids to delete.
+
+        Returns:
+            int: Number of vectors that were deleted now.
+        """
+        ids = np.atleast_1d(np.asarray(ids, dtype=np.int64))
+        with self._lock:
+            ids = ids[(ids >= 0) & (ids < self.count)]
+            alive = self._meta['alive'][ids] == 1
+            ids = ids[alive]
+            self._meta['alive'][ids] = 0
+            self.deleted += len(ids)
+            return len(ids)
+
+    def _assign(self, ids: np.ndarray) -> None:
+        """Assign ids to their nearest centroid and append them to its list."""
+        for chunk in range(0, len(ids), 65536):
+            part = ids[chunk:chunk + 65536]
+            lists = np.argmax(self._vectors[part] @ self.centroids.T, axis=1).astype(np.int32)
+            self._meta['list'][part] = lists
+            order = np.argsort(lists, kind='stable')
+            sorted_lists = lists[order]
+            starts = np.flatnonzero(np.r_[True, sorted_lists[1:] != sorted_lists[:-1]])
+            for begin, finish in zip(starts, np.r_[starts[1:], len(order)]):
+                self._append(int(sorted_lists[begin]), part[order[begin:finish]])
+
+    def _append(self, list_id: int, ids: np.ndarray) -> None:
+        bucket = self._lists[list_id]
+        size = int(self._list_sizes[list_id])
+        if size + len(ids) > len(bucket):
+            grown = np.empty(max(16, 2 * (size + len(ids))), dtype=np.int64)
+            grown[:size] = bucket[:size]
+            self._lists[list_id] = bucket = grown
+        bucket[size:size + len(ids)] = ids
+        self._list_sizes[list_id] = size + len(ids)
+
+    def train(self, iterations: int = 10, sample: int = 64, seed: int = 0) -> None:
+        """
+        Train the centroids with spherical k-means on a sample of the live vectors
+        and reassign every vector. Runs automatically once enough vectors exist;
+        call it again after heavy growth or deletion to rebalance the lists.
+
+        Args:
+            iterations: k-means iterations.
+            sample: Training vectors per centroid.
+            seed: Random seed.
+        """
+        with self._lock:
+            live = np.flatnonzero(self._meta['alive'][:self.count])
+            nlist = min(self.nlist, len(live))
+            if nlist == 0:
+                return
+            rng = np.random.default_rng(seed)
+            train_ids = np.sort(rng.choice(live, min(len(live), nlist * sample), replace=False))
+            data = np.asarray(self._vectors[train_ids])
+            centroids = data[rng.choice(len(data), nlist, replace=False)].copy()
+            for _ in range(iterations):
+                assignment = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignment, data)
+                empty = np.bincount(assignment, minlength=nlist) == 0
+                # Re-seed empty centroids so every list stays in use
+                sums[empty] = data[rng.choice(len(data), int(empty.sum()))]
+                centroids = normalize_rows(sums)
+            started = time.perf_counter()
+            self.nlist = nlist
+            self.centroids = centroids
+            self._lists = [np.empty(0, dtype=np.int64) for _ in range(nlist)]
+            self._list_sizes = np.zeros(nlist, dtype=np.int64)
+            self._assign(live)
+            log.info(f"Vector index trained: {nlist} lists over {len(live)} vectors "
+                     f"(assignment {time.perf_counter() - started:.2f}s)")
+            # Persist the centroids with the list assignments they belong to
+            self.flush()
+
+    # ------------------------------------------------------------------ search
+
+    def _predicate(
+        self,
+        ids: np.ndarray,
+        user: Optional[str],
+        kinds: Optional[Sequence[str]],
+        since: Optional[float],
+        until: Optional[float]
+    ) -> Optional[np.ndarray]:
+        """Boolean mask of ids passing the filters, or None if a filter matches nothing."""
+        meta = self._meta[ids]
+        mask = meta['alive'] == 1
+        if user is not None:
+            code = self._users.get(user)
+            if code is None:
+                return None
+            mask &= meta['user'] == code
+        if kinds is not None:
+            codes = [self._kinds[kind] for kind in kinds if kind in self._kinds]
+            if not codes:
+                return None
+            mask &= np.isin(meta['kind'], codes)
+        if since is not None:
+            mask &= meta['time'] >= since
+        if until is not None:
+            mask &= meta['time'] < until
+        return mask
+
+    def _score(self, ids: np.ndarray, query: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        scores = self._vectors[ids] @ query
+        best = _top_k(scores, k)
+        return ids[best], scores[best]
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int = 10,
+        user: Optional[str] = None,
+        kinds: Optional[Sequence[str]] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        nprobe: Optional[int] = None,
+        exact: bool = False
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the vectors most similar to a query.
+
+        Args:
+            query: (dim,) query vector.
+            k: Number of results.
+            user: Only vectors of this user.
+            kinds: Only vectors of these kinds.
+            since: Only vectors with timestamp >= since.
+            until: Only vectors with timestamp < until.
+            nprobe: Lists to scan; defaults to ``self.nprobe``.
+            exact: Scan every vector (brute force).
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Ids and cosine similarities, best first.
+        """
+        query = normalize_rows(query).reshape(-1)
+        with self._lock:
+            if self.count == 0:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+            if exact or self.centroids is None:
+                return self._search_exact(query, k, user, kinds, since, until)
+
+            probes = min(nprobe or self.nprobe, self.nlist)
+            order = _top_k(self.centroids @ query, self.nlist)
+            scanned = 0
+            found_ids, found_scores = [], []
+            found = 0
+            while True:
+                lists = order[scanned:probes]
+                scanned = probes
+                candidates = np.concatenate([self._lists[i][:self._list_sizes[i]] for i in lists])
+                mask = self._predicate(candidates, user, kinds, since, until)
+                if mask is None:
+                    return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+                candidates = candidates[mask]
+                if len(candidates):
+                    ids, scores = self._score(candidates, query, k)
+                    found_ids.append(ids)
+                    found_scores.append(scores)
+                    found += len(ids)
+                if found >= k or probes >= self.nlist:
+                    break
+                if probes >= (nprobe or self.nprobe) * self.max_probe_factor:
+                    # Very selective filter: an exact scan of the matching rows is cheaper
+                    return self._search_exact(query, k, user, kinds, since, until)
+                probes = min(probes * 2, self.nlist)
+
+            ids = np.concatenate(found_ids) if found_ids else np.empty(0, dtype=np.int64)
+            scores = np.concatenate(found_scores) if found_scores else np.empty(0, dtype=np.float32)
+            best = _top_k(scores, k)
+            return ids[best], scores[best]
+
+    def _search_exact(
+        self,
+        query: np.ndarray,
+        k: int,
+        user: Optional[str],
+        kinds: Optional[Sequence[str]],
+        since: Optional[float],
+        until: Optional[float]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        all_ids = np.arange(self.count)
+        mask = self._predicate(all_ids, user, kinds, since, until)
+        if mask is None or not mask.any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if mask.all():
+            scores = np.asarray(self._vectors[:self.count]) @ query
+            best = _top_k(scores, k)
+            return all_ids[best], scores[best]
+        return self._score(all_ids[mask], query, k)
+
+    def vector(self, vector_id: int) -> np.ndarray:
+        """
+        Get a stored (normalized) vector.
+
+        Args:
+            vector_id: Vector id.
+
+        Returns:
+            np.ndarray: (dim,) vector.
+        """
+        return np.array(self._vectors[vector_id])
+
+    def __len__(self) -> int:
+        return self.count - self.deleted
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict[str, float]: Live/deleted vectors, lists and list size spread.
+        """
+        sizes = self._list_sizes
+        return {
+            'vectors': len(self),
+            'deleted': self.deleted,
+            'trained': self.centroids is not None,
+            'lists': len(self._lists),
+            'mean_list': float(sizes.mean()) if len(sizes) else 0.0,
+            'max_list': int(sizes.max()) if len(sizes) else 0,
+        }
+
+    def close(self) -> None:
+        """Flush and release the mapped files."""
+        self.flush()
+        self._vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self._meta = np.zeros(0, dtype=META_DTYPE)
+
+
+def clustered_vectors(n: int, dim: int, clusters: int = 1000, spread: float = 1.0, seed: int = 0) -> np.ndarray:
+    """
+    Synthetic embeddings with topic structure (Gaussian clusters on the sphere).
+
+    Args:
+        n: Number of vectors.
+        dim: Dimension.
+        clusters: Number of topics.
+        spread: Noise relative to the topic direction.
+        seed: Random seed.
+
+    Returns:
+        np.ndarray: (n, dim) normalized float32 vectors.
+    """
+    rng = np.random.default_rng(seed)
+    centers = normalize_rows(rng.standard_normal((clusters, dim)))
+    out = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, 100_000):
+        end = min(n, start + 100_000)
+        topics = rng.integers(0, clusters, end - start)
+        noise = rng.standard_normal((end - start, dim)).astype(np.float32) * (spread / np.sqrt(dim))
+        out[start:end] = normalize_rows(centers[topics] + noise)
+    return out
+
+
+def benchmark(n: int = 100_000, dim: int = 128, queries: int = 200, k: int = 10, directory: Optional[Path] = None) -> Dict[str, float]:
+    """
+    Compare IVF search with brute force on synthetic clustered vectors.
+
+    Args:
+        n: Indexed vectors.
+        dim: Dimension.
+        queries: Measured queries.
+        k: Results per query.
+        directory: Index directory (a temporary one if None).
+
+    Returns:
+        Dict[str, float]: Build, reopen and search timings and recall@k.
+    """
+    import statistics
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as temp:
+        path = Path(directory or temp) / 'index'
+        data = clustered_vectors(n + queries, dim)
+        base, probe_vectors = data[:n], data[n:]
+        nlist = int(4 * np.sqrt(n))
+        users = np.array(['alice', 'bob', 'carol', 'dave'])
+        rng = np.random.default_rng(1)
+        user_of = rng.integers(0, len(users), n)
+
+        index = VectorIndex(path, dim=dim, nlist=nlist, nprobe=max(8, nlist // 64))
+        started = time.perf_counter()
+        for chunk in range(0, n, 10_000):
+            part = slice(chunk, min(n, chunk + 10_000))
+            for code, user in enumerate(users):
+                rows = np.flatnonzero(user_of[part] == code)
+                index.add(base[part][rows], user=str(user), kind='message',
+                          timestamps=chunk + rows.astype(np.float64))
+        build_s = time.perf_counter() - started
+        index.flush()
+        index.close()
+
+        started = time.perf_counter()
+        index = VectorIndex(path)
+        reopen_s = time.perf_counter() - started
+
+        def measure(**filters) -> Tuple[float, float, float, float]:
+            ivf_times, exact_times, hits = [], [], 0
+            for query in probe_vectors:
+                started = time.perf_counter()
+                ids, _ = index.search(query, k, **filters)
+                ivf_times.append(time.perf_counter() - started)
+                started = time.perf_counter()
+                truth, _ = index.search(query, k, exact=True, **filters)
+                exact_times.append(time.perf_counter() - started)
+                hits += len(np.intersect1d(ids, truth))
+            ivf_times.sort()
+            return (hits / (k * len(probe_vectors)), statistics.median(ivf_times) * 1000,
+                    ivf_times[int(len(ivf_times) * 0.99)] * 1000, statistics.median(exact_times) * 1000)
+
+        recall, p50, p99, exact = measure()
+        f_recall, f_p50, f_p99, f_exact = measure(user='bob', since=n * 0.5)
+        index.close()
+    return {
+        'n': n, 'build_s': build_s, 'reopen_s': reopen_s,
+        'recall': recall, 'p50_ms': p50, 'p99_ms': p99, 'exact_p50_ms': exact,
+        'filtered_recall': f_recall, 'filtered_p50_ms': f_p50, 'filtered_p99_ms': f_p99, 'filtered_exact_p50_ms': f_exact,
+    }
+
+
+def main():
+    """
+    Run the vector index benchmark at 10^5 vectors (pass a count, e.g. 1000000, to change it).
+    """
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    result = benchmark(n)
+    print(f"{result['n']:,} vectors: build {result['build_s']:.1f}s, reopen {result['reopen_s'] * 1000:.0f} ms")
+    print(f"  unfiltered   recall@10 {result['recall']:.3f}  p50 {result['p50_ms']:.2f} ms  "
+          f"p99 {result['p99_ms']:.2f} ms  (brute force p50 {result['exact_p50_ms']:.2f} ms)")
+    print(f"  user + time  recall@10 {result['filtered_recall']:.3f}  p50 {result['filtered_p50_ms']:.2f} ms  "
+          f"p99 {result['filtered_p99_ms']:.2f} ms  (brute force p50 {result['filtered_exact_p50_ms']:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
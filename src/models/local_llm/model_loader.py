@@ -1 +1,261 @@
-#এই মডিউলে Ollama বা transformers ব্যবহার করে লোকাল Mistral মডেল লোড ফাংশন থাকবে যা CPU/GPU সাপোর্ট করবে; এটি অফলাইন LLM রান করার জন্য তৈরি, প্রাইভেসি এবং স্পিড নিশ্চিত করে।
+"""
+NeoMate AI Local Model Loader Module
+
+This module loads and runs the local LLM (Mistral, Llama, Phi, ... served by Ollama)
+on CPU or GPU. Generation is exposed as an async token stream so downstream consumers
+(the brain, text-to-speech) can start working on the first words while the rest of
+the answer is still being generated.
+
+Features:
+- Ollama backend with lazy client creation and model warm-up
+- Async token streaming and full-text generation
+- keep_alive control so the model stays resident between requests
+- Deterministic stub model with configurable first-token latency and token rate,
+  for tests and latency benchmarks without a model installed
+- Batching stub that mimics Ollama's parallel decode slots
+- Offline operation for privacy and speed
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+from typing import Any, AsyncIterator, Dict, Optional
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+
+class LocalModelLoader:
+    """
+    Loads a local model into Ollama and streams generations from it.
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None, model: Optional[str] = None):
+        """
+        Initialize the LocalModelLoader.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            model: Model name. If None, ``local_llm.model`` is used (and followed
+                   across configuration reloads).
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        llm_config = self.config.get('local_llm', {})
+
+        self._model = (lambda: model) if model else self.config_loader.accessor('local_llm.model', 'mistral')
+        self.host = llm_config.get('host')
+        self.keep_alive = llm_config.get('keep_alive', '30m')
+        self.device = llm_config.get('device', 'auto')
+        self._client = None
+        self.loaded_model: Optional[str] = None
+
+    @property
+    def model(self) -> str:
+        """Model name used for generation."""
+        return self._model()
+
+    def _get_client(self) -> Any:
+        if self._client is None:
+            import ollama
+            self._client = ollama.AsyncClient(host=self.host)
+        return self._client
+
+    def _options(self, options: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        merged = dict(options or {})
+        if self.device == 'cpu':
+            merged.setdefault('num_gpu', 0)
+        return merged
+
+    async def load(self) -> bool:
+        """
+        Load the model into memory so the first request does not pay for it.
+
+        Returns:
+            bool: True if the model is loaded, False otherwise.
+        """
+        model = self.model
+        try:
+            # An empty prompt only loads the model
+            await self._get_client().generate(model=model, prompt='', keep_alive=self.keep_alive)
+            self.loaded_model = model
+            log.info(f"Local model '{model}' loaded (keep_alive {self.keep_alive})")
+            return True
+        except Exception as e:
+            log.error(f"Failed to load local model '{model}': {e}")
+            return False
+
+    async def digest(self) -> str:
+        """
+        Get the digest of the installed model, which changes when it is re-pulled.
+
+        Returns:
+            str: Model digest, or '' if it cannot be determined.
+        """
+        model = self.model
+        try:
+            listing = await self._get_client().list()
+        except Exception as e:
+            log.debug(f"Could not list local models: {e}")
+            return ''
+        for entry in listing.get('models', []):
+            name = entry.get('name') or entry.get('model') or ''
+            if name == model or name.split(':')[0] == model:
+                return entry.get('digest', '')
+        return ''
+
+    async def stream(self, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """
+        Stream generated text.
+
+        Args:
+            prompt: Full prompt text.
+            options: Sampling options (temperature, top_p, num_predict, ...).
+
+        Yields:
+            str: Text fragments (tokens) in generation order.
+        """
+        response = await self._get_client().generate(
+            model=self.model,
+            prompt=prompt,
+            options=self._options(options),
+            keep_alive=self.keep_alive,
+            stream=True
+        )
+        async for part in response:
+            token = part.get('response', '')
+            if token:
+                yield token
+
+    async def generate(self, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Generate the complete response.
+
+        Args:
+            prompt: Full prompt text.
+            options: Sampling options.
+
+        Returns:
+            str: Generated text.
+        """
+        return ''.join([token async for token in self.stream(prompt, options)])
+
+    async def unload(self) -> None:
+        """Ask Ollama to release the model's memory."""
+        if self.loaded_model is None:
+            return
+        try:
+            await self._get_client().generate(model=self.loaded_model, prompt='', keep_alive=0)
+            log.info(f"Local model '{self.loaded_model}' unloaded")
+        except Exception as e:
+            log.warning(f"Failed to unload local model '{self.loaded_model}': {e}")
+        self.loaded_model = None
+
+
+class StubModelLoader:
+    """
+    Drop-in replacement for LocalModelLoader that emits a fixed answer at a fixed
+    token rate. Used for tests and latency benchmarks.
+    """
+
+    def __init__(
+        self,
+        response: str = "This is a stub answer. It arrives one token at a time.",
+        first_token_s: float = 0.3,
+        tokens_per_s: float = 8.0,
+        model: str = 'stub'
+    ):
+        """
+        Initialize the StubModelLoader.
+
+        Args:
+            response: Text to generate.
+            first_token_s: Delay before the first token (prompt processing).
+            tokens_per_s: Generation speed after the first token.
+            model: Reported model name.
+        """
+        self.response = response
+        self.first_token_s = first_token_s
+        self.tokens_per_s = tokens_per_s
+        self.model = model
+        self.loaded_model: Optional[str] = None
+
+    async def load(self) -> bool:
+        self.loaded_model = self.model
+        return True
+
+    async def digest(self) -> str:
+        return self.model
+
+    async def stream(self, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        await asyncio.sleep(self.first_token_s)
+        for i, token in enumerate(re.findall(r'\s*\S+', self.response)):
+            if i:
+                await asyncio.sleep(1.0 / self.tokens_per_s)
+            yield token
+
+    async def generate(self, prompt: str, options: Optional[Dict[str, Any]] = None) -> str:
+        return ''.join([token async for token in self.stream(prompt, options)])
+
+    async def unload(self) -> None:
+        self.loaded_model = None
+
+
+class BatchingStubModelLoader(StubModelLoader):
+    """
+    Stub that behaves like an Ollama server with parallel slots (``OLLAMA_NUM_PARALLEL``).
+
+    Up to ``num_parallel`` requests are decoded together: each decode step emits one
+    token for every active sequence and gets slower as the batch grows, but much
+    less than linearly, so aggregate throughput rises with batch size. Requests
+    beyond ``num_parallel`` wait for a slot, as they would in Ollama.
+    """
+
+    def __init__(
+        self,
+        response: str = "This is a stub answer. It arrives one token at a time.",
+        first_token_s: float = 0.05,
+        step_s: float = 0.02,
+        batch_cost: float = 0.15,
+        num_parallel: int = 4,
+        model: str = 'stub'
+    ):
+        """
+        Initialize the BatchingStubModelLoader.
+
+        Args:
+            response: Text to generate.
+            first_token_s: Prompt processing time per request.
+            step_s: Decode step time for a single sequence.
+            batch_cost: Extra step time per additional sequence in the batch,
+                        as a fraction of ``step_s``.
+            num_parallel: Sequences decoded together.
+            model: Reported model name.
+        """
+        super().__init__(response, first_token_s, 1.0 / step_s, model)
+        self.step_s = step_s
+        self.batch_cost = batch_cost
+        self.num_parallel = num_parallel
+        self.active = 0
+        self.tokens = 0
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def stream(self, prompt: str, options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.num_parallel)
+        async with self._slots:
+            await asyncio.sleep(self.first_token_s)
+            limit = (options or {}).get('num_predict')
+            tokens = re.findall(r'\s*\S+', self.response)[:limit]
+            self.active += 1
+            try:
+                for token in tokens:
+                    await asyncio.sleep(self.step_s * (1.0 + self.batch_cost * (self.active - 1)))
+                    self.tokens += 1
+                    yield token
+            finally:
+                self.active -= 1
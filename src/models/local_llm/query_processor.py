@@ -1 +1,398 @@
-#এই মডিউলে লোকাল LLM কুয়েরি প্রসেসিং ফাংশন থাকবে যা প্রম্পট জেনারেট করে রেসপন্স পার্স করবে; এটি লোকাল ডিসিশন মেকিংয়ের জন্য তৈরি, অফলাইন অপারেশন সাপোর্ট করে।
+"""
+NeoMate AI Local LLM Query Processor Module
+
+This module turns user queries into prompts for the local LLM (served by Ollama),
+parses the model output into text and optional structured actions, and answers
+repeated queries from a persistent response cache instead of running inference again.
+
+Features:
+- Prompt construction with system prompt and conversation context
+- Response parsing: plain text plus an optional JSON action block
+- Two-tier response cache (memory LRU + SQLite) keyed on normalized prompt,
+  model version and sampling parameters
+- Cache invalidation when the local model is updated
+- Per-intent cache TTLs; real-time queries (weather, prices, news) are not cached
+- Token streaming through the model loader, with the completed stream cached
+- Sampling options and system prompt follow configuration hot reloads
+- Offline operation: no network access beyond the local Ollama server
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import json
+import re
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.models.local_llm.model_loader import LocalModelLoader
+from src.models.local_llm.response_cache import ResponseCache, make_cache_key, normalize_prompt
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import DATA_DIR
+from src.utils.instrumentation import span
+from src.utils.logger import log
+
+DEFAULT_SYSTEM_PROMPT = (
+    "You are NeoMate, a helpful bilingual (Bengali and English) desktop assistant. "
+    "Answer briefly. If the user asks you to do something on the computer, reply with "
+    "a JSON object such as {\"action\": \"open_app\", \"target\": \"browser\"}."
+)
+
+_JSON_BLOCK = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+GenerateFunc = Callable[[str, str, Dict[str, Any]], Awaitable[str]]
+
+
+@dataclass
+class ParsedResponse:
+    """A parsed local LLM response."""
+
+    text: str
+    action: Optional[Dict[str, Any]]
+    raw: str
+    model: str
+    cached: bool = False
+    latency_s: float = 0.0
+
+
+class QueryProcessor:
+    """
+    Builds prompts for the local LLM, parses its output and caches responses.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        generate: Optional[GenerateFunc] = None,
+        cache: Optional[ResponseCache] = None,
+        model_loader: Optional[LocalModelLoader] = None,
+        model_registry: Optional[Any] = None,
+        intent_classifier: Optional[Any] = None
+    ):
+        """
+        Initialize the QueryProcessor.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            generate: Optional async function (prompt, model, options) -> text used
+                      instead of the model loader, e.g. for tests and benchmarks.
+            cache: Optional ResponseCache. If None, one is created from the
+                   ``local_llm.cache`` configuration (unless disabled).
+            model_loader: Optional model loader (LocalModelLoader or StubModelLoader).
+                          If None, a LocalModelLoader is created.
+            model_registry: Optional ModelRegistry. If it has an 'llm' model, the
+                            model is pinned while generating so it is not evicted
+                            mid-answer (cache hits do not load it).
+            intent_classifier: Optional IntentClassifier used to pick a per-intent
+                               cache TTL. If None, one is created on the first cache
+                               lookup when ``local_llm.cache.intent_ttl_s`` is set.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        llm_config = self.config.get('local_llm', {})
+
+        # Read through accessors so a configuration reload switches options/prompt
+        self._options = self.config_loader.accessor('local_llm.options', {})
+        self._system_prompt = self.config_loader.accessor('local_llm.system_prompt', DEFAULT_SYSTEM_PROMPT)
+        self.model_loader = model_loader or LocalModelLoader(self.config_loader)
+        self.model_registry = model_registry
+
+        cache_config = llm_config.get('cache', {})
+        if cache is None and cache_config.get('enabled', True):
+            cache = ResponseCache(
+                path=cache_config.get('path', DATA_DIR / "cache" / "llm_responses.sqlite3"),
+                max_entries=cache_config.get('max_entries', 1024),
+                max_disk_entries=cache_config.get('max_disk_entries', 100_000),
+                ttl_s=cache_config.get('ttl_s', 7 * 24 * 3600.0)
+            )
+        self.cache = cache
+        self.version_check_s = cache_config.get('version_check_s', 60.0)
+        # Intent -> TTL in seconds overriding the cache TTL; 0 disables caching, so
+        # live answers (weather, prices, news) are never replayed from the cache
+        self.intent_ttl_s: Dict[str, float] = dict(cache_config.get('intent_ttl_s', {'real_time': 0.0}))
+        self.intent_classifier = intent_classifier
+
+        self._generate = generate
+        # model -> (checked_at, version)
+        self._model_versions: Dict[str, Tuple[float, str]] = {}
+
+        log.info("QueryProcessor initialized successfully")
+
+    @property
+    def model(self) -> str:
+        """Configured local model name."""
+        return self.model_loader.model
+
+    @property
+    def system_prompt(self) -> str:
+        """Configured system prompt."""
+        return self._system_prompt()
+
+    def build_prompt(self, query: str, context: Optional[List[Dict[str, str]]] = None) -> str:
+        """
+        Build the model prompt for a query.
+
+        Args:
+            query: User query.
+            context: Optional previous turns as {'role': 'user'|'assistant', 'content': ...};
+                     'system' entries (profile, conversation summary) are added verbatim.
+
+        Returns:
+            str: Prompt text.
+        """
+        lines = [self.system_prompt, ""]
+        for turn in context or ():
+            role = turn.get('role')
+            if role == 'system':
+                lines.append(turn.get('content', ''))
+                continue
+            lines.append(f"{'User' if role == 'user' else 'Assistant'}: {turn.get('content', '')}")
+        lines.append(f"User: {query}")
+        lines.append("Assistant:")
+        return "\n".join(lines)
+
+    @staticmethod
+    def parse_response(raw: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Split model output into text and an optional JSON action.
+
+        The action may be a fenced ```json block anywhere in the output or the whole
+        output being a JSON object.
+
+        Args:
+            raw: Raw model output.
+
+        Returns:
+            Tuple[str, Optional[Dict[str, Any]]]: Remaining text and the action, if any.
+        """
+        text = raw.strip()
+        match = _JSON_BLOCK.search(text)
+        candidate = match.group(1) if match else (text if text.startswith('{') and text.endswith('}') else None)
+        if candidate is not None:
+            try:
+                action = json.loads(candidate)
+            except json.JSONDecodeError:
+                action = None
+            if isinstance(action, dict):
+                remaining = (text[:match.start()] + text[match.end():]).strip() if match else ''
+                return remaining, action
+        return text, None
+
+    def _pinned(self) -> AsyncContextManager[Any]:
+        if self.model_registry is not None and 'llm' in self.model_registry:
+            return self.model_registry.use('llm')
+        return nullcontext()
+
+    async def _call_model(self, prompt: str, model: str, options: Dict[str, Any]) -> str:
+        if self._generate is not None:
+            return await self._generate(prompt, model, options)
+        async with self._pinned():
+            return await self.model_loader.generate(prompt, options)
+
+    async def _stream_model(self, prompt: str, model: str, options: Dict[str, Any]) -> AsyncIterator[str]:
+        if self._generate is not None:
+            yield await self._generate(prompt, model, options)
+            return
+        async with self._pinned():
+            async for token in self.model_loader.stream(prompt, options):
+                yield token
+
+    async def model_version(self, model: str) -> str:
+        """
+        Get the installed version (digest) of a model, checked at most every
+        ``version_check_s`` seconds. A changed digest invalidates the model's cache
+        entries.
+
+        Args:
+            model: Model name.
+
+        Returns:
+            str: Model digest, or '' if it cannot be determined.
+        """
+        checked = self._model_versions.get(model)
+        now = time.monotonic()
+        if checked is not None and now - checked[0] < self.version_check_s:
+            return checked[1]
+
+        version = checked[1] if checked else ''
+        if self._generate is None:
+            version = await self.model_loader.digest() or version
+
+        if checked is not None and version != checked[1] and self.cache is not None:
+            log.info(f"Local model '{model}' changed, invalidating cached responses")
+            await asyncio.to_thread(self.cache.invalidate_model, model, version)
+        self._model_versions[model] = (now, version)
+        return version
+
+    async def cache_ttl(self, query: str) -> Optional[float]:
+        """
+        Get the cache TTL for a query from its intent.
+
+        Args:
+            query: User query.
+
+        Returns:
+            Optional[float]: TTL in seconds (0 means do not cache), or None for the
+                             cache's default TTL.
+        """
+        if not self.intent_ttl_s:
+            return None
+        if self.intent_classifier is None:
+            from src.models.nlp.intent_classifier import IntentClassifier
+            # Loading (or training) the fast model takes a moment; keep it off the loop
+            self.intent_classifier = await asyncio.to_thread(IntentClassifier, self.config_loader)
+        intent = self.intent_classifier.classify_fast(query).intent
+        return self.intent_ttl_s.get(intent)
+
+    async def _lookup(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]],
+        use_cache: bool,
+        options: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any], Optional[str], str, Optional[str], Optional[float]]:
+        """Resolve model and options, and look the request up in the cache."""
+        model = self.model
+        merged_options = {**self._options(), **options}
+        key, version, raw, ttl_s = None, '', None, None
+        if use_cache and self.cache is not None:
+            ttl_s = await self.cache_ttl(query)
+            use_cache = ttl_s is None or ttl_s > 0
+        if use_cache and self.cache is not None:
+            version = await self.model_version(model)
+            # Key on the normalized query so 'Open browser!' and 'open browser' share an entry
+            key = make_cache_key(self.build_prompt(normalize_prompt(query), context), model, version, merged_options)
+            async with span('llm.local.cache_lookup'):
+                raw = await self.cache.aget(key)
+        return model, merged_options, key, version, raw, ttl_s
+
+    async def cached(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        **options: Any
+    ) -> Optional[str]:
+        """
+        Look a query up in the response cache without running the model.
+
+        Args:
+            query: User query.
+            context: Optional previous turns (see ``build_prompt``).
+            **options: Sampling options overriding ``local_llm.options``.
+
+        Returns:
+            Optional[str]: The cached raw response, or None.
+        """
+        return (await self._lookup(query, context, True, options))[4]
+
+    async def process(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_cache: bool = True,
+        **options: Any
+    ) -> ParsedResponse:
+        """
+        Answer a query with the local LLM, using the response cache when possible.
+
+        Args:
+            query: User query.
+            context: Optional previous turns (see ``build_prompt``).
+            use_cache: Whether to read from and write to the response cache.
+            **options: Sampling options overriding ``local_llm.options``.
+
+        Returns:
+            ParsedResponse: Parsed response; ``cached`` tells whether inference was skipped.
+        """
+        started = time.perf_counter()
+        model, merged_options, key, version, raw, ttl_s = await self._lookup(query, context, use_cache, options)
+        if raw is not None:
+            text, action = self.parse_response(raw)
+            return ParsedResponse(text, action, raw, model, cached=True, latency_s=time.perf_counter() - started)
+
+        async with span('llm.local.generate'):
+            raw = await self._call_model(self.build_prompt(query, context), model, merged_options)
+
+        if key is not None:
+            await self.cache.aput(key, raw, model=model, model_version=version, ttl_s=ttl_s)
+
+        text, action = self.parse_response(raw)
+        return ParsedResponse(text, action, raw, model, latency_s=time.perf_counter() - started)
+
+    async def stream(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        use_cache: bool = True,
+        **options: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream the raw response to a query token by token.
+
+        A cached response is yielded as a single fragment. A generated response is
+        stored in the cache once the stream completes; an interrupted stream is not.
+
+        Args:
+            query: User query.
+            context: Optional previous turns (see ``build_prompt``).
+            use_cache: Whether to read from and write to the response cache.
+            **options: Sampling options overriding ``local_llm.options``.
+
+        Yields:
+            str: Response text fragments.
+        """
+        model, merged_options, key, version, raw, ttl_s = await self._lookup(query, context, use_cache, options)
+        if raw is not None:
+            yield raw
+            return
+
+        parts: List[str] = []
+        async for token in self._stream_model(self.build_prompt(query, context), model, merged_options):
+            parts.append(token)
+            yield token
+
+        if key is not None:
+            await self.cache.aput(key, ''.join(parts), model=model, model_version=version, ttl_s=ttl_s)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get response cache hit/miss metrics.
+
+        Returns:
+            Dict[str, Any]: ResponseCache statistics, empty if caching is disabled.
+        """
+        return self.cache.stats() if self.cache is not None else {}
+
+    def close(self) -> None:
+        """Close the response cache."""
+        if self.cache is not None:
+            self.cache.close()
+
+
+async def main():
+    """
+    Demonstrate the response cache with a simulated slow local model.
+    """
+    async def slow_model(prompt: str, model: str, options: Dict[str, Any]) -> str:
+        await asyncio.sleep(0.5)
+        query = prompt.rsplit('User:', 1)[-1].lower()
+        if 'browser' in query:
+            return '{"action": "open_app", "target": "browser"}'
+        return "It is a good day."
+
+    processor = QueryProcessor(generate=slow_model, cache=ResponseCache(max_entries=64))
+    queries = ["Open browser", "open  browser!", "How is the day?", "OPEN BROWSER", "how is the day"]
+    for query in queries:
+        result = await processor.process(query)
+        source = 'cache' if result.cached else 'model'
+        print(f"{query!r:<22} {source:<6} {result.latency_s * 1000:8.2f} ms  action={result.action} text={result.text!r}")
+    print(processor.cache_stats())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,448 @@
+"""
+NeoMate AI Local LLM Request Scheduler Module
+
+This module schedules requests from every part of NeoMate (voice conversation, the
+general/work/real-time agents, background learning) onto the single local model.
+Ollama decodes up to ``OLLAMA_NUM_PARALLEL`` requests for the same model together in
+one batch, so the scheduler keeps that many compatible requests in flight (continuous
+batching: a finished sequence's slot is refilled immediately) and decides who gets
+the next free slot: the most urgent priority class first, and within a class the
+agent that has received the fewest tokens so far.
+
+Features:
+- Priority classes: interactive voice above agents above background learning
+- Continuous batching up to the backend's parallel slots, one model/context size at a time
+- Slots reserved for interactive requests so background work never blocks a voice answer
+- Weighted fair sharing of tokens across agents within a class
+- Aging of queued requests so background work is never starved
+- Bounded per-request output buffers with backpressure on slow readers
+- Cancellation of queued and running requests when the caller goes away
+- Cache hits answered without queueing
+- Queue wait per priority class and tokens/s, with a mixed-load benchmark
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+from src.models.local_llm.query_processor import QueryProcessor
+from src.utils.config_loader import ConfigLoader
+from src.utils.instrumentation import Histogram
+from src.utils.logger import log
+
+
+class RequestPriority(IntEnum):
+    """Priority classes; lower values are served first."""
+
+    INTERACTIVE = 0
+    AGENT = 1
+    BACKGROUND = 2
+
+
+class RequestCancelled(RuntimeError):
+    """Raised to a caller whose request was cancelled before it completed."""
+
+
+_DONE = object()
+
+
+@dataclass
+class LLMJob:
+    """A request waiting for or holding a decode slot."""
+
+    query: str
+    context: Optional[List[Dict[str, str]]]
+    options: Dict[str, Any]
+    agent: str
+    priority: RequestPriority
+    use_cache: bool = True
+    seq: int = 0
+    enqueued_ns: int = field(default_factory=time.perf_counter_ns)
+    started_ns: int = 0
+    tokens: int = 0
+    cancelled: bool = False
+    output: 'asyncio.Queue[Any]' = field(default_factory=asyncio.Queue)
+    task: Optional[asyncio.Task] = None
+
+    def effective_priority(self, now_ns: int, aging_s: float) -> int:
+        """Priority class after aging: one class more urgent per ``aging_s`` queued."""
+        if aging_s <= 0:
+            return int(self.priority)
+        waited_s = (now_ns - self.enqueued_ns) / 1e9
+        return max(int(RequestPriority.INTERACTIVE), int(self.priority) - int(waited_s / aging_s))
+
+    def put_final(self, item: Any) -> None:
+        """Queue an error or cancellation, dropping unread tokens if the buffer is full."""
+        while self.output.full():
+            self.output.get_nowait()
+        self.output.put_nowait(item)
+
+    @property
+    def batch_key(self) -> Tuple[Any, ...]:
+        # Ollama reloads the model for a different context size, so those cannot share a batch
+        return (self.options.get('num_ctx'),)
+
+
+class LLMScheduler:
+    """
+    Priority and fairness scheduler with continuous batching for the local LLM.
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None, query_processor: Optional[QueryProcessor] = None):
+        """
+        Initialize the LLMScheduler.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            query_processor: QueryProcessor that runs the requests. Created if None.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        scheduler_config = self.config.get('llm_scheduler', {})
+
+        self.query_processor = query_processor or QueryProcessor(self.config_loader)
+        # Should match OLLAMA_NUM_PARALLEL on the server
+        self.max_batch = max(1, scheduler_config.get('max_batch', 4))
+        # Slots only interactive requests may take
+        self.reserved_interactive = min(scheduler_config.get('reserved_interactive', 1), self.max_batch - 1)
+        self.agent_weights: Dict[str, float] = dict(scheduler_config.get('agent_weights', {}))
+        # A queued request moves up one priority class per aging_s waited, so a
+        # steady stream of agent requests cannot starve background work
+        self.aging_s = scheduler_config.get('aging_s', 10.0)
+        # Tokens buffered per request for a slow reader before generation pauses
+        self.output_buffer = max(1, scheduler_config.get('output_buffer', 256))
+
+        self._queues: Dict[RequestPriority, Dict[str, Deque[LLMJob]]] = {p: {} for p in RequestPriority}
+        self.running: Dict[int, LLMJob] = {}
+        self._batch_key: Optional[Tuple[Any, ...]] = None
+        # Weighted tokens served per agent (virtual time for fair sharing)
+        self._served: Dict[str, float] = {}
+        self._seq = itertools.count()
+
+        self.queue_wait = {p: Histogram() for p in RequestPriority}
+        self.completed = 0
+        self.cancelled = 0
+        self.cache_hits = 0
+        self.tokens = 0
+        self._first_start: Optional[float] = None
+
+        log.info(f"LLMScheduler initialized with {self.max_batch} slots")
+
+    def queued(self, priority: Optional[RequestPriority] = None) -> int:
+        """Number of requests waiting, optionally for one priority class."""
+        classes = [priority] if priority is not None else list(RequestPriority)
+        return sum(len(q) for p in classes for q in self._queues[p].values())
+
+    def _weight(self, agent: str) -> float:
+        return max(1e-3, float(self.agent_weights.get(agent, 1.0)))
+
+    def submit(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        agent: str = 'default',
+        priority: RequestPriority = RequestPriority.AGENT,
+        use_cache: bool = True,
+        **options: Any
+    ) -> LLMJob:
+        """
+        Queue a request. Its tokens arrive on ``job.output``, followed by a
+        completion marker; ``stream`` wraps this for callers.
+
+        Args:
+            query: User query.
+            context: Optional previous turns.
+            agent: Name of the requesting agent, used for fair sharing.
+            priority: Priority class.
+            use_cache: Whether the response cache may be used.
+            **options: Sampling options.
+
+        Returns:
+            LLMJob: The queued job (pass it to ``cancel`` to abandon it).
+        """
+        job = LLMJob(
+            query, context, options, agent, RequestPriority(priority), use_cache,
+            seq=next(self._seq), output=asyncio.Queue(maxsize=self.output_buffer)
+        )
+        agents = self._queues[job.priority]
+        if agent not in agents or not agents[agent]:
+            # An agent returning from idle starts level with the others instead of
+            # spending the share it did not use
+            active = [self._served[a] for p in RequestPriority for a, q in self._queues[p].items() if q]
+            floor = min(active) if active else max(self._served.values(), default=0.0)
+            self._served[agent] = max(self._served.get(agent, 0.0), floor)
+        agents.setdefault(agent, deque()).append(job)
+        self._dispatch()
+        return job
+
+    def cancel(self, job: LLMJob) -> None:
+        """
+        Abandon a request, freeing its queue position or decode slot.
+
+        Args:
+            job: Job returned by ``submit``.
+        """
+        if job.cancelled or (job.task is not None and job.task.done()):
+            return
+        job.cancelled = True
+        self.cancelled += 1
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            queue = self._queues[job.priority].get(job.agent)
+            if queue is not None and job in queue:
+                queue.remove(job)
+            job.put_final(RequestCancelled(f"Request from '{job.agent}' was cancelled"))
+
+    def _next_job(self, priority: RequestPriority) -> Optional[LLMJob]:
+        """Oldest job of the least-served agent in a class (not removed)."""
+        best = None
+        for agent, queue in self._queues[priority].items():
+            if queue and (best is None or self._served[agent] < self._served[best]):
+                best = agent
+        return self._queues[priority][best][0] if best is not None else None
+
+    def _dispatch(self) -> None:
+        """Fill free slots, most urgent (aged) class first."""
+        while len(self.running) < self.max_batch:
+            now_ns = time.perf_counter_ns()
+            job, urgency = None, None
+            for priority in RequestPriority:
+                candidate = self._next_job(priority)
+                if candidate is None:
+                    continue
+                effective = candidate.effective_priority(now_ns, self.aging_s)
+                # Ties go to the class that is more urgent by nature
+                if urgency is None or (effective, priority) < urgency:
+                    job, urgency = candidate, (effective, priority)
+            if job is None:
+                return
+            free = self.max_batch - len(self.running)
+            if urgency[0] != RequestPriority.INTERACTIVE and free <= self.reserved_interactive:
+                return
+            if self.running and job.batch_key != self._batch_key:
+                # Let the current batch drain rather than reloading the model mid-batch
+                return
+            self._queues[job.priority][job.agent].popleft()
+            self._start(job)
+
+    def _start(self, job: LLMJob) -> None:
+        job.started_ns = time.perf_counter_ns()
+        self.queue_wait[job.priority].record(job.started_ns - job.enqueued_ns)
+        if self._first_start is None:
+            self._first_start = time.perf_counter()
+        self._batch_key = job.batch_key
+        self.running[job.seq] = job
+        job.task = asyncio.create_task(self._run(job), name=f"llm:{job.agent}:{job.seq}")
+
+    async def _run(self, job: LLMJob) -> None:
+        weight = self._weight(job.agent)
+        try:
+            async for token in self.query_processor.stream(job.query, job.context, job.use_cache, **job.options):
+                job.tokens += 1
+                self.tokens += 1
+                self._served[job.agent] += 1.0 / weight
+                # Waits while the reader is a full buffer behind
+                await job.output.put(token)
+            self.completed += 1
+            await job.output.put(_DONE)
+        except asyncio.CancelledError:
+            job.put_final(RequestCancelled(f"Request from '{job.agent}' was cancelled"))
+        except Exception as e:
+            log.error(f"Local LLM request from '{job.agent}' failed: {e}")
+            job.put_final(e)
+        finally:
+            self.running.pop(job.seq, None)
+            self._dispatch()
+
+    async def stream(
+        self,
+        query: str,
+        context: Optional[List[Dict[str, str]]] = None,
+        agent: str = 'default',
+        priority: RequestPriority = RequestPriority.AGENT,
+        use_cache: bool = True,
+        **options: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream the local model's answer once the request is scheduled.
+
+        Leaving the iteration early (or cancelling the consuming task) cancels
+        the request and frees its slot.
+
+        Args:
+            query: User query.
+            context: Optional previous turns.
+            agent: Name of the requesting agent.
+            priority: Priority class.
+            use_cache: Whether the response cache may be used.
+            **options: Sampling options.
+
+        Yields:
+            str: Response text fragments.
+
+        Raises:
+            RequestCancelled: If the request was cancelled through ``cancel``.
+        """
+        if use_cache:
+            raw = await self.query_processor.cached(query, context, **options)
+            if raw is not None:
+                self.cache_hits += 1
+                yield raw
+                return
+
+        job = self.submit(query, context, agent, priority, use_cache, **options)
+        try:
+            while True:
+                item = await job.output.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            if job.task is None or not job.task.done():
+                self.cancel(job)
+
+    async def generate(self, query: str, context: Optional[List[Dict[str, str]]] = None, **kwargs: Any) -> str:
+        """
+        Get the complete answer; takes the same arguments as ``stream``.
+
+        Returns:
+            str: Raw response text.
+        """
+        return ''.join([token async for token in self.stream(query, context, **kwargs)])
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler metrics.
+
+        Returns:
+            Dict[str, Any]: Throughput, counters, queue depth and queue wait per class.
+        """
+        elapsed = time.perf_counter() - self._first_start if self._first_start is not None else 0.0
+        return {
+            'tokens': self.tokens,
+            'tokens_per_s': self.tokens / elapsed if elapsed > 0 else 0.0,
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'cache_hits': self.cache_hits,
+            'running': len(self.running),
+            'queued': {p.name: self.queued(p) for p in RequestPriority},
+            'queue_wait': {p.name: self.queue_wait[p].summary() for p in RequestPriority},
+            'agent_tokens': {agent: served * self._weight(agent) for agent, served in self._served.items()},
+        }
+
+
+async def run_mixed_load(scheduled: bool, duration_s: float = 6.0, num_parallel: int = 4, seed: int = 3) -> Dict[str, Any]:
+    """
+    Drive a batching stub model with voice, agent and background traffic.
+
+    Voice requests arrive about once a second and a third of them are abandoned
+    after a few tokens (barge-in); three agents and a learning job keep the model
+    saturated. With ``scheduled`` False every caller goes straight to the model,
+    which serves them first come first served like a bare Ollama server.
+
+    Args:
+        scheduled: Route requests through the LLMScheduler.
+        duration_s: Length of the load test.
+        num_parallel: Parallel decode slots of the stub server.
+        seed: Random seed.
+
+    Returns:
+        Dict[str, Any]: Tokens/s and time to first token per agent.
+    """
+    import random
+
+    from src.models.local_llm.model_loader import BatchingStubModelLoader
+    from src.models.local_llm.response_cache import ResponseCache
+
+    rng = random.Random(seed)
+    answer = ' '.join(f"word{i}" for i in range(40))
+    model = BatchingStubModelLoader(answer, num_parallel=num_parallel)
+    processor = QueryProcessor(model_loader=model, cache=ResponseCache())
+    scheduler = LLMScheduler(query_processor=processor)
+    scheduler.max_batch = num_parallel
+    scheduler.reserved_interactive = 1
+
+    ttft: Dict[str, Histogram] = {}
+    tokens = {'count': 0}
+    deadline = time.perf_counter() + duration_s
+
+    async def one(agent: str, priority: RequestPriority, abandon_after: Optional[int] = None) -> None:
+        started = time.perf_counter_ns()
+        query = f"{agent} {rng.random()}"
+        if scheduled:
+            stream = scheduler.stream(query, agent=agent, priority=priority, use_cache=False)
+        else:
+            stream = processor.stream(query, use_cache=False)
+        received = 0
+        async for _ in stream:
+            if received == 0:
+                ttft.setdefault(agent, Histogram()).record(time.perf_counter_ns() - started)
+            received += 1
+            tokens['count'] += 1
+            if abandon_after is not None and received >= abandon_after:
+                break
+        await stream.aclose()
+
+    async def caller(agent: str, priority: RequestPriority, concurrency: int, think_s: float) -> None:
+        async def loop() -> None:
+            while time.perf_counter() < deadline:
+                await one(agent, priority)
+                await asyncio.sleep(think_s)
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+
+    async def voice() -> None:
+        tasks = []
+        while time.perf_counter() < deadline:
+            await asyncio.sleep(rng.uniform(0.6, 1.2))
+            abandon = 3 if rng.random() < 0.33 else None
+            tasks.append(asyncio.create_task(one('voice', RequestPriority.INTERACTIVE, abandon)))
+        await asyncio.gather(*tasks)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        voice(),
+        caller('work_agent', RequestPriority.AGENT, concurrency=6, think_s=0.0),
+        caller('general_agent', RequestPriority.AGENT, concurrency=1, think_s=0.2),
+        caller('real_time_agent', RequestPriority.AGENT, concurrency=1, think_s=0.2),
+        caller('learning', RequestPriority.BACKGROUND, concurrency=4, think_s=0.0),
+    )
+    elapsed = time.perf_counter() - started
+    return {
+        'tokens_per_s': tokens['count'] / elapsed,
+        'ttft': {agent: histogram.summary() for agent, histogram in ttft.items()},
+        'scheduler': scheduler.stats() if scheduled else None,
+    }
+
+
+async def main():
+    """
+    Compare direct model access with the scheduler under mixed load.
+    """
+    for scheduled in (False, True):
+        result = await run_mixed_load(scheduled)
+        print(f"{'scheduler' if scheduled else 'direct (FIFO)'}: {result['tokens_per_s']:.0f} tokens/s")
+        for name, summary in result['ttft'].items():
+            print(f"  {name:<16} time to first token p50 {summary['p50_ms']:6.0f} ms  "
+                  f"p99 {summary['p99_ms']:6.0f} ms  (n={summary['count']})")
+        stats = result['scheduler']
+        if stats:
+            for name, summary in stats['queue_wait'].items():
+                print(f"  {name:<16} queue wait p50 {summary['p50_ms']:6.0f} ms  p99 {summary['p99_ms']:6.0f} ms")
+            shares = ', '.join(f"{agent} {count:.0f}" for agent, count in sorted(stats['agent_tokens'].items()))
+            print(f"  tokens per agent: {shares}; cancelled {stats['cancelled']}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
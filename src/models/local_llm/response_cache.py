@@ -0,0 +1,349 @@
+"""
+NeoMate AI LLM Response Cache Module
+
+This module caches local LLM responses so repeated requests ("open browser", "what
+time is it") are answered without running inference again. Entries are keyed on the
+normalized prompt, the model (name and version) and the sampling parameters, and live
+in two tiers: an in-memory LRU for the hot set and a SQLite database that survives
+restarts.
+
+Features:
+- Prompt normalization (Unicode NFC, case folding, whitespace and trailing punctuation)
+- In-memory LRU tier with promotion of disk hits
+- SQLite (WAL) disk tier with size limit
+- Per-entry TTL on both tiers
+- Invalidation of all entries of a model when its version changes
+- Hit/miss/eviction counters
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from src.utils.logger import log
+
+_WHITESPACE = re.compile(r'\s+')
+# Sentence-final punctuation that does not change a command's meaning (incl. Bengali dari)
+_TRAILING_PUNCTUATION = ' \t\n.?!।॥,;:'
+
+
+def normalize_prompt(text: str) -> str:
+    """
+    Normalize a prompt or user query for cache keying.
+
+    Args:
+        text: Raw text.
+
+    Returns:
+        str: NFC-normalized, case-folded text with collapsed whitespace and without
+             trailing punctuation, e.g. 'Open  Browser!' -> 'open browser'.
+    """
+    text = unicodedata.normalize('NFC', text).casefold()
+    return _WHITESPACE.sub(' ', text).strip(_TRAILING_PUNCTUATION)
+
+
+def make_cache_key(prompt: str, model: str, model_version: str = '', params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Build the cache key of a request.
+
+    Args:
+        prompt: Prompt text; normalized before hashing.
+        model: Model name.
+        model_version: Model version or digest; entries of other versions never match.
+        params: Sampling parameters (temperature, top_p, ...).
+
+    Returns:
+        str: Hex SHA-256 digest.
+    """
+    payload = json.dumps(
+        [normalize_prompt(prompt), model, model_version, params or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache of LLM responses.
+
+    Thread-safe. The synchronous methods may block on SQLite; async callers should use
+    ``aget``/``aput``, which serve memory hits inline and move disk I/O to a thread.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+        ttl_s: float = 7 * 24 * 3600.0
+    ):
+        """
+        Initialize the ResponseCache.
+
+        Args:
+            path: SQLite database file. None keeps the cache in memory only.
+            max_entries: Capacity of the in-memory LRU tier.
+            max_disk_entries: Capacity of the disk tier; oldest entries are trimmed.
+            ttl_s: Default time to live of an entry in seconds.
+        """
+        self.path = Path(path) if path is not None else None
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_s = ttl_s
+
+        # key -> (expires_at, model, model_version, response)
+        self._memory: 'OrderedDict[str, Tuple[float, str, str, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._puts_since_trim = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the SQLite database on first use."""
+        if self.path is None:
+            return None
+        if self._db is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " model_version TEXT NOT NULL,"
+                " response TEXT NOT NULL,"
+                " created REAL NOT NULL,"
+                " expires REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS responses_model ON responses (model, model_version)")
+            db.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            deleted = db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),)).rowcount
+            if deleted:
+                log.debug(f"Response cache purged {deleted} expired entries")
+            self._db = db
+            log.info(f"Response cache opened at {self.path}")
+        return self._db
+
+    def _remember(self, key: str, entry: Tuple[float, str, str, str]) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """
+        Look up the memory tier only. Never blocks on I/O.
+
+        Args:
+            key: Cache key from ``make_cache_key``.
+
+        Returns:
+            Optional[str]: Cached response, or None.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._memory[key]
+                self.expirations += 1
+                return None
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return entry[3]
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a response, promoting disk hits to the memory tier.
+
+        Args:
+            key: Cache key from ``make_cache_key``.
+
+        Returns:
+            Optional[str]: Cached response, or None on a miss.
+        """
+        response = self.get_memory(key)
+        if response is not None:
+            return response
+        return self._get_disk(key)
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        row = None
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                row = db.execute(
+                    "SELECT expires, model, model_version, response FROM responses WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is not None and row[0] <= time.time():
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.expirations += 1
+                    row = None
+        if row is None:
+            self.misses += 1
+            return None
+        self.disk_hits += 1
+        self._remember(key, tuple(row))
+        return row[3]
+
+    def put(
+        self,
+        key: str,
+        response: str,
+        model: str = '',
+        model_version: str = '',
+        ttl_s: Optional[float] = None
+    ) -> None:
+        """
+        Store a response in both tiers.
+
+        Args:
+            key: Cache key from ``make_cache_key``.
+            response: Raw model output.
+            model: Model name, used for invalidation.
+            model_version: Model version, used for invalidation.
+            ttl_s: Time to live; defaults to the cache TTL. 0 or less stores nothing.
+        """
+        if ttl_s is not None and ttl_s <= 0:
+            return
+        now = time.time()
+        expires = now + (self.ttl_s if ttl_s is None else ttl_s)
+        self._remember(key, (expires, model, model_version, response))
+        self.stores += 1
+        with self._db_lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, model_version, response, created, expires)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, model_version, response, now, expires)
+            )
+            self._puts_since_trim += 1
+            if self._puts_since_trim >= 256:
+                self._puts_since_trim = 0
+                self._trim(db)
+
+    def _trim(self, db: sqlite3.Connection) -> None:
+        """Drop expired entries and the oldest entries beyond the disk capacity."""
+        db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        excess = db.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_disk_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created LIMIT ?)",
+                (excess,)
+            )
+            self.evictions += excess
+
+    async def aget(self, key: str) -> Optional[str]:
+        """Async ``get``: memory hits are served inline, disk lookups run in a thread."""
+        response = self.get_memory(key)
+        if response is not None or self.path is None:
+            if response is None:
+                self.misses += 1
+            return response
+        return await asyncio.to_thread(self._get_disk, key)
+
+    async def aput(self, key: str, response: str, **kwargs: Any) -> None:
+        """Async ``put``: the SQLite write runs in a thread."""
+        await asyncio.to_thread(self.put, key, response, **kwargs)
+
+    def invalidate_model(self, model: str, keep_version: Optional[str] = None) -> int:
+        """
+        Remove the entries of a model, e.g. after it was updated.
+
+        Args:
+            model: Model name.
+            keep_version: Version whose entries stay valid; None removes all.
+
+        Returns:
+            int: Number of entries removed from both tiers.
+        """
+        with self._lock:
+            stale = [
+                key for key, (_, entry_model, version, _) in self._memory.items()
+                if entry_model == model and version != keep_version
+            ]
+            for key in stale:
+                del self._memory[key]
+        removed = len(stale)
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                if keep_version is None:
+                    cursor = db.execute("DELETE FROM responses WHERE model = ?", (model,))
+                else:
+                    cursor = db.execute(
+                        "DELETE FROM responses WHERE model = ? AND model_version != ?",
+                        (model, keep_version)
+                    )
+                removed = max(removed, cursor.rowcount)
+        self.invalidations += removed
+        if removed:
+            log.info(f"Response cache invalidated {removed} entries of model '{model}'")
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers."""
+        with self._lock:
+            self._memory.clear()
+        with self._db_lock:
+            db = self._connect()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+
+    def close(self) -> None:
+        """Close the SQLite database."""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits per tier, misses, hit rate, stores, evictions,
+                            expirations, invalidations and memory tier size.
+        """
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'invalidations': self.invalidations,
+            'memory_entries': len(self._memory),
+        }
@@ -0,0 +1,689 @@
+"""
+NeoMate AI Model Registry Module
+
+This module keeps track of the models NeoMate holds in memory (local LLM, Whisper,
+vision and NLP models) and keeps their combined size under a RAM budget. Models are
+registered with a loader and a size estimate. They are loaded on first use and pinned
+while in use. When a new model needs room, idle models are evicted, lowest priority
+first and then least recently used. While the assistant is idle, the models needed
+right after a wake word (LLM and speech-to-text) are preloaded, so the first answer
+does not wait for a cold load.
+
+Features:
+- RAM budget from configuration (absolute, or a fraction of physical memory)
+- Reference counting so a model that is in use is never evicted
+- Priority-ordered LRU eviction
+- Deduplicated async loading with sync or async loaders and unloaders
+- Blocking acquire for worker threads (e.g. Whisper transcription)
+- Memory-mapped weight loading for .npy, .safetensors and raw weight files
+- Speculative preloading while idle, bounded by available system memory
+- Load time, hit and eviction statistics, with a simulated benchmark
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import inspect
+import json
+import mmap
+import os
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+MB = 1024 * 1024
+
+# safetensors dtype -> NumPy dtype (BF16 has no NumPy type and is exposed as raw uint16)
+_SAFETENSORS_DTYPES = {
+    'F64': '<f8', 'F32': '<f4', 'F16': '<f2', 'BF16': '<u2',
+    'I64': '<i8', 'I32': '<i4', 'I16': '<i2', 'I8': 'i1',
+    'U64': '<u8', 'U32': '<u4', 'U16': '<u2', 'U8': 'u1', 'BOOL': '?',
+}
+
+
+class ModelLoadError(RuntimeError):
+    """Raised when a registered model cannot be loaded."""
+
+
+def total_memory_bytes() -> int:
+    """
+    Get the physical memory size.
+
+    Returns:
+        int: Total RAM in bytes (8 GB if it cannot be determined).
+    """
+    try:
+        import psutil
+        return int(psutil.virtual_memory().total)
+    except ImportError:
+        pass
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        return 8 * 1024 * MB
+
+
+def available_memory_bytes() -> Optional[int]:
+    """
+    Get the memory available to new allocations without swapping.
+
+    Returns:
+        Optional[int]: Available RAM in bytes, or None if it cannot be determined.
+    """
+    try:
+        import psutil
+        return int(psutil.virtual_memory().available)
+    except ImportError:
+        pass
+    try:
+        with open('/proc/meminfo') as meminfo:
+            for line in meminfo:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def map_weights(path: Union[str, Path]) -> Any:
+    """
+    Open model weights memory-mapped where the format allows it.
+
+    Mapped pages are read from disk on first access and live in the page cache.
+    That makes reloading an evicted model almost free while the file is still
+    cached, and lets processes share one copy of the weights.
+
+    - ``.npy``: read-only NumPy memmap
+    - ``.safetensors``: dict of read-only NumPy arrays viewing one file mapping
+    - anything else (``.gguf``, ``.onnx``, ``.bin``, ...): read-only mmap of the bytes
+
+    Args:
+        path: Weight file.
+
+    Returns:
+        Any: The mapped weights.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == '.npy':
+        import numpy as np
+        return np.load(path, mmap_mode='r')
+
+    with open(path, 'rb') as handle:
+        mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if suffix != '.safetensors':
+        return mapped
+
+    # Layout: u64 header length, JSON header, tensor data
+    import numpy as np
+    header_len = int.from_bytes(mapped[:8], 'little')
+    header = json.loads(mapped[8:8 + header_len])
+    base = 8 + header_len
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        start, end = info['data_offsets']
+        dtype = np.dtype(_SAFETENSORS_DTYPES[info['dtype']])
+        array = np.frombuffer(mapped, dtype=dtype, count=(end - start) // dtype.itemsize, offset=base + start)
+        tensors[name] = array.reshape(info['shape'])
+    return tensors
+
+
+def _process_rss() -> Optional[int]:
+    try:
+        import psutil
+        return int(psutil.Process().memory_info().rss)
+    except ImportError:
+        return None
+
+
+@dataclass
+class ModelSpec:
+    """A registered model and its residency state."""
+
+    name: str
+    loader: Callable[[], Any]
+    unloader: Optional[Callable[[Any], Any]] = None
+    size_bytes: int = 0
+    priority: int = 0
+    path: Optional[Path] = None
+    model: Any = None
+    refs: int = 0
+    last_used: float = 0.0
+    loads: int = 0
+    evictions: int = 0
+    load_s: float = 0.0
+
+    @property
+    def resident(self) -> bool:
+        return self.model is not None
+
+
+class ModelRegistry:
+    """
+    Loads, pins and evicts models within a RAM budget.
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None, budget_mb: Optional[float] = None):
+        """
+        Initialize the ModelRegistry.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            budget_mb: RAM budget in MB. If None, ``models.ram_budget_mb`` is used,
+                       or ``models.ram_budget_fraction`` (default 0.5) of physical RAM.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        models_config = self.config.get('models', {})
+
+        if budget_mb is None:
+            budget_mb = models_config.get('ram_budget_mb')
+        if budget_mb is None:
+            self.budget_bytes = int(total_memory_bytes() * models_config.get('ram_budget_fraction', 0.5))
+        else:
+            self.budget_bytes = int(budget_mb * MB)
+        # Speculative loads leave at least this much system memory free
+        self.preload_headroom_bytes = int(models_config.get('preload_headroom_mb', 1024) * MB)
+        self.preload_interval_s = models_config.get('preload_interval_s', 2.0)
+
+        self.specs: Dict[str, ModelSpec] = {}
+        # Sizes of resident models plus reservations of loads in progress
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.preloads = 0
+        # Guards refcounts and residency; releases may come from worker threads
+        self._lock = threading.Lock()
+        self._loading: Dict[str, asyncio.Task] = {}
+        # Loader threads of cancelled loads; a thread cannot be stopped, so shutdown
+        # waits for them and unloads what they produced
+        self._abandoned: Dict[asyncio.Future, ModelSpec] = {}
+        self._preloader: Optional[asyncio.Task] = None
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+
+        log.info(f"ModelRegistry initialized with a {self.budget_bytes / MB:.0f} MB budget")
+
+    def register(
+        self,
+        name: str,
+        loader: Optional[Callable[[], Any]] = None,
+        unloader: Optional[Callable[[Any], Any]] = None,
+        size_mb: Optional[float] = None,
+        priority: int = 0,
+        path: Optional[Union[str, Path]] = None
+    ) -> None:
+        """
+        Register a model without loading it.
+
+        Args:
+            name: Model name used to acquire it.
+            loader: Callable (sync or async) returning the loaded model. If None,
+                    ``path`` is opened with ``map_weights``.
+            unloader: Optional callable (sync or async) receiving the model on eviction.
+            size_mb: Memory the model occupies. If None, the size of ``path`` is used,
+                     or the process RSS growth measured during the first load.
+            priority: Higher priorities are evicted last.
+            path: Optional weight file.
+        """
+        if loader is None and path is None:
+            raise ValueError(f"Model '{name}' needs a loader or a weight path")
+        path = Path(path) if path is not None else None
+        if loader is None:
+            loader = lambda: map_weights(path)
+        if size_mb is not None:
+            size_bytes = int(size_mb * MB)
+        elif path is not None and path.exists():
+            size_bytes = path.stat().st_size
+        else:
+            size_bytes = 0
+        self.specs[name] = ModelSpec(
+            name=name,
+            loader=loader,
+            unloader=unloader,
+            size_bytes=size_bytes,
+            priority=priority,
+            path=path
+        )
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.specs
+
+    def is_resident(self, name: str) -> bool:
+        """Whether the model is loaded."""
+        spec = self.specs.get(name)
+        return spec is not None and spec.resident
+
+    def _spec(self, name: str) -> ModelSpec:
+        try:
+            return self.specs[name]
+        except KeyError:
+            raise KeyError(f"Unknown model '{name}'") from None
+
+    async def acquire(self, name: str) -> Any:
+        """
+        Get a model, loading it first if needed, and pin it until ``release``.
+
+        Args:
+            name: Model name.
+
+        Returns:
+            Any: The loaded model.
+
+        Raises:
+            KeyError: If the model is not registered.
+            ModelLoadError: If the loader fails.
+        """
+        spec = self._spec(name)
+        self._loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                if spec.model is not None:
+                    spec.refs += 1
+                    spec.last_used = time.monotonic()
+                    self.hits += 1
+                    return spec.model
+            task = self._loading.get(name)
+            if task is None:
+                task = self._loop.create_task(self._load(spec, speculative=False))
+                self._loading[name] = task
+            # Shielded so a cancelled caller does not abort a load others wait for.
+            # Loop afterwards: the model may have been evicted again before we pin it,
+            # or the running load was a speculative one that did not find room
+            await asyncio.shield(task)
+
+    def release(self, name: str) -> None:
+        """
+        Unpin a model acquired with ``acquire``. Safe to call from any thread.
+
+        Args:
+            name: Model name.
+        """
+        spec = self._spec(name)
+        with self._lock:
+            if spec.refs <= 0:
+                raise RuntimeError(f"Model '{name}' released more often than acquired")
+            spec.refs -= 1
+            spec.last_used = time.monotonic()
+
+    @asynccontextmanager
+    async def use(self, name: str) -> AsyncIterator[Any]:
+        """
+        Pin a model for the duration of an ``async with`` block.
+
+        Args:
+            name: Model name.
+
+        Yields:
+            Any: The loaded model.
+        """
+        model = await self.acquire(name)
+        try:
+            yield model
+        finally:
+            self.release(name)
+
+    @contextmanager
+    def hold(self, name: str, timeout: Optional[float] = None) -> Iterator[Any]:
+        """
+        Pin a model from a worker thread (loads run on the registry's event loop).
+
+        Args:
+            name: Model name.
+            timeout: Seconds to wait for the model to load.
+
+        Yields:
+            Any: The loaded model.
+
+        Raises:
+            RuntimeError: If called on the event loop thread or before the
+                          registry has seen an event loop.
+        """
+        if self._loop is None:
+            raise RuntimeError("ModelRegistry.hold() needs the registry to be created or used on an event loop")
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            raise RuntimeError("ModelRegistry.hold() would block the event loop; use 'async with registry.use()'")
+        model = asyncio.run_coroutine_threadsafe(self.acquire(name), self._loop).result(timeout)
+        try:
+            yield model
+        finally:
+            self.release(name)
+
+    def _select_victims(self, spec: ModelSpec, speculative: bool) -> Optional[List[Tuple[ModelSpec, Any]]]:
+        """
+        Reserve room for ``spec`` by evicting idle models. Caller holds the lock.
+
+        Returns:
+            Optional[List[Tuple[ModelSpec, Any]]]: Evicted models to unload, or None
+            if a speculative load does not fit without evicting models of equal or
+            higher priority.
+        """
+        overflow = self.used_bytes + spec.size_bytes - self.budget_bytes
+        candidates = sorted(
+            (other for other in self.specs.values()
+             if other.resident and other.refs == 0 and other is not spec
+             and (not speculative or other.priority < spec.priority)),
+            key=lambda other: (other.priority, other.last_used)
+        )
+        victims: List[ModelSpec] = []
+        for other in candidates:
+            if overflow <= 0:
+                break
+            victims.append(other)
+            overflow -= other.size_bytes
+        if overflow > 0 and speculative:
+            return None
+
+        evicted = []
+        for other in victims:
+            evicted.append((other, other.model))
+            other.model = None
+            other.evictions += 1
+            self.used_bytes -= other.size_bytes
+            self.evictions += 1
+        self.used_bytes += spec.size_bytes
+        if overflow > 0:
+            log.warning(
+                f"Loading model '{spec.name}' exceeds the RAM budget by {overflow / MB:.0f} MB "
+                f"(remaining models are in use)"
+            )
+        return evicted
+
+    async def _unload(self, spec: ModelSpec, model: Any) -> None:
+        log.info(f"Evicting model '{spec.name}' ({spec.size_bytes / MB:.0f} MB, priority {spec.priority})")
+        if spec.unloader is None:
+            return
+        try:
+            result = spec.unloader(model)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            log.warning(f"Failed to unload model '{spec.name}': {e}")
+
+    async def _load(self, spec: ModelSpec, speculative: bool) -> bool:
+        try:
+            with self._lock:
+                if spec.model is not None:
+                    return True
+                victims = self._select_victims(spec, speculative)
+            if victims is None:
+                return False
+            for victim, model in victims:
+                await self._unload(victim, model)
+
+            started = time.perf_counter()
+            rss_before = _process_rss() if not spec.size_bytes else None
+            try:
+                if inspect.iscoroutinefunction(spec.loader):
+                    model = await spec.loader()
+                else:
+                    worker = asyncio.ensure_future(asyncio.to_thread(spec.loader))
+                    try:
+                        model = await asyncio.shield(worker)
+                    except asyncio.CancelledError:
+                        if not worker.done():
+                            self._abandoned[worker] = spec
+                        raise
+                if model is None:
+                    raise ValueError("loader returned None")
+            except asyncio.CancelledError:
+                with self._lock:
+                    self.used_bytes -= spec.size_bytes
+                raise
+            except Exception as e:
+                with self._lock:
+                    self.used_bytes -= spec.size_bytes
+                raise ModelLoadError(f"Failed to load model '{spec.name}': {e}") from e
+
+            with self._lock:
+                if rss_before is not None:
+                    # Unknown size: charge what the load added to this process
+                    spec.size_bytes = max(0, (_process_rss() or rss_before) - rss_before)
+                    self.used_bytes += spec.size_bytes
+                spec.model = model
+                spec.loads += 1
+                spec.load_s = time.perf_counter() - started
+                spec.last_used = time.monotonic()
+                self.misses += 1
+                self.preloads += speculative
+            log.info(
+                f"Model '{spec.name}' loaded{' speculatively' if speculative else ''} in {spec.load_s:.2f} s "
+                f"({spec.size_bytes / MB:.0f} MB, {self.used_bytes / MB:.0f}/{self.budget_bytes / MB:.0f} MB used)"
+            )
+            return True
+        finally:
+            self._loading.pop(spec.name, None)
+
+    def _has_headroom(self, spec: ModelSpec) -> bool:
+        available = available_memory_bytes()
+        return available is None or available - spec.size_bytes >= self.preload_headroom_bytes
+
+    async def preload(self, names: Iterable[str]) -> List[str]:
+        """
+        Load models speculatively, without evicting models of equal or higher
+        priority and only while the system has memory to spare.
+
+        Args:
+            names: Models to preload, in order.
+
+        Returns:
+            List[str]: Models that are resident afterwards because of this call.
+        """
+        self._loop = asyncio.get_running_loop()
+        loaded = []
+        for name in names:
+            spec = self.specs.get(name)
+            if spec is None or spec.resident:
+                continue
+            if not self._has_headroom(spec):
+                log.debug(f"Not preloading model '{name}': system memory is low")
+                continue
+            task = self._loading.get(name)
+            if task is None:
+                task = self._loop.create_task(self._load(spec, speculative=True))
+                self._loading[name] = task
+            try:
+                if await asyncio.shield(task):
+                    loaded.append(name)
+            except ModelLoadError as e:
+                log.warning(str(e))
+        return loaded
+
+    def preload_when_idle(
+        self,
+        names: List[str],
+        is_idle: Callable[[], bool],
+        interval_s: Optional[float] = None
+    ) -> asyncio.Task:
+        """
+        Keep models resident in the background while the assistant is idle.
+
+        Every ``interval_s`` the idle check is evaluated. If it passes, the first
+        missing model is preloaded (one at a time, so idleness is re-checked
+        between loads). Models evicted in the meantime are loaded again on a
+        later tick.
+
+        Args:
+            names: Models to keep warm, most important first.
+            is_idle: Returns True while nothing is waiting on a model
+                     (e.g. the wake-word detector has not fired).
+            interval_s: Seconds between checks. Defaults to ``models.preload_interval_s``.
+
+        Returns:
+            asyncio.Task: The preloading task (cancelled by ``shutdown``).
+        """
+        interval_s = self.preload_interval_s if interval_s is None else interval_s
+
+        async def run() -> None:
+            while True:
+                await asyncio.sleep(interval_s)
+                try:
+                    if not is_idle():
+                        continue
+                    missing = [name for name in names if name in self.specs and not self.is_resident(name)]
+                    if missing:
+                        await self.preload(missing[:1])
+                except Exception as e:
+                    log.warning(f"Idle model preloading failed: {e}")
+
+        if self._preloader is not None:
+            self._preloader.cancel()
+        self._preloader = asyncio.get_running_loop().create_task(run())
+        return self._preloader
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get residency statistics.
+
+        Returns:
+            Dict[str, Any]: Budget, usage, counters and per-model state.
+        """
+        with self._lock:
+            return {
+                'budget_mb': self.budget_bytes / MB,
+                'used_mb': self.used_bytes / MB,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'preloads': self.preloads,
+                'models': {
+                    name: {
+                        'resident': spec.resident,
+                        'refs': spec.refs,
+                        'size_mb': spec.size_bytes / MB,
+                        'priority': spec.priority,
+                        'loads': spec.loads,
+                        'evictions': spec.evictions,
+                        'load_s': spec.load_s,
+                    }
+                    for name, spec in self.specs.items()
+                }
+            }
+
+    async def shutdown(self) -> None:
+        """
+        Stop preloading, cancel loads in progress and unload every resident model.
+
+        Returns once the cancelled loads, including their loader threads, have finished.
+        """
+        tasks = list(self._loading.values())
+        if self._preloader is not None:
+            tasks.append(self._preloader)
+            self._preloader = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+        abandoned, self._abandoned = self._abandoned, {}
+        results = await asyncio.gather(*abandoned, return_exceptions=True)
+        for spec, model in zip(abandoned.values(), results):
+            if model is not None and not isinstance(model, BaseException):
+                await self._unload(spec, model)
+
+        with self._lock:
+            resident = [(spec, spec.model) for spec in self.specs.values() if spec.resident]
+            for spec, _ in resident:
+                spec.model = None
+                self.used_bytes -= spec.size_bytes
+        for spec, model in resident:
+            await self._unload(spec, model)
+
+
+async def simulate(preload: bool, cycles: int = 6, disk_mb_per_s: float = 2000.0, time_scale: float = 0.1) -> Dict[str, float]:
+    """
+    Simulate wake-word interactions on a 12 GB machine (6 GB model budget) where
+    screen-reading models compete with the LLM and speech-to-text for memory.
+
+    Each cycle uses the vision models (which evicts speech models), idles, then a
+    wake word arrives and speech-to-text and the LLM are needed at once.
+
+    Args:
+        preload: Whether idle preloading is enabled.
+        cycles: Number of interactions.
+        disk_mb_per_s: Simulated load throughput.
+        time_scale: Factor applied to simulated load times.
+
+    Returns:
+        Dict[str, float]: Mean and worst wake-to-ready latency in simulated seconds.
+    """
+    registry = ModelRegistry(budget_mb=6000)
+    registry.preload_headroom_bytes = 0
+    models = {'llm': (4200, 100), 'stt': (500, 90), 'detector': (1500, 10), 'ocr': (300, 10)}
+    for name, (size_mb, priority) in models.items():
+        registry.register(
+            name,
+            loader=lambda size_mb=size_mb: time.sleep(size_mb / disk_mb_per_s * time_scale) or object(),
+            size_mb=size_mb,
+            priority=priority
+        )
+
+    idle = {'value': False}
+    if preload:
+        registry.preload_when_idle(['stt', 'llm'], lambda: idle['value'], interval_s=0.01)
+
+    latencies = []
+    for _ in range(cycles):
+        async with registry.use('detector'), registry.use('ocr'):
+            await asyncio.sleep(0.02)
+        idle['value'] = True
+        await asyncio.sleep(0.8)
+        idle['value'] = False
+
+        started = time.perf_counter()
+        stt, llm = await asyncio.gather(registry.acquire('stt'), registry.acquire('llm'))
+        latencies.append((time.perf_counter() - started) / time_scale)
+        registry.release('stt')
+        registry.release('llm')
+
+    await registry.shutdown()
+    return {'mean_s': sum(latencies) / len(latencies), 'max_s': max(latencies), 'evictions': registry.evictions}
+
+
+async def main():
+    """
+    Compare wake-to-ready latency with and without idle preloading, and mmap
+    versus read loading of a weight file.
+    """
+    import tempfile
+
+    import numpy as np
+
+    for preload in (False, True):
+        result = await simulate(preload)
+        label = 'idle preload' if preload else 'on demand'
+        print(f"{label:<13} wake->ready mean {result['mean_s']:.2f} s, max {result['max_s']:.2f} s, "
+              f"evictions {result['evictions']}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / 'weights.npy'
+        np.save(path, np.ones((64, MB // 4), dtype=np.float32))
+        started = time.perf_counter()
+        np.load(path)
+        read_s = time.perf_counter() - started
+        started = time.perf_counter()
+        mapped = map_weights(path)
+        map_s = time.perf_counter() - started
+        print(f"256 MB weights: read {read_s * 1000:.1f} ms, mmap {map_s * 1000:.2f} ms")
+        del mapped
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1 +1,640 @@
-#এই মডিউলে BERT বা TinyML ব্যবহার করে ইনটেন্ট ক্লাসিফিকেশন মডেল থাকবে যা ইনপুট টেক্সট থেকে ইনটেন্ট (e.g., query/work) আইডেন্টিফাই করবে; এটি NLP প্রসেসিংয়ের জন্য তৈরি, সঠিক রুটিং নিশ্চিত করে।
+"""
+NeoMate AI Intent Classifier Module
+
+This module decides which agent handles an utterance: general_agent
+(conversation and knowledge), work_agent (actions on the computer) or
+real_time_agent (live information). Running a transformer on every utterance
+would add its latency to every request, so classification is tiered. A compiled
+phrase trie and a hashed n-gram linear model answer in microseconds, for Bengali,
+English and code-mixed text. The heavy model (a BERT classifier or the LLM) runs
+only when the fast stage is not confident.
+
+Features:
+- Word-level phrase trie compiled from keyword/phrase lists, one pass per utterance
+- Hashed word and character n-gram features (stable CRC32 hashing, no vocabulary)
+- Multinomial logistic regression trained offline with SGD, stored as .npz
+- Trie matches added to the linear model's logits; softmax confidence
+- Escalation below ``intent_classifier.confidence_threshold`` to a pluggable async heavy model
+- Batch classification: one vectorized pass, one heavy call for the uncertain ones
+- Built-in bilingual seed data, evaluation and latency/accuracy benchmark
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import DATA_DIR
+from src.utils.logger import log
+
+INTENTS = ('general', 'work', 'real_time')
+
+INTENT_AGENTS = {
+    'general': 'general_agent',
+    'work': 'work_agent',
+    'real_time': 'real_time_agent',
+}
+
+# Latin words and numbers, or runs of Bengali letters with their vowel signs
+_TOKEN = re.compile(r"[a-z0-9']+|[ঀ-৿]+|[^\W\d_]+")
+
+# High-precision phrases per intent; a match adds its weight to the intent's logit
+DEFAULT_PHRASES: Dict[str, Dict[str, float]] = {
+    'work': {
+        'open': 1.5, 'close': 1.5, 'send email': 2.5, 'email to': 2.0, 'create a folder': 2.5,
+        'new folder': 2.5, 'schedule': 2.0, 'remind me': 2.5, 'screenshot': 2.5, 'set an alarm': 2.5,
+        'alarm': 2.0, 'save': 1.5, 'delete': 1.5, 'rename': 2.0, 'print': 1.5, 'minimize': 2.0,
+        'খোলো': 2.5, 'খুলে দাও': 2.5, 'বন্ধ করো': 2.0, 'পাঠাও': 2.0, 'মনে করিয়ে দিও': 2.5,
+        'স্ক্রিনশট': 2.5, 'অ্যালার্ম': 2.5, 'সেভ করো': 2.5, 'মুছে ফেলো': 2.5, 'শিডিউল': 2.0,
+        'প্রিন্ট করো': 2.5, 'ফোল্ডার': 1.5, 'ইমেইল': 1.5,
+    },
+    'real_time': {
+        'weather': 2.5, 'rain': 1.5, 'news': 2.5, 'what time': 2.5, 'score': 2.0, 'traffic': 2.5,
+        'exchange rate': 2.5, 'price of': 2.0, 'temperature': 2.5, 'right now': 1.0, 'live': 1.5,
+        'today\'s date': 2.5, 'battery': 2.0,
+        'আবহাওয়া': 2.5, 'বৃষ্টি': 1.5, 'খবর': 2.5, 'কয়টা বাজে': 2.5, 'স্কোর': 2.5, 'জ্যাম': 2.5,
+        'দাম': 2.0, 'রেট': 2.0, 'কত তারিখ': 2.5, 'তাপমাত্রা': 2.5, 'লাইভ': 1.5, 'ব্যাটারি': 2.0,
+    },
+    'general': {
+        'joke': 2.5, 'who are you': 2.5, 'thank you': 2.5, 'thanks': 2.0, 'good morning': 2.0,
+        'poem': 2.5, 'story': 2.0, 'explain': 1.5, 'what is the meaning': 2.0, 'how are you': 2.5,
+        'কৌতুক': 2.5, 'ধন্যবাদ': 2.5, 'কবিতা': 2.5, 'গল্প': 2.0, 'তুমি কে': 2.5, 'কেমন আছো': 2.5,
+        'বুঝিয়ে বলো': 2.0, 'মানে কী': 2.0,
+    },
+}
+
+SEED_EXAMPLES: List[Tuple[str, str]] = [
+    # general
+    ("tell me a joke", 'general'), ("who are you", 'general'), ("what is the capital of france", 'general'),
+    ("explain how photosynthesis works", 'general'), ("how are you today", 'general'),
+    ("what does serendipity mean", 'general'), ("write a poem about the rain", 'general'),
+    ("thank you so much", 'general'), ("good morning neomate", 'general'), ("who wrote gitanjali", 'general'),
+    ("what is machine learning", 'general'), ("help me understand recursion", 'general'),
+    ("tell me a story about a tiger", 'general'), ("what's your name", 'general'), ("give me a fun fact", 'general'),
+    ("how do i cook rice", 'general'), ("define democracy", 'general'), ("hi there", 'general'),
+    ("what is the meaning of life", 'general'), ("recommend a good book", 'general'),
+    ("why is the sky blue", 'general'), ("can you sing a song", 'general'), ("summarize the theory of relativity", 'general'),
+    ("একটা কৌতুক বলো", 'general'), ("তুমি কে", 'general'), ("ফ্রান্সের রাজধানী কী", 'general'),
+    ("সালোকসংশ্লেষণ কীভাবে কাজ করে বুঝিয়ে বলো", 'general'), ("তুমি কেমন আছো", 'general'),
+    ("বৃষ্টি নিয়ে একটা কবিতা লেখো", 'general'), ("অনেক ধন্যবাদ", 'general'), ("শুভ সকাল", 'general'),
+    ("গীতাঞ্জলি কে লিখেছেন", 'general'), ("মেশিন লার্নিং কী", 'general'), ("একটা গল্প বলো", 'general'),
+    ("তোমার নাম কী", 'general'), ("ভাত কীভাবে রান্না করতে হয়", 'general'), ("গণতন্ত্র মানে কী", 'general'),
+    ("হ্যালো", 'general'), ("জীবনের অর্থ কী", 'general'), ("একটা ভালো বই সাজেস্ট করো", 'general'),
+    ("মজার একটা তথ্য বলো", 'general'), ("আকাশ নীল কেন", 'general'), ("recursion ki jinish bujhiye bolo", 'general'),
+    # work
+    ("open the browser", 'work'), ("send an email to rahim", 'work'), ("create a new folder on the desktop", 'work'),
+    ("schedule a meeting tomorrow at 10", 'work'), ("remind me to call mom at 5 pm", 'work'),
+    ("open visual studio code", 'work'), ("save this document", 'work'), ("close all windows", 'work'),
+    ("take a screenshot", 'work'), ("rename the file to final report", 'work'),
+    ("copy these files to the usb drive", 'work'), ("add a task to my todo list", 'work'),
+    ("draft a reply to the last email", 'work'), ("open my calendar", 'work'), ("delete the downloads folder", 'work'),
+    ("start a zoom call with the team", 'work'), ("set an alarm for 6 am", 'work'),
+    ("fill my address in the form", 'work'), ("compress the project folder", 'work'), ("minimize this window", 'work'),
+    ("search my files for the invoice", 'work'), ("print the word file", 'work'), ("mute the microphone", 'work'),
+    ("ব্রাউজার খোলো", 'work'), ("রহিমকে একটা ইমেইল পাঠাও", 'work'), ("ডেস্কটপে একটা নতুন ফোল্ডার তৈরি করো", 'work'),
+    ("কাল সকাল ১০টায় একটা মিটিং শিডিউল করো", 'work'), ("বিকেল ৫টায় মাকে ফোন করার কথা মনে করিয়ে দিও", 'work'),
+    ("ফাইলটা সেভ করো", 'work'), ("সব উইন্ডো বন্ধ করো", 'work'), ("একটা স্ক্রিনশট নাও", 'work'),
+    ("ফাইলের নাম বদলে রিপোর্ট রাখো", 'work'), ("আমার টুডু লিস্টে একটা কাজ যোগ করো", 'work'),
+    ("শেষ ইমেইলের একটা উত্তর লেখো", 'work'), ("ক্যালেন্ডার খোলো", 'work'), ("ডাউনলোড ফোল্ডারটা মুছে ফেলো", 'work'),
+    ("সকাল ৬টায় অ্যালার্ম সেট করো", 'work'), ("ইনভয়েস ফাইলটা খুঁজে বের করো", 'work'),
+    ("এই উইন্ডোটা ছোট করো", 'work'), ("ওয়ার্ড ফাইলটা প্রিন্ট করো", 'work'), ("মাইক্রোফোন মিউট করো", 'work'),
+    ("chrome ta open koro", 'work'), ("vs code খুলে দাও", 'work'),
+    # real_time
+    ("what's the weather like today", 'real_time'), ("will it rain tomorrow in dhaka", 'real_time'),
+    ("what time is it now", 'real_time'), ("latest news headlines", 'real_time'),
+    ("what is the score of the cricket match", 'real_time'), ("how is the traffic to the office", 'real_time'),
+    ("current price of bitcoin", 'real_time'), ("dollar to taka exchange rate today", 'real_time'),
+    ("what's today's date", 'real_time'), ("is my flight delayed", 'real_time'),
+    ("how much battery is left", 'real_time'), ("what's the temperature outside", 'real_time'),
+    ("any breaking news", 'real_time'), ("apple stock price right now", 'real_time'),
+    ("when is the next train to chittagong", 'real_time'), ("is the internet connection working", 'real_time'),
+    ("how busy is the road now", 'real_time'), ("live score bangladesh vs india", 'real_time'),
+    ("is it going to be hot this afternoon", 'real_time'), ("which shops are open near me now", 'real_time'),
+    ("আজকের আবহাওয়া কেমন", 'real_time'), ("কাল ঢাকায় কি বৃষ্টি হবে", 'real_time'), ("এখন কয়টা বাজে", 'real_time'),
+    ("আজকের সর্বশেষ খবর কী", 'real_time'), ("ক্রিকেট খেলার স্কোর কত", 'real_time'),
+    ("অফিসে যাওয়ার রাস্তায় জ্যাম কেমন", 'real_time'), ("বিটকয়েনের দাম এখন কত", 'real_time'),
+    ("আজ ডলারের রেট কত", 'real_time'), ("আজ কত তারিখ", 'real_time'), ("বাইরে তাপমাত্রা কত", 'real_time'),
+    ("কোনো ব্রেকিং নিউজ আছে", 'real_time'), ("চট্টগ্রামের পরের ট্রেন কখন", 'real_time'),
+    ("ব্যাটারি কত শতাংশ আছে", 'real_time'), ("ইন্টারনেট কানেকশন কি ঠিক আছে", 'real_time'),
+    ("বাংলাদেশ বনাম ভারত লাইভ স্কোর", 'real_time'), ("ajke weather kemon", 'real_time'),
+    ("এখন বাইরে কি গরম", 'real_time'),
+]
+
+HeavyClassifier = Callable[[List[str]], Awaitable[List[Tuple[str, float]]]]
+
+
+@dataclass
+class IntentResult:
+    """Classification of one utterance."""
+
+    intent: str
+    confidence: float
+    agent: str
+    stage: str
+    latency_s: float = 0.0
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens of English, Bengali and romanized Bengali text."""
+    return _TOKEN.findall(text.lower())
+
+
+class PhraseTrie:
+    """
+    Word-level trie of phrases, compiled once and matched in one pass.
+    """
+
+    _END = ''
+
+    def __init__(self, phrases: Dict[str, Dict[str, float]], intents: Sequence[str] = INTENTS):
+        """
+        Compile phrase lists.
+
+        Args:
+            phrases: Intent -> {phrase: weight}.
+            intents: Intent order of the returned score vectors.
+        """
+        self.intents = list(intents)
+        self._root: Dict[str, Any] = {}
+        for intent, weights in phrases.items():
+            column = self.intents.index(intent)
+            for phrase, weight in weights.items():
+                node = self._root
+                for token in tokenize(phrase):
+                    node = node.setdefault(token, {})
+                node[self._END] = (column, weight)
+
+    def scores(self, tokens: Sequence[str]) -> np.ndarray:
+        """
+        Sum the weights of every phrase occurring in a token sequence.
+
+        Args:
+            tokens: Utterance tokens.
+
+        Returns:
+            np.ndarray: Score per intent.
+        """
+        out = np.zeros(len(self.intents), dtype=np.float32)
+        root, end = self._root, self._END
+        for start in range(len(tokens)):
+            node = root.get(tokens[start])
+            position = start + 1
+            while node is not None:
+                match = node.get(end)
+                if match is not None:
+                    out[match[0]] += match[1]
+                if position >= len(tokens):
+                    break
+                node = node.get(tokens[position])
+                position += 1
+        return out
+
+
+class HashedNgramModel:
+    """
+    Multinomial logistic regression over hashed word and character n-grams.
+    """
+
+    def __init__(self, intents: Sequence[str] = INTENTS, buckets: int = 1 << 18, char_ngrams: Tuple[int, ...] = (3, 4)):
+        """
+        Initialize an untrained model.
+
+        Args:
+            intents: Class labels.
+            buckets: Hash space size.
+            char_ngrams: Character n-gram sizes (inside words, with boundary marks).
+        """
+        self.intents = list(intents)
+        self.buckets = buckets
+        self.char_ngrams = tuple(char_ngrams)
+        self.weights = np.zeros((buckets, len(self.intents)), dtype=np.float32)
+        self.bias = np.zeros(len(self.intents), dtype=np.float32)
+
+    def features(self, tokens: Sequence[str]) -> np.ndarray:
+        """
+        Hash an utterance's unigrams, bigrams and character n-grams.
+
+        Args:
+            tokens: Utterance tokens.
+
+        Returns:
+            np.ndarray: Bucket indices (with repeats).
+        """
+        buckets = self.buckets
+        crc = zlib.crc32
+        out = []
+        previous = '<s>'
+        for token in tokens:
+            out.append(crc(token.encode()) % buckets)
+            out.append(crc(f'{previous} {token}'.encode()) % buckets)
+            previous = token
+            padded = f'<{token}>'
+            for n in self.char_ngrams:
+                for i in range(len(padded) - n + 1):
+                    out.append(crc(padded[i:i + n].encode(), 0x9E3779B9) % buckets)
+        return np.array(out, dtype=np.int64)
+
+    def logits(self, features: np.ndarray) -> np.ndarray:
+        """Class logits of one utterance's features."""
+        return self.weights[features].sum(axis=0) + self.bias
+
+    def batch_logits(self, features: List[np.ndarray]) -> np.ndarray:
+        """
+        Class logits of many utterances in one gather and segmented sum.
+
+        Args:
+            features: Feature arrays per utterance.
+
+        Returns:
+            np.ndarray: (n, classes) logits.
+        """
+        lengths = np.array([len(f) for f in features])
+        out = np.tile(self.bias, (len(features), 1))
+        nonempty = lengths > 0
+        if nonempty.any():
+            flat = np.concatenate([f for f in features if len(f)])
+            starts = np.concatenate(([0], np.cumsum(lengths[nonempty])[:-1]))
+            out[nonempty] += np.add.reduceat(self.weights[flat], starts, axis=0)
+        return out
+
+    def fit(
+        self,
+        features: List[np.ndarray],
+        labels: Sequence[int],
+        epochs: int = 40,
+        learning_rate: float = 0.2,
+        l2: float = 1e-4,
+        seed: int = 0
+    ) -> None:
+        """
+        Train with per-example SGD on the softmax cross-entropy.
+
+        Args:
+            features: Feature arrays per example.
+            labels: Class index per example.
+            epochs: Passes over the data.
+            learning_rate: Initial step size (decays linearly).
+            l2: L2 penalty on the touched weights.
+            seed: Shuffle seed.
+        """
+        rng = np.random.default_rng(seed)
+        targets = np.eye(len(self.intents), dtype=np.float32)
+        order = np.arange(len(features))
+        for epoch in range(epochs):
+            rng.shuffle(order)
+            step = learning_rate * (1 - epoch / epochs)
+            for i in order:
+                index, counts = np.unique(features[i], return_counts=True)
+                logits = self.weights[index].T @ counts.astype(np.float32) + self.bias
+                probabilities = np.exp(logits - logits.max())
+                probabilities /= probabilities.sum()
+                gradient = probabilities - targets[labels[i]]
+                scale = step / np.sqrt(len(index))
+                self.weights[index] -= scale * (counts[:, None] * gradient[None, :] + l2 * self.weights[index])
+                self.bias -= step * gradient
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Store the model as a compressed .npz file (only non-zero rows)."""
+        rows = np.flatnonzero(np.abs(self.weights).sum(axis=1))
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path, rows=rows, values=self.weights[rows], bias=self.bias, intents=np.array(self.intents),
+            buckets=self.buckets, char_ngrams=np.array(self.char_ngrams)
+        )
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'HashedNgramModel':
+        """Load a model stored with ``save``."""
+        with np.load(path) as data:
+            model = cls([str(i) for i in data['intents']], int(data['buckets']), tuple(int(n) for n in data['char_ngrams']))
+            model.weights[data['rows']] = data['values']
+            model.bias[:] = data['bias']
+        return model
+
+
+def _softmax(logits: np.ndarray) -> np.ndarray:
+    exp = np.exp(logits - logits.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+def train_model(examples: Iterable[Tuple[str, str]], intents: Sequence[str] = INTENTS, **options: Any) -> HashedNgramModel:
+    """
+    Train the hashed n-gram model on (text, intent) pairs.
+
+    Args:
+        examples: Training examples.
+        intents: Class labels.
+        **options: ``HashedNgramModel.fit`` options.
+
+    Returns:
+        HashedNgramModel: Trained model.
+    """
+    model = HashedNgramModel(intents)
+    texts, labels = zip(*examples)
+    model.fit([model.features(tokenize(text)) for text in texts], [model.intents.index(label) for label in labels], **options)
+    return model
+
+
+def llm_intent_classifier(generate: Callable[[str], Awaitable[str]], intents: Sequence[str] = INTENTS) -> HeavyClassifier:
+    """
+    Build a heavy classifier that asks the LLM, e.g. a background-priority
+    ``LLMScheduler.generate`` wrapper.
+
+    Args:
+        generate: Async function prompt -> text.
+        intents: Class labels.
+
+    Returns:
+        HeavyClassifier: Async function texts -> [(intent, confidence)].
+    """
+    async def classify(texts: List[str]) -> List[Tuple[str, float]]:
+        async def one(text: str) -> Tuple[str, float]:
+            prompt = (
+                f"Classify the request as one of: {', '.join(intents)}. 'work' means an action on the "
+                f"computer, 'real_time' means live information, 'general' is anything else. "
+                f"Answer with the label only.\nRequest: {text}\nLabel:"
+            )
+            answer = (await generate(prompt)).strip().lower()
+            label = next((intent for intent in intents if intent in answer), 'general')
+            return label, 0.9
+
+        return list(await asyncio.gather(*(one(text) for text in texts)))
+
+    return classify
+
+
+class IntentClassifier:
+    """
+    Tiered intent classifier: phrase trie + hashed n-gram model, heavy model on doubt.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        model: Optional[HashedNgramModel] = None,
+        heavy: Optional[HeavyClassifier] = None,
+        phrases: Optional[Dict[str, Dict[str, float]]] = None
+    ):
+        """
+        Initialize the IntentClassifier.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            model: Fast model. Loaded from ``intent_classifier.model_path`` if that exists,
+                   otherwise trained on the built-in seed examples.
+            heavy: Optional async heavy classifier for low-confidence utterances.
+            phrases: Intent -> {phrase: weight}. Defaults to ``DEFAULT_PHRASES``.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        intent_config = self.config.get('intent_classifier', {})
+
+        self.confidence_threshold = intent_config.get('confidence_threshold', 0.7)
+        if model is None:
+            model_path = Path(intent_config.get('model_path', DATA_DIR / "models" / "intent_classifier.npz"))
+            if model_path.exists():
+                model = HashedNgramModel.load(model_path)
+            else:
+                log.info("No trained intent model found, training on the built-in seed examples")
+                model = train_model(SEED_EXAMPLES)
+        self.model = model
+        self.trie = PhraseTrie(phrases if phrases is not None else DEFAULT_PHRASES, self.model.intents)
+        self.heavy = heavy
+
+        self.fast_answers = 0
+        self.escalations = 0
+
+    def _probabilities(self, tokens: List[str], features: np.ndarray) -> np.ndarray:
+        return _softmax(self.model.logits(features) + self.trie.scores(tokens))
+
+    def classify_fast(self, text: str) -> IntentResult:
+        """
+        Classify with the fast stage only.
+
+        Args:
+            text: Utterance.
+
+        Returns:
+            IntentResult: Best intent and its probability.
+        """
+        started = time.perf_counter()
+        tokens = tokenize(text)
+        probabilities = self._probabilities(tokens, self.model.features(tokens))
+        best = int(probabilities.argmax())
+        intent = self.model.intents[best]
+        return IntentResult(intent, float(probabilities[best]), INTENT_AGENTS.get(intent, intent), 'fast',
+                            time.perf_counter() - started)
+
+    async def classify(self, text: str) -> IntentResult:
+        """
+        Classify an utterance, escalating to the heavy model below the threshold.
+
+        Args:
+            text: Utterance.
+
+        Returns:
+            IntentResult: Classification; ``stage`` is 'fast' or 'heavy'.
+        """
+        return (await self.classify_batch([text]))[0]
+
+    def classify_batch_fast(self, texts: Sequence[str]) -> List[IntentResult]:
+        """
+        Classify many utterances with the fast stage in one vectorized pass.
+
+        Args:
+            texts: Utterances.
+
+        Returns:
+            List[IntentResult]: One result per utterance.
+        """
+        started = time.perf_counter()
+        tokens = [tokenize(text) for text in texts]
+        logits = self.model.batch_logits([self.model.features(t) for t in tokens])
+        logits += np.stack([self.trie.scores(t) for t in tokens]) if tokens else 0
+        probabilities = _softmax(logits)
+        best = probabilities.argmax(axis=1)
+        each = (time.perf_counter() - started) / max(1, len(texts))
+        results = []
+        for i, column in enumerate(best):
+            intent = self.model.intents[column]
+            results.append(IntentResult(intent, float(probabilities[i, column]), INTENT_AGENTS.get(intent, intent), 'fast', each))
+        return results
+
+    async def classify_batch(self, texts: Sequence[str]) -> List[IntentResult]:
+        """
+        Classify many utterances; the uncertain ones go to the heavy model in one call.
+
+        Args:
+            texts: Utterances.
+
+        Returns:
+            List[IntentResult]: One result per utterance.
+        """
+        results = self.classify_batch_fast(texts)
+        uncertain = [i for i, result in enumerate(results) if result.confidence < self.confidence_threshold]
+        self.fast_answers += len(results) - len(uncertain)
+        if not uncertain or self.heavy is None:
+            return results
+
+        self.escalations += len(uncertain)
+        started = time.perf_counter()
+        try:
+            answers = await self.heavy([texts[i] for i in uncertain])
+        except Exception as e:
+            log.warning(f"Heavy intent model failed, keeping the fast answers: {e}")
+            return results
+        elapsed = time.perf_counter() - started
+        for i, (intent, confidence) in zip(uncertain, answers):
+            results[i] = IntentResult(intent, confidence, INTENT_AGENTS.get(intent, intent), 'heavy',
+                                      results[i].latency_s + elapsed)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get tier statistics.
+
+        Returns:
+            Dict[str, Any]: Fast answers, escalations and escalation rate.
+        """
+        total = self.fast_answers + self.escalations
+        return {
+            'fast_answers': self.fast_answers,
+            'escalations': self.escalations,
+            'escalation_rate': self.escalations / total if total else 0.0,
+        }
+
+
+def evaluate(classifier: IntentClassifier, examples: Sequence[Tuple[str, str]]) -> Dict[str, Any]:
+    """
+    Evaluate the fast stage.
+
+    Args:
+        classifier: Classifier to evaluate.
+        examples: (text, intent) pairs.
+
+    Returns:
+        Dict[str, Any]: Accuracy, accuracy of the confident answers, escalation rate
+                        and per-intent recall.
+    """
+    results = classifier.classify_batch_fast([text for text, _ in examples])
+    correct = [result.intent == label for result, (_, label) in zip(results, examples)]
+    confident = [ok for ok, result in zip(correct, results) if result.confidence >= classifier.confidence_threshold]
+    recall = {}
+    for intent in classifier.model.intents:
+        hits = [ok for ok, (_, label) in zip(correct, examples) if label == intent]
+        recall[intent] = sum(hits) / len(hits) if hits else 0.0
+    return {
+        'examples': len(examples),
+        'accuracy': sum(correct) / len(correct) if correct else 0.0,
+        'confident_accuracy': sum(confident) / len(confident) if confident else 0.0,
+        'escalation_rate': 1 - len(confident) / len(correct) if correct else 0.0,
+        'recall': recall,
+    }
+
+
+def cross_validate(examples: Sequence[Tuple[str, str]], folds: int = 5, seed: int = 0) -> Dict[str, float]:
+    """
+    k-fold cross-validation of the fast stage on held-out examples.
+
+    Args:
+        examples: (text, intent) pairs.
+        folds: Number of folds.
+        seed: Shuffle seed.
+
+    Returns:
+        Dict[str, float]: Mean accuracy, confident accuracy and escalation rate.
+    """
+    order = np.random.default_rng(seed).permutation(len(examples))
+    totals = {'accuracy': 0.0, 'confident_accuracy': 0.0, 'escalation_rate': 0.0}
+    for fold in range(folds):
+        test = set(order[fold::folds].tolist())
+        train = [examples[i] for i in range(len(examples)) if i not in test]
+        classifier = IntentClassifier(model=train_model(train), config_loader=None)
+        result = evaluate(classifier, [examples[i] for i in sorted(test)])
+        for key in totals:
+            totals[key] += result[key] / folds
+    return totals
+
+
+async def benchmark(heavy_latency_s: float = 0.04) -> Dict[str, float]:
+    """
+    Measure fast-stage latency and compare tiered classification with running a
+    heavy model on every utterance (simulated: ``heavy_latency_s`` per batch, always right).
+
+    Args:
+        heavy_latency_s: Simulated heavy model latency.
+
+    Returns:
+        Dict[str, float]: Latency percentiles, batch throughput and mean latency per mode.
+    """
+    import statistics
+
+    truth = dict(SEED_EXAMPLES)
+    classifier = IntentClassifier(model=train_model(SEED_EXAMPLES[::2] + SEED_EXAMPLES[1::4]))
+    held_out = SEED_EXAMPLES[3::4]
+
+    async def heavy(texts: List[str]) -> List[Tuple[str, float]]:
+        await asyncio.sleep(heavy_latency_s)
+        return [(truth[text], 0.95) for text in texts]
+
+    texts = [text for text, _ in SEED_EXAMPLES]
+    for text in texts[:50]:
+        classifier.classify_fast(text)
+    latencies = []
+    for _ in range(5):
+        for text in texts:
+            started = time.perf_counter()
+            classifier.classify_fast(text)
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    started = time.perf_counter()
+    for _ in range(20):
+        classifier.classify_batch_fast(texts)
+    batch_rate = 20 * len(texts) / (time.perf_counter() - started)
+
+    classifier.heavy = heavy
+    tiered_latencies, correct = [], 0
+    for text, label in held_out:
+        started = time.perf_counter()
+        result = await classifier.classify(text)
+        tiered_latencies.append(time.perf_counter() - started)
+        correct += result.intent == label
+    return {
+        'p50_us': statistics.median(latencies) * 1e6,
+        'p99_us': latencies[int(len(latencies) * 0.99)] * 1e6,
+        'batch_per_s': batch_rate,
+        'tiered_mean_ms': statistics.mean(tiered_latencies) * 1000,
+        'tiered_accuracy': correct / len(held_out),
+        'escalation_rate': classifier.stats()['escalation_rate'],
+        'heavy_mean_ms': heavy_latency_s * 1000,
+    }
+
+
+async def main():
+    """
+    Report cross-validated accuracy and the latency benchmark on the seed data.
+    """
+    cv = cross_validate(SEED_EXAMPLES)
+    print(f"5-fold CV on {len(SEED_EXAMPLES)} seed examples: accuracy {cv['accuracy']:.3f}, "
+          f"confident accuracy {cv['confident_accuracy']:.3f}, escalation {cv['escalation_rate'] * 100:.1f}%")
+    result = await benchmark()
+    print(f"fast stage: p50 {result['p50_us']:.1f} us, p99 {result['p99_us']:.1f} us, "
+          f"batch {result['batch_per_s']:,.0f} utterances/s")
+    print(f"held-out, tiered: mean {result['tiered_mean_ms']:.2f} ms, accuracy {result['tiered_accuracy']:.3f}, "
+          f"escalated {result['escalation_rate'] * 100:.1f}%  (heavy model on every utterance: "
+          f"{result['heavy_mean_ms']:.0f} ms)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
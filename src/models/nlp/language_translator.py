@@ -1 +1,739 @@
-#এই মডিউলে transformers ব্যবহার করে ভাষা অনুবাদ ফাংশন থাকবে যা বাংলা/ইংরেজি মিক্স হ্যান্ডল করবে; এটি মাল্টি-ল্যাঙ্গুয়েজ সাপোর্টের জন্য তৈরি, গ্লোবাল ইউজারদের জন্য অ্যাক্সেসিবিলিটি বাড়ায়।
+"""
+NeoMate AI Language Translator Module
+
+This module translates between Bengali and English, including code-mixed text
+such as "আমার laptop টা খোলো". Running whole utterances through a transformer one
+at a time is slow, so text is split into sentences and script spans first. Only
+the spans that are not already in the target language go to the model. Finished
+sentences are cached. Concurrent requests share forward passes: segments queue for
+a short batching window and are translated together.
+
+Features:
+- Vectorized script detection over Unicode code-point ranges (NumPy)
+- Sentence and code-mixed span splitting; short islands of the other script stay with their sentence
+- Sentence-level LRU translation cache with hit statistics
+- Async batching window with in-flight deduplication and length-sorted batches
+- Pluggable model: MarianMT through transformers (CPU) or any batch callable
+- Stub model and throughput/latency benchmark
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+NEUTRAL, LATIN, BENGALI = 0, 1, 2
+
+SCRIPT_LANGUAGES = {LATIN: 'en', BENGALI: 'bn'}
+LANGUAGE_SCRIPTS = {language: script for script, language in SCRIPT_LANGUAGES.items()}
+
+# Code-point range starts and the script of each range. Digits, punctuation, spaces,
+# Bengali digits and other scripts are neutral and join the neighbouring span.
+_RANGE_STARTS = np.array([0x41, 0x5B, 0x61, 0x7B, 0xC0, 0x250, 0x980, 0x9E6, 0x9F0, 0xA00], dtype=np.uint32)
+_RANGE_SCRIPTS = np.array(
+    [NEUTRAL, LATIN, NEUTRAL, LATIN, NEUTRAL, LATIN, NEUTRAL, BENGALI, NEUTRAL, BENGALI, NEUTRAL], dtype=np.int8
+)
+
+# A sentence ends at ., !, ?, । or ॥ followed by whitespace or the end of the text
+_SENTENCE = re.compile(r'(?:[^.!?।॥]|[.!?।॥](?![.!?।॥]*(?:\s|$)))*(?:[.!?।॥]+|$)\s*')
+_WHITESPACE = re.compile(r'\s+')
+
+TranslationModel = Callable[[List[str], str, str], List[str]]
+
+
+class TranslationError(RuntimeError):
+    """Raised when the translation model fails."""
+
+
+@dataclass
+class Span:
+    """A run of text in one script; neutral characters belong to the span before them."""
+
+    text: str
+    script: int
+    start: int
+    end: int
+
+    @property
+    def language(self) -> Optional[str]:
+        return SCRIPT_LANGUAGES.get(self.script)
+
+
+def script_codes(text: str) -> np.ndarray:
+    """
+    Classify every character of a text by script.
+
+    Args:
+        text: Text.
+
+    Returns:
+        np.ndarray: NEUTRAL, LATIN or BENGALI per character.
+    """
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype='<u4')
+    return _RANGE_SCRIPTS[np.searchsorted(_RANGE_STARTS, codes, side='right')]
+
+
+def detect_language(text: str) -> Tuple[Optional[str], Dict[str, float]]:
+    """
+    Detect the dominant language of a text by script.
+
+    Args:
+        text: Text.
+
+    Returns:
+        Tuple[Optional[str], Dict[str, float]]: 'bn', 'en' or None (no letters), and
+        the share of letters per language.
+    """
+    counts = np.bincount(script_codes(text), minlength=3)
+    letters = int(counts[LATIN] + counts[BENGALI])
+    if not letters:
+        return None, {'en': 0.0, 'bn': 0.0}
+    shares = {'en': counts[LATIN] / letters, 'bn': counts[BENGALI] / letters}
+    return max(shares, key=shares.get), {language: float(share) for language, share in shares.items()}
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split text into sentences; joining the result gives the text back.
+
+    Args:
+        text: Text.
+
+    Returns:
+        List[str]: Sentences with their trailing punctuation and whitespace.
+    """
+    return [sentence for sentence in _SENTENCE.findall(text) if sentence]
+
+
+def split_spans(text: str) -> List[Span]:
+    """
+    Split text into contiguous single-script spans.
+
+    Args:
+        text: Text.
+
+    Returns:
+        List[Span]: Spans covering the whole text in order.
+    """
+    if not text:
+        return []
+    scripts = script_codes(text)
+    letters = np.flatnonzero(scripts)
+    if not len(letters):
+        return [Span(text, NEUTRAL, 0, len(text))]
+    # Neutral characters take the script of the last letter before them (or the first letter)
+    last = np.where(scripts != NEUTRAL, np.arange(len(scripts)), letters[0])
+    filled = scripts[np.maximum.accumulate(last)]
+    bounds = np.concatenate(([0], np.flatnonzero(filled[1:] != filled[:-1]) + 1, [len(text)]))
+    return [Span(text[start:end], int(filled[start]), int(start), int(end))
+            for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+
+
+def cache_key(text: str) -> str:
+    """Normalize a segment for caching: NFC and collapsed whitespace."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+class TranslationCache:
+    """
+    LRU cache of translated segments per direction. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 8192):
+        """
+        Initialize the TranslationCache.
+
+        Args:
+            max_entries: Maximum cached segments.
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Tuple[str, str, str], str]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, source: str, target: str, text: str) -> Optional[str]:
+        """
+        Look up a translation.
+
+        Args:
+            source: Source language.
+            target: Target language.
+            text: Segment, normalized with ``cache_key``.
+
+        Returns:
+            Optional[str]: Cached translation, or None.
+        """
+        key = (source, target, text)
+        with self._lock:
+            translation = self._entries.get(key)
+            if translation is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return translation
+
+    def put(self, source: str, target: str, text: str, translation: str) -> None:
+        """
+        Store a translation, evicting the least recently used entry when full.
+
+        Args:
+            source: Source language.
+            target: Target language.
+            text: Segment, normalized with ``cache_key``.
+            translation: Its translation.
+        """
+        with self._lock:
+            self._entries[(source, target, text)] = translation
+            self._entries.move_to_end((source, target, text))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Entries, hits, misses, hit rate and evictions.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+class MarianTranslator:
+    """
+    MarianMT models through transformers on the CPU, loaded on first use per direction.
+    """
+
+    DEFAULT_MODELS = {
+        'bn-en': 'Helsinki-NLP/opus-mt-bn-en',
+        'en-bn': 'Helsinki-NLP/opus-mt-en-mul',
+    }
+    # Multilingual target models need the target language token in front of the input
+    DEFAULT_PREFIXES = {'en-bn': '>>ben<< '}
+
+    def __init__(
+        self,
+        models: Optional[Dict[str, str]] = None,
+        prefixes: Optional[Dict[str, str]] = None,
+        max_new_tokens: int = 256,
+        threads: Optional[int] = None,
+        model_registry: Optional[Any] = None,
+        size_mb: float = 300.0
+    ):
+        """
+        Initialize the translator.
+
+        Args:
+            models: Direction ('bn-en') -> model name or path.
+            prefixes: Direction -> text put in front of every input.
+            max_new_tokens: Generation limit per segment.
+            threads: Torch intra-op threads; torch's default if None.
+            model_registry: Optional ModelRegistry. Each direction is registered there
+                            as 'translation.<direction>' and pinned per call, so the
+                            models are loaded and evicted within the RAM budget.
+            size_mb: Memory of one loaded direction, for the registry's budget.
+        """
+        self.models = {**self.DEFAULT_MODELS, **(models or {})}
+        self.prefixes = {**self.DEFAULT_PREFIXES, **(prefixes or {})}
+        self.max_new_tokens = max_new_tokens
+        self.threads = threads
+        self._loaded: Dict[str, Tuple[Any, Any]] = {}
+        self._lock = threading.Lock()
+
+        self.model_registry = model_registry
+        if model_registry is not None:
+            for direction in self.models:
+                name = self.registry_name(direction)
+                if name not in model_registry:
+                    model_registry.register(
+                        name,
+                        loader=lambda direction=direction: self.load(direction),
+                        unloader=lambda _, direction=direction: self.unload(direction),
+                        size_mb=size_mb
+                    )
+
+    @staticmethod
+    def registry_name(direction: str) -> str:
+        """Model registry name of a direction's model."""
+        return f'translation.{direction}'
+
+    def load(self, direction: str) -> Tuple[Any, Any]:
+        """
+        Load a direction's tokenizer and model.
+
+        Args:
+            direction: 'bn-en' or 'en-bn'.
+
+        Returns:
+            Tuple[Any, Any]: Tokenizer and model.
+        """
+        import torch
+        from transformers import MarianMTModel, MarianTokenizer
+
+        if self.threads:
+            torch.set_num_threads(self.threads)
+        name = self.models[direction]
+        started = time.perf_counter()
+        model = MarianMTModel.from_pretrained(name).eval()
+        tokenizer = MarianTokenizer.from_pretrained(name)
+        log.info(f"Loaded translation model {name} in {time.perf_counter() - started:.1f}s")
+        return tokenizer, model
+
+    def unload(self, direction: str) -> None:
+        """Drop a direction's model (the registry's eviction hook)."""
+        with self._lock:
+            self._loaded.pop(direction, None)
+        log.info(f"Translation model {self.models[direction]} unloaded")
+
+    @contextmanager
+    def _pinned(self, direction: str) -> Iterator[Tuple[Any, Any]]:
+        """A direction's tokenizer and model, pinned in the registry while the block runs."""
+        name = self.registry_name(direction)
+        if self.model_registry is not None and name in self.model_registry:
+            with self.model_registry.hold(name) as loaded:
+                yield loaded
+            return
+        with self._lock:
+            if direction not in self._loaded:
+                self._loaded[direction] = self.load(direction)
+            loaded = self._loaded[direction]
+        yield loaded
+
+    def __call__(self, texts: List[str], source: str, target: str) -> List[str]:
+        import torch
+
+        direction = f'{source}-{target}'
+        prefix = self.prefixes.get(direction, '')
+        with self._pinned(direction) as (tokenizer, model):
+            batch = tokenizer([prefix + text for text in texts], return_tensors='pt', padding=True, truncation=True)
+            with torch.inference_mode():
+                output = model.generate(**batch, max_new_tokens=self.max_new_tokens)
+            return tokenizer.batch_decode(output, skip_special_tokens=True)
+
+
+class StubTranslationModel:
+    """
+    Stand-in for a CPU seq2seq model: each call costs a fixed overhead plus a cost
+    per padded token of the batch, like one encoder/decoder pass. Output is the
+    input tagged with the direction. Used by the benchmark.
+    """
+
+    def __init__(self, call_s: float = 0.04, token_s: float = 0.0006):
+        """
+        Initialize the stub.
+
+        Args:
+            call_s: Fixed cost per forward pass.
+            token_s: Cost per token of the padded batch.
+        """
+        self.call_s = call_s
+        self.token_s = token_s
+        self.calls = 0
+        self.segments = 0
+
+    def __call__(self, texts: List[str], source: str, target: str) -> List[str]:
+        tokens = max(len(text.split()) * 3 // 2 + 2 for text in texts)
+        time.sleep(self.call_s + self.token_s * tokens * len(texts))
+        self.calls += 1
+        self.segments += len(texts)
+        return [f'[{source}>{target}] {text}' for text in texts]
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    if not future.cancelled():
+        future.exception()
+
+
+class LanguageTranslator:
+    """
+    Bengali/English translator with span splitting, caching and batched model calls.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        model: Optional[TranslationModel] = None,
+        cache: Optional[TranslationCache] = None,
+        model_registry: Optional[Any] = None
+    ):
+        """
+        Initialize the LanguageTranslator.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            model: Batch model (texts, source, target) -> translations. Defaults to
+                   MarianTranslator with ``translation.models``.
+            cache: Translation cache. Created with ``translation.cache_entries`` if None.
+            model_registry: Optional ModelRegistry the default MarianTranslator loads through.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        translation_config = self.config.get('translation', {})
+
+        self.model = model or MarianTranslator(
+            translation_config.get('models'),
+            translation_config.get('prefixes'),
+            translation_config.get('max_new_tokens', 256),
+            translation_config.get('threads'),
+            model_registry=model_registry,
+            size_mb=translation_config.get('size_mb', 300.0)
+        )
+        self.cache = cache if cache is not None else TranslationCache(translation_config.get('cache_entries', 8192))
+        self.target = translation_config.get('target', 'en')
+        self.batch_window = translation_config.get('batch_window_ms', 10) / 1000
+        self.max_batch = translation_config.get('max_batch', 16)
+        # Islands of up to this many words in the other script are loanwords
+        # ("laptop টা খোলো") and go with the text around them
+        self.max_island_words = translation_config.get('max_island_words', 2)
+
+        self._pending: Dict[Tuple[str, str], Dict[str, asyncio.Future]] = {}
+        self._timers: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        # Running flushes; the loop only keeps weak references to tasks
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._model_lock = asyncio.Lock()
+        self.requests = 0
+        self.model_calls = 0
+        self.model_segments = 0
+
+    def segments(self, text: str, target: Optional[str] = None) -> List[Tuple[str, Optional[str]]]:
+        """
+        Split text into pieces and the source language of the pieces that need translation.
+
+        Args:
+            text: Text.
+            target: Target language ('en' or 'bn'); ``translation.target`` if None.
+
+        Returns:
+            List[Tuple[str, Optional[str]]]: (piece, source language or None to keep
+            as is); joining the pieces gives the text back.
+        """
+        target_script = LANGUAGE_SCRIPTS[target or self.target]
+        out: List[Tuple[str, Optional[str]]] = []
+        for sentence in split_sentences(text):
+            spans = split_spans(sentence)
+            words = {LATIN: 0, BENGALI: 0}
+            for span in spans:
+                if span.script != NEUTRAL:
+                    words[span.script] += len(span.text.split())
+            dominant = max(words, key=words.get)
+            for span in spans:
+                # A short island in the other script goes with the rest of the sentence
+                if span.script != NEUTRAL and len(span.text.split()) <= self.max_island_words:
+                    span.script = dominant
+                source = None if span.script in (target_script, NEUTRAL) else span.language
+                if out and out[-1][1] == source:
+                    out[-1] = (out[-1][0] + span.text, source)
+                else:
+                    out.append((span.text, source))
+        return out
+
+    def _enqueue(self, source: str, target: str, text: str) -> asyncio.Future:
+        direction = (source, target)
+        pending = self._pending.setdefault(direction, {})
+        future = pending.get(text)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Every waiter may have gone by the time a batch fails; retrieve the error
+        # here so it is not reported as never retrieved
+        future.add_done_callback(_retrieve)
+        pending[text] = future
+        if len(pending) >= self.max_batch:
+            timer = self._timers.pop(direction, None)
+            if timer is not None:
+                timer.cancel()
+            self._start_flush(direction)
+        elif direction not in self._timers:
+            self._timers[direction] = loop.call_later(self.batch_window, self._start_flush, direction)
+        return future
+
+    def _start_flush(self, direction: Tuple[str, str]) -> None:
+        task = asyncio.create_task(self._flush(direction))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, direction: Tuple[str, str]) -> None:
+        async with self._model_lock:
+            # Taken only once the model is free, so segments that arrived meanwhile join
+            timer = self._timers.pop(direction, None)
+            if timer is not None:
+                timer.cancel()
+            pending = self._pending.pop(direction, {})
+            if not pending:
+                return
+            texts = sorted(pending, key=len)
+            source, target = direction
+            for start in range(0, len(texts), self.max_batch):
+                chunk = texts[start:start + self.max_batch]
+                try:
+                    translations = await asyncio.to_thread(self.model, chunk, source, target)
+                except Exception as e:
+                    log.error(f"Translation of {len(chunk)} segments {source}->{target} failed: {e}")
+                    for text in chunk:
+                        if not pending[text].done():
+                            pending[text].set_exception(TranslationError(str(e)))
+                    continue
+                self.model_calls += 1
+                self.model_segments += len(chunk)
+                for text, translation in zip(chunk, translations):
+                    self.cache.put(source, target, text, translation)
+                    if not pending[text].done():
+                        pending[text].set_result(translation)
+
+    async def translate(self, text: str, target: Optional[str] = None) -> str:
+        """
+        Translate text into the target language; parts already in it are kept.
+
+        Args:
+            text: Bengali, English or code-mixed text.
+            target: 'en' or 'bn'; ``translation.target`` if None.
+
+        Returns:
+            str: Translated text.
+
+        Raises:
+            TranslationError: If the model fails.
+        """
+        target = target or self.target
+        self.requests += 1
+        pieces = self.segments(text, target)
+        parts: List[Any] = []
+        for piece, source in pieces:
+            core = cache_key(piece) if source else ''
+            if not core:
+                parts.append(piece)
+                continue
+            leading = piece[:len(piece) - len(piece.lstrip())]
+            trailing = piece[len(piece.rstrip()):]
+            translation = self.cache.get(source, target, core)
+            parts.append((leading, translation if translation is not None else self._enqueue(source, target, core), trailing))
+        waiting = [part[1] for part in parts if isinstance(part, tuple) and isinstance(part[1], asyncio.Future)]
+        if waiting:
+            # The futures are shared with every request for the same segment; shielded
+            # so a cancelled caller does not cancel them for the others
+            await asyncio.gather(*(asyncio.shield(future) for future in waiting))
+        out = []
+        for part in parts:
+            if isinstance(part, tuple):
+                leading, translation, trailing = part
+                if isinstance(translation, asyncio.Future):
+                    translation = translation.result()
+                out.append(f'{leading}{translation}{trailing}')
+            else:
+                out.append(part)
+        return ''.join(out)
+
+    async def translate_batch(self, texts: Sequence[str], target: Optional[str] = None) -> List[str]:
+        """
+        Translate many texts; their segments share model batches.
+
+        Args:
+            texts: Texts.
+            target: 'en' or 'bn'; ``translation.target`` if None.
+
+        Returns:
+            List[str]: Translations in order.
+        """
+        return list(await asyncio.gather(*(self.translate(text, target) for text in texts)))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get translation counters.
+
+        Returns:
+            Dict[str, Any]: Requests, model calls, segments per call and cache statistics.
+        """
+        return {
+            'requests': self.requests,
+            'model_calls': self.model_calls,
+            'segments_per_call': self.model_segments / self.model_calls if self.model_calls else 0.0,
+            **{f'cache_{key}': value for key, value in self.cache.stats().items()},
+        }
+
+
+_BENGALI_SENTENCES = [
+    "আজকের আবহাওয়া কেমন?", "আমাকে কাল সকালে মনে করিয়ে দিও।", "তুমি কি গান শুনতে পছন্দ করো?",
+    "আমার মায়ের জন্মদিন ১২ মার্চ।", "এই ফাইলটা কোথায় রাখলে?", "আমি আজ অফিসে যাব না।",
+    "রাতের খাবারে কী রান্না করব?", "ঢাকায় আজ খুব জ্যাম।", "আমাকে একটা গল্প বলো।", "ধন্যবাদ, খুব সাহায্য হলো।",
+]
+_ENGLISH_SENTENCES = [
+    "Open the browser please.", "What time is the meeting?", "Send the report to Rahim.",
+    "Play some music.", "How is the traffic today?",
+]
+_MIXED_SENTENCES = [
+    "আমার laptop টা খোলো।", "meeting টা কখন শুরু হবে?", "এই email এর reply লিখে দাও।",
+    "আজকে weather কেমন?", "Please আমাকে দশ মিনিট পরে call দিও।", "আমি report টা শেষ করেছি, now send it to the team.",
+]
+
+
+_TEMPLATES = [
+    "আমাকে {n} মিনিট পরে মনে করিয়ে দিও।", "{name}কে বলো আমি {n} টায় আসব।", "{name} এর email টা খোলো।",
+    "{n} টার meeting টা cancel করো।", "{name}কে {n} টাকা পাঠাও।",
+]
+_NAMES = ["রহিম", "করিম", "সুমি", "নাদিয়া", "তানভীর", "মিতু"]
+_BENGALI_DIGITS = str.maketrans('0123456789', '০১২৩৪৫৬৭৮৯')
+
+
+def conversation_workload(n: int = 240, templated: float = 0.4, seed: int = 5) -> List[str]:
+    """
+    Generate utterances with the repetition of real use: a Zipf-distributed choice
+    among Bengali, English, code-mixed and two-sentence utterances, and a share of
+    templated utterances with names and numbers that are mostly unique.
+
+    Args:
+        n: Number of utterances.
+        templated: Share of templated utterances.
+        seed: Random seed.
+
+    Returns:
+        List[str]: Utterances.
+    """
+    rng = np.random.default_rng(seed)
+    sentences = _BENGALI_SENTENCES + _ENGLISH_SENTENCES + _MIXED_SENTENCES
+    pool = sentences + [f'{a} {b}' for a, b in zip(rng.permutation(sentences), rng.permutation(sentences))]
+    weights = 1 / np.arange(1, len(pool) + 1) ** 0.8
+    out = []
+    for _ in range(n):
+        if rng.random() < templated:
+            template = _TEMPLATES[int(rng.integers(len(_TEMPLATES)))]
+            number = str(int(rng.integers(1, 100))).translate(_BENGALI_DIGITS)
+            out.append(template.format(n=number, name=_NAMES[int(rng.integers(len(_NAMES)))]))
+        else:
+            out.append(pool[int(rng.choice(len(pool), p=weights / weights.sum()))])
+    return out
+
+
+async def _run_mode(texts: List[str], rate: float, mode: str) -> Dict[str, float]:
+    import statistics
+
+    stub = StubTranslationModel()
+    if mode == 'whole':
+        translator = LanguageTranslator(model=stub, cache=TranslationCache(0))
+    else:
+        translator = LanguageTranslator(model=stub)
+    if mode != 'batched':
+        translator.batch_window = 0
+        translator.max_batch = 1
+    lock = asyncio.Lock()
+    latencies: List[float] = []
+
+    async def one(text: str) -> None:
+        started = time.perf_counter()
+        if mode == 'whole':
+            # One utterance per forward pass, no splitting or caching
+            source, _ = detect_language(text)
+            async with lock:
+                if source != 'en':
+                    await asyncio.to_thread(stub, [text], source or 'bn', 'en')
+        else:
+            await translator.translate(text, 'en')
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    tasks = []
+    for text in texts:
+        tasks.append(asyncio.create_task(one(text)))
+        await asyncio.sleep(1 / rate)
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'throughput': len(texts) / elapsed,
+        'p50_ms': statistics.median(latencies) * 1000,
+        'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+        'model_calls': stub.calls,
+        'segments_per_call': stub.segments / stub.calls if stub.calls else 0.0,
+        'cache_hit_rate': translator.cache.stats()['hit_rate'],
+    }
+
+
+async def benchmark(n: int = 240, rate: float = 60.0) -> Dict[str, Dict[str, float]]:
+    """
+    Compare per-utterance translation, span+cache translation without batching and
+    span+cache translation with the batching window, under open-loop arrivals,
+    on the stub model.
+
+    Args:
+        n: Number of utterances.
+        rate: Arrivals per second.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per mode: throughput, latency percentiles, model
+        calls, segments per call and cache hit rate; plus script detection speed.
+    """
+    texts = conversation_workload(n)
+    results = {}
+    for mode in ('whole', 'spans_cached', 'batched'):
+        results[mode] = await _run_mode(texts, rate, mode)
+
+    sample = ' '.join(texts)
+    started = time.perf_counter()
+    for _ in range(20):
+        script_codes(sample)
+    vectorized = 20 * len(sample) / (time.perf_counter() - started)
+
+    def per_char(text: str) -> List[int]:
+        return [BENGALI if 0x980 <= ord(c) < 0xA00 else LATIN if c.isascii() and c.isalpha() else NEUTRAL for c in text]
+
+    started = time.perf_counter()
+    for _ in range(5):
+        per_char(sample)
+    results['script_detection'] = {
+        'vectorized_chars_per_s': vectorized,
+        'python_chars_per_s': 5 * len(sample) / (time.perf_counter() - started),
+    }
+    return results
+
+
+async def main():
+    """
+    Demonstrate span splitting and run the benchmark on the stub model.
+    """
+    translator = LanguageTranslator(model=StubTranslationModel(call_s=0.0, token_s=0.0))
+    for text in ("আমার laptop টা খোলো। Then check the mail.", "Please আমাকে দশ মিনিট পরে call দিও।"):
+        print(f"{text!r} -> {translator.segments(text, 'en')}")
+        print(f"  en: {await translator.translate(text, 'en')!r}")
+        print(f"  bn: {await translator.translate(text, 'bn')!r}")
+
+    results = await benchmark()
+    for mode in ('whole', 'spans_cached', 'batched'):
+        r = results[mode]
+        print(f"{mode:13s} {r['throughput']:6.1f} utt/s  p50 {r['p50_ms']:7.1f} ms  p95 {r['p95_ms']:7.1f} ms  "
+              f"{r['model_calls']:4d} model calls ({r['segments_per_call']:.1f} segments each)  "
+              f"cache hit rate {r['cache_hit_rate']:.2f}")
+    detection = results['script_detection']
+    print(f"script detection: {detection['vectorized_chars_per_s'] / 1e6:.1f} M chars/s vectorized, "
+          f"{detection['python_chars_per_s'] / 1e6:.1f} M chars/s per-character Python")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
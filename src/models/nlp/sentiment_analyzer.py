@@ -1 +1,557 @@
-#এই মডিউলে সেন্টিমেন্ট অ্যানালাইসিস মডেল থাকবে যা ইউজার ইমোশন ডিটেক্ট করে রেসপন্স অ্যাডজাস্ট করবে; এটি ইমোশনাল ইন্টেলিজেন্স যোগ করার জন্য তৈরি, ইউজার এক্সপেরিয়েন্স পার্সোনালাইজ করে।
+"""
+NeoMate AI Sentiment Analyzer Module
+
+This module tracks how the user feels during a conversation so responses can be
+adjusted, e.g. shorter and calmer when the user is frustrated. Scoring is
+incremental: each turn is scored once and folded into a per-session mood. That
+mood decays over time and over turns, so the cost of a turn does not grow with
+the conversation. A bilingual lexicon scorer runs first. The heavy model (a
+sentiment classifier or the LLM) runs only for ambiguous turns.
+
+Features:
+- Bengali/English lexicon with valence and emotions (joy, sadness, anger, fear)
+- Negation (English before, Bengali after the word), intensifiers, contrast and emoji
+- Vectorized scoring of many turns in one pass
+- Ambiguous turns (mixed polarity) escalated in one call to a pluggable heavy model
+- Exponentially decayed mood per session, with a neutral prior as time passes
+- Batch updates across many sessions, response guidance text
+- Benchmark of per-turn cost against rescoring the whole conversation
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+EMOTIONS = ('joy', 'sadness', 'anger', 'fear')
+
+# Column 0 is valence, then one column per emotion
+DIMENSIONS = 1 + len(EMOTIONS)
+
+# word -> (valence, emotion or None)
+LEXICON: Dict[str, Tuple[float, Optional[str]]] = {
+    'good': (0.6, None), 'great': (0.8, 'joy'), 'excellent': (0.9, 'joy'), 'awesome': (0.9, 'joy'),
+    'love': (0.8, 'joy'), 'like': (0.3, None), 'thanks': (0.5, None), 'thank': (0.5, None),
+    'happy': (0.8, 'joy'), 'glad': (0.6, 'joy'), 'nice': (0.5, None), 'perfect': (0.9, 'joy'),
+    'wonderful': (0.9, 'joy'), 'amazing': (0.9, 'joy'), 'helpful': (0.6, None), 'fine': (0.2, None),
+    'cool': (0.4, None), 'yay': (0.7, 'joy'), 'excited': (0.7, 'joy'), 'fantastic': (0.9, 'joy'),
+    'bad': (-0.6, None), 'terrible': (-0.9, None), 'awful': (-0.9, None), 'hate': (-0.9, 'anger'),
+    'angry': (-0.8, 'anger'), 'annoyed': (-0.6, 'anger'), 'annoying': (-0.6, 'anger'), 'stupid': (-0.7, 'anger'),
+    'useless': (-0.8, 'anger'), 'wrong': (-0.5, None), 'broken': (-0.6, None), 'sad': (-0.7, 'sadness'),
+    'upset': (-0.6, 'sadness'), 'tired': (-0.4, 'sadness'), 'lonely': (-0.7, 'sadness'),
+    'depressed': (-0.9, 'sadness'), 'worried': (-0.6, 'fear'), 'scared': (-0.8, 'fear'), 'afraid': (-0.7, 'fear'),
+    'anxious': (-0.7, 'fear'), 'nervous': (-0.5, 'fear'), 'slow': (-0.4, 'anger'), 'fail': (-0.6, None),
+    'failed': (-0.6, None), 'problem': (-0.4, None), 'worst': (-1.0, 'anger'), 'disappointed': (-0.7, 'sadness'),
+    'frustrated': (-0.8, 'anger'), 'sorry': (-0.2, 'sadness'),
+    'ভালো': (0.6, None), 'দারুণ': (0.9, 'joy'), 'চমৎকার': (0.9, 'joy'), 'সুন্দর': (0.6, None),
+    'ধন্যবাদ': (0.5, None), 'খুশি': (0.8, 'joy'), 'আনন্দ': (0.8, 'joy'), 'ভালোবাসি': (0.8, 'joy'),
+    'অসাধারণ': (0.9, 'joy'), 'মজা': (0.6, 'joy'),
+    'খারাপ': (-0.6, None), 'বাজে': (-0.8, 'anger'), 'রাগ': (-0.8, 'anger'), 'বিরক্ত': (-0.7, 'anger'),
+    'ফালতু': (-0.8, 'anger'), 'জঘন্য': (-1.0, 'anger'), 'দুঃখ': (-0.7, 'sadness'), 'দুঃখিত': (-0.3, 'sadness'),
+    'কষ্ট': (-0.7, 'sadness'), 'একা': (-0.5, 'sadness'), 'ক্লান্ত': (-0.4, 'sadness'), 'হতাশ': (-0.8, 'sadness'),
+    'ভয়': (-0.8, 'fear'), 'চিন্তা': (-0.5, 'fear'), 'টেনশন': (-0.6, 'fear'), 'ভুল': (-0.5, None),
+    'সমস্যা': (-0.4, None),
+    '😊': (0.7, 'joy'), '🙂': (0.4, 'joy'), '😀': (0.8, 'joy'), '😍': (0.9, 'joy'), '👍': (0.5, None),
+    '😢': (-0.7, 'sadness'), '😭': (-0.8, 'sadness'), '😞': (-0.6, 'sadness'), '😡': (-0.9, 'anger'),
+    '😠': (-0.8, 'anger'), '😨': (-0.7, 'fear'), '😰': (-0.7, 'fear'),
+}
+
+# English negators act on the next few words, Bengali ones on the words before them
+ENGLISH_NEGATORS = {'not', 'no', 'never', "don't", 'dont', "isn't", "can't", 'cannot', "won't", "didn't", "doesn't", "wasn't"}
+BENGALI_NEGATORS = {'না', 'নয়', 'নেই', 'নি', 'নাই'}
+INTENSIFIERS = {'very', 'so', 'really', 'too', 'extremely', 'super', 'খুব', 'অনেক', 'ভীষণ', 'একদম', 'বেশি'}
+CONTRASTS = {'but', 'however', 'though', 'কিন্তু', 'তবে', 'তবুও'}
+# Clause punctuation; like a contrast word, it ends a negation's scope
+BOUNDARIES = {',', '.', ';', ':', '?', '।'}
+
+# Common Bengali suffixes tried when a word is not in the lexicon (longest first)
+_BENGALI_SUFFIXES = ('গুলো', 'টুকু', 'টা', 'টি', 'ের', 'এর', 'কে', 'তে', 'রা', 'র', 'ই', 'ও')
+
+_TOKEN = re.compile(r"[a-z']+|[ঀ-৿]+|[\U0001F300-\U0001FAFF☀-➿]|[!,.;:?।]")
+
+_ENGLISH_NEGATOR, _BENGALI_NEGATOR, _INTENSIFIER, _CONTRAST, _EXCLAMATION, _BOUNDARY = -1, -2, -3, -4, -5, -6
+
+HeavyScorer = Callable[[List[str]], Awaitable[List[float]]]
+
+
+def _build_table() -> Tuple[Dict[str, int], np.ndarray]:
+    vocabulary = {'': 0}
+    rows = [np.zeros(DIMENSIONS, dtype=np.float32)]
+    for word, (valence, emotion) in LEXICON.items():
+        row = np.zeros(DIMENSIONS, dtype=np.float32)
+        row[0] = valence
+        if emotion is not None:
+            row[1 + EMOTIONS.index(emotion)] = abs(valence)
+        vocabulary[word] = len(rows)
+        rows.append(row)
+    return vocabulary, np.stack(rows)
+
+
+_VOCABULARY, _TABLE = _build_table()
+
+
+@lru_cache(maxsize=65536)
+def _token_id(token: str) -> int:
+    """Lexicon row of a token (0 if none) or a negative marker code."""
+    if token in _VOCABULARY:
+        return _VOCABULARY[token]
+    if token in ENGLISH_NEGATORS:
+        return _ENGLISH_NEGATOR
+    if token in BENGALI_NEGATORS:
+        return _BENGALI_NEGATOR
+    if token in INTENSIFIERS:
+        return _INTENSIFIER
+    if token in CONTRASTS:
+        return _CONTRAST
+    if token == '!':
+        return _EXCLAMATION
+    if token in BOUNDARIES:
+        return _BOUNDARY
+    for suffix in _BENGALI_SUFFIXES:
+        if token.endswith(suffix) and len(token) > len(suffix) + 1 and token[:-len(suffix)] in _VOCABULARY:
+            return _VOCABULARY[token[:-len(suffix)]]
+    return 0
+
+
+@dataclass
+class TurnSentiment:
+    """Sentiment of one turn."""
+
+    valence: float
+    emotions: Dict[str, float]
+    ambiguous: bool
+    escalated: bool = False
+
+
+@dataclass
+class Mood:
+    """Decayed mood of a session."""
+
+    valence: float
+    emotions: Dict[str, float]
+    turns: int
+
+    @property
+    def label(self) -> str:
+        return 'positive' if self.valence > 0.2 else 'negative' if self.valence < -0.2 else 'neutral'
+
+    @property
+    def dominant_emotion(self) -> Optional[str]:
+        emotion = max(self.emotions, key=self.emotions.get)
+        return emotion if self.emotions[emotion] >= 0.2 else None
+
+
+def score_turns(texts: Sequence[str], ambiguity_margin: float = 0.4) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score many turns with the lexicon in one vectorized pass.
+
+    Args:
+        texts: Turns.
+        ambiguity_margin: A turn with both polarities whose net score is below this
+                          share of its total is ambiguous.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (n, DIMENSIONS) scores (valence in [-1, 1],
+        emotions in [0, 1]) and a boolean ambiguity mask.
+    """
+    n = len(texts)
+    tokens = [_TOKEN.findall(text.lower()) for text in texts]
+    lengths = np.array([len(t) for t in tokens], dtype=np.int64)
+    ids = np.fromiter((_token_id(token) for turn in tokens for token in turn), dtype=np.int64, count=int(lengths.sum()))
+    scores = np.zeros((n, DIMENSIONS), dtype=np.float32)
+    ambiguous = np.zeros(n, dtype=bool)
+    if not len(ids):
+        return scores, ambiguous
+
+    turn = np.repeat(np.arange(n), lengths)
+    size = len(ids)
+
+    def shifted(mask: np.ndarray, offset: int) -> np.ndarray:
+        """mask[p - offset] within the same turn, for every position p."""
+        out = np.zeros(size, dtype=bool)
+        if offset > 0:
+            out[offset:] = mask[:-offset] & (turn[offset:] == turn[:-offset])
+        else:
+            out[:offset] = mask[-offset:] & (turn[:offset] == turn[-offset:])
+        return out
+
+    # A negation reaches up to three words forward (English) or two back (Bengali),
+    # but never across punctuation or a contrast ("not good, but great")
+    barrier = (ids == _CONTRAST) | (ids == _BOUNDARY)
+    negated = np.zeros(size, dtype=bool)
+    reach = ids == _ENGLISH_NEGATOR
+    for _ in range(3):
+        reach = shifted(reach, 1) & ~barrier
+        negated |= reach
+    reach = ids == _BENGALI_NEGATOR
+    for _ in range(2):
+        reach = shifted(reach, -1) & ~barrier
+        negated |= reach
+    intensified = shifted(ids == _INTENSIFIER, 1)
+
+    # Words after a contrast ("..., but it is slow") count more
+    contrast = (ids == _CONTRAST).astype(np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    running = np.cumsum(contrast)
+    first = np.minimum(starts, size - 1)
+    seen = running - np.repeat(running[first] - contrast[first], lengths)
+    after_contrast = (seen - contrast) > 0
+
+    rows = _TABLE[np.maximum(ids, 0)].copy()
+    weight = np.where(intensified, 1.5, 1.0) * np.where(after_contrast, 1.5, 1.0)
+    rows *= weight[:, None].astype(np.float32)
+    rows[negated, 0] *= -0.7
+    # A negated emotion word ("not happy") does not express that emotion
+    rows[negated, 1:] = 0
+
+    nonempty = lengths > 0
+    segments = starts[nonempty]
+    totals = np.add.reduceat(rows, segments, axis=0)
+    positive = np.add.reduceat(np.maximum(rows[:, 0], 0), segments)
+    negative = np.add.reduceat(np.maximum(-rows[:, 0], 0), segments)
+    exclamations = np.add.reduceat((ids == _EXCLAMATION).astype(np.float32), segments)
+
+    emphasis = 1 + 0.15 * np.minimum(exclamations, 3)
+    scores[nonempty, 0] = np.tanh(totals[:, 0] * emphasis)
+    scores[nonempty, 1:] = np.minimum(totals[:, 1:] * emphasis[:, None], 1)
+    mixed = (positive > 0) & (negative > 0)
+    ambiguous[nonempty] = mixed & (np.abs(positive - negative) < ambiguity_margin * (positive + negative))
+    return scores, ambiguous
+
+
+def llm_sentiment_scorer(generate: Callable[[str], Awaitable[str]]) -> HeavyScorer:
+    """
+    Build a heavy scorer that asks the LLM for a valence.
+
+    Args:
+        generate: Async function prompt -> text.
+
+    Returns:
+        HeavyScorer: Async function texts -> valences in [-1, 1].
+    """
+    number = re.compile(r'-?\d+(?:\.\d+)?')
+
+    async def score(texts: List[str]) -> List[float]:
+        async def one(text: str) -> float:
+            answer = await generate(
+                "Rate the sentiment of the user's message from -1 (very negative) to 1 (very positive). "
+                f"Answer with the number only.\nMessage: {text}\nSentiment:"
+            )
+            match = number.search(answer)
+            return max(-1.0, min(1.0, float(match.group()))) if match else 0.0
+
+        return list(await asyncio.gather(*(one(text) for text in texts)))
+
+    return score
+
+
+class SentimentAnalyzer:
+    """
+    Incremental per-session mood tracking with a lexicon scorer and heavy-model escalation.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        heavy: Optional[HeavyScorer] = None,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the SentimentAnalyzer.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            heavy: Optional async scorer texts -> valences for ambiguous turns.
+            clock: Time source for turns without a timestamp.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        sentiment_config = self.config.get('sentiment', {})
+
+        self.heavy = heavy
+        self.clock = clock
+        self.ambiguity_margin = sentiment_config.get('ambiguity_margin', 0.4)
+        # Mood halves its weight after this long without turns...
+        self.half_life_s = sentiment_config.get('half_life_s', 600.0)
+        # ...and each older turn counts this much less than the next one
+        self.turn_decay = sentiment_config.get('turn_decay', 0.8)
+        # Weight of the neutral prior; decayed evidence fades back towards neutral
+        self.prior = sentiment_config.get('prior_weight', 1.0)
+
+        capacity = 64
+        self._sessions: Dict[str, int] = {}
+        self._sums = np.zeros((capacity, DIMENSIONS), dtype=np.float64)
+        self._weights = np.zeros(capacity, dtype=np.float64)
+        self._last = np.zeros(capacity, dtype=np.float64)
+        self._turns = np.zeros(capacity, dtype=np.int64)
+        self.turns_scored = 0
+        self.escalations = 0
+
+    def _rows(self, sessions: Sequence[str]) -> np.ndarray:
+        for session in sessions:
+            if session not in self._sessions:
+                self._sessions[session] = len(self._sessions)
+        needed = len(self._sessions)
+        if needed > len(self._weights):
+            capacity = max(needed, 2 * len(self._weights))
+            grow = capacity - len(self._weights)
+            self._sums = np.concatenate((self._sums, np.zeros((grow, DIMENSIONS))))
+            self._weights = np.concatenate((self._weights, np.zeros(grow)))
+            self._last = np.concatenate((self._last, np.zeros(grow)))
+            self._turns = np.concatenate((self._turns, np.zeros(grow, dtype=np.int64)))
+        return np.array([self._sessions[session] for session in sessions], dtype=np.int64)
+
+    def _decay(self, rows: np.ndarray, now: np.ndarray) -> np.ndarray:
+        elapsed = np.maximum(now - self._last[rows], 0)
+        return 0.5 ** (elapsed / self.half_life_s)
+
+    async def observe_batch(self, turns: Sequence[Tuple[str, str, Optional[float]]]) -> List[TurnSentiment]:
+        """
+        Score new turns of many sessions and fold them into their moods.
+
+        Args:
+            turns: (session, text, timestamp or None) per turn, in time order
+                   within each session.
+
+        Returns:
+            List[TurnSentiment]: Sentiment per turn.
+        """
+        if not turns:
+            return []
+        sessions, texts, stamps = zip(*turns)
+        scores, ambiguous = score_turns(texts, self.ambiguity_margin)
+        escalated = np.zeros(len(texts), dtype=bool)
+        uncertain = np.flatnonzero(ambiguous)
+        if len(uncertain) and self.heavy is not None:
+            try:
+                valences = await self.heavy([texts[i] for i in uncertain])
+                scores[uncertain, 0] = valences
+                escalated[uncertain] = True
+                self.escalations += len(uncertain)
+            except Exception as e:
+                log.warning(f"Heavy sentiment model failed, keeping the lexicon scores: {e}")
+
+        now = self.clock()
+        times = np.array([now if stamp is None else stamp for stamp in stamps], dtype=np.float64)
+        rows = self._rows(sessions)
+        # Turns of the same session are applied in order, one round per repeat
+        order = np.argsort(rows, kind='stable')
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = rows[order][1:] != rows[order][:-1]
+        group_start = np.maximum.accumulate(np.where(first, np.arange(len(rows)), 0))
+        rounds = np.empty(len(rows), dtype=np.int64)
+        rounds[order] = np.arange(len(rows)) - group_start
+        for round_ in range(int(rounds.max()) + 1):
+            chosen = np.flatnonzero(rounds == round_)
+            r = rows[chosen]
+            decay = np.where(self._turns[r] > 0, self._decay(r, times[chosen]) * self.turn_decay, 0.0)
+            self._sums[r] = self._sums[r] * decay[:, None] + scores[chosen]
+            self._weights[r] = self._weights[r] * decay + 1
+            self._last[r] = times[chosen]
+            self._turns[r] += 1
+        self.turns_scored += len(texts)
+
+        return [
+            TurnSentiment(float(score[0]), dict(zip(EMOTIONS, score[1:].tolist())), bool(flag), bool(heavy))
+            for score, flag, heavy in zip(scores, ambiguous, escalated)
+        ]
+
+    async def observe(self, session: str, text: str, timestamp: Optional[float] = None) -> TurnSentiment:
+        """
+        Score a new turn and fold it into the session's mood.
+
+        Args:
+            session: Session id.
+            text: User turn.
+            timestamp: When it was said; the clock if None.
+
+        Returns:
+            TurnSentiment: Sentiment of the turn.
+        """
+        return (await self.observe_batch([(session, text, timestamp)]))[0]
+
+    def moods(self, sessions: Sequence[str], now: Optional[float] = None) -> List[Mood]:
+        """
+        Get the current moods of sessions.
+
+        Args:
+            sessions: Session ids; unknown ones are neutral.
+            now: Time to decay to; the clock if None.
+
+        Returns:
+            List[Mood]: Mood per session.
+        """
+        known = [session for session in sessions if session in self._sessions]
+        moods = {}
+        if known:
+            rows = np.array([self._sessions[session] for session in known])
+            decay = self._decay(rows, np.full(len(rows), self.clock() if now is None else now))
+            values = self._sums[rows] * decay[:, None] / (self._weights[rows] * decay + self.prior)[:, None]
+            for session, row, value in zip(known, rows, values):
+                moods[session] = Mood(float(value[0]), dict(zip(EMOTIONS, value[1:].tolist())), int(self._turns[row]))
+        neutral = Mood(0.0, dict.fromkeys(EMOTIONS, 0.0), 0)
+        return [moods.get(session, neutral) for session in sessions]
+
+    def mood(self, session: str, now: Optional[float] = None) -> Mood:
+        """
+        Get the current mood of a session.
+
+        Args:
+            session: Session id.
+            now: Time to decay to; the clock if None.
+
+        Returns:
+            Mood: Decayed mood.
+        """
+        return self.moods([session], now)[0]
+
+    def guidance(self, session: str) -> str:
+        """
+        Describe how to adjust the response to the session's mood, for the prompt.
+
+        Args:
+            session: Session id.
+
+        Returns:
+            str: Guidance sentence, or '' when the mood is neutral.
+        """
+        mood = self.mood(session)
+        emotion = mood.dominant_emotion
+        if emotion == 'anger':
+            return "The user seems frustrated: answer briefly, acknowledge the problem and fix it first."
+        if emotion == 'sadness':
+            return "The user seems sad: be warm and supportive."
+        if emotion == 'fear':
+            return "The user seems worried: be calm and reassuring, with clear next steps."
+        if mood.label == 'positive':
+            return "The user is in a good mood: a friendly, light tone fits."
+        if mood.label == 'negative':
+            return "The user seems unhappy: be patient and concise."
+        return ''
+
+    def reset(self, session: str) -> None:
+        """
+        Forget a session's mood.
+
+        Args:
+            session: Session id.
+        """
+        row = self._sessions.get(session)
+        if row is not None:
+            self._sums[row] = 0
+            self._weights[row] = 0
+            self._turns[row] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scoring counters.
+
+        Returns:
+            Dict[str, Any]: Sessions, turns scored, escalations and escalation rate.
+        """
+        return {
+            'sessions': len(self._sessions),
+            'turns_scored': self.turns_scored,
+            'escalations': self.escalations,
+            'escalation_rate': self.escalations / self.turns_scored if self.turns_scored else 0.0,
+        }
+
+
+_SAMPLE_TURNS = [
+    "thanks, that was really helpful", "this is so slow, useless!", "ok open the file", "আমার মন খুব খারাপ",
+    "দারুণ হয়েছে, ধন্যবাদ 😊", "the result looks good but the app is very slow", "I'm not happy with this",
+    "খুব ভালো না", "what time is the meeting", "I am worried about the exam tomorrow", "কিন্তু এটা কাজ করছে না",
+    "love it!", "আমি ক্লান্ত", "নতুন ফাইলটা সেভ করো", "great, but it failed again 😡",
+]
+
+
+async def benchmark(conversation_lengths: Sequence[int] = (10, 100, 1000), sessions: int = 1000) -> Dict[str, Any]:
+    """
+    Compare per-turn cost of incremental tracking with rescoring the whole
+    conversation, and batch scoring across sessions with one call per turn.
+
+    Args:
+        conversation_lengths: Turn counts at which to measure the next turn's cost.
+        sessions: Sessions in the batch comparison.
+
+    Returns:
+        Dict[str, Any]: Per-turn cost (us) per length for both approaches, batch and
+        single-turn throughput and the escalation rate with a simulated heavy model.
+    """
+    rng = np.random.default_rng(0)
+    analyzer = SentimentAnalyzer()
+    result: Dict[str, Any] = {'per_turn_us': {}}
+    for length in conversation_lengths:
+        history = [_SAMPLE_TURNS[i] for i in rng.integers(len(_SAMPLE_TURNS), size=length)]
+        session = f'conversation-{length}'
+        for i, text in enumerate(history):
+            await analyzer.observe(session, text, float(i))
+        repeats = 50
+        started = time.perf_counter()
+        for i in range(repeats):
+            await analyzer.observe(session, history[i % length], float(length + i))
+        incremental = (time.perf_counter() - started) / repeats
+        started = time.perf_counter()
+        for _ in range(max(1, repeats // 10)):
+            score_turns(history)
+        rescoring = (time.perf_counter() - started) / max(1, repeats // 10)
+        result['per_turn_us'][length] = {'incremental': incremental * 1e6, 'rescore_all': rescoring * 1e6}
+
+    batch = [(f's{i}', _SAMPLE_TURNS[i % len(_SAMPLE_TURNS)], None) for i in range(sessions)]
+    analyzer = SentimentAnalyzer()
+    started = time.perf_counter()
+    await analyzer.observe_batch(batch)
+    result['batch_turns_per_s'] = sessions / (time.perf_counter() - started)
+    analyzer = SentimentAnalyzer()
+    started = time.perf_counter()
+    for turn in batch:
+        await analyzer.observe(*turn)
+    result['single_turns_per_s'] = sessions / (time.perf_counter() - started)
+
+    async def heavy(texts: List[str]) -> List[float]:
+        await asyncio.sleep(0.05)
+        return [0.0] * len(texts)
+
+    analyzer = SentimentAnalyzer(heavy=heavy)
+    await analyzer.observe_batch(batch)
+    result['escalation_rate'] = analyzer.stats()['escalation_rate']
+    return result
+
+
+async def main():
+    """
+    Demonstrate mood tracking and run the benchmark.
+    """
+    now = [0.0]
+    analyzer = SentimentAnalyzer(clock=lambda: now[0])
+    for text in ("hi, can you open the report", "this is so slow, useless!", "আবার ভুল হলো, খুব বিরক্ত লাগছে",
+                 "ok that worked, thanks"):
+        turn = await analyzer.observe('demo', text)
+        mood = analyzer.mood('demo')
+        print(f"{text!r}: turn {turn.valence:+.2f} ambiguous={turn.ambiguous}  mood {mood.valence:+.2f} "
+              f"{mood.label} {mood.dominant_emotion}  -> {analyzer.guidance('demo')!r}")
+        now[0] += 30
+    print(f"after an hour: {analyzer.mood('demo', now=now[0] + 3600).valence:+.2f}")
+
+    result = await benchmark()
+    for length, cost in result['per_turn_us'].items():
+        print(f"turn after {length:5d} turns: incremental {cost['incremental']:8.1f} us, "
+              f"rescoring the conversation {cost['rescore_all']:9.1f} us")
+    print(f"1000 sessions: batch {result['batch_turns_per_s']:,.0f} turns/s, one call per turn "
+          f"{result['single_turns_per_s']:,.0f} turns/s; escalated {result['escalation_rate'] * 100:.1f}% of turns")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
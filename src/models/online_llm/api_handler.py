@@ -1 +1,662 @@
-#এই মডিউলে requests ব্যবহার করে অনলাইন API (e.g., OpenAI/Groq) কল ফাংশন থাকবে যা API কী হ্যান্ডল করবে; এটি ফলব্যাক LLM-এর জন্য তৈরি, অ্যাডভান্সড ক্যাপাবিলিটি প্রোভাইড করে যখন লোকাল অপশন ফেইল করে।
+"""
+NeoMate AI Online LLM API Handler Module
+
+This module calls online LLM APIs (OpenAI, Groq, OpenRouter and other OpenAI-compatible
+endpoints) when a task needs more than the local model can offer. API keys are read
+from the environment, never from the configuration files. Responses are streamed as
+server-sent events and exposed as an async token iterator, so speech output can start
+before the full answer has arrived.
+
+Each provider gets its own long-lived connection pool (HTTP/2 when the ``h2`` package
+is installed and the server supports it), a concurrency limit and an optional request
+rate limit. Identical requests that are in flight at the same time are coalesced: only
+one is sent and every caller receives the same token stream.
+
+Features:
+- OpenAI-compatible chat completions for several providers
+- API keys from environment variables
+- Shared keep-alive connection pool per provider, HTTP/2 where available
+- Per-provider concurrency limit and token-bucket rate limit
+- Coalescing of identical in-flight requests with token fan-out and replay
+- Retries with Retry-After support for 429 and 5xx responses before the first token
+- Async token streaming (server-sent events) and full-text responses
+- Benchmark against a local mock provider with simulated latency
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import hashlib
+import importlib.util
+import json
+import os
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.instrumentation import Histogram, span
+from src.utils.logger import log
+
+DEFAULT_PROVIDERS: Dict[str, Dict[str, Any]] = {
+    'openai': {
+        'base_url': 'https://api.openai.com/v1',
+        'api_key_env': 'OPENAI_API_KEY',
+        'model': 'gpt-4o-mini',
+    },
+    'groq': {
+        'base_url': 'https://api.groq.com/openai/v1',
+        'api_key_env': 'GROQ_API_KEY',
+        'model': 'llama-3.1-8b-instant',
+        'requests_per_minute': 30,
+    },
+    'openrouter': {
+        'base_url': 'https://openrouter.ai/api/v1',
+        'api_key_env': 'OPENROUTER_API_KEY',
+        'model': 'mistralai/mistral-7b-instruct',
+    },
+}
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class APIError(RuntimeError):
+    """An online LLM request failed."""
+
+    def __init__(self, provider: str, message: str, status: Optional[int] = None):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+        self.status = status
+
+
+def parse_sse_data(line: str) -> Optional[str]:
+    """
+    Extract the text delta from one server-sent event line of a chat completion stream.
+
+    Args:
+        line: Line of the response body.
+
+    Returns:
+        Optional[str]: Text fragment ('' for events without text), or None at the
+                       end of the stream ('data: [DONE]').
+    """
+    if not line.startswith('data:'):
+        return ''
+    data = line[5:].strip()
+    if data == '[DONE]':
+        return None
+    try:
+        event = json.loads(data)
+    except json.JSONDecodeError:
+        return ''
+    choices = event.get('choices') or ()
+    if not choices:
+        return ''
+    return (choices[0].get('delta') or {}).get('content') or ''
+
+
+class AsyncTokenBucket:
+    """
+    Async token bucket: ``acquire`` waits until a request may be sent.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize the AsyncTokenBucket.
+
+        Args:
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+        """
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting for it if necessary.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        waited = 0.0
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+
+class ProviderPool:
+    """
+    Connection pool, limits and statistics of one provider.
+    """
+
+    def __init__(self, name: str, settings: Dict[str, Any], timeout_s: float, client: Optional[Any] = None):
+        """
+        Initialize the ProviderPool.
+
+        Args:
+            name: Provider name.
+            settings: Provider settings (base_url, api_key_env, model,
+                      max_concurrency, requests_per_minute, keepalive_s).
+            timeout_s: Read/connect timeout in seconds.
+            client: Optional pre-built httpx.AsyncClient.
+        """
+        self.name = name
+        self.settings = settings
+        self.timeout_s = timeout_s
+        self.max_concurrency = settings.get('max_concurrency', 8)
+        self._client = client
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        rpm = settings.get('requests_per_minute')
+        self._bucket = AsyncTokenBucket(rpm / 60.0, settings.get('burst', max(1, self.max_concurrency))) if rpm else None
+
+        self.requests = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.rate_limit_wait_s = 0.0
+        self.latency = Histogram()
+
+    @property
+    def client(self) -> Any:
+        """Shared httpx.AsyncClient (created on first use)."""
+        if self._client is None:
+            import httpx
+
+            http2 = importlib.util.find_spec('h2') is not None
+            self._client = httpx.AsyncClient(
+                base_url=self.settings['base_url'],
+                http2=http2,
+                timeout=httpx.Timeout(self.timeout_s, connect=min(self.timeout_s, 10.0)),
+                limits=httpx.Limits(
+                    max_connections=self.settings.get('max_connections', self.max_concurrency),
+                    max_keepalive_connections=self.settings.get('max_connections', self.max_concurrency),
+                    keepalive_expiry=self.settings.get('keepalive_s', 60.0)
+                )
+            )
+            log.debug(f"Connection pool for '{self.name}' created (HTTP/2 {'on' if http2 else 'off'})")
+        return self._client
+
+    async def acquire(self) -> None:
+        """
+        Wait for a concurrency slot and, if configured, a rate limit token.
+
+        If the wait is cancelled, the slot is given back before the cancellation propagates.
+        """
+        await self._semaphore.acquire()
+        if self._bucket is not None:
+            try:
+                self.rate_limit_wait_s += await self._bucket.acquire()
+            except BaseException:
+                self._semaphore.release()
+                raise
+        self.in_flight += 1
+
+    def release(self) -> None:
+        """Give the concurrency slot back."""
+        self.in_flight -= 1
+        self._semaphore.release()
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get provider statistics.
+
+        Returns:
+            Dict[str, Any]: Request counts and latency summary (ms).
+        """
+        return {
+            'requests': self.requests,
+            'coalesced': self.coalesced,
+            'retries': self.retries,
+            'errors': self.errors,
+            'in_flight': self.in_flight,
+            'rate_limit_wait_s': round(self.rate_limit_wait_s, 3),
+            'latency_ms': self.latency.summary(),
+        }
+
+
+class _InFlightStream:
+    """
+    Token stream of one in-flight request, shared by every caller that asked for it.
+    Late subscribers first replay the tokens received so far.
+    """
+
+    def __init__(self):
+        self.parts: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def _notify(self) -> None:
+        event, self._changed = self._changed, asyncio.Event()
+        event.set()
+
+    def push(self, text: str) -> None:
+        self.parts.append(text)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.done = True
+        self.error = error
+        self._notify()
+
+    async def subscribe(self) -> AsyncIterator[str]:
+        self.subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(self.parts):
+                    yield self.parts[index]
+                    index += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            # Nobody is listening any more: stop the request
+            if self.subscribers == 0 and not self.done and self.task is not None:
+                self.task.cancel()
+
+
+class APIHandler:
+    """
+    Client for OpenAI-compatible online LLM APIs.
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None, client: Optional[Any] = None):
+        """
+        Initialize the APIHandler.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            client: Optional httpx.AsyncClient shared by all providers (e.g. one with
+                    a mock transport). If None, each provider gets its own pool.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        online_config = self.config.get('online_llm', {})
+
+        self.providers: Dict[str, Dict[str, Any]] = {name: dict(p) for name, p in DEFAULT_PROVIDERS.items()}
+        for name, overrides in online_config.get('providers', {}).items():
+            self.providers.setdefault(name, {}).update(overrides)
+        self._default_provider = self.config_loader.accessor('online_llm.default_provider', 'groq')
+        self.timeout_s = online_config.get('timeout_s', 30.0)
+        self.max_retries = online_config.get('max_retries', 2)
+        self.coalesce = online_config.get('coalesce', True)
+
+        self._client = client
+        self._pools: Dict[str, ProviderPool] = {}
+        self._in_flight: Dict[str, _InFlightStream] = {}
+
+    @property
+    def default_provider(self) -> str:
+        """Provider used when none is given."""
+        return self._default_provider()
+
+    def pool(self, provider: str) -> ProviderPool:
+        """
+        Get the connection pool of a provider.
+
+        Args:
+            provider: Provider name.
+
+        Returns:
+            ProviderPool: The provider's pool.
+
+        Raises:
+            APIError: If the provider is unknown.
+        """
+        pool = self._pools.get(provider)
+        if pool is None:
+            if provider not in self.providers:
+                raise APIError(provider, "unknown provider")
+            pool = ProviderPool(provider, self.providers[provider], self.timeout_s, self._client)
+            self._pools[provider] = pool
+        return pool
+
+    def _request(self, pool: ProviderPool, messages: List[Dict[str, str]], model: Optional[str], params: Dict[str, Any]) -> Dict[str, Any]:
+        settings = pool.settings
+        api_key = os.getenv(settings.get('api_key_env', ''), '')
+        if not api_key:
+            raise APIError(pool.name, f"API key not set (environment variable {settings.get('api_key_env')})")
+        return {
+            'url': f"{settings['base_url'].rstrip('/')}/chat/completions",
+            'headers': {'Authorization': f"Bearer {api_key}"},
+            'json': {
+                'model': model or settings.get('model'),
+                'messages': messages,
+                'stream': True,
+                **params,
+            },
+        }
+
+    async def _fetch(self, pool: ProviderPool, request: Dict[str, Any], flight: _InFlightStream) -> None:
+        """
+        Send one request (with retries) and publish its tokens to ``flight``.
+
+        The flight is always finished, also when the task is cancelled while waiting
+        for a slot, so no subscriber is left waiting; the cancellation is re-raised.
+        """
+        error: Optional[BaseException] = None
+        acquired = False
+        started = time.perf_counter_ns()
+        try:
+            await pool.acquire()
+            acquired = True
+            started = time.perf_counter_ns()
+            pool.requests += 1
+            for attempt in range(self.max_retries + 1):
+                async with pool.client.stream('POST', **request) as response:
+                    if response.status_code in _RETRY_STATUSES and attempt < self.max_retries:
+                        pool.retries += 1
+                        retry_after = response.headers.get('retry-after')
+                        delay = float(retry_after) if retry_after and retry_after.replace('.', '', 1).isdigit() else 0.5 * 2 ** attempt
+                        log.warning(f"{pool.name} returned HTTP {response.status_code}, retrying in {delay:.1f} s")
+                        await asyncio.sleep(delay)
+                        continue
+                    if response.status_code >= 400:
+                        body = (await response.aread()).decode('utf-8', 'replace')[:200]
+                        raise APIError(pool.name, f"HTTP {response.status_code}: {body}", response.status_code)
+                    finished = False
+                    async for line in response.aiter_lines():
+                        # Read to the end of the body even after [DONE] so the
+                        # connection goes back to the pool instead of being closed
+                        if finished:
+                            continue
+                        text = parse_sse_data(line)
+                        if text is None:
+                            finished = True
+                        elif text:
+                            flight.push(text)
+                    break
+        except asyncio.CancelledError:
+            error = APIError(pool.name, "request cancelled")
+            raise
+        except APIError as e:
+            error = e
+        except Exception as e:
+            error = APIError(pool.name, f"{type(e).__name__}: {e}")
+        finally:
+            if acquired:
+                pool.release()
+                pool.latency.record((time.perf_counter_ns() - started) // 1000)
+            if error is not None:
+                pool.errors += 1
+            flight.finish(error)
+
+    async def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        **params: Any
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion.
+
+        If an identical request (same provider, model, messages and parameters) is
+        already in flight, no new request is sent and this call follows its stream.
+
+        Args:
+            messages: Chat messages ({'role': ..., 'content': ...}).
+            provider: Provider name. Defaults to ``online_llm.default_provider``.
+            model: Model name. Defaults to the provider's configured model.
+            **params: Extra request fields (temperature, max_tokens, ...).
+
+        Yields:
+            str: Response text fragments.
+
+        Raises:
+            APIError: If the provider is unknown, has no API key or the request fails.
+        """
+        provider = provider or self.default_provider
+        pool = self.pool(provider)
+        request = self._request(pool, messages, model, params)
+
+        key = None
+        flight = None
+        if self.coalesce:
+            body = json.dumps(request['json'], sort_keys=True, ensure_ascii=False)
+            key = hashlib.sha256(f"{provider}\n{body}".encode('utf-8')).hexdigest()
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                pool.coalesced += 1
+
+        if flight is None:
+            flight = _InFlightStream()
+            # The request runs in its own task so that it outlives any single caller
+            flight.task = asyncio.create_task(self._fetch(pool, request, flight), name=f"llm-{provider}")
+            if key is not None:
+                self._in_flight[key] = flight
+                flight.task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+
+        async with span(f'llm.online.{provider}'):
+            async for text in flight.subscribe():
+                yield text
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        provider: Optional[str] = None,
+        model: Optional[str] = None,
+        **params: Any
+    ) -> str:
+        """
+        Get a complete chat response.
+
+        Args:
+            messages: Chat messages ({'role': ..., 'content': ...}).
+            provider: Provider name. Defaults to ``online_llm.default_provider``.
+            model: Model name. Defaults to the provider's configured model.
+            **params: Extra request fields (temperature, max_tokens, ...).
+
+        Returns:
+            str: Response text.
+
+        Raises:
+            APIError: If the provider is unknown, has no API key or the request fails.
+        """
+        return ''.join([text async for text in self.stream_chat(messages, provider, model, **params)])
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-provider statistics.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: ProviderPool statistics by provider name.
+        """
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    async def close(self) -> None:
+        """Close all connection pools."""
+        for flight in list(self._in_flight.values()):
+            if flight.task is not None:
+                flight.task.cancel()
+        for pool in self._pools.values():
+            await pool.close()
+        self._pools.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        log.info("APIHandler closed")
+
+
+class MockProviderServer:
+    """
+    Minimal local OpenAI-compatible streaming server for benchmarks.
+
+    Each new connection pays a simulated TCP+TLS handshake delay, each request a
+    time-to-first-token delay, then tokens are streamed at a fixed interval.
+    """
+
+    def __init__(self, handshake_s: float = 0.08, first_token_s: float = 0.15, token_interval_s: float = 0.01, tokens: int = 20):
+        self.handshake_s = handshake_s
+        self.first_token_s = first_token_s
+        self.token_interval_s = token_interval_s
+        self.tokens = tokens
+        self.connections = 0
+        self.requests = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        port = self._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/v1"
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, '127.0.0.1', 0)
+
+    async def stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        await asyncio.sleep(self.handshake_s)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                length = 0
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    if name.strip().lower() == 'content-length':
+                        length = int(value.strip())
+                await reader.readexactly(length)
+                self.requests += 1
+
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n")
+                await asyncio.sleep(self.first_token_s)
+                for i in range(self.tokens):
+                    event = json.dumps({'choices': [{'delta': {'content': f"tok{i} "}}]})
+                    payload = f"data: {event}\n\n".encode('utf-8')
+                    writer.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+                    await writer.drain()
+                    if self.token_interval_s:
+                        await asyncio.sleep(self.token_interval_s)
+                done = b"data: [DONE]\n\n"
+                writer.write(b"%x\r\n%s\r\n0\r\n\r\n" % (len(done), done))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def benchmark_concurrency(calls: int = 64, distinct_prompts: int = 16, max_concurrency: int = 64) -> Dict[str, Dict[str, float]]:
+    """
+    Compare a new HTTP client per call (the blocking ``requests`` pattern) with the
+    pooled handler, with and without coalescing, under concurrent agent calls against
+    a local mock provider.
+
+    Args:
+        calls: Number of concurrent calls.
+        distinct_prompts: Number of distinct prompts among the calls.
+        max_concurrency: Provider concurrency limit of the pooled handler.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Throughput, p50/p99 latency and server
+                                     connection/request counts per mode.
+    """
+    import httpx
+
+    server = MockProviderServer()
+    await server.start()
+    os.environ.setdefault('MOCK_API_KEY', 'mock')
+    prompts = [[{'role': 'user', 'content': f"question {i % distinct_prompts}"}] for i in range(calls)]
+    results: Dict[str, Dict[str, float]] = {}
+
+    def summarize(name: str, latencies: List[float], elapsed: float, connections: int, requests: int) -> None:
+        latencies.sort()
+        results[name] = {
+            'calls_per_s': calls / elapsed,
+            'p50_ms': latencies[len(latencies) // 2] * 1000,
+            'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+            'connections': connections,
+            'upstream_requests': requests,
+        }
+
+    async def timed(coro: Any, latencies: List[float]) -> None:
+        started = time.perf_counter()
+        await coro
+        latencies.append(time.perf_counter() - started)
+
+    # Baseline: one client (and therefore one connection) per call
+    async def per_call(messages: List[Dict[str, str]]) -> str:
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            body = {'model': 'mock', 'messages': messages, 'stream': True}
+            async with client.stream('POST', f"{server.base_url}/chat/completions", json=body) as response:
+                return ''.join([parse_sse_data(line) or '' async for line in response.aiter_lines()])
+
+    latencies: List[float] = []
+    connections, requests = server.connections, server.requests
+    started = time.perf_counter()
+    await asyncio.gather(*(timed(per_call(m), latencies) for m in prompts))
+    summarize('client_per_call', latencies, time.perf_counter() - started,
+              server.connections - connections, server.requests - requests)
+
+    for coalesce in (False, True):
+        handler = APIHandler()
+        handler.coalesce = coalesce
+        handler.providers['mock'] = {
+            'base_url': server.base_url,
+            'api_key_env': 'MOCK_API_KEY',
+            'model': 'mock',
+            'max_concurrency': max_concurrency,
+        }
+        # Warm the pool so the measurement shows steady state, as in a running app
+        await asyncio.gather(*(handler.chat([{'role': 'user', 'content': f"warm {i}"}], provider='mock') for i in range(max_concurrency)))
+        latencies = []
+        connections, requests = server.connections, server.requests
+        started = time.perf_counter()
+        await asyncio.gather(*(timed(handler.chat(m, provider='mock'), latencies) for m in prompts))
+        summarize('pooled_coalesced' if coalesce else 'pooled', latencies, time.perf_counter() - started,
+                  server.connections - connections, server.requests - requests)
+        await handler.close()
+
+    await server.stop()
+    return results
+
+
+async def main():
+    """
+    Run the concurrency benchmark against the local mock provider.
+    """
+    calls = 64
+    results = await benchmark_concurrency(calls=calls)
+    print(f"{calls} concurrent calls, 16 distinct prompts, mock provider (80 ms handshake, 150 ms TTFT, 20 tokens)")
+    print(f"{'mode':<18} {'calls/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'conns':>6} {'upstream':>9}")
+    for name, row in results.items():
+        print(f"{name:<18} {row['calls_per_s']:>8.1f} {row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f} "
+              f"{row['connections']:>6} {row['upstream_requests']:>9}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
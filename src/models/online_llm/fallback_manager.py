@@ -1 +1,656 @@
-#এই মডিউলে ফলব্যাক লজিক থাকবে যা লোকাল থেকে অনলাইন সুইচ করবে এবং এরর হ্যান্ডল করবে; এটি রিলায়েবিলিটি নিশ্চিত করার জন্য তৈরি, ইন্টারনেট ইস্যু ম্যানেজ করে।
+"""
+NeoMate AI Fallback Manager Module
+
+This module decides which language model backend (the local model or an online
+provider) answers a request, and what happens when one of them is slow or down.
+Instead of waiting out a full timeout before failing over, the router tracks how fast
+and how reliable every backend is, sends a hedged copy of a slow request to the next
+best backend and takes whichever starts answering first. Backends that keep failing
+are taken out of rotation by a circuit breaker and probed again later.
+
+Features:
+- EWMA time-to-first-token and error-rate tracking per backend
+- Hedged requests after an adaptive, per-backend delay; the first backend to produce
+  a token wins and the others are cancelled
+- Circuit breakers (closed / open / half-open) with exponential back-off and single
+  probe requests
+- Per-request deadline budget used to pick and hedge backends
+- Stub backends with injectable slowdowns and outages, and a routing simulation
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+
+class RoutingError(RuntimeError):
+    """No backend could answer the request."""
+
+
+class DeadlineExceeded(RoutingError, TimeoutError):
+    """No backend produced a first token within the request's deadline."""
+
+
+@dataclass
+class LLMRequest:
+    """A routed language model request."""
+
+    query: str
+    context: List[Dict[str, str]] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)
+    # Filled in by the router
+    served_by: Optional[str] = None
+    first_token_s: Optional[float] = None
+    hedged: bool = False
+
+
+StreamFunc = Callable[[LLMRequest], AsyncIterator[str]]
+
+
+class BackendHealth:
+    """
+    Exponentially weighted time-to-first-token and error-rate estimates.
+    """
+
+    def __init__(self, initial_latency_s: float = 1.0, alpha: float = 0.3):
+        """
+        Initialize the BackendHealth.
+
+        Args:
+            initial_latency_s: Latency assumed before the first observation.
+            alpha: EWMA smoothing factor (weight of the newest observation).
+        """
+        self.alpha = alpha
+        self.latency_s = initial_latency_s
+        self.deviation_s = initial_latency_s / 2
+        self.error_rate = 0.0
+        self.samples = 0
+        self.updated_at = 0.0
+
+    def record_success(self, latency_s: float) -> None:
+        """Record a request that produced its first token after ``latency_s``."""
+        a = self.alpha if self.samples else 1.0
+        self.deviation_s += a * (abs(latency_s - self.latency_s) - self.deviation_s)
+        self.latency_s += a * (latency_s - self.latency_s)
+        self.error_rate += self.alpha * (0.0 - self.error_rate)
+        self.samples += 1
+        self.updated_at = time.monotonic()
+
+    def record_failure(self) -> None:
+        """Record a failed request."""
+        self.error_rate += self.alpha * (1.0 - self.error_rate)
+        self.samples += 1
+        self.updated_at = time.monotonic()
+
+    def record_censored(self, elapsed_s: float) -> None:
+        """
+        Record a request abandoned after ``elapsed_s`` without a token (it lost a
+        hedge race). The true latency is at least ``elapsed_s``, so the estimate is
+        only ever raised.
+        """
+        if elapsed_s > self.latency_s:
+            self.deviation_s += self.alpha * (elapsed_s - self.latency_s - self.deviation_s)
+            self.latency_s += self.alpha * (elapsed_s - self.latency_s)
+
+    @property
+    def expected_latency_s(self) -> float:
+        """Expected time to first token, inflated by the error rate."""
+        return self.latency_s / max(0.05, 1.0 - self.error_rate)
+
+    def hedge_delay_s(self, k: float = 2.0, floor_s: float = 0.05) -> float:
+        """
+        How long to wait for this backend before hedging.
+
+        Args:
+            k: Deviations above the mean latency (about a p95 for k=2).
+            floor_s: Minimum delay.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        return max(floor_s, self.latency_s + k * self.deviation_s)
+
+
+class BreakerState(Enum):
+    """Circuit breaker states."""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a failing backend and probes it again later.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout_s: float = 5.0, max_reset_timeout_s: float = 60.0):
+        """
+        Initialize the CircuitBreaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout_s: Time in the open state before a probe is allowed.
+            max_reset_timeout_s: Upper bound of the back-off after failed probes.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_reset_timeout_s = reset_timeout_s
+        self.max_reset_timeout_s = max_reset_timeout_s
+        self.reset_timeout_s = reset_timeout_s
+        self.state = BreakerState.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.opens = 0
+
+    def allow(self) -> bool:
+        """
+        Whether a request may be sent now. In the half-open state only a single
+        probe request is allowed at a time.
+        """
+        if self.state is BreakerState.CLOSED:
+            return True
+        if self.state is BreakerState.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout_s:
+                return False
+            self.state = BreakerState.HALF_OPEN
+        if self.probe_in_flight:
+            return False
+        self.probe_in_flight = True
+        return True
+
+    def on_success(self) -> None:
+        """Record a success; closes the circuit after a successful probe."""
+        self.failures = 0
+        self.probe_in_flight = False
+        if self.state is not BreakerState.CLOSED:
+            log.info("Circuit closed after successful probe")
+        self.state = BreakerState.CLOSED
+        self.reset_timeout_s = self.base_reset_timeout_s
+
+    def on_failure(self) -> None:
+        """Record a failure; opens the circuit at the threshold or on a failed probe."""
+        self.failures += 1
+        probe_failed = self.state is BreakerState.HALF_OPEN
+        self.probe_in_flight = False
+        if probe_failed:
+            self.reset_timeout_s = min(self.max_reset_timeout_s, self.reset_timeout_s * 2)
+        if probe_failed or self.failures >= self.failure_threshold:
+            if self.state is not BreakerState.OPEN:
+                self.opens += 1
+            self.state = BreakerState.OPEN
+            self.opened_at = time.monotonic()
+
+    def on_abandoned(self) -> None:
+        """A request was cancelled without a verdict (e.g. lost a hedge race)."""
+        self.probe_in_flight = False
+
+
+class RouteBackend:
+    """
+    One routable backend: a name, a streaming function and its health state.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        stream: StreamFunc,
+        initial_latency_s: float = 1.0,
+        breaker: Optional[CircuitBreaker] = None
+    ):
+        """
+        Initialize the RouteBackend.
+
+        Args:
+            name: Backend name ('local', 'groq', ...).
+            stream: Function returning the token stream of a request.
+            initial_latency_s: Latency assumed before the first observation.
+            breaker: Circuit breaker. If None, a default one is created and the router
+                     it is added to applies its configured thresholds.
+        """
+        self.name = name
+        self.stream = stream
+        self.health = BackendHealth(initial_latency_s)
+        # Only a breaker the caller did not supply is configured by the router
+        self.default_breaker = breaker is None
+        self.breaker = breaker or CircuitBreaker()
+        self.probed_at = 0.0
+        self.requests = 0
+        self.wins = 0
+        self.failures = 0
+
+
+class FallbackRouter:
+    """
+    Routes requests across backends with latency tracking, hedging, circuit
+    breaking and deadline budgets.
+    """
+
+    def __init__(self, config_loader: Optional[ConfigLoader] = None, backends: Optional[List[RouteBackend]] = None):
+        """
+        Initialize the FallbackRouter.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            backends: Backends in order of preference (used to break ties).
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        router_config = self.config.get('fallback', {})
+
+        self.default_deadline_s = router_config.get('deadline_s', 10.0)
+        self.max_hedges = router_config.get('max_hedges', 2)
+        # A backend not heard from for this long races the best one, so estimates
+        # of backends that were slow or down recover once they do
+        self.probe_interval_s = router_config.get('probe_interval_s', 30.0)
+        self.hedge_k = router_config.get('hedge_k', 2.0)
+        self.failure_threshold = router_config.get('failure_threshold', 3)
+        self.reset_timeout_s = router_config.get('reset_timeout_s', 5.0)
+        self.backends: List[RouteBackend] = []
+        for backend in backends or ():
+            self.add_backend(backend)
+
+        self.requests = 0
+        self.hedges = 0
+        self.probes = 0
+        self.fallbacks = 0
+        self.deadline_misses = 0
+
+    def add_backend(self, backend: RouteBackend) -> RouteBackend:
+        """
+        Add a backend (after the existing ones in preference order).
+
+        Args:
+            backend: Backend to add.
+
+        Returns:
+            RouteBackend: The added backend.
+        """
+        if backend.default_breaker:
+            backend.breaker.failure_threshold = self.failure_threshold
+            backend.breaker.base_reset_timeout_s = backend.breaker.reset_timeout_s = self.reset_timeout_s
+        self.backends.append(backend)
+        return backend
+
+    def candidates(self, budget_s: float) -> List[RouteBackend]:
+        """
+        Order the available backends for a request.
+
+        Backends with an open circuit are skipped. The rest are ordered by expected
+        time to first token (preference order breaks ties); those not expected to
+        answer within the budget go last.
+
+        Args:
+            budget_s: Remaining deadline budget.
+
+        Returns:
+            List[RouteBackend]: Backends to try, best first.
+        """
+        ranked = [
+            (b.health.expected_latency_s > budget_s, b.health.expected_latency_s, index, b)
+            for index, b in enumerate(self.backends)
+            if b.breaker.state is not BreakerState.OPEN
+            or time.monotonic() - b.breaker.opened_at >= b.breaker.reset_timeout_s
+        ]
+        ranked.sort(key=lambda item: item[:3])
+        return [item[3] for item in ranked]
+
+    @staticmethod
+    async def _first_token(backend: RouteBackend, request: LLMRequest) -> Tuple[AsyncIterator[str], Optional[str]]:
+        stream = backend.stream(request)
+        try:
+            return stream, await stream.__anext__()
+        except StopAsyncIteration:
+            return stream, None
+
+    async def stream(self, request: LLMRequest, deadline_s: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Stream the answer to a request from the best available backend.
+
+        The best candidate is started first. If it has not produced a token after its
+        hedge delay, the next candidate is started too (up to ``max_hedges`` times);
+        if it fails, the next one is started immediately. A candidate whose estimate
+        is older than ``probe_interval_s`` is raced against the best one right away. The first backend to yield
+        a token wins and the others are cancelled. The deadline applies to the first
+        token; once streaming has started the answer is not switched mid-way.
+
+        Args:
+            request: The request. ``served_by``, ``first_token_s`` and ``hedged`` are
+                     filled in.
+            deadline_s: Time budget for the first token. Defaults to ``fallback.deadline_s``.
+
+        Yields:
+            str: Answer text fragments.
+
+        Raises:
+            DeadlineExceeded: If no backend answered within the deadline.
+            RoutingError: If every backend failed or none is available.
+        """
+        self.requests += 1
+        started = time.monotonic()
+        deadline = started + (deadline_s if deadline_s is not None else self.default_deadline_s)
+        queue = self.candidates(deadline - started)
+        if not queue:
+            raise RoutingError("No language model backend available (all circuits open)")
+
+        running: Dict[asyncio.Task, Tuple[RouteBackend, float]] = {}
+        hedges_left = self.max_hedges
+        errors: List[str] = []
+
+        def launch() -> bool:
+            while queue:
+                backend = queue.pop(0)
+                if not backend.breaker.allow():
+                    continue
+                backend.requests += 1
+                task = asyncio.create_task(self._first_token(backend, request), name=f"route-{backend.name}")
+                running[task] = (backend, time.monotonic())
+                return True
+            return False
+
+        winner: Optional[RouteBackend] = None
+        stream: Optional[AsyncIterator[str]] = None
+        first: Optional[str] = None
+        try:
+            launch()
+            now = time.monotonic()
+            stale = [
+                b for b in queue
+                if b.health.samples and now - max(b.health.updated_at, b.probed_at) >= self.probe_interval_s
+            ]
+            if stale and hedges_left:
+                stale[0].probed_at = now
+                queue.remove(stale[0])
+                queue.insert(0, stale[0])
+                if launch():
+                    hedges_left -= 1
+                    self.probes += 1
+            while running:
+                now = time.monotonic()
+                newest_backend, newest_start = list(running.values())[-1]
+                hedge_at = newest_start + newest_backend.health.hedge_delay_s(self.hedge_k)
+                timeout = min(deadline, hedge_at if hedges_left and queue else deadline) - now
+                done, _ = await asyncio.wait(running, timeout=max(0.0, timeout), return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    backend, launched = running.pop(task)
+                    try:
+                        stream, first = task.result()
+                    except Exception as e:
+                        backend.failures += 1
+                        backend.health.record_failure()
+                        backend.breaker.on_failure()
+                        errors.append(f"{backend.name}: {e}")
+                        log.warning(f"LLM backend '{backend.name}' failed: {e}")
+                        continue
+                    if winner is None:
+                        winner = backend
+                        latency = time.monotonic() - launched
+                        backend.health.record_success(latency)
+                        backend.breaker.on_success()
+                    else:
+                        # Lost a photo finish; discard its stream
+                        backend.breaker.on_abandoned()
+                        await task.result()[0].aclose()
+                if winner is not None:
+                    break
+
+                if time.monotonic() >= deadline:
+                    self.deadline_misses += 1
+                    # Attempts still silent at the deadline count as failures
+                    for backend, _ in running.values():
+                        backend.failures += 1
+                        backend.health.record_failure()
+                        backend.breaker.on_failure()
+                    raise DeadlineExceeded(f"No first token within {deadline - started:.2f} s")
+                if done and not running:
+                    # Every running attempt failed: fall back right away
+                    if launch():
+                        self.fallbacks += 1
+                    continue
+                if not done and hedges_left and queue and time.monotonic() >= hedge_at:
+                    if launch():
+                        hedges_left -= 1
+                        self.hedges += 1
+                        request.hedged = True
+                        log.debug(f"Hedging request to '{list(running.values())[-1][0].name}'")
+
+            if winner is None:
+                raise RoutingError("All language model backends failed: " + "; ".join(errors))
+        finally:
+            for task, (backend, launched) in running.items():
+                task.cancel()
+                backend.breaker.on_abandoned()
+                backend.health.record_censored(time.monotonic() - launched)
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+        winner.wins += 1
+        request.served_by = winner.name
+        request.first_token_s = time.monotonic() - started
+        if first is None:
+            return
+        yield first
+        try:
+            async for token in stream:
+                yield token
+        except Exception:
+            winner.failures += 1
+            winner.health.record_failure()
+            winner.breaker.on_failure()
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get routing statistics.
+
+        Returns:
+            Dict[str, Any]: Router counters and per-backend health.
+        """
+        return {
+            'requests': self.requests,
+            'hedges': self.hedges,
+            'probes': self.probes,
+            'fallbacks': self.fallbacks,
+            'deadline_misses': self.deadline_misses,
+            'backends': {
+                b.name: {
+                    'requests': b.requests,
+                    'wins': b.wins,
+                    'failures': b.failures,
+                    'latency_ms': round(b.health.latency_s * 1000, 1),
+                    'error_rate': round(b.health.error_rate, 3),
+                    'circuit': b.breaker.state.value,
+                }
+                for b in self.backends
+            },
+        }
+
+
+class StubBackend:
+    """
+    Simulated backend with injectable slowdowns and outages.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        first_token_s: float = 0.2,
+        jitter: float = 0.2,
+        tokens: int = 5,
+        token_interval_s: float = 0.005,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        """
+        Initialize the StubBackend.
+
+        Args:
+            name: Backend name.
+            first_token_s: Mean time to first token.
+            jitter: Relative spread of the first-token time (log-normal).
+            tokens: Tokens per answer.
+            token_interval_s: Delay between tokens.
+            failure_rate: Probability that a request fails.
+            seed: Random seed.
+        """
+        self.name = name
+        self.first_token_s = first_token_s
+        self.jitter = jitter
+        self.tokens = tokens
+        self.token_interval_s = token_interval_s
+        self.failure_rate = failure_rate
+        self.slowdown = 1.0
+        self.outage: Optional[str] = None
+        self._random = random.Random(seed)
+
+    def set_slowdown(self, factor: float) -> None:
+        """Multiply the first-token time by ``factor`` (1.0 = normal)."""
+        self.slowdown = factor
+
+    def set_outage(self, mode: Optional[str]) -> None:
+        """
+        Inject an outage.
+
+        Args:
+            mode: 'error' (fail fast), 'hang' (never answer) or None (healthy).
+        """
+        self.outage = mode
+
+    async def stream(self, request: LLMRequest) -> AsyncIterator[str]:
+        if self.outage == 'error':
+            await asyncio.sleep(0.01)
+            raise ConnectionError(f"{self.name} unavailable")
+        if self.outage == 'hang':
+            await asyncio.sleep(3600)
+        delay = self.first_token_s * self.slowdown * self._random.lognormvariate(0.0, self.jitter)
+        await asyncio.sleep(delay)
+        if self._random.random() < self.failure_rate:
+            raise ConnectionError(f"{self.name} request failed")
+        for i in range(self.tokens):
+            if i:
+                await asyncio.sleep(self.token_interval_s)
+            yield f"{self.name}{i} "
+
+
+class _PlainFailover:
+    """Baseline for the simulation: try backends in order, each with a fixed timeout."""
+
+    def __init__(self, backends: List[StubBackend], timeout_s: float):
+        self.backends = backends
+        self.timeout_s = timeout_s
+
+    async def first_token(self, request: LLMRequest) -> str:
+        for backend in self.backends:
+            stream = backend.stream(request)
+            try:
+                return await asyncio.wait_for(stream.__anext__(), self.timeout_s)
+            except Exception:
+                continue
+            finally:
+                await stream.aclose()
+        raise RoutingError("all backends failed")
+
+
+async def simulate(requests_per_phase: int = 20, deadline_s: float = 2.0, seed: int = 7) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare plain failover with the router while backends slow down and fail.
+
+    Phases: normal; local model 5x slower (CPU contention); groq hangs; local model
+    errors while groq still hangs; recovery.
+
+    Args:
+        requests_per_phase: Sequential requests per phase.
+        deadline_s: Deadline budget (also the failover timeout of the baseline).
+        seed: Random seed.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per phase and strategy: p50/p95 time to first
+                                   token (ms) and failures.
+    """
+    stubs = {
+        'local': StubBackend('local', first_token_s=0.15, seed=seed),
+        'groq': StubBackend('groq', first_token_s=0.25, seed=seed + 1),
+        'openai': StubBackend('openai', first_token_s=0.45, seed=seed + 2),
+    }
+    router = FallbackRouter(backends=[
+        RouteBackend(name, stub.stream, initial_latency_s=stub.first_token_s * 2)
+        for name, stub in stubs.items()
+    ])
+    router.probe_interval_s = 2.0
+    for backend in router.backends:
+        backend.breaker.base_reset_timeout_s = backend.breaker.reset_timeout_s = 1.0
+    baseline = _PlainFailover(list(stubs.values()), deadline_s)
+
+    phases = [
+        ('normal', lambda: None),
+        ('local 5x slow', lambda: stubs['local'].set_slowdown(5.0)),
+        ('groq hangs', lambda: stubs['groq'].set_outage('hang')),
+        ('local errors', lambda: stubs['local'].set_outage('error')),
+        ('recovered', lambda: [s.set_outage(None) or s.set_slowdown(1.0) for s in stubs.values()]),
+    ]
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def summarize(latencies: List[float], failures: int) -> Dict[str, Any]:
+        latencies.sort()
+
+        def pick(q: float) -> Optional[int]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(len(latencies) * q))] * 1000)
+
+        return {'p50_ms': pick(0.5), 'p95_ms': pick(0.95), 'failures': failures}
+
+    for phase, apply in phases:
+        apply()
+        row = {}
+        for strategy in ('failover', 'router'):
+            latencies: List[float] = []
+            failures = 0
+            for i in range(requests_per_phase):
+                request = LLMRequest(f"question {i}")
+                started = time.monotonic()
+                try:
+                    if strategy == 'failover':
+                        await baseline.first_token(request)
+                    else:
+                        async for _ in router.stream(request, deadline_s=deadline_s):
+                            break
+                    latencies.append(time.monotonic() - started)
+                except RoutingError:
+                    failures += 1
+            row[strategy] = summarize(latencies, failures)
+        results[phase] = row
+    results['router_stats'] = router.stats()
+    return results
+
+
+async def main():
+    """
+    Run the routing simulation.
+    """
+    results = await simulate()
+    stats = results.pop('router_stats')
+    print(f"{'phase':<16} {'failover p50/p95 ms':>22} {'fail':>5}   {'router p50/p95 ms':>20} {'fail':>5}")
+    for phase, row in results.items():
+        f, r = row['failover'], row['router']
+        print(f"{phase:<16} {f['p50_ms']!s:>10} / {f['p95_ms']!s:<9} {f['failures']:>5}   "
+              f"{r['p50_ms']!s:>8} / {r['p95_ms']!s:<9} {r['failures']:>5}")
+    print(f"hedges={stats['hedges']} probes={stats['probes']} fallbacks={stats['fallbacks']} deadline_misses={stats['deadline_misses']}")
+    for name, backend in stats['backends'].items():
+        print(f"  {name:<7} {backend}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
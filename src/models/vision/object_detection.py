@@ -1 +1,738 @@
-#এই মডিউলে OpenCV/YOLO ব্যবহার করে অবজেক্ট ডিটেকশন ফাংশন থাকবে যা স্ক্রিন ইমেজে অবজেক্ট আইডেন্টিফাই করবে; এটি কম্পিউটার ভিশন টাস্কের জন্য তৈরি, অটোনমাস নেভিগেশন সাহায্য করে।
+"""
+NeoMate AI Object Detection Module
+
+This module finds UI elements and objects on the screen with a YOLO model exported
+to ONNX and run by ONNX Runtime on the CPU. Detection shares the machine with the
+local LLM and has no GPU, so it runs within two budgets. One is a latency budget
+per frame. The other is a share of the total CPU, measured with psutil and
+charged with the wall time of each detection call. Only the changed regions of the screen (from the screen capture
+pipeline) are detected. They are letterboxed and batched into a single inference
+call, at the largest input resolution whose measured cost fits the latency
+budget. When the CPU share is used up, the frame is skipped and its regions are
+kept for the next frame. Detections in regions that did not change are carried
+forward unchanged.
+
+Features:
+- ONNX Runtime CPU inference with tuned session options and lazy model loading
+- YOLOv8-style output decoding with per-class non-maximum suppression
+- Changed regions merged, letterboxed and batched into one inference call
+- Dynamic input resolution from measured seconds per megapixel
+- CPU-share token bucket; tighter budget while the system is busy (e.g. LLM running)
+- Frame skipping without losing regions; carry-forward of unchanged detections
+- Synthetic detector and a load-test harness with a simulated LLM load
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import ast
+import asyncio
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.helpers import DATA_DIR
+from src.utils.logger import log
+
+# (left, top, right, bottom) in screen pixels
+Box = Tuple[int, int, int, int]
+
+LETTERBOX_FILL = 114
+
+
+@dataclass
+class Detection:
+    """A detected object in screen coordinates."""
+
+    left: int
+    top: int
+    right: int
+    bottom: int
+    label: str
+    score: float
+
+    @property
+    def center(self) -> Tuple[float, float]:
+        """Box center (x, y)."""
+        return (self.left + self.right) / 2, (self.top + self.bottom) / 2
+
+
+@dataclass
+class FrameDetections:
+    """Outcome of one frame."""
+
+    detections: List[Detection]
+    skipped: bool
+    resolution: int = 0
+    processed_rois: int = 0
+    pending_rois: int = 0
+    latency_s: float = 0.0
+    cpu_s: float = 0.0
+
+
+def system_cpu_percent() -> Optional[float]:
+    """
+    Get the system-wide CPU use since the previous call.
+
+    Returns:
+        Optional[float]: Percent of total capacity, or None if it cannot be measured.
+    """
+    try:
+        import psutil
+        return psutil.cpu_percent(interval=None)
+    except ImportError:
+        pass
+    try:
+        return min(100.0, os.getloadavg()[0] / (os.cpu_count() or 1) * 100)
+    except (AttributeError, OSError):
+        return None
+
+
+def _resize(image: np.ndarray, width: int, height: int) -> np.ndarray:
+    """Resize with OpenCV when available, else nearest neighbour in NumPy."""
+    try:
+        import cv2
+        return cv2.resize(image, (width, height), interpolation=cv2.INTER_AREA)
+    except ImportError:
+        rows = (np.arange(height) * image.shape[0] / height).astype(np.intp)
+        cols = (np.arange(width) * image.shape[1] / width).astype(np.intp)
+        return image[rows][:, cols]
+
+
+def letterbox(image: np.ndarray, size: int, out: np.ndarray) -> float:
+    """
+    Scale an image to fit a size x size square (top-left aligned, padded).
+
+    Args:
+        image: (height, width, 3 or 4) uint8 BGR(A) image.
+        size: Square edge.
+        out: (size, size, 3) uint8 destination.
+
+    Returns:
+        float: Scale factor from image to letterboxed coordinates.
+    """
+    height, width = image.shape[:2]
+    scale = size / max(height, width)
+    new_w, new_h = max(1, round(width * scale)), max(1, round(height * scale))
+    out[...] = LETTERBOX_FILL
+    out[:new_h, :new_w] = _resize(np.ascontiguousarray(image[..., :3]), new_w, new_h)
+    return scale
+
+
+def non_max_suppression(boxes: np.ndarray, scores: np.ndarray, classes: np.ndarray, iou: float) -> np.ndarray:
+    """
+    Greedy per-class NMS.
+
+    Args:
+        boxes: (n, 4) x1, y1, x2, y2.
+        scores: (n,) scores.
+        classes: (n,) class ids.
+        iou: Overlap above which the lower-scoring box is dropped.
+
+    Returns:
+        np.ndarray: Indices of the kept boxes, best first.
+    """
+    # Offset boxes per class so boxes of different classes never overlap
+    offset = boxes + (classes.astype(np.float32) * 10000.0)[:, None]
+    areas = (offset[:, 2] - offset[:, 0]) * (offset[:, 3] - offset[:, 1])
+    order = np.argsort(-scores)
+    keep = []
+    while len(order):
+        best, rest = order[0], order[1:]
+        keep.append(best)
+        x1 = np.maximum(offset[best, 0], offset[rest, 0])
+        y1 = np.maximum(offset[best, 1], offset[rest, 1])
+        x2 = np.minimum(offset[best, 2], offset[rest, 2])
+        y2 = np.minimum(offset[best, 3], offset[rest, 3])
+        inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+        order = rest[inter / (areas[best] + areas[rest] - inter + 1e-9) <= iou]
+    return np.array(keep, dtype=np.intp)
+
+
+class OnnxDetector:
+    """
+    YOLOv8-style ONNX model on ONNX Runtime's CPU provider.
+
+    The model takes (batch, 3, size, size) float32 RGB in [0, 1] and returns
+    (batch, 4 + classes, anchors) with center/size boxes in input pixels.
+    """
+
+    REGISTRY_NAME = 'object_detection'
+
+    def __init__(
+        self,
+        model_path: str,
+        class_names: Optional[List[str]] = None,
+        threads: Optional[int] = None,
+        conf_threshold: float = 0.35,
+        iou_threshold: float = 0.45,
+        model_registry: Optional[Any] = None,
+        size_mb: float = 30.0
+    ):
+        """
+        Initialize the detector. The session is created on first use.
+
+        Args:
+            model_path: ONNX model file.
+            class_names: Class labels. Read from the model metadata ('names') if None.
+            threads: Intra-op threads (default: half the cores, at least 1).
+            conf_threshold: Minimum class score.
+            iou_threshold: NMS overlap threshold.
+            model_registry: Optional ModelRegistry. The session is registered there as
+                            'object_detection' and pinned per batch, so it is loaded
+                            and evicted within the RAM budget with the other models.
+            size_mb: Memory of a loaded session, for the registry's budget.
+        """
+        self.model_path = str(model_path)
+        self.class_names = class_names
+        self.threads = threads or max(1, (os.cpu_count() or 2) // 2)
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self._session = None
+        self._input_name = ''
+        self._fixed_batch: Optional[int] = None
+        self._fixed_size: Optional[int] = None
+
+        self.model_registry = model_registry
+        if model_registry is not None and self.REGISTRY_NAME not in model_registry:
+            model_registry.register(self.REGISTRY_NAME, loader=self.load, unloader=self.unload, size_mb=size_mb)
+
+    def load(self) -> Any:
+        """
+        Create an ONNX Runtime session for the model and read its input shape.
+
+        Returns:
+            Any: The inference session.
+        """
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session = ort.InferenceSession(self.model_path, options, providers=['CPUExecutionProvider'])
+        model_input = session.get_inputs()[0]
+        self._input_name = model_input.name
+        batch, _, size = model_input.shape[0], model_input.shape[1], model_input.shape[2]
+        self._fixed_batch = batch if isinstance(batch, int) else None
+        self._fixed_size = size if isinstance(size, int) else None
+        if self.class_names is None:
+            names = session.get_modelmeta().custom_metadata_map.get('names')
+            if names:
+                parsed = ast.literal_eval(names)
+                self.class_names = [parsed[i] for i in sorted(parsed)]
+        log.info(f"Detection model loaded from {self.model_path} ({self.threads} threads)")
+        return session
+
+    def unload(self, session: Any = None) -> None:
+        """Drop the inference session (the registry's eviction hook)."""
+        self._session = None
+        log.info(f"Detection model {self.model_path} unloaded")
+
+    def _uses_registry(self) -> bool:
+        return self.model_registry is not None and self.REGISTRY_NAME in self.model_registry
+
+    @contextmanager
+    def _pinned(self) -> Iterator[Any]:
+        """The session, pinned in the registry while the block runs."""
+        if self._uses_registry():
+            with self.model_registry.hold(self.REGISTRY_NAME) as session:
+                yield session
+        else:
+            if self._session is None:
+                self._session = self.load()
+            yield self._session
+
+    def supported_sizes(self, sizes: Sequence[int]) -> List[int]:
+        """
+        Filter input sizes to those the model accepts.
+
+        Args:
+            sizes: Candidate square input sizes.
+
+        Returns:
+            List[int]: Usable sizes (only the fixed size for a static-shape model).
+        """
+        with self._pinned():
+            pass
+        if self._fixed_size is not None:
+            return [self._fixed_size]
+        return list(sizes)
+
+    def detect_batch(self, batch: np.ndarray) -> List[List[Tuple[float, float, float, float, int, float]]]:
+        """
+        Run the model on letterboxed images.
+
+        Args:
+            batch: (n, size, size, 3) uint8 BGR images.
+
+        Returns:
+            List[List[Tuple]]: Per image: (x1, y1, x2, y2, class id, score) in input pixels.
+        """
+        tensor = np.ascontiguousarray(batch[..., ::-1].transpose(0, 3, 1, 2), dtype=np.float32) / 255.0
+        outputs = []
+        with self._pinned() as session:
+            step = self._fixed_batch or len(tensor)
+            for start in range(0, len(tensor), step):
+                chunk = tensor[start:start + step]
+                if len(chunk) < step:
+                    chunk = np.concatenate([chunk, np.zeros((step - len(chunk),) + chunk.shape[1:], dtype=np.float32)])
+                outputs.append(session.run(None, {self._input_name: chunk})[0])
+        predictions = np.concatenate(outputs)[:len(tensor)]
+
+        results = []
+        for prediction in predictions:
+            prediction = prediction.T
+            class_scores = prediction[:, 4:]
+            classes = class_scores.argmax(axis=1)
+            scores = class_scores[np.arange(len(classes)), classes]
+            keep = scores >= self.conf_threshold
+            centers, classes, scores = prediction[keep, :4], classes[keep], scores[keep]
+            boxes = np.concatenate([centers[:, :2] - centers[:, 2:] / 2, centers[:, :2] + centers[:, 2:] / 2], axis=1)
+            kept = non_max_suppression(boxes, scores, classes, self.iou_threshold)
+            results.append([(*boxes[i].tolist(), int(classes[i]), float(scores[i])) for i in kept])
+        return results
+
+    def label(self, class_id: int) -> str:
+        """Class label of a class id."""
+        if self.class_names and 0 <= class_id < len(self.class_names):
+            return self.class_names[class_id]
+        return str(class_id)
+
+
+class SyntheticDetector:
+    """
+    Detector for tests and load tests: finds saturated red rectangles ('button')
+    and spends CPU in proportion to the input pixels, like a small YOLO model.
+    """
+
+    def __init__(self, seconds_per_mpix: float = 0.2):
+        """
+        Initialize the detector.
+
+        Args:
+            seconds_per_mpix: Approximate single-core CPU seconds per megapixel of
+                              input (0.2 is about YOLOv8n at 640 px on a laptop core).
+        """
+        self.seconds_per_mpix = seconds_per_mpix
+        self.class_names = ['button']
+        self._passes: Optional[float] = None
+
+    def supported_sizes(self, sizes: Sequence[int]) -> List[int]:
+        return list(sizes)
+
+    def _calibrate(self) -> float:
+        """Passes of the stand-in workload that cost ``seconds_per_mpix`` per megapixel."""
+        work = np.random.default_rng(0).random((256, 256), dtype=np.float32)
+        started = time.process_time()
+        for _ in range(20):
+            work = np.sqrt(work * 0.5 + 0.25)
+        per_pass_mpix = (time.process_time() - started) / 20 / (256 * 256 / 1e6)
+        return self.seconds_per_mpix / max(per_pass_mpix, 1e-9)
+
+    def detect_batch(self, batch: np.ndarray) -> List[List[Tuple[float, float, float, float, int, float]]]:
+        if self._passes is None:
+            self._passes = self._calibrate()
+        work = batch[..., 2].astype(np.float32) / 255.0
+        for _ in range(max(1, round(self._passes))):
+            work = np.sqrt(work * 0.5 + 0.25)
+
+        results = []
+        for image in batch:
+            red = (image[..., 2] > 180) & (image[..., 1] < 90) & (image[..., 0] < 90)
+            found = []
+            rows = np.flatnonzero(red.any(axis=1))
+            if len(rows):
+                for band in np.split(rows, np.flatnonzero(np.diff(rows) > 1) + 1):
+                    columns = np.flatnonzero(red[band[0]:band[-1] + 1].any(axis=0))
+                    for run in np.split(columns, np.flatnonzero(np.diff(columns) > 1) + 1):
+                        if len(run) >= 2 and len(band) >= 2:
+                            found.append((float(run[0]), float(band[0]), float(run[-1] + 1), float(band[-1] + 1), 0, 0.9))
+            results.append(found)
+        return results
+
+    def label(self, class_id: int) -> str:
+        return self.class_names[class_id]
+
+
+def merge_boxes(boxes: List[Box], padding: int, width: int, height: int) -> List[Box]:
+    """
+    Pad boxes and merge the ones that overlap.
+
+    Args:
+        boxes: Boxes to merge.
+        padding: Pixels added on each side (context for the detector).
+        width: Frame width (clip).
+        height: Frame height (clip).
+
+    Returns:
+        List[Box]: Merged boxes.
+    """
+    merged = [(max(0, l - padding), max(0, t - padding), min(width, r + padding), min(height, b + padding))
+              for l, t, r, b in boxes]
+    changed = True
+    while changed:
+        changed = False
+        result: List[Box] = []
+        for box in merged:
+            for i, other in enumerate(result):
+                if box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]:
+                    result[i] = (min(box[0], other[0]), min(box[1], other[1]),
+                                 max(box[2], other[2]), max(box[3], other[3]))
+                    changed = True
+                    break
+            else:
+                result.append(box)
+        merged = result
+    return merged
+
+
+class ObjectDetector:
+    """
+    Detection scheduler: batched region inference within latency and CPU budgets.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        detector: Optional[Any] = None,
+        cpu_percent: Optional[Any] = None,
+        model_registry: Optional[Any] = None
+    ):
+        """
+        Initialize the ObjectDetector.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            detector: Object with ``detect_batch``, ``supported_sizes`` and ``label``.
+                      Defaults to an OnnxDetector for ``object_detection.model_path``.
+            cpu_percent: Function returning system CPU percent; defaults to psutil.
+            model_registry: Optional ModelRegistry the default OnnxDetector loads through.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        detection_config = self.config.get('object_detection', {})
+
+        self.detector = detector or OnnxDetector(
+            detection_config.get('model_path', DATA_DIR / "models" / "yolov8n.onnx"),
+            class_names=detection_config.get('class_names'),
+            threads=detection_config.get('threads'),
+            conf_threshold=detection_config.get('conf_threshold', 0.35),
+            iou_threshold=detection_config.get('iou_threshold', 0.45),
+            model_registry=model_registry,
+            size_mb=detection_config.get('size_mb', 30.0)
+        )
+        self.cpu_percent = cpu_percent or system_cpu_percent
+        self._resolutions = sorted(detection_config.get('resolutions', [320, 416, 512, 640]))
+        self.resolutions: Optional[List[int]] = None
+        self.frame_budget_s = detection_config.get('frame_budget_ms', 120) / 1000.0
+        # Share of the whole machine (all cores) detection may use, and its factor while busy
+        self.cpu_budget = detection_config.get('cpu_budget_percent', 25) / 100.0
+        self.busy_cpu_percent = detection_config.get('busy_cpu_percent', 80)
+        self.busy_budget_factor = detection_config.get('busy_budget_factor', 0.5)
+        self.max_batch = detection_config.get('max_batch', 8)
+        self.roi_padding = detection_config.get('roi_padding', 16)
+        # Changed regions smaller than this (cursor blinks, clocks) are not worth a detection
+        self.min_roi_area = detection_config.get('min_roi_area', 48 * 48)
+        # Beyond this many waiting regions they collapse into their bounding box
+        self.max_pending_rois = detection_config.get('max_pending_rois', 64)
+
+        self.cores = os.cpu_count() or 1
+        self.detections: List[Detection] = []
+        self._pending: List[Box] = []
+        self._lock = asyncio.Lock()
+        self._credit_s = self.cpu_budget * self.cores
+        self._last_refill = time.monotonic()
+        # Measured wall seconds per megapixel of model input (reflects CPU contention)
+        self._s_per_mpix: Optional[float] = None
+        self.system_busy = False
+
+        self.frames = 0
+        self.skipped = 0
+        self.inference_cpu_s = 0.0
+        self.resolution_counts: Dict[int, int] = {}
+
+    def _refill(self, now: float) -> float:
+        """Add CPU credit for the elapsed time; returns the current budget share."""
+        system = self.cpu_percent()
+        self.system_busy = system is not None and system >= self.busy_cpu_percent
+        budget = self.cpu_budget * (self.busy_budget_factor if self.system_busy else 1.0)
+        capacity = budget * self.cores
+        self._credit_s = min(capacity, self._credit_s + (now - self._last_refill) * capacity)
+        self._last_refill = now
+        return budget
+
+    def _plan(self, rois: List[Box]) -> Tuple[int, int]:
+        """Pick the input resolution and number of regions for this frame."""
+        if self.resolutions is None:
+            self.resolutions = self.detector.supported_sizes(self._resolutions)
+        count = min(len(rois), self.max_batch)
+        # Upscaling small regions adds cost and no detail: stop at the first size that holds them
+        longest = max(max(r - l, b - t) for l, t, r, b in rois[:count])
+        useful = next((size for size in self.resolutions if size >= longest), self.resolutions[-1])
+        if self._s_per_mpix is None:
+            return self.resolutions[0], count
+        for size in reversed(self.resolutions):
+            if size <= useful and count * size * size / 1e6 * self._s_per_mpix <= self.frame_budget_s:
+                return size, count
+        size = self.resolutions[0]
+        fits = int(self.frame_budget_s / (size * size / 1e6 * self._s_per_mpix))
+        return size, max(1, min(count, fits))
+
+    def process(self, frame: np.ndarray, changed: Optional[Sequence[Box]] = None, now: Optional[float] = None) -> FrameDetections:
+        """
+        Update detections for a frame.
+
+        Args:
+            frame: (height, width, 3 or 4) BGR(A) screen image.
+            changed: Changed regions (left, top, right, bottom), e.g. from ScreenCapture.
+                     None means the whole frame changed.
+            now: Current monotonic time.
+
+        Returns:
+            FrameDetections: Current detections (new and carried forward) and what was done.
+        """
+        now = time.monotonic() if now is None else now
+        height, width = frame.shape[:2]
+        self.frames += 1
+        boxes = [tuple(box) for box in (changed if changed is not None else [(0, 0, width, height)])
+                 if (box[2] - box[0]) * (box[3] - box[1]) >= self.min_roi_area]
+        if boxes:
+            # Overlapping regions collapse, so skipped frames do not pile up regions
+            self._pending = merge_boxes(self._pending + boxes, 0, width, height)
+            if len(self._pending) > self.max_pending_rois:
+                self._pending = [(min(b[0] for b in self._pending), min(b[1] for b in self._pending),
+                                  max(b[2] for b in self._pending), max(b[3] for b in self._pending))]
+
+        self._refill(now)
+        if not self._pending:
+            return FrameDetections(list(self.detections), skipped=False)
+        if self._credit_s <= 0:
+            # Out of CPU budget: keep the regions for a later frame
+            self.skipped += 1
+            return FrameDetections(list(self.detections), skipped=True, pending_rois=len(self._pending))
+
+        rois = merge_boxes(self._pending, self.roi_padding, width, height)
+        # Largest regions first: they hold the most (and most likely new) content
+        rois.sort(key=lambda b: (b[2] - b[0]) * (b[3] - b[1]), reverse=True)
+        size, count = self._plan(rois)
+        run = rois[:count]
+
+        # Timed per call: process CPU time would also charge whatever else the process runs
+        started = time.perf_counter()
+        batch = np.empty((len(run), size, size, 3), dtype=np.uint8)
+        scales = [letterbox(frame[t:b, l:r], size, batch[i]) for i, (l, t, r, b) in enumerate(run)]
+        outputs = self.detector.detect_batch(batch)
+        latency = time.perf_counter() - started
+        cpu = latency * min(getattr(self.detector, 'threads', 1), self.cores)
+
+        measured = latency / (len(run) * size * size / 1e6)
+        self._s_per_mpix = measured if self._s_per_mpix is None else 0.7 * self._s_per_mpix + 0.3 * measured
+        self._credit_s -= cpu
+        self.inference_cpu_s += cpu
+        self.resolution_counts[size] = self.resolution_counts.get(size, 0) + 1
+
+        # Replace detections inside the processed regions; keep (carry forward) the rest
+        def inside(detection: Detection, box: Box) -> bool:
+            x, y = detection.center
+            return box[0] <= x < box[2] and box[1] <= y < box[3]
+
+        def covered(pending: Box, box: Box) -> bool:
+            return box[0] <= pending[0] and box[1] <= pending[1] and pending[2] <= box[2] and pending[3] <= box[3]
+
+        kept = [d for d in self.detections if not any(inside(d, box) for box in run)]
+        for (l, t, r, b), scale, found in zip(run, scales, outputs):
+            for x1, y1, x2, y2, class_id, score in found:
+                kept.append(Detection(
+                    int(l + x1 / scale), int(t + y1 / scale), int(l + x2 / scale), int(t + y2 / scale),
+                    self.detector.label(class_id), score
+                ))
+        self.detections = kept
+        # Every waiting region lies inside one padded region; keep only those not processed
+        self._pending = [p for p in self._pending if not any(covered(p, box) for box in run)]
+        return FrameDetections(list(kept), False, size, len(run), len(self._pending), latency, cpu)
+
+    async def aprocess(self, frame: np.ndarray, changed: Optional[Sequence[Box]] = None) -> FrameDetections:
+        """
+        ``process`` on a worker thread, keeping the event loop responsive. Calls are
+        serialized: the scheduler's regions, detections and budget are not thread-safe.
+
+        Args:
+            frame: Screen image.
+            changed: Changed regions, None for the whole frame.
+
+        Returns:
+            FrameDetections: See ``process``.
+        """
+        async with self._lock:
+            work = asyncio.ensure_future(asyncio.to_thread(self.process, frame, changed))
+            try:
+                return await asyncio.shield(work)
+            except asyncio.CancelledError:
+                # The thread cannot be interrupted: hold the lock until it has finished
+                await asyncio.wait([work])
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get scheduling statistics.
+
+        Returns:
+            Dict[str, Any]: Frames, skipped frames, inference CPU and resolutions used.
+        """
+        return {
+            'frames': self.frames,
+            'skipped': self.skipped,
+            'inference_cpu_s': self.inference_cpu_s,
+            'resolutions': dict(self.resolution_counts),
+            'seconds_per_mpix': self._s_per_mpix,
+        }
+
+
+class SyntheticScreen:
+    """
+    Screen with static red buttons, a button moving across it and a dialog with
+    buttons that appears every few seconds; drawn in place.
+    """
+
+    def __init__(self, width: int = 1920, height: int = 1080):
+        self.width = width
+        self.height = height
+        self.frame = np.full((height, width, 3), 235, dtype=np.uint8)
+        self._base = self.frame.copy()
+        for i in range(8):
+            self._base[40:80, 100 + 220 * i:260 + 220 * i] = (40, 40, 220)
+        self._mover: Optional[Box] = None
+        self._dialog = False
+
+    def render(self, t: float) -> Tuple[np.ndarray, List[Box]]:
+        """
+        Draw the screen at time t.
+
+        Returns:
+            Tuple[np.ndarray, List[Box]]: Frame and the regions changed since the previous call.
+        """
+        changed: List[Box] = []
+        if self._mover is None:
+            np.copyto(self.frame, self._base)
+            changed.append((0, 0, self.width, self.height))
+        else:
+            l, t0, r, b = self._mover
+            self.frame[t0:b, l:r] = self._base[t0:b, l:r]
+            changed.append(self._mover)
+        x = int(200 + (t * 150) % (self.width - 400))
+        self._mover = (x, 600, x + 120, 640)
+        self.frame[600:640, x:x + 120] = (30, 30, 230)
+        changed.append(self._mover)
+
+        dialog = int(t) % 6 < 3
+        box = (700, 300, 1220, 560)
+        if dialog != self._dialog:
+            if dialog:
+                self.frame[300:560, 700:1220] = 250
+                self.frame[480:530, 760:900] = (40, 40, 220)
+                self.frame[480:530, 1020:1160] = (40, 40, 220)
+            else:
+                self.frame[300:560, 700:1220] = self._base[300:560, 700:1220]
+            changed.append(box)
+            self._dialog = dialog
+        return self.frame, changed
+
+
+def _burn(stop_at: float) -> None:
+    """Busy CPU loop standing in for LLM inference."""
+    work = np.random.default_rng(0).random((512, 512), dtype=np.float32)
+    while time.time() < stop_at:
+        work = np.sqrt(work * 0.5 + 0.25)
+
+
+def load_test(seconds: float = 6.0, fps: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Feed a synthetic screen at a fixed frame rate, without and with a simulated LLM
+    load (one busy process per core), to naive full-frame detection at 640 px and to
+    the budgeted scheduler.
+
+    Args:
+        seconds: Duration of each run.
+        fps: Input frame rate.
+
+    Returns:
+        List[Dict[str, Any]]: Per run: latency percentiles, skipped frames,
+                              detection CPU share and resolutions.
+    """
+    import multiprocessing
+
+    rows = []
+    cores = os.cpu_count() or 1
+    for load in (False, True):
+        for mode in ('naive 640', 'budgeted'):
+            workers = []
+            if load:
+                stop_at = time.time() + seconds + 0.5
+                workers = [multiprocessing.Process(target=_burn, args=(stop_at,)) for _ in range(cores)]
+                for worker in workers:
+                    worker.start()
+            screen = SyntheticScreen()
+            detector = SyntheticDetector()
+            scheduler = ObjectDetector(detector=detector)
+            system_cpu_percent()
+            latencies, found = [], 0
+            cpu_started = time.process_time()
+            started = time.monotonic()
+            frame_index = 0
+            while time.monotonic() - started < seconds:
+                frame, changed = screen.render(frame_index / fps)
+                t0 = time.perf_counter()
+                if mode == 'naive 640':
+                    batch = np.empty((1, 640, 640, 3), dtype=np.uint8)
+                    letterbox(frame, 640, batch[0])
+                    found = len(detector.detect_batch(batch)[0])
+                else:
+                    found = len(scheduler.process(frame, changed).detections)
+                latencies.append(time.perf_counter() - t0)
+                frame_index += 1
+                delay = started + frame_index / fps - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+            elapsed = time.monotonic() - started
+            cpu = time.process_time() - cpu_started
+            system = system_cpu_percent()
+            for worker in workers:
+                worker.join()
+            latencies.sort()
+            rows.append({
+                'load': 'LLM running' if load else 'idle',
+                'mode': mode,
+                'frames': frame_index,
+                'skipped': scheduler.skipped,
+                'p50_ms': latencies[len(latencies) // 2] * 1000,
+                'p95_ms': latencies[int(len(latencies) * 0.95)] * 1000,
+                'cpu_share': cpu / elapsed / cores,
+                'system_cpu': system,
+                'resolutions': scheduler.resolution_counts,
+                'objects': found,
+            })
+    return rows
+
+
+def main():
+    """
+    Run the detection load test (120 ms / 25% CPU budgets) with the synthetic detector.
+    """
+    for row in load_test():
+        print(f"{row['load']:<12} {row['mode']:<10} frames {row['frames']:3d}  skipped {row['skipped']:3d}  "
+              f"latency p50 {row['p50_ms']:6.1f} ms  p95 {row['p95_ms']:6.1f} ms  "
+              f"detection CPU {row['cpu_share'] * 100:5.1f}%  system CPU {row['system_cpu'] or 0:5.1f}%  "
+              f"objects {row['objects']:2d}  sizes {row['resolutions']}")
+
+
+if __name__ == "__main__":
+    main()
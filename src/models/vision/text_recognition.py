@@ -1 +1,788 @@
-#এই মডিউলে Tesseract OCR ব্যবহার করে টেক্সট এক্সট্র্যাকশন ফাংশন থাকবে যা স্ক্রিন থেকে টেক্সট রিড করবে; এটি টেক্সট-বেসড অ্যানালাইসিসের জন্য তৈরি, টাস্ক অটোমেশন ইমপ্রুভ করে।
+"""
+NeoMate AI Text Recognition Module
+
+This module reads the text on the screen with Tesseract. Running OCR on a full
+screen costs hundreds of milliseconds, but most of a screen is the same from one
+frame to the next. The image is therefore split along its whitespace into text
+blocks (columns, then paragraphs) cropped tight to their content. Each block is
+keyed by a perceptual hash of its binarized pixels, and only blocks missing from
+an LRU cache are OCR'd, in parallel on a process pool. A paragraph that scrolled,
+or that appears again in another window or after switching back to a tab, has the
+same key and is served from the cache. The full-screen text is rebuilt from the
+blocks in reading order.
+
+Features:
+- XY-cut segmentation on an edge mask: column cuts first, then paragraph cuts;
+  the cut tree gives the reading order
+- Position-independent block keys: binarized, polarity-normalized pixels hashed
+  with BLAKE2 (colour, anti-aliasing and light/dark theme do not change the key)
+- LRU result cache bounded by entry count and bytes, shared across frames and windows
+- Parallel OCR of missed blocks on a process pool; identical blocks in flight are
+  OCR'd once
+- Layout-aware merge into full text plus positioned blocks and words
+- Tesseract engine, and a synthetic-font engine for tests and benchmarks
+- Benchmark on a recorded screen sequence: OCR calls avoided and latency
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import hashlib
+import os
+import struct
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.logger import log
+
+# (top, left, bottom, right) in pixels
+Box = Tuple[int, int, int, int]
+
+
+class OCRWord(NamedTuple):
+    """A recognized word; coordinates are relative to the OCR'd image."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    text: str
+    line: int
+    confidence: float = 100.0
+
+
+@dataclass
+class TextBlock:
+    """A block of recognized text with its position on the screen."""
+
+    x: int
+    y: int
+    width: int
+    height: int
+    text: str
+    words: List[OCRWord] = field(default_factory=list)
+    cached: bool = False
+
+
+@dataclass
+class ScreenText:
+    """Recognized text of an image."""
+
+    text: str
+    blocks: List[TextBlock]
+    tiles: int
+    cache_hits: int
+    ocr_calls: int
+    latency_s: float
+
+
+def to_gray(image: np.ndarray) -> np.ndarray:
+    """
+    Convert a BGRA, BGR or gray uint8 image to gray.
+
+    Args:
+        image: Image array.
+
+    Returns:
+        np.ndarray: (height, width) uint8 array.
+    """
+    if image.ndim == 2:
+        return image
+    b, g, r = image[..., 0].astype(np.uint16), image[..., 1].astype(np.uint16), image[..., 2].astype(np.uint16)
+    return ((29 * b + 150 * g + 77 * r) >> 8).astype(np.uint8)
+
+
+def edge_mask(gray: np.ndarray, contrast: int = 32) -> np.ndarray:
+    """
+    Mark pixels that differ strongly from their left or upper neighbour. Text
+    produces dense edges; flat panels and gradients produce none.
+
+    Args:
+        gray: Gray image.
+        contrast: Minimum neighbour difference.
+
+    Returns:
+        np.ndarray: Boolean mask of the image's shape.
+    """
+    g = gray.astype(np.int16)
+    mask = np.zeros(gray.shape, dtype=bool)
+    mask[:, 1:] = np.abs(g[:, 1:] - g[:, :-1]) > contrast
+    mask[1:, :] |= np.abs(g[1:] - g[:-1]) > contrast
+    return mask
+
+
+def _runs(profile: np.ndarray, min_gap: int) -> List[Tuple[int, int]]:
+    """Runs of True in a projection profile; gaps shorter than min_gap (at least 1) do not split a run."""
+    index = np.flatnonzero(profile)
+    if not len(index):
+        return []
+    breaks = np.flatnonzero(np.diff(index) > max(min_gap, 1))
+    starts = np.concatenate(([index[0]], index[breaks + 1]))
+    ends = np.concatenate((index[breaks], [index[-1]])) + 1
+    return list(zip(starts.tolist(), ends.tolist()))
+
+
+def segment_blocks(
+    gray: np.ndarray,
+    min_gap_x: int = 24,
+    min_gap_y: int = 12,
+    max_height: int = 256,
+    contrast: int = 32
+) -> List[Box]:
+    """
+    Split an image into text blocks with a recursive XY-cut.
+
+    Each region is cut at vertical whitespace (columns) when it has any, otherwise
+    at horizontal whitespace (paragraphs), and cropped tight to its content, so
+    the same text gives the same block wherever it is drawn. Blocks taller than
+    ``max_height`` are split between lines.
+
+    Args:
+        gray: Gray image.
+        min_gap_x: Minimum blank width separating columns.
+        min_gap_y: Minimum blank height separating paragraphs.
+        max_height: Maximum block height.
+        contrast: Edge contrast (see ``edge_mask``).
+
+    Returns:
+        List[Box]: Blocks in reading order.
+    """
+    mask = edge_mask(gray, contrast)
+    blocks: List[Box] = []
+
+    def split_tall(top: int, left: int, bottom: int, right: int) -> None:
+        lines = _runs(mask[top:bottom, left:right].any(axis=1), 0)
+        start = lines[0][0]
+        for i, (line_start, line_end) in enumerate(lines):
+            if line_end - start > max_height and line_start > start:
+                blocks.append((top + start, left, top + lines[i - 1][1], right))
+                start = line_start
+            while line_end - start > max_height:
+                # A single "line" taller than a block (e.g. a picture): fixed slices
+                blocks.append((top + start, left, top + start + max_height, right))
+                start += max_height
+        blocks.append((top + start, left, top + lines[-1][1], right))
+
+    def cut(top: int, left: int, bottom: int, right: int, depth: int) -> None:
+        rows = _runs(mask[top:bottom, left:right].any(axis=1), min_gap_y)
+        if not rows:
+            return
+        top, bottom = top + rows[0][0], top + rows[-1][1]
+        columns = _runs(mask[top:bottom, left:right].any(axis=0), min_gap_x)
+        if depth < 32 and len(columns) > 1:
+            for start, end in columns:
+                cut(top, left + start, bottom, left + end, depth + 1)
+            return
+        left, right = left + columns[0][0], left + columns[-1][1]
+        if len(rows) > 1:
+            # The row runs are still valid after tightening: whitespace does not move
+            rows = _runs(mask[top:bottom, left:right].any(axis=1), min_gap_y)
+        if depth < 32 and len(rows) > 1:
+            for start, end in rows:
+                cut(top + start, left, top + end, right, depth + 1)
+            return
+        if bottom - top > max_height:
+            split_tall(top, left, bottom, right)
+        else:
+            blocks.append((top, left, bottom, right))
+
+    cut(0, 0, gray.shape[0], gray.shape[1], 0)
+    return blocks
+
+
+def tile_key(gray_tile: np.ndarray, downsample: int = 1) -> bytes:
+    """
+    Perceptual key of a text block.
+
+    The block is binarized at the midpoint of its range and flipped so ink is the
+    minority, then hashed with its size. The key ignores colour, anti-aliasing
+    shades and light/dark theme but not glyph shapes. A coarse 8x8 hash would map
+    '12:01' and '12:02' to one key, which a text cache cannot afford.
+
+    Args:
+        gray_tile: Gray block pixels.
+        downsample: Block-average factor applied before binarizing.
+
+    Returns:
+        bytes: 16-byte key.
+    """
+    h, w = gray_tile.shape
+    if downsample > 1:
+        h, w = h // downsample, w // downsample
+        small = gray_tile[:h * downsample, :w * downsample].reshape(h, downsample, w, downsample).mean(axis=(1, 3))
+    else:
+        small = gray_tile
+    low, high = int(small.min()), int(small.max())
+    bits = small > (low + high) / 2
+    if bits.mean() > 0.5:
+        bits = ~bits
+    digest = hashlib.blake2b(np.packbits(bits).tobytes(), digest_size=16)
+    digest.update(struct.pack('<II', h, w))
+    return digest.digest()
+
+
+class OCRCache:
+    """
+    LRU cache of OCR results bounded by entries and bytes. Thread-safe.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the OCRCache.
+
+        Args:
+            max_entries: Maximum cached blocks.
+            max_bytes: Maximum approximate size of the cached results.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: 'OrderedDict[bytes, Tuple[List[OCRWord], int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(words: List[OCRWord]) -> int:
+        # Key, entry and per-word tuple overhead plus the text itself
+        return 128 + sum(96 + len(word.text) for word in words)
+
+    def get(self, key: bytes) -> Optional[List[OCRWord]]:
+        """
+        Look up a block's words.
+
+        Args:
+            key: Key from ``tile_key``.
+
+        Returns:
+            Optional[List[OCRWord]]: Cached words, or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: bytes, words: List[OCRWord]) -> None:
+        """
+        Store a block's words, evicting least recently used entries over either bound.
+
+        Args:
+            key: Key from ``tile_key``.
+            words: Recognized words.
+        """
+        size = self._size(words)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (words, size)
+            self.bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters.
+
+        Returns:
+            Dict[str, Any]: Entries, bytes, hits, misses, hit rate and evictions.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+class TesseractEngine:
+    """
+    Tesseract through pytesseract. Picklable, so it runs in pool processes.
+    """
+
+    def __init__(self, lang: str = 'eng+ben', psm: int = 6):
+        """
+        Initialize the engine.
+
+        Args:
+            lang: Tesseract languages.
+            psm: Page segmentation mode (6 = one uniform block of text).
+        """
+        self.lang = lang
+        self.psm = psm
+
+    def __call__(self, gray: np.ndarray) -> List[OCRWord]:
+        import pytesseract
+
+        data = pytesseract.image_to_data(
+            gray, lang=self.lang, config=f'--psm {self.psm}', output_type=pytesseract.Output.DICT
+        )
+        words = []
+        for i, text in enumerate(data['text']):
+            text = text.strip()
+            if not text:
+                continue
+            line = data['block_num'][i] * 10000 + data['par_num'][i] * 100 + data['line_num'][i]
+            words.append(OCRWord(
+                data['left'][i], data['top'][i], data['width'][i], data['height'][i],
+                text, line, float(data['conf'][i])
+            ))
+        return words
+
+
+class SyntheticFont:
+    """
+    A 6x10 pixel bitmap font whose glyphs have a solid left column and top row, so
+    text drawn with it can be read back exactly. Used by tests and benchmarks.
+    """
+
+    CHARACTERS = 'abcdefghijklmnopqrstuvwxyz0123456789.,:-?!'
+    WIDTH = 6
+    HEIGHT = 10
+    PITCH = 7
+    LINE_PITCH = 14
+
+    def __init__(self, seed: int = 7):
+        rng = np.random.default_rng(seed)
+        self.glyphs: Dict[str, np.ndarray] = {}
+        self.lookup: Dict[bytes, str] = {}
+        for char in self.CHARACTERS:
+            while True:
+                glyph = rng.random((self.HEIGHT, self.WIDTH)) < 0.4
+                glyph[:, 0] = True
+                glyph[0, :] = True
+                key = np.packbits(glyph).tobytes()
+                if key not in self.lookup:
+                    break
+            self.glyphs[char] = glyph
+            self.lookup[key] = char
+
+    def draw(self, image: np.ndarray, x: int, y: int, lines: Sequence[str], ink: int = 30) -> None:
+        """
+        Draw lines of text into an image in place.
+
+        Args:
+            image: BGRA, BGR or gray uint8 image.
+            x: Left edge.
+            y: Top edge of the first line.
+            lines: Text lines (unknown characters are drawn as spaces).
+            ink: Ink gray level.
+        """
+        for row, line in enumerate(lines):
+            top = y + row * self.LINE_PITCH
+            if top < 0 or top + self.HEIGHT > image.shape[0]:
+                continue
+            for column, char in enumerate(line.lower()):
+                glyph = self.glyphs.get(char)
+                left = x + column * self.PITCH
+                if glyph is None or left + self.WIDTH > image.shape[1]:
+                    continue
+                region = image[top:top + self.HEIGHT, left:left + self.WIDTH]
+                if image.ndim == 3:
+                    region[glyph, :3] = ink
+                else:
+                    region[glyph] = ink
+
+
+class SyntheticFontEngine:
+    """
+    OCR engine that reads ``SyntheticFont`` text exactly and sleeps like Tesseract
+    would for the image size: a fixed per-call cost plus a per-pixel cost.
+    """
+
+    def __init__(self, font: Optional[SyntheticFont] = None, call_s: float = 0.04, pixel_s: float = 3e-7):
+        """
+        Initialize the engine.
+
+        Args:
+            font: Font to read. Defaults to ``SyntheticFont()``.
+            call_s: Simulated fixed cost per call (process start, model init).
+            pixel_s: Simulated cost per pixel.
+        """
+        self.lookup = (font or SyntheticFont()).lookup
+        self.call_s = call_s
+        self.pixel_s = pixel_s
+
+    def __call__(self, gray: np.ndarray) -> List[OCRWord]:
+        started = time.perf_counter()
+        f = SyntheticFont
+        low, high = int(gray.min()), int(gray.max())
+        ink = gray < (low + high) / 2 if high > low else np.zeros(gray.shape, dtype=bool)
+        words = []
+        for line, (top, bottom) in enumerate(_runs(ink.any(axis=1), 0)):
+            band = ink[top:top + f.HEIGHT]
+            columns = np.flatnonzero(band.any(axis=0))
+            if bottom - top != f.HEIGHT or not len(columns):
+                continue
+            chars = []
+            for left in range(int(columns[0]), int(columns[-1]) + 1, f.PITCH):
+                cell = band[:, left:left + f.WIDTH]
+                if cell.shape[1] < f.WIDTH or not cell.any():
+                    chars.append(' ')
+                else:
+                    chars.append(self.lookup.get(np.packbits(cell).tobytes(), '?'))
+            text = ''.join(chars)
+            position = 0
+            for token in text.split(' '):
+                if token:
+                    words.append(OCRWord(int(columns[0]) + position * f.PITCH, top,
+                                         len(token) * f.PITCH - 1, f.HEIGHT, token, line))
+                position += len(token) + 1
+        remaining = self.call_s + gray.size * self.pixel_s - (time.perf_counter() - started)
+        if remaining > 0:
+            time.sleep(remaining)
+        return words
+
+
+def merge_layout(boxes: Sequence[Box], results: Sequence[List[OCRWord]], cached: Sequence[bool]) -> Tuple[str, List[TextBlock]]:
+    """
+    Rebuild text from per-block OCR results.
+
+    Blocks are already in reading order (``segment_blocks``). Words are placed at
+    absolute screen positions and joined into lines by their line number, then
+    left to right.
+
+    Args:
+        boxes: Block boxes in reading order.
+        results: Words of each block, relative to the block.
+        cached: Whether each block came from the cache.
+
+    Returns:
+        Tuple[str, List[TextBlock]]: Full text (blocks separated by blank lines) and blocks.
+    """
+    blocks = []
+    for (top, left, bottom, right), words, hit in zip(boxes, results, cached):
+        lines: Dict[int, List[OCRWord]] = {}
+        placed = []
+        for word in words:
+            word = word._replace(x=word.x + left, y=word.y + top)
+            placed.append(word)
+            lines.setdefault(word.line, []).append(word)
+        ordered = sorted(lines.values(), key=lambda line_words: min(w.y for w in line_words))
+        text = '\n'.join(' '.join(w.text for w in sorted(line_words, key=lambda w: w.x)) for line_words in ordered)
+        if text:
+            blocks.append(TextBlock(left, top, right - left, bottom - top, text, placed, hit))
+    return '\n\n'.join(block.text for block in blocks), blocks
+
+
+def _retrieve(future: asyncio.Future) -> None:
+    # Marks the exception retrieved when every caller waiting on the block was cancelled
+    if not future.cancelled():
+        future.exception()
+
+
+class TextRecognizer:
+    """
+    Cached, parallel OCR of screen images.
+    """
+
+    REGISTRY_NAME = 'ocr'
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        engine: Optional[Callable[[np.ndarray], List[OCRWord]]] = None,
+        cache: Optional[OCRCache] = None,
+        workers: Optional[int] = None,
+        model_registry: Optional[Any] = None
+    ):
+        """
+        Initialize the TextRecognizer.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            engine: Picklable callable gray image -> words. Defaults to Tesseract
+                    with ``ocr.lang`` and ``ocr.psm``.
+            cache: Result cache. Created from ``ocr.cache_entries`` / ``ocr.cache_mb`` if None.
+            workers: OCR processes (``ocr.workers``, default CPU count - 1, at least 1).
+            model_registry: Optional ModelRegistry. The OCR process pool is registered
+                            there as 'ocr' (``ocr.size_mb`` per worker, default 80) and
+                            pinned per call, so idle workers are shut down when another
+                            model needs the memory.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        ocr_config = self.config.get('ocr', {})
+
+        self.engine = engine or TesseractEngine(ocr_config.get('lang', 'eng+ben'), ocr_config.get('psm', 6))
+        self.cache = cache if cache is not None else OCRCache(
+            max_entries=ocr_config.get('cache_entries', 4096),
+            max_bytes=int(ocr_config.get('cache_mb', 8) * 1024 * 1024)
+        )
+        self.workers = workers or ocr_config.get('workers', max(1, (os.cpu_count() or 2) - 1))
+        self.min_gap_x = ocr_config.get('min_gap_x', 24)
+        self.min_gap_y = ocr_config.get('min_gap_y', 12)
+        self.max_block_height = ocr_config.get('max_block_height', 256)
+        self.contrast = ocr_config.get('contrast', 32)
+        self.hash_downsample = ocr_config.get('hash_downsample', 1)
+
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[bytes, asyncio.Future] = {}
+        self.ocr_calls = 0
+
+        self.model_registry = model_registry
+        if model_registry is not None and self.REGISTRY_NAME not in model_registry:
+            model_registry.register(
+                self.REGISTRY_NAME, loader=self.start_pool, unloader=self.stop_pool,
+                size_mb=ocr_config.get('size_mb', 80) * self.workers
+            )
+
+    def start_pool(self) -> ProcessPoolExecutor:
+        """
+        Start the OCR worker processes.
+
+        Returns:
+            ProcessPoolExecutor: The pool.
+        """
+        pool = ProcessPoolExecutor(self.workers)
+        log.info(f"OCR process pool started with {self.workers} workers")
+        return pool
+
+    def stop_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Shut a pool's workers down (the registry's eviction hook)."""
+        pool.shutdown(wait=False, cancel_futures=True)
+        log.info("OCR process pool stopped")
+
+    def _uses_registry(self) -> bool:
+        return self.model_registry is not None and self.REGISTRY_NAME in self.model_registry
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = self.start_pool()
+        return self._pool
+
+    def _prepare(self, image: np.ndarray) -> Tuple[np.ndarray, List[Box], List[bytes]]:
+        gray = to_gray(image)
+        boxes = segment_blocks(gray, self.min_gap_x, self.min_gap_y, self.max_block_height, self.contrast)
+        keys = [tile_key(gray[top:bottom, left:right], self.hash_downsample) for top, left, bottom, right in boxes]
+        return gray, boxes, keys
+
+    async def recognize(self, image: np.ndarray, offset: Tuple[int, int] = (0, 0)) -> ScreenText:
+        """
+        Recognize the text in an image.
+
+        Args:
+            image: BGRA, BGR or gray uint8 image (a screen or a ScreenRegion image).
+            offset: (x, y) of the image on the screen, added to block and word positions.
+
+        Returns:
+            ScreenText: Merged text, positioned blocks and cache/OCR counters.
+        """
+        started = time.perf_counter()
+        gray, boxes, keys = await asyncio.to_thread(self._prepare, image)
+        if not self._uses_registry():
+            return await self._recognize(gray, boxes, keys, offset, started, self._executor)
+        # Pinned for the whole call, so the pool is not shut down under waiting blocks
+        async with self.model_registry.use(self.REGISTRY_NAME) as pool:
+            return await self._recognize(gray, boxes, keys, offset, started, lambda: pool)
+
+    async def _recognize(
+        self,
+        gray: np.ndarray,
+        boxes: List[Box],
+        keys: List[bytes],
+        offset: Tuple[int, int],
+        started: float,
+        executor: Callable[[], ProcessPoolExecutor]
+    ) -> ScreenText:
+        loop = asyncio.get_running_loop()
+        results: List[Optional[List[OCRWord]]] = [None] * len(boxes)
+        cached = [False] * len(boxes)
+        pending: Dict[bytes, asyncio.Future] = {}
+        calls = 0
+        for i, key in enumerate(keys):
+            if key in pending:
+                continue
+            words = self.cache.get(key)
+            if words is not None:
+                results[i] = words
+                cached[i] = True
+                continue
+            future = self._inflight.get(key)
+            if future is None:
+                top, left, bottom, right = boxes[i]
+                tile = np.ascontiguousarray(gray[top:bottom, left:right])
+                future = loop.run_in_executor(executor(), self.engine, tile)
+                self._inflight[key] = future
+                future.add_done_callback(lambda _, key=key: self._inflight.pop(key, None))
+                future.add_done_callback(_retrieve)
+                calls += 1
+            pending[key] = future
+
+        if pending:
+            # The futures are shared with every call OCR'ing the same block; shielded
+            # so a cancelled caller does not cancel them for the others
+            done = await asyncio.gather(*(asyncio.shield(future) for future in pending.values()))
+            for key, words in zip(pending, done):
+                self.cache.put(key, words)
+            by_key = dict(zip(pending, done))
+            for i, key in enumerate(keys):
+                if results[i] is None:
+                    results[i] = by_key[key]
+        self.ocr_calls += calls
+
+        dx, dy = offset
+        shifted = [(top + dy, left + dx, bottom + dy, right + dx) for top, left, bottom, right in boxes]
+        text, blocks = merge_layout(shifted, results, cached)
+        return ScreenText(text, blocks, len(boxes), sum(cached), calls, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get OCR and cache counters.
+
+        Returns:
+            Dict[str, Any]: OCR calls and cache statistics.
+        """
+        return {'ocr_calls': self.ocr_calls, **self.cache.stats()}
+
+    def close(self) -> None:
+        """Shut the process pool down."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+def record_screen_sequence(frames: int = 40, width: int = 1920, height: int = 1080, seed: int = 3) -> List[np.ndarray]:
+    """
+    Synthesize a recorded screen session drawn with ``SyntheticFont``: an editor and
+    a chat window side by side. Frames 0-9 type into the chat, 10-24 scroll the
+    editor one line per frame and the rest switch between two editor tabs.
+
+    Args:
+        frames: Number of frames.
+        width: Frame width.
+        height: Frame height.
+        seed: Random seed of the text.
+
+    Returns:
+        List[np.ndarray]: BGRA frames.
+    """
+    rng = np.random.default_rng(seed)
+    vocabulary = ['the', 'screen', 'memory', 'agent', 'model', 'cache', 'window', 'task', 'open', 'file',
+                  'send', 'mail', 'call', 'bank', 'at', '10:30', 'today', 'neomate', 'voice', 'plan']
+
+    def paragraphs(count: int) -> List[str]:
+        lines: List[str] = []
+        for _ in range(count):
+            for _ in range(int(rng.integers(2, 6))):
+                lines.append(' '.join(rng.choice(vocabulary, int(rng.integers(4, 14)))))
+            lines.append('')
+        return lines
+
+    font = SyntheticFont()
+    documents = [paragraphs(60), paragraphs(60)]
+    chat = [' '.join(rng.choice(vocabulary, int(rng.integers(3, 9)))) + '?' for _ in range(12)]
+    typed = 'can you open the bank file and plan a call at 10:30 today'
+    visible = (height - 120) // font.LINE_PITCH
+
+    sequence = []
+    for index in range(frames):
+        frame = np.full((height, width, 4), 245, dtype=np.uint8)
+        frame[:, 1040:1060, :3] = 200
+        frame[..., 3] = 255
+        if index < 10:
+            document, scroll = documents[0], 0
+        elif index < 25:
+            document, scroll = documents[0], index - 9
+        else:
+            document, scroll = documents[(index - 25) // 3 % 2], 15
+        font.draw(frame, 40, 60, document[scroll:scroll + visible])
+        chat_lines = []
+        for message in chat:
+            chat_lines.extend([message, ''])
+        font.draw(frame, 1100, 60, chat_lines)
+        font.draw(frame, 1100, height - 80, [typed[:12 + 4 * min(index, 9)]])
+        sequence.append(frame)
+    return sequence
+
+
+async def benchmark(frames: int = 40, workers: int = 4) -> Dict[str, Dict[str, Any]]:
+    """
+    Compare full-screen OCR, tiled OCR and cached tiled OCR on a recorded sequence.
+
+    Args:
+        frames: Frames in the sequence.
+        workers: OCR processes.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Per mode: OCR calls, calls avoided and latency;
+                                   for the cached mode also whether its text matches
+                                   the uncached text and the first frame's text.
+    """
+    import statistics
+
+    sequence = record_screen_sequence(frames)
+    engine = SyntheticFontEngine()
+    results: Dict[str, Dict[str, float]] = {}
+
+    pool = ProcessPoolExecutor(1)
+    loop = asyncio.get_running_loop()
+    latencies = []
+    for frame in sequence[:3]:
+        started = time.perf_counter()
+        await loop.run_in_executor(pool, engine, to_gray(frame))
+        latencies.append(time.perf_counter() - started)
+    pool.shutdown()
+    results['full screen, 1 call/frame'] = {
+        'calls': frames, 'avoided': 0.0, 'p50_ms': statistics.median(latencies) * 1000, 'max_ms': max(latencies) * 1000,
+    }
+
+    texts = {}
+    for name, cache_entries in (('blocks, no cache', 0), ('blocks + cache', 4096)):
+        recognizer = TextRecognizer(engine=engine, cache=OCRCache(max_entries=cache_entries), workers=workers)
+        latencies, tiles, outputs = [], 0, []
+        for frame in sequence:
+            result = await recognizer.recognize(frame)
+            latencies.append(result.latency_s)
+            tiles += result.tiles
+            outputs.append(result.text)
+        recognizer.close()
+        texts[name] = outputs
+        results[name] = {
+            'calls': recognizer.ocr_calls,
+            'avoided': 1 - recognizer.ocr_calls / tiles,
+            'p50_ms': statistics.median(latencies) * 1000,
+            'max_ms': max(latencies) * 1000,
+        }
+    results['blocks + cache']['same_text'] = float(texts['blocks, no cache'] == texts['blocks + cache'])
+    results['blocks + cache']['sample'] = texts['blocks + cache'][0]
+    return results
+
+
+async def main():
+    """
+    Run the OCR cache benchmark with the synthetic-font engine.
+    """
+    results = await benchmark()
+    for name, result in results.items():
+        print(f"{name:<26} {result['calls']:5.0f} OCR calls  ({result['avoided'] * 100:5.1f}% avoided)  "
+              f"latency p50 {result['p50_ms']:7.1f} ms  max {result['max_ms']:7.1f} ms")
+    print(f"cached text identical to uncached: {bool(results['blocks + cache']['same_text'])}")
+    print(f"first frame: {results['blocks + cache']['sample'][:160]!r}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1 +1,477 @@
-#এই মডিউলে Coqui TTS বা pyttsx3 ব্যবহার করে ভয়েস আউটপুট ফাংশন থাকবে যা টেক্সটকে স্পিচে কনভার্ট করবে, বাংলা সাপোর্ট সহ; এটি রেসপন্স কমিউনিকেট করার জন্য তৈরি, ন্যাচারাল ইন্টারঅ্যাকশন প্রোভাইড করে।
+"""
+NeoMate AI Voice Output Module
+
+This module converts response text into speech with Bengali and English support. It
+is built for streaming: text arrives as an async iterator of LLM tokens, is cut into
+sentences as soon as a sentence boundary is seen, and each sentence is synthesized and
+played while the following sentences are still being generated and synthesized.
+
+Features:
+- Sentence-boundary chunking for Bengali (।, ॥) and English (. ! ?) punctuation,
+  robust to decimals and common abbreviations
+- Pipelined synthesis and playback: sentence N plays while sentence N+1 is synthesized
+- Piper and Coqui TTS backends with per-script voices, loaded lazily
+- sounddevice playback, plus a silent player and a stub backend for benchmarks
+- Time-to-first-audio measurement and barge-in (stop while speaking)
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import asyncio
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import numpy as np
+
+from src.utils.config_loader import ConfigLoader
+from src.utils.instrumentation import metrics, span
+from src.utils.logger import log
+
+# Always end a sentence (no look-ahead needed)
+_HARD_BOUNDARIES = '।॥\n'
+# End a sentence only if followed by whitespace, so '3.5' or 'v1.2' stay intact
+_SOFT_BOUNDARIES = '.!?…'
+_CLOSERS = '"\'”’)]»'
+_ABBREVIATIONS = frozenset({
+    'mr', 'mrs', 'ms', 'dr', 'prof', 'sr', 'jr', 'st', 'vs', 'etc', 'e.g', 'i.e', 'no', 'approx',
+})
+_BENGALI = re.compile(r'[ঀ-৿]')
+
+
+class SentenceChunker:
+    """
+    Incrementally splits streamed text into speakable sentences.
+    """
+
+    def __init__(self, max_chars: int = 200):
+        """
+        Initialize the SentenceChunker.
+
+        Args:
+            max_chars: Longest chunk emitted without a sentence boundary; longer runs
+                       are split at the last clause break or space.
+        """
+        self.max_chars = max_chars
+        self._buffer = ''
+        self._scan = 0
+
+    def _is_abbreviation(self, end: int) -> bool:
+        """Whether the '.' at ``end`` terminates an abbreviation or an initial."""
+        start = end
+        while start > 0 and not self._buffer[start - 1].isspace():
+            start -= 1
+        word = self._buffer[start:end].lower().lstrip(_CLOSERS + '(')
+        return word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add streamed text.
+
+        Args:
+            text: Next text fragment.
+
+        Returns:
+            List[str]: Sentences completed by this fragment.
+        """
+        self._buffer += text
+        sentences = []
+        buffer = self._buffer
+        cut = 0
+        i = self._scan
+        n = len(buffer)
+        while i < n:
+            char = buffer[i]
+            end = None
+            if char in _HARD_BOUNDARIES:
+                end = i + 1
+            elif char in _SOFT_BOUNDARIES:
+                j = i + 1
+                while j < n and (buffer[j] in _CLOSERS or buffer[j] in _SOFT_BOUNDARIES):
+                    j += 1
+                if j == n:
+                    # Cannot decide until the next character arrives
+                    break
+                if buffer[j].isspace() and not (char == '.' and self._is_abbreviation(i)):
+                    end = j
+                i = j - 1
+            if end is not None:
+                while end < n and buffer[end] in _CLOSERS:
+                    end += 1
+                sentence = buffer[cut:end].strip()
+                if sentence:
+                    sentences.append(sentence)
+                cut = end
+                i = end
+                continue
+            i += 1
+
+        # Force a split in overlong runs without punctuation
+        while i - cut > self.max_chars:
+            window = buffer[cut:cut + self.max_chars]
+            split = max(window.rfind(','), window.rfind(';'), window.rfind(':'), window.rfind('،'))
+            if split <= 0:
+                split = window.rfind(' ')
+            end = cut + (split + 1 if split > 0 else self.max_chars)
+            sentence = buffer[cut:end].strip()
+            if sentence:
+                sentences.append(sentence)
+            cut = end
+
+        self._buffer = buffer[cut:]
+        self._scan = i - cut
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """
+        End the stream.
+
+        Returns:
+            Optional[str]: The remaining text, if any.
+        """
+        rest = self._buffer.strip()
+        self._buffer = ''
+        self._scan = 0
+        return rest or None
+
+
+async def chunk_sentences(tokens: AsyncIterator[str], max_chars: int = 200) -> AsyncIterator[str]:
+    """
+    Turn an async token stream into an async sentence stream.
+
+    Args:
+        tokens: Streamed text fragments.
+        max_chars: See ``SentenceChunker``.
+
+    Yields:
+        str: Complete sentences, as soon as each one ends.
+    """
+    chunker = SentenceChunker(max_chars)
+    async for token in tokens:
+        for sentence in chunker.feed(token):
+            yield sentence
+    rest = chunker.flush()
+    if rest:
+        yield rest
+
+
+class TTSBackend:
+    """
+    Base class of text-to-speech backends. ``synthesize`` is blocking and is run in a
+    worker thread.
+    """
+
+    sample_rate = 22050
+
+    def load(self) -> None:
+        """Load voices/models. Called once before the first synthesis."""
+
+    def synthesize(self, text: str) -> np.ndarray:
+        """
+        Synthesize one sentence.
+
+        Args:
+            text: Sentence to speak.
+
+        Returns:
+            np.ndarray: Mono float32 audio in [-1, 1] at ``sample_rate``.
+        """
+        raise NotImplementedError
+
+
+class PiperTTSBackend(TTSBackend):
+    """
+    Piper neural TTS (fast on CPU). Picks the Bengali or English voice by script.
+    """
+
+    def __init__(self, voices: Dict[str, str]):
+        """
+        Initialize the PiperTTSBackend.
+
+        Args:
+            voices: Language code ('en', 'bn') -> path of a Piper .onnx voice model.
+        """
+        self.voice_paths = voices
+        self._voices: Dict[str, Any] = {}
+
+    def load(self) -> None:
+        from piper.voice import PiperVoice
+
+        for language, path in self.voice_paths.items():
+            if language not in self._voices:
+                self._voices[language] = PiperVoice.load(path)
+                log.info(f"Piper voice '{language}' loaded from {path}")
+        if self._voices:
+            self.sample_rate = next(iter(self._voices.values())).config.sample_rate
+
+    def synthesize(self, text: str) -> np.ndarray:
+        language = 'bn' if _BENGALI.search(text) else 'en'
+        voice = self._voices.get(language) or next(iter(self._voices.values()))
+        pcm = b''.join(voice.synthesize_stream_raw(text))
+        return np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+class CoquiTTSBackend(TTSBackend):
+    """
+    Coqui TTS, e.g. a multilingual XTTS or VITS model.
+    """
+
+    def __init__(self, model_name: str = 'tts_models/multilingual/multi-dataset/xtts_v2', speaker: Optional[str] = None):
+        """
+        Initialize the CoquiTTSBackend.
+
+        Args:
+            model_name: Coqui model identifier.
+            speaker: Optional speaker name for multi-speaker models.
+        """
+        self.model_name = model_name
+        self.speaker = speaker
+        self._tts: Any = None
+
+    def load(self) -> None:
+        if self._tts is None:
+            from TTS.api import TTS
+
+            self._tts = TTS(self.model_name)
+            self.sample_rate = self._tts.synthesizer.output_sample_rate
+            log.info(f"Coqui TTS model '{self.model_name}' loaded")
+
+    def synthesize(self, text: str) -> np.ndarray:
+        kwargs: Dict[str, Any] = {'speaker': self.speaker} if self.speaker else {}
+        if getattr(self._tts, 'is_multi_lingual', False):
+            kwargs['language'] = 'bn' if _BENGALI.search(text) else 'en'
+        return np.asarray(self._tts.tts(text, **kwargs), dtype=np.float32)
+
+
+class StubTTSBackend(TTSBackend):
+    """
+    Produces silence of a realistic length after a realistic synthesis delay.
+    Used for tests and latency benchmarks.
+    """
+
+    def __init__(self, chars_per_s: float = 15.0, realtime_factor: float = 0.3, sample_rate: int = 16000):
+        """
+        Initialize the StubTTSBackend.
+
+        Args:
+            chars_per_s: Speaking rate used to size the audio.
+            realtime_factor: Synthesis time as a fraction of the audio duration.
+            sample_rate: Output sample rate.
+        """
+        self.chars_per_s = chars_per_s
+        self.realtime_factor = realtime_factor
+        self.sample_rate = sample_rate
+
+    def synthesize(self, text: str) -> np.ndarray:
+        duration = len(text) / self.chars_per_s
+        time.sleep(duration * self.realtime_factor)
+        return np.zeros(int(duration * self.sample_rate), dtype=np.float32)
+
+
+class AudioPlayer:
+    """
+    Blocking audio player. ``play`` runs in a worker thread; ``stop`` may be called
+    from any thread and makes an ongoing ``play`` return early.
+    """
+
+    def play(self, audio: np.ndarray, sample_rate: int) -> None:
+        """Play audio and return when it has finished (or was stopped)."""
+        import sounddevice as sd
+
+        sd.play(audio, sample_rate)
+        sd.wait()
+
+    def stop(self) -> None:
+        """Interrupt playback."""
+        import sounddevice as sd
+
+        sd.stop()
+
+
+class SilentPlayer(AudioPlayer):
+    """
+    Waits for the duration of the audio without producing sound.
+    """
+
+    def __init__(self):
+        self._stopped = threading.Event()
+
+    def play(self, audio: np.ndarray, sample_rate: int) -> None:
+        self._stopped.clear()
+        self._stopped.wait(len(audio) / sample_rate)
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+@dataclass
+class SpeechResult:
+    """Outcome of one spoken response."""
+
+    sentences: List[str] = field(default_factory=list)
+    # Seconds from ``started_at`` until the first sentence started playing
+    first_audio_s: Optional[float] = None
+    synthesis_s: float = 0.0
+    audio_s: float = 0.0
+    interrupted: bool = False
+
+
+class VoiceOutput:
+    """
+    Streaming text-to-speech output.
+    """
+
+    def __init__(
+        self,
+        config_loader: Optional[ConfigLoader] = None,
+        backend: Optional[TTSBackend] = None,
+        player: Optional[AudioPlayer] = None
+    ):
+        """
+        Initialize the VoiceOutput.
+
+        Args:
+            config_loader: Optional ConfigLoader instance for configuration.
+                          If None, a new instance will be created.
+            backend: Optional TTS backend. If None, one is built from the
+                     ``voice_output`` configuration.
+            player: Optional audio player. Defaults to sounddevice playback.
+        """
+        self.config_loader = config_loader or ConfigLoader()
+        self.config = self.config_loader.get_config()
+        tts_config = self.config.get('voice_output', {})
+
+        self.backend = backend or self._create_backend(tts_config)
+        self.player = player or AudioPlayer()
+        self.max_sentence_chars = tts_config.get('max_sentence_chars', 200)
+        # Synthesized sentences waiting for playback; bounds work done ahead of the listener
+        self.queue_depth = tts_config.get('queue_depth', 2)
+
+        self._loaded = False
+        self._stop_requested = False
+        self.is_speaking = False
+
+        log.info("VoiceOutput initialized successfully")
+
+    @staticmethod
+    def _create_backend(tts_config: Dict[str, Any]) -> TTSBackend:
+        name = tts_config.get('backend', 'piper')
+        if name == 'piper':
+            return PiperTTSBackend(dict(tts_config.get('voices', {})))
+        if name == 'coqui':
+            return CoquiTTSBackend(tts_config.get('model', 'tts_models/multilingual/multi-dataset/xtts_v2'), tts_config.get('speaker'))
+        if name == 'stub':
+            return StubTTSBackend()
+        raise ValueError(f"Unknown TTS backend '{name}'")
+
+    async def initialize(self) -> bool:
+        """
+        Load the TTS backend.
+
+        Returns:
+            bool: True if initialization successful, False otherwise.
+        """
+        try:
+            await asyncio.to_thread(self.backend.load)
+            self._loaded = True
+            log.info(f"VoiceOutput backend {type(self.backend).__name__} ready")
+            return True
+        except Exception as e:
+            log.error(f"Failed to initialize VoiceOutput: {e}")
+            return False
+
+    async def speak_stream(self, tokens: AsyncIterator[str], started_at: Optional[float] = None) -> SpeechResult:
+        """
+        Speak streamed text, starting with the first complete sentence.
+
+        Sentences are synthesized in a worker thread by a producer task while the
+        previous sentence plays, so generation, synthesis and playback overlap.
+
+        Args:
+            tokens: Streamed text fragments (e.g. LLM tokens).
+            started_at: perf_counter value that time-to-first-audio is measured
+                        from. Defaults to the call time.
+
+        Returns:
+            SpeechResult: Spoken sentences and timings.
+        """
+        if not self._loaded:
+            await asyncio.to_thread(self.backend.load)
+            self._loaded = True
+        started_at = time.perf_counter() if started_at is None else started_at
+        result = SpeechResult()
+        audio_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_depth)
+        self._stop_requested = False
+        self.is_speaking = True
+
+        async def synthesize_sentences() -> None:
+            try:
+                async for sentence in chunk_sentences(tokens, self.max_sentence_chars):
+                    if self._stop_requested:
+                        break
+                    synth_start = time.perf_counter()
+                    async with span('tts.synthesize'):
+                        audio = await asyncio.to_thread(self.backend.synthesize, sentence)
+                    result.synthesis_s += time.perf_counter() - synth_start
+                    await audio_queue.put((sentence, audio))
+            except Exception:
+                await audio_queue.put(None)
+                raise
+            # End-of-stream marker (not sent when cancelled: the player is gone)
+            await audio_queue.put(None)
+
+        producer = asyncio.create_task(synthesize_sentences(), name="tts-synthesis")
+        try:
+            while True:
+                item = await audio_queue.get()
+                if item is None or self._stop_requested:
+                    break
+                sentence, audio = item
+                if result.first_audio_s is None:
+                    result.first_audio_s = time.perf_counter() - started_at
+                    if metrics.enabled:
+                        metrics.record('tts.time_to_first_audio', int(started_at * 1e9), int(result.first_audio_s * 1e9))
+                    log.debug(f"First audio after {result.first_audio_s:.3f} s")
+                result.sentences.append(sentence)
+                result.audio_s += len(audio) / self.backend.sample_rate
+                await asyncio.to_thread(self.player.play, audio, self.backend.sample_rate)
+        finally:
+            self.is_speaking = False
+            result.interrupted = self._stop_requested
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+
+        if not producer.cancelled() and producer.exception() is not None:
+            raise producer.exception()
+        return result
+
+    async def speak(self, text: str) -> SpeechResult:
+        """
+        Speak a complete text.
+
+        Args:
+            text: Text to speak.
+
+        Returns:
+            SpeechResult: Spoken sentences and timings.
+        """
+        async def single() -> AsyncIterator[str]:
+            yield text
+
+        return await self.speak_stream(single())
+
+    def stop(self) -> None:
+        """Stop speaking (barge-in): drops pending sentences and interrupts playback."""
+        if self.is_speaking:
+            self._stop_requested = True
+            self.player.stop()
+
+    async def cleanup(self) -> None:
+        """Stop playback."""
+        self.stop()
+        log.info("VoiceOutput resources cleaned up")
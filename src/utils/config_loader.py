@@ -5,10 +5,20 @@ This module provides a centralized, robust way to load and access configuration
 from the settings.yaml file. It includes validation, environment variable overrides,
 caching, and comprehensive error handling to ensure reliable configuration management.
 
+The merged configuration is published as an immutable ``ConfigSnapshot``. A reload
+builds a complete new snapshot and swaps it in with a single reference assignment, so
+readers never see a half-updated configuration. Subscribers are notified after each
+swap, which lets settings such as the wake word threshold change without a restart.
+
 Features:
 - YAML file loading with validation
 - Environment variable override support
 - Configuration caching for performance
+- Lazy loading: nothing is parsed until the configuration is first used
+- Immutable snapshots with precompiled O(1) dotted-key lookups and live accessors
+- Hot reload driven by a file watcher (watchdog, with an mtime polling fallback)
+- On-disk JSON cache of the file configuration keyed by file mtimes and a digest of the
+  env overrides; override values (which may be secrets) are never written to disk
 - Comprehensive error handling and logging
 - Type hints for better code maintainability
 
@@ -16,15 +26,105 @@ Author: NeoMate AI Team
 Version: 1.0.0
 """
 
+import hashlib
+import json
 import os
 import logging
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
-import yaml
+from types import MappingProxyType
+from typing import Dict, Any, Callable, List, Mapping, Optional, Tuple
 
 
 logger = logging.getLogger(__name__)
 
+# Bump when the snapshot layout or the merge rules change so stale caches are ignored
+_CACHE_FORMAT_VERSION = 3
+
+_MISSING = object()
+
+SnapshotCallback = Callable[['ConfigSnapshot', 'ConfigSnapshot'], None]
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    """Recursively convert a frozen value back to plain dicts and lists."""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _flatten(value: Mapping, prefix: str, out: Dict[str, Any]) -> Dict[str, Any]:
+    """Index every nested value of a mapping under its dotted key path."""
+    for key, item in value.items():
+        path = f"{prefix}.{key}" if prefix else str(key)
+        out[path] = item
+        if isinstance(item, Mapping):
+            _flatten(item, path, out)
+    return out
+
+
+class ConfigSnapshot:
+    """
+    An immutable, fully merged configuration.
+
+    Every nested value is indexed by its dotted key path when the snapshot is built,
+    so ``get('wake_word.confidence_threshold')`` is a single dictionary lookup.
+    """
+
+    __slots__ = ('data', 'version', 'loaded_at', 'from_cache', '_flat')
+
+    def __init__(self, config: Dict[str, Any], version: int = 1, from_cache: bool = False):
+        """
+        Initialize the ConfigSnapshot.
+
+        Args:
+            config: Merged configuration dictionary. It is copied, not referenced.
+            version: Monotonic snapshot number, incremented on every reload.
+            from_cache: Whether the configuration came from the on-disk cache.
+        """
+        self.data: Mapping[str, Any] = _freeze(config)
+        self.version = version
+        self.loaded_at = time.time()
+        self.from_cache = from_cache
+        self._flat = _flatten(self.data, '', {})
+
+    def get(self, key_path: str, default: Any = None) -> Any:
+        """
+        Look up a value by dotted key path.
+
+        Args:
+            key_path: Dotted path, e.g. 'llm.primary_provider'.
+            default: Value returned if the path does not exist.
+
+        Returns:
+            Any: The (read-only) value, or default.
+        """
+        return self._flat.get(key_path, default)
+
+    def __contains__(self, key_path: str) -> bool:
+        return key_path in self._flat
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get a mutable deep copy of the configuration.
+
+        Returns:
+            Dict[str, Any]: Plain nested dicts and lists.
+        """
+        return _thaw(self.data)
+
 
 class ConfigLoader:
     """
@@ -32,32 +132,302 @@ class ConfigLoader:
 
     This class provides methods to load YAML configuration files, validate them,
     apply environment variable overrides, and cache the results for efficient access.
+    The current configuration is an immutable ``ConfigSnapshot`` that can be hot
+    reloaded with ``reload()`` or automatically with ``start_watching()``.
     """
 
     _instance: Optional['ConfigLoader'] = None
-    _config: Optional[Dict[str, Any]] = None
+    _snapshot: Optional[ConfigSnapshot] = None
 
     def __new__(cls) -> 'ConfigLoader':
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            instance = super().__new__(cls)
+            instance._lock = threading.RLock()
+            instance._subscribers: List[SnapshotCallback] = []
+            instance._fingerprint: Optional[Tuple] = None
+            instance._watcher: Optional[_ConfigWatcher] = None
+            cls._instance = instance
         return cls._instance
 
     def __init__(self) -> None:
-        if self._config is None:
-            self._config = self._load_and_validate_config()
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    fingerprint = self._compute_fingerprint()
+                    config = self._load_cached_config(fingerprint)
+                    from_cache = config is not None
+                    if config is None:
+                        config = self._load_and_validate_config()
+                        self._store_cached_config(fingerprint, config)
+                    config = self._apply_env_overrides(config)
+                    self._fingerprint = fingerprint
+                    self._snapshot = ConfigSnapshot(config, from_cache=from_cache)
 
     def get_config(self) -> Dict[str, Any]:
         """
         Get the loaded and validated configuration.
 
+        The result is a private deep copy made of plain dicts and lists, so callers
+        may modify or serialize it. It does not change when the configuration is
+        reloaded; long-lived callers should use ``get``, ``accessor`` or
+        ``subscribe`` to see updates.
+
         Returns:
             Dict[str, Any]: The complete configuration dictionary.
         """
-        return self._config
+        return self._snapshot.to_dict()
+
+    def get_frozen_config(self) -> Mapping[str, Any]:
+        """
+        Get the current snapshot's read-only configuration without copying it.
+
+        Nested sections are read-only mappings and lists are tuples.
+
+        Returns:
+            Mapping[str, Any]: The complete configuration mapping.
+        """
+        return self._snapshot.data
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        """The current configuration snapshot."""
+        return self._snapshot
+
+    def get(self, key_path: str, default: Any = None) -> Any:
+        """
+        Look up a value in the current snapshot by dotted key path.
+
+        Args:
+            key_path: Dotted path, e.g. 'wake_word.confidence_threshold'.
+            default: Value returned if the path does not exist.
+
+        Returns:
+            Any: The configured value, or default.
+        """
+        return self._snapshot._flat.get(key_path, default)
+
+    def accessor(self, key_path: str, default: Any = None) -> Callable[[], Any]:
+        """
+        Build a precompiled getter for one dotted key path.
+
+        The getter always reads the current snapshot, so it reflects hot reloads,
+        and costs one attribute and one dictionary lookup per call.
+
+        Args:
+            key_path: Dotted path, e.g. 'llm.primary_provider'.
+            default: Value returned if the path does not exist.
+
+        Returns:
+            Callable[[], Any]: Zero-argument getter.
+        """
+        loader = self
+
+        def get_value() -> Any:
+            return loader._snapshot._flat.get(key_path, default)
+
+        get_value.__name__ = f"config[{key_path}]"
+        return get_value
+
+    def subscribe(self, callback: SnapshotCallback) -> Callable[[], None]:
+        """
+        Register a callback invoked with (old, new) snapshots after every reload.
+
+        Callbacks run on the thread that performed the reload (the watcher thread for
+        automatic reloads); asyncio consumers should hand work over with
+        ``loop.call_soon_threadsafe``. Exceptions raised by callbacks are logged.
+
+        Args:
+            callback: Function taking the previous and the new snapshot.
+
+        Returns:
+            Callable[[], None]: Function that removes the subscription.
+        """
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe() -> None:
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+
+        return unsubscribe
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Re-read the configuration files and swap in a new snapshot.
+
+        If the new files fail to parse or validate, the current snapshot is kept.
+
+        Args:
+            force: Reload even if file mtimes and env overrides are unchanged.
+
+        Returns:
+            bool: True if a new snapshot was published.
+        """
+        with self._lock:
+            fingerprint = self._compute_fingerprint()
+            if not force and fingerprint == self._fingerprint:
+                return False
+            # Remember the inputs even if they are invalid, so a broken file is
+            # reported once rather than on every poll until it is fixed
+            self._fingerprint = fingerprint
+            try:
+                config = self._load_and_validate_config()
+            except Exception as e:
+                logger.error(f"Configuration reload failed, keeping previous configuration: {e}")
+                return False
+            self._store_cached_config(fingerprint, config)
+            config = self._apply_env_overrides(config)
+
+            old = self._snapshot
+            new = ConfigSnapshot(config, version=old.version + 1)
+            if new._flat == old._flat:
+                return False
+            self._snapshot = new
+            subscribers = list(self._subscribers)
+
+        changed = sorted(
+            key for key in new._flat.keys() | old._flat.keys()
+            if not isinstance(new._flat.get(key), Mapping)
+            and not isinstance(old._flat.get(key), Mapping)
+            and new._flat.get(key, _MISSING) != old._flat.get(key, _MISSING)
+        )
+        logger.info(f"Configuration reloaded (snapshot {new.version}), changed: {', '.join(changed) or 'none'}")
+        for callback in subscribers:
+            try:
+                callback(old, new)
+            except Exception as e:
+                logger.error(f"Configuration subscriber {callback!r} failed: {e}")
+        return True
+
+    def start_watching(self, poll_interval: float = 1.0) -> None:
+        """
+        Start reloading the configuration automatically when its files change.
+
+        Uses watchdog file system events when available and falls back to polling
+        file mtimes every ``poll_interval`` seconds.
+
+        Args:
+            poll_interval: Polling period in seconds (also the upper bound on
+                           reload latency if watchdog events are missed).
+        """
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = _ConfigWatcher(self, self._get_config_path().parent, poll_interval)
+                self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the configuration file watcher."""
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            watcher.stop()
+
+    @property
+    def is_watching(self) -> bool:
+        """Whether the configuration file watcher is running."""
+        return self._watcher is not None
+
+    def _compute_fingerprint(self) -> Tuple:
+        """
+        Identify the inputs of the merged configuration.
+
+        Returns:
+            Tuple: Size and mtime of each configuration file plus a SHA-256 digest of
+                   the NEOMATE_* environment variables. The fingerprint is written to
+                   the cache file, so it must not contain the values themselves
+                   (NEOMATE_DB_KEY is the database master key).
+        """
+        files = []
+        for path in (self._get_config_path(), self._get_wake_words_path()):
+            try:
+                stat = path.stat()
+                files.append((path.name, stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                files.append((path.name, None, None))
+        env = hashlib.sha256()
+        for key, value in sorted((k, v) for k, v in os.environ.items() if k.startswith('NEOMATE_')):
+            env.update(f"{key}={value}\0".encode('utf-8', 'surrogatepass'))
+        return (_CACHE_FORMAT_VERSION, str(self._get_config_path().parent), tuple(files), env.hexdigest())
+
+    def _get_cache_path(self) -> Path:
+        """
+        Determine the absolute path to the merged configuration cache.
+
+        Returns:
+            Path: Absolute path to the cache file under data/cache.
+        """
+        return Path(__file__).parent.parent.parent / "data" / "cache" / "config_snapshot.json"
+
+    def _load_cached_config(self, fingerprint: Tuple) -> Optional[Dict[str, Any]]:
+        """
+        Load the merged configuration from the on-disk cache if it is still valid.
+
+        Args:
+            fingerprint: Fingerprint of the current configuration inputs.
+
+        Returns:
+            Optional[Dict[str, Any]]: Cached configuration, or None on a miss.
+        """
+        cache_path = self._get_cache_path()
+        try:
+            with open(cache_path, encoding='utf-8') as file:
+                cached = json.load(file)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable configuration cache {cache_path}: {e}")
+            return None
+        # JSON has no tuples; compare the fingerprint in its serialized form
+        if not isinstance(cached, dict) or cached.get('fingerprint') != json.loads(json.dumps(fingerprint)):
+            return None
+        logger.info(f"Configuration loaded from cache {cache_path}")
+        return cached['config']
+
+    def _store_cached_config(self, fingerprint: Tuple, config: Dict[str, Any]) -> None:
+        """
+        Write the merged configuration to the on-disk cache.
+
+        The file is written next to its destination with owner-only permissions and
+        renamed into place so a concurrent reader never sees a partial cache. Only
+        the configuration read from the files is cached; environment overrides are
+        applied after loading. A configuration that does not
+        survive a JSON round trip unchanged (e.g. YAML dates or integer keys) is not
+        cached. Failures are not fatal.
+
+        Args:
+            fingerprint: Fingerprint of the configuration inputs.
+            config: Merged configuration dictionary.
+        """
+        cache_path = self._get_cache_path()
+        temp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        try:
+            text = json.dumps({'fingerprint': fingerprint, 'config': config}, ensure_ascii=False)
+            if json.loads(text)['config'] != config:
+                logger.debug("Configuration is not JSON round-trippable; not caching it")
+                return
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                temp_path.unlink()
+            except FileNotFoundError:
+                pass
+            fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with open(fd, 'w', encoding='utf-8') as file:
+                file.write(text)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logger.debug(f"Could not write configuration cache {cache_path}: {e}")
+            try:
+                temp_path.unlink()
+            except OSError:
+                pass
 
     def _load_and_validate_config(self) -> Dict[str, Any]:
         """
-        Load configuration from settings.yaml and wake_words.yaml files with validation and overrides.
+        Load configuration from settings.yaml and wake_words.yaml files with validation.
+
+        Environment overrides are applied separately by ``_apply_env_overrides`` so
+        that their values never reach the on-disk cache.
 
         Returns:
             Dict[str, Any]: Validated configuration dictionary.
@@ -67,6 +437,9 @@ class ConfigLoader:
             yaml.YAMLError: If there's an error parsing the YAML files.
             ValueError: If required configuration keys are missing.
         """
+        # Imported here so a cold start served from the cache never loads the YAML parser
+        import yaml
+
         config_path = self._get_config_path()
         wake_words_path = self._get_wake_words_path()
 
@@ -123,10 +496,7 @@ class ConfigLoader:
         if 'application' in config:
             self._validate_config(config)
 
-        # Apply environment variable overrides
-        config = self._apply_env_overrides(config)
-
-        logger.info("Configuration validation and overrides applied successfully")
+        logger.info("Configuration validated successfully")
         return config
 
     def _get_config_path(self) -> Path:
@@ -229,9 +599,80 @@ class ConfigLoader:
         return apply_override(config)
 
 
-# Global configuration instance
-config_loader = ConfigLoader()
-CONFIG = config_loader.get_config()
+class _ConfigWatcher:
+    """
+    Background thread that reloads the configuration when its files change.
+
+    watchdog events (if the package is installed) wake the thread immediately;
+    otherwise it compares file mtimes every ``poll_interval`` seconds. Changes are
+    debounced so an editor's write-then-rename sequence triggers a single reload.
+    """
+
+    DEBOUNCE_S = 0.2
+
+    def __init__(self, loader: ConfigLoader, directory: Path, poll_interval: float):
+        self.loader = loader
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+
+    def start(self) -> None:
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+
+            wake = self._wake
+
+            class _Handler(FileSystemEventHandler):
+                def on_any_event(self, event: Any) -> None:
+                    wake.set()
+
+            observer = Observer()
+            observer.schedule(_Handler(), str(self.directory), recursive=False)
+            observer.daemon = True
+            observer.start()
+            self._observer = observer
+            logger.info(f"Watching {self.directory} for configuration changes (watchdog)")
+        except Exception as e:
+            logger.info(f"Polling {self.directory} for configuration changes every {self.poll_interval:.1f} s ({e})")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2.0)
+        self._thread.join(timeout=2.0)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            if self._wake.wait(self.poll_interval):
+                # Let the burst of events from a single save settle first
+                self._stopped.wait(self.DEBOUNCE_S)
+                self._wake.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                self.loader.reload()
+            except Exception as e:
+                logger.error(f"Configuration watcher error: {e}")
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Lazily provide the global ``config_loader`` and ``CONFIG`` module attributes.
+
+    Configuration files are parsed on first access instead of at import time.
+    """
+    if name == 'config_loader':
+        return ConfigLoader()
+    if name == 'CONFIG':
+        return ConfigLoader().get_frozen_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
@@ -239,6 +680,5 @@ if __name__ == "__main__":
     Test script to verify configuration loading.
     Run this module directly to see the loaded configuration.
     """
-    import json
     print("Loaded Configuration:")
-    print(json.dumps(CONFIG, indent=2, default=str))
+    print(json.dumps(ConfigLoader().snapshot.to_dict(), indent=2, default=str))
@@ -12,15 +12,14 @@ Features:
 - File system operations
 - Configuration utilities
 - Error handling decorators
-- Performance monitoring helpers
+- Performance monitoring helpers (backed by utils.instrumentation)
 
 Author: NeoMate AI Team
 Version: 1.0.0
 License: MIT
 """
 
-import functools
-import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union, Callable, TypeVar
 from datetime import datetime
@@ -89,10 +88,18 @@ def ensure_directory(path: Union[str, Path]) -> Path:
     return path
 
 
+@lru_cache(maxsize=1024)
+def _split_key_path(key_path: str) -> tuple:
+    return tuple(key_path.split('.'))
+
+
 def safe_get(data: Dict[str, Any], key_path: str, default: Any = None) -> Any:
     """
     Safely get nested dictionary value using dot notation.
 
+    For the application configuration prefer ``ConfigLoader.get`` or
+    ``ConfigLoader.accessor``, which use a precompiled index of all key paths.
+
     Args:
         data: Dictionary to search
         key_path: Dot-separated key path (e.g., 'application.name')
@@ -101,7 +108,7 @@ def safe_get(data: Dict[str, Any], key_path: str, default: Any = None) -> Any:
     Returns:
         Any: Value at key path or default
     """
-    keys = key_path.split('.')
+    keys = _split_key_path(key_path)
     current = data
 
     try:
@@ -132,7 +139,11 @@ def validate_config(config: Dict[str, Any], required_keys: List[str]) -> List[st
 
 def timing_decorator(func: Callable[..., T]) -> Callable[..., T]:
     """
-    Decorator to measure and log function execution time.
+    Decorator to measure function execution time.
+
+    Works on both sync and async functions. Durations are measured with
+    perf_counter_ns and recorded into the instrumentation span histogram named
+    after the function; nothing is printed. See ``utils.instrumentation``.
 
     Args:
         func: Function to decorate
@@ -140,21 +151,9 @@ def timing_decorator(func: Callable[..., T]) -> Callable[..., T]:
     Returns:
         Callable: Decorated function
     """
-    @functools.wraps(func)
-    def wrapper(*args, **kwargs) -> T:
-        start_time = time.time()
-        try:
-            result = func(*args, **kwargs)
-            end_time = time.time()
-            execution_time = end_time - start_time
-            print(f"Function {func.__name__} executed in {execution_time:.4f} seconds")
-            return result
-        except Exception as e:
-            end_time = time.time()
-            execution_time = end_time - start_time
-            print(f"Function {func.__name__} failed after {execution_time:.4f} seconds: {e}")
-            raise
-    return wrapper
+    from src.utils.instrumentation import traced
+
+    return traced(func.__qualname__)(func)
 
 
 def get_timestamp(format_str: str = "%Y-%m-%d %H:%M:%S") -> str:
@@ -0,0 +1,515 @@
+"""
+NeoMate AI Instrumentation Module
+
+This module provides low-overhead latency instrumentation for both synchronous and
+asyncio code paths. Named spans feed log-linear (HDR-style) histograms, per-request
+trace IDs follow a request through the listen -> think -> act stages via contextvars,
+and everything can be exported locally as Prometheus text or a JSON snapshot.
+
+Features:
+- ``traced`` decorator for sync and async callables using perf_counter_ns
+- ``span`` context manager usable with ``with`` and ``async with``
+- Fixed-memory log-linear histograms with ~3% relative precision
+- Per-request trace IDs propagated across tasks with contextvars and continued by ID across event consumers
+- Prometheus text format and JSON snapshot export
+- Near-zero overhead when disabled (a shared no-op span and a single flag check)
+
+Usage:
+    from src.utils.instrumentation import metrics, span, start_trace, traced
+
+    metrics.enable()
+
+    @traced("think")
+    async def think(text): ...
+
+    with start_trace():
+        with span("listen"):
+            ...
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import time
+import uuid
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, TypeVar, Union
+
+T = TypeVar('T')
+
+# Histogram layout: 2**SUB_BITS linear sub-buckets per power of two
+_SUB_BITS = 5
+_SUB_COUNT = 1 << _SUB_BITS
+_MAX_SHIFT = 40  # values up to ~2**46 ns (~19 hours)
+_BUCKETS = (_MAX_SHIFT + 2) * _SUB_COUNT
+
+_current_trace: contextvars.ContextVar[Optional['Trace']] = contextvars.ContextVar('neomate_trace', default=None)
+
+
+class Histogram:
+    """
+    Log-linear latency histogram in nanoseconds.
+
+    Values below 64 ns are counted exactly; above that each power of two is split
+    into 32 linear sub-buckets. Recording is a few integer operations and never
+    allocates. Updates are not locked, so counts may be marginally off under heavy
+    multi-threaded contention.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self) -> None:
+        self.counts = [0] * _BUCKETS
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < 2 * _SUB_COUNT:
+            return value
+        shift = min(value.bit_length() - _SUB_BITS - 1, _MAX_SHIFT)
+        return min(shift * _SUB_COUNT + (value >> shift), _BUCKETS - 1)
+
+    @staticmethod
+    def _lower_bound(index: int) -> int:
+        if index < 2 * _SUB_COUNT:
+            return index
+        shift = index // _SUB_COUNT - 1
+        return (index - shift * _SUB_COUNT) << shift
+
+    def record(self, value_ns: int) -> None:
+        """
+        Record one duration.
+
+        Args:
+            value_ns: Duration in nanoseconds.
+        """
+        value_ns = max(0, value_ns)
+        self.counts[self._index(value_ns)] += 1
+        if self.count == 0 or value_ns < self.min:
+            self.min = value_ns
+        if value_ns > self.max:
+            self.max = value_ns
+        self.count += 1
+        self.total += value_ns
+
+    def percentile(self, q: float) -> int:
+        """
+        Get an approximate percentile.
+
+        Args:
+            q: Percentile in [0, 100].
+
+        Returns:
+            int: Value in nanoseconds (bucket midpoint, clamped to the observed range).
+        """
+        if self.count == 0:
+            return 0
+        target = max(1, int(round(self.count * q / 100.0)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            if not n:
+                continue
+            seen += n
+            if seen >= target:
+                low = self._lower_bound(index)
+                high = self._lower_bound(index + 1)
+                return min(max((low + high) // 2, self.min), self.max)
+        return self.max
+
+    def merge(self, other: 'Histogram') -> None:
+        """Add another histogram's counts into this one."""
+        if other.count == 0:
+            return
+        for index, n in enumerate(other.counts):
+            if n:
+                self.counts[index] += n
+        self.min = other.min if self.count == 0 else min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.count += other.count
+        self.total += other.total
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Summarize the histogram.
+
+        Returns:
+            Dict[str, float]: count, mean/min/max and p50/p90/p99/p999 in milliseconds.
+        """
+        to_ms = 1e-6
+        return {
+            'count': self.count,
+            'mean_ms': (self.total / self.count) * to_ms if self.count else 0.0,
+            'min_ms': self.min * to_ms,
+            'p50_ms': self.percentile(50) * to_ms,
+            'p90_ms': self.percentile(90) * to_ms,
+            'p99_ms': self.percentile(99) * to_ms,
+            'p999_ms': self.percentile(99.9) * to_ms,
+            'max_ms': self.max * to_ms,
+        }
+
+
+class Trace:
+    """
+    A single request's trace: an ID plus the spans recorded under it.
+    """
+
+    __slots__ = ('trace_id', 'started_ns', 'spans')
+
+    def __init__(self, trace_id: Optional[str] = None):
+        self.trace_id = trace_id or uuid.uuid4().hex[:16]
+        self.started_ns = time.perf_counter_ns()
+        self.spans: List[Tuple[str, int, int]] = []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the trace to a JSON-serializable dictionary (offsets and durations in ms)."""
+        return {
+            'trace_id': self.trace_id,
+            'spans': [
+                {'name': name, 'offset_ms': (start - self.started_ns) / 1e6, 'duration_ms': duration / 1e6}
+                for name, start, duration in self.spans
+            ],
+        }
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of span histograms and recent traces.
+    """
+
+    def __init__(self, enabled: bool = False, trace_history: int = 256):
+        """
+        Initialize the MetricsRegistry.
+
+        Args:
+            enabled: Whether spans are recorded.
+            trace_history: Number of finished traces kept for inspection.
+        """
+        self.enabled = enabled
+        self.histograms: Dict[str, Histogram] = {}
+        self.traces: Deque[Trace] = deque(maxlen=trace_history)
+        # trace_id -> [trace, open start_trace blocks] for traces still being recorded
+        self._active: Dict[str, List[Any]] = {}
+
+    def enable(self) -> None:
+        """Start recording spans."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop recording spans; instrumented code falls back to a single flag check."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Drop all recorded data."""
+        self.histograms.clear()
+        self.traces.clear()
+
+    def histogram(self, name: str) -> Histogram:
+        """
+        Get or create the histogram for a span name.
+
+        Args:
+            name: Span name.
+
+        Returns:
+            Histogram: The span's histogram.
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, Histogram())
+        return histogram
+
+    def record(self, name: str, start_ns: int, duration_ns: int) -> None:
+        """
+        Record a finished span into its histogram and the current trace.
+
+        Args:
+            name: Span name.
+            start_ns: perf_counter_ns at span start.
+            duration_ns: Span duration in nanoseconds.
+        """
+        self.histogram(name).record(duration_ns)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.spans.append((name, start_ns, duration_ns))
+
+    def get_trace(self, trace_id: str) -> Optional[Trace]:
+        """
+        Find a recently finished trace.
+
+        Args:
+            trace_id: Trace identifier.
+
+        Returns:
+            Optional[Trace]: The trace, or None if it is unknown or has been evicted.
+        """
+        for trace in reversed(self.traces):
+            if trace.trace_id == trace_id:
+                return trace
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get a JSON-serializable snapshot of all spans and recent traces.
+
+        Returns:
+            Dict[str, Any]: Span summaries and recent traces.
+        """
+        return {
+            'timestamp': time.time(),
+            'spans': {name: h.summary() for name, h in sorted(self.histograms.items())},
+            'traces': [t.to_dict() for t in self.traces],
+        }
+
+    def write_snapshot(self, path: Union[str, Path]) -> None:
+        """
+        Write the JSON snapshot to a file.
+
+        Args:
+            path: Destination file path.
+        """
+        Path(path).write_text(json.dumps(self.snapshot(), indent=2), encoding='utf-8')
+
+    def to_prometheus(self, prefix: str = 'neomate') -> str:
+        """
+        Render span histograms in the Prometheus text exposition format.
+
+        Args:
+            prefix: Metric name prefix.
+
+        Returns:
+            str: Prometheus text (summary type with quantiles, in seconds).
+        """
+        metric = f"{prefix}_span_duration_seconds"
+        lines = [
+            f"# HELP {metric} Span latency measured with perf_counter_ns.",
+            f"# TYPE {metric} summary",
+        ]
+        for name, h in sorted(self.histograms.items()):
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for q in (0.5, 0.9, 0.99, 0.999):
+                lines.append(f'{metric}{{span="{label}",quantile="{q}"}} {h.percentile(q * 100) / 1e9:.9f}')
+            lines.append(f'{metric}_sum{{span="{label}"}} {h.total / 1e9:.9f}')
+            lines.append(f'{metric}_count{{span="{label}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+# Global registry, enabled with NEOMATE_METRICS=1 or metrics.enable()
+metrics = MetricsRegistry(enabled=os.getenv('NEOMATE_METRICS', '').lower() in ('1', 'true', 'yes'))
+
+
+class _Span:
+    """Active span; works as a sync and async context manager."""
+
+    __slots__ = ('name', 'registry', 'start_ns')
+
+    def __init__(self, name: str, registry: MetricsRegistry):
+        self.name = name
+        self.registry = registry
+        self.start_ns = 0
+
+    def __enter__(self) -> '_Span':
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.registry.record(self.name, self.start_ns, time.perf_counter_ns() - self.start_ns)
+
+    async def __aenter__(self) -> '_Span':
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.__exit__(*exc_info)
+
+
+class _NoopSpan:
+    """Shared span used while instrumentation is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    async def __aenter__(self) -> '_NoopSpan':
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, registry: Optional[MetricsRegistry] = None) -> Union[_Span, _NoopSpan]:
+    """
+    Time a block of code.
+
+    Args:
+        name: Span name.
+        registry: Registry to record into (default: the global ``metrics``).
+
+    Returns:
+        A context manager usable with ``with`` or ``async with``.
+    """
+    registry = registry or metrics
+    if not registry.enabled:
+        return _NOOP_SPAN
+    return _Span(name, registry)
+
+
+def traced(name: Optional[str] = None, registry: Optional[MetricsRegistry] = None) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """
+    Decorator that records the duration of each call of a sync or async function.
+
+    Args:
+        name: Span name. Defaults to the function's qualified name.
+        registry: Registry to record into (default: the global ``metrics``).
+
+    Returns:
+        Callable: Decorator.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        span_name = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                reg = registry or metrics
+                if not reg.enabled:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    reg.record(span_name, start, time.perf_counter_ns() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            reg = registry or metrics
+            if not reg.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                reg.record(span_name, start, time.perf_counter_ns() - start)
+        return wrapper
+
+    return decorator
+
+
+class start_trace:
+    """
+    Context manager that starts or continues a request trace.
+
+    Spans recorded inside the block - including in tasks created from it, since
+    asyncio copies the context - are attached to the trace. Passing the ID of a
+    trace that is still open or recently finished continues that same trace, so
+    consumers handling an event can add their spans to the producer's trace.
+    Works with ``with`` and ``async with``.
+    """
+
+    def __init__(self, trace_id: Optional[str] = None, registry: Optional[MetricsRegistry] = None):
+        """
+        Initialize the trace context.
+
+        Args:
+            trace_id: Existing trace ID to continue. A new one is generated if None.
+            registry: Registry that keeps the finished trace (default: the global ``metrics``).
+        """
+        self.registry = registry or metrics
+        self.trace = self._find(trace_id) or Trace(trace_id)
+        self._token: Optional[contextvars.Token] = None
+
+    def _find(self, trace_id: Optional[str]) -> Optional[Trace]:
+        if trace_id is None:
+            return None
+        entry = self.registry._active.get(trace_id)
+        return entry[0] if entry is not None else self.registry.get_trace(trace_id)
+
+    @property
+    def trace_id(self) -> str:
+        """The trace's identifier."""
+        return self.trace.trace_id
+
+    def __enter__(self) -> Trace:
+        entry = self.registry._active.setdefault(self.trace.trace_id, [self.trace, 0])
+        entry[1] += 1
+        self._token = _current_trace.set(self.trace)
+        return self.trace
+
+    def __exit__(self, *exc_info: Any) -> None:
+        _current_trace.reset(self._token)
+        entry = self.registry._active[self.trace.trace_id]
+        entry[1] -= 1
+        if entry[1]:
+            return
+        del self.registry._active[self.trace.trace_id]
+        # A continued trace is already in the history
+        if self.registry.enabled and self.registry.get_trace(self.trace.trace_id) is not self.trace:
+            self.registry.traces.append(self.trace)
+
+    async def __aenter__(self) -> Trace:
+        return self.__enter__()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.__exit__(*exc_info)
+
+
+def current_trace_id() -> Optional[str]:
+    """
+    Get the trace ID of the request being handled in this context.
+
+    Returns:
+        Optional[str]: Trace ID, or None outside a trace.
+    """
+    trace = _current_trace.get()
+    return trace.trace_id if trace is not None else None
+
+
+def measure_overhead(iterations: int = 200000) -> Dict[str, float]:
+    """
+    Measure the per-call overhead of instrumentation.
+
+    Args:
+        iterations: Calls per measurement.
+
+    Returns:
+        Dict[str, float]: Nanoseconds per call for a bare call and for traced
+        calls with instrumentation disabled and enabled.
+    """
+    registry = MetricsRegistry()
+
+    def bare() -> None:
+        return None
+
+    wrapped = traced('overhead', registry)(bare)
+
+    def run(fn: Callable[[], None]) -> float:
+        start = time.perf_counter_ns()
+        for _ in range(iterations):
+            fn()
+        return (time.perf_counter_ns() - start) / iterations
+
+    results = {'bare_call': run(bare), 'traced_disabled': run(wrapped)}
+    registry.enable()
+    results['traced_enabled'] = run(wrapped)
+    return results
+
+
+if __name__ == "__main__":
+    for label, ns in measure_overhead().items():
+        print(f"{label:>16}: {ns:7.0f} ns per call")
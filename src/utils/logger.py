@@ -12,17 +12,158 @@ Features:
 - Structured log format with timestamps, modules, and levels
 - Error handling and graceful degradation
 - Environment-based configuration
+- Non-blocking queue-based backend with a background writer thread
+- Optional compact JSON-lines file format
+- Opt-in per call-site rate limiting for hot-loop debug messages
 
 Author: NeoMate AI Team
 Version: 1.0.0
 License: MIT
 """
 
+import atexit
+import json
 import logging
 import logging.handlers
+import os
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+
+_LEVEL_MAP = {
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'CRITICAL': logging.CRITICAL
+}
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """
+    Compact JSON-lines formatter, one object per record.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 6),
+            'level': record.levelname,
+            'logger': record.name,
+            'module': record.module,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'msg': record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Per call-site token bucket for hot-loop messages.
+
+    Records at or below ``max_level`` are limited per (file, line) to ``burst``
+    messages plus ``rate`` messages per second; suppressed counts are appended to
+    the next message that gets through, and ``pending_suppressed`` reports the
+    ones no later message has accounted for yet.
+    """
+
+    def __init__(self, rate: float = 5.0, burst: int = 10, max_level: int = logging.DEBUG):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.max_level = max_level
+        self.suppressed_total = 0
+        # (pathname, lineno) -> [tokens, last refill time, suppressed count]
+        self._buckets: Dict[Tuple[str, int], List[float]] = {}
+        # Filters run on every logging thread; the buckets are read-modify-write
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate)
+                bucket[1] = now
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                self.suppressed_total += 1
+                return False
+            bucket[0] -= 1.0
+            suppressed = int(bucket[2])
+            bucket[2] = 0
+        if suppressed:
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+    def pending_suppressed(self) -> Dict[Tuple[str, int], int]:
+        """
+        Suppressed counts not yet reported on a later message, by call site.
+
+        Returns:
+            Dict[Tuple[str, int], int]: (pathname, lineno) -> suppressed records.
+        """
+        with self._lock:
+            return {key: int(bucket[2]) for key, bucket in self._buckets.items() if bucket[2]}
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller.
+
+    Only the message is rendered on the calling thread; formatting and I/O happen on
+    the listener thread. When the queue is full the record is dropped and counted.
+    """
+
+    def __init__(self, log_queue: 'queue.SimpleQueue[logging.LogRecord]', maxsize: int = 10000):
+        super().__init__(log_queue)
+        self.maxsize = maxsize
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Freeze the message so mutable args cannot change before the listener formats it
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        # SimpleQueue is lock-free on put; the size bound is approximate by design
+        if self.queue.qsize() >= self.maxsize:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+class _DelayedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that creates its directory and file on the first record."""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _DelayedFileHandler(logging.FileHandler):
+    """FileHandler that creates its directory and file on the first record."""
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
 
 
 class NeoMateLogger:
@@ -31,6 +172,16 @@ class NeoMateLogger:
 
     This class provides centralized logging configuration with support for
     multiple handlers, log rotation, and environment-specific settings.
+    In async mode (the default) callers only enqueue records; a background
+    listener thread performs all file and console writes.
+
+    Environment variables:
+        NEOMATE_LOG_LEVEL: Logger level (default: DEBUG).
+        NEOMATE_CONSOLE_LOG_LEVEL: Console handler level (default: INFO).
+        NEOMATE_LOG_ASYNC: Use the queue-based backend (default: true).
+        NEOMATE_LOG_FORMAT: 'text' or 'json' for the log files (default: text).
+        NEOMATE_LOG_QUEUE_SIZE: Maximum queued records before dropping (default: 10000).
+        NEOMATE_LOG_RATE_LIMIT: Debug messages per second per call site; opt-in, 0 disables (default: 0).
     """
 
     _instance: Optional['NeoMateLogger'] = None
@@ -43,6 +194,9 @@ class NeoMateLogger:
 
     def __init__(self) -> None:
         if self._logger is None:
+            self.listener: Optional[logging.handlers.QueueListener] = None
+            self.queue_handler: Optional[NonBlockingQueueHandler] = None
+            self.rate_limiter: Optional[RateLimitFilter] = None
             self._logger = self._setup_logger()
 
     def get_logger(self) -> logging.Logger:
@@ -64,24 +218,54 @@ class NeoMateLogger:
         if logger.handlers:
             return logger
 
-        # Create logs directory
-        logs_dir = Path('logs')
-        logs_dir.mkdir(exist_ok=True)
+        handlers = self._create_handlers(Path('logs'))
+
+        if not self._env_flag('NEOMATE_LOG_ASYNC', True):
+            for handler in handlers:
+                logger.addHandler(handler)
+            self._add_rate_limit(logger)
+            return logger
+
+        # Queue front-end on the caller side, real handlers on the listener thread
+        queue_size = int(os.getenv('NEOMATE_LOG_QUEUE_SIZE', '10000'))
+        log_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        self.queue_handler = NonBlockingQueueHandler(log_queue, maxsize=queue_size)
+        self.listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.shutdown)
+
+        logger.addHandler(self.queue_handler)
+        self._add_rate_limit(logger)
+        logger.propagate = False
+        return logger
+
+    def _create_handlers(self, logs_dir: Path) -> List[logging.Handler]:
+        """
+        Create the file and console handlers.
+
+        Args:
+            logs_dir: Directory for log files.
 
+        Returns:
+            List[logging.Handler]: Rotating file, console and error file handlers.
+        """
         # Formatter
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
+        file_formatter = JsonLinesFormatter() if os.getenv('NEOMATE_LOG_FORMAT', 'text').lower() == 'json' else formatter
 
-        # File handler with rotation
-        file_handler = logging.handlers.RotatingFileHandler(
+        # File handler with rotation (directory and file are created on first write)
+        file_handler = _DelayedRotatingFileHandler(
             logs_dir / 'neomate.log',
             maxBytes=10*1024*1024,  # 10MB
-            backupCount=5
+            backupCount=5,
+            encoding='utf-8',
+            delay=True
         )
         file_handler.setLevel(logging.DEBUG)
-        file_handler.setFormatter(formatter)
+        file_handler.setFormatter(file_formatter)
 
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
@@ -89,34 +273,124 @@ class NeoMateLogger:
         console_handler.setFormatter(formatter)
 
         # Error file handler
-        error_handler = logging.FileHandler(logs_dir / 'neomate_errors.log')
+        error_handler = _DelayedFileHandler(logs_dir / 'neomate_errors.log', encoding='utf-8', delay=True)
         error_handler.setLevel(logging.ERROR)
-        error_handler.setFormatter(formatter)
+        error_handler.setFormatter(file_formatter)
 
-        # Add handlers
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
-        logger.addHandler(error_handler)
+        return [file_handler, console_handler, error_handler]
 
-        return logger
+    def _add_rate_limit(self, logger: logging.Logger) -> None:
+        """Attach the hot-loop rate limiter if NEOMATE_LOG_RATE_LIMIT enables it."""
+        rate = float(os.getenv('NEOMATE_LOG_RATE_LIMIT', '0'))
+        if rate > 0:
+            self.rate_limiter = RateLimitFilter(rate=rate, burst=max(1, int(rate * 2)))
+            logger.addFilter(self.rate_limiter)
+
+    @staticmethod
+    def _env_flag(name: str, default: bool) -> bool:
+        value = os.getenv(name)
+        if value is None:
+            return default
+        return value.lower() in ('true', '1', 'yes')
 
     def _get_log_level(self) -> int:
         """Get log level from environment or default to DEBUG."""
-        level_map = {
-            'DEBUG': logging.DEBUG,
-            'INFO': logging.INFO,
-            'WARNING': logging.WARNING,
-            'ERROR': logging.ERROR,
-            'CRITICAL': logging.CRITICAL
-        }
-        level = level_map.get('DEBUG')  # Default to DEBUG
-        return level
+        return _LEVEL_MAP.get(os.getenv('NEOMATE_LOG_LEVEL', 'DEBUG').upper(), logging.DEBUG)
 
     def _get_console_level(self) -> int:
-        """Get console log level, default to INFO."""
-        return logging.INFO
+        """Get console log level from environment, default to INFO."""
+        return _LEVEL_MAP.get(os.getenv('NEOMATE_CONSOLE_LOG_LEVEL', 'INFO').upper(), logging.INFO)
+
+    @property
+    def dropped_records(self) -> int:
+        """Number of records dropped because the log queue was full."""
+        return self.queue_handler.dropped if self.queue_handler else 0
+
+    def shutdown(self) -> None:
+        """
+        Flush queued records and stop the listener thread.
+        """
+        if self.rate_limiter is not None:
+            pending = sum(self.rate_limiter.pending_suppressed().values())
+            if pending:
+                self._logger.info(f"{pending} rate-limited debug records suppressed since their last report")
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+            if self.queue_handler and self.queue_handler.dropped:
+                sys.stderr.write(f"NeoMate logger dropped {self.queue_handler.dropped} records\n")
+
+
+def benchmark_log_call(iterations: int = 2000, interval_s: float = 0.0005) -> Dict[str, Dict[str, float]]:
+    """
+    Measure the caller-side cost of ``log.debug`` in each logging mode.
+
+    Calls are spaced ``interval_s`` apart, as in an audio or event loop, and each
+    call is timed individually so tail latency (jitter) is visible.
+
+    Args:
+        iterations: Calls per measurement.
+        interval_s: Pause between calls.
+
+    Returns:
+        Dict[str, Dict[str, float]]: Mean, p50 and p99 nanoseconds per call by mode.
+    """
+    import statistics
+    import tempfile
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_queue: 'queue.SimpleQueue[logging.LogRecord]' = queue.SimpleQueue()
+        file_handler = logging.FileHandler(Path(tmp) / 'bench.log')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s'))
+
+        def run(logger: logging.Logger) -> Dict[str, float]:
+            samples = []
+            for i in range(iterations):
+                start = time.perf_counter_ns()
+                logger.debug("chunk %d processed", i)
+                samples.append(time.perf_counter_ns() - start)
+                # Spin rather than sleep so CPU frequency and caches stay warm
+                deadline = time.perf_counter() + interval_s
+                while time.perf_counter() < deadline:
+                    pass
+            samples.sort()
+            return {
+                'mean': statistics.fmean(samples),
+                'p50': samples[len(samples) // 2],
+                'p99': samples[int(len(samples) * 0.99)],
+            }
+
+        def make_logger(name: str, level: int, *handlers: logging.Handler) -> logging.Logger:
+            logger = logging.getLogger(f"NeoMateAI.bench.{name}")
+            logger.propagate = False
+            logger.setLevel(level)
+            for handler in handlers:
+                logger.addHandler(handler)
+            return logger
+
+        results['disabled_level'] = run(make_logger('disabled', logging.INFO))
+        results['sync_file'] = run(make_logger('sync', logging.DEBUG, file_handler))
+
+        listener = logging.handlers.QueueListener(bench_queue, file_handler)
+        listener.start()
+        results['async_queue'] = run(
+            make_logger('async', logging.DEBUG, NonBlockingQueueHandler(bench_queue, maxsize=iterations))
+        )
+        rate_limited = make_logger('rate_limited', logging.DEBUG, NonBlockingQueueHandler(bench_queue, maxsize=iterations))
+        rate_limited.addFilter(RateLimitFilter())
+        results['async_rate_limited'] = run(rate_limited)
+        listener.stop()
+        file_handler.close()
+    return results
 
 
 # Global logger instance
 _logger_instance = NeoMateLogger()
 log = _logger_instance.get_logger()
+
+
+if __name__ == "__main__":
+    print(f"{'mode':>20}  {'mean ns':>8}  {'p50 ns':>8}  {'p99 ns':>8}")
+    for mode, stats in benchmark_log_call().items():
+        print(f"{mode:>20}  {stats['mean']:8.0f}  {stats['p50']:8.0f}  {stats['p99']:8.0f}")
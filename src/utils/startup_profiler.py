@@ -0,0 +1,185 @@
+"""
+NeoMate AI Startup Profiler Module
+
+This module measures where startup time goes. It records named startup phases and,
+while profiling is active, times every module import (like ``python -X importtime``)
+so heavy dependencies pulled in by a subsystem are visible. Results are checked
+against a startup budget.
+
+Features:
+- Named phase timing (imports, configuration, subsystem import/init)
+- Per-module inclusive and self import time via a meta path hook
+- Budget check with a plain-text report
+
+Author: NeoMate AI Team
+Version: 1.0.0
+License: MIT
+"""
+
+import importlib.abc
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class _TimedLoader:
+    """Loader proxy that times ``exec_module`` of the wrapped loader."""
+
+    def __init__(self, loader: Any, profiler: 'StartupProfiler'):
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: Any) -> Any:
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: Any) -> None:
+        profiler = self._profiler
+        profiler._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            inclusive = time.perf_counter() - start
+            children = profiler._stack.pop()
+            if profiler._stack:
+                profiler._stack[-1] += inclusive
+            profiler.imports[module.__name__] = (inclusive, inclusive - children)
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    """Meta path finder that wraps the loaders found by the other finders."""
+
+    def __init__(self, profiler: 'StartupProfiler'):
+        self._profiler = profiler
+
+    def find_spec(self, fullname: str, path: Any, target: Any = None) -> Any:
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, 'exec_module'):
+                spec.loader = _TimedLoader(spec.loader, self._profiler)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    """
+    Records startup phases and module import times.
+    """
+
+    def __init__(self, budget_s: float = 5.0, started_at: Optional[float] = None):
+        """
+        Initialize the StartupProfiler.
+
+        Args:
+            budget_s: Startup time budget in seconds.
+            started_at: perf_counter value at process start, if captured earlier.
+        """
+        self.budget_s = budget_s
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.ready_s: Optional[float] = None
+        self.phases: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Tuple[float, float]] = {}
+        self._stack: List[float] = []
+        self._finder: Optional[_TimingFinder] = None
+
+    def install_import_hook(self) -> None:
+        """Start timing module imports."""
+        if self._finder is None:
+            self._finder = _TimingFinder(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def remove_import_hook(self) -> None:
+        """Stop timing module imports."""
+        if self._finder is not None:
+            sys.meta_path.remove(self._finder)
+            self._finder = None
+
+    def record(self, name: str, seconds: float) -> None:
+        """
+        Record a finished phase.
+
+        Args:
+            name: Phase name, e.g. 'import:wake_word'.
+            seconds: Phase duration.
+        """
+        self.phases.append((name, seconds))
+
+    def phase(self, name: str) -> '_Phase':
+        """
+        Time a phase with a context manager.
+
+        Args:
+            name: Phase name.
+
+        Returns:
+            Context manager recording the phase on exit.
+        """
+        return _Phase(self, name)
+
+    @property
+    def elapsed_s(self) -> float:
+        """Seconds since process start (or profiler creation)."""
+        return time.perf_counter() - self.started_at
+
+    def mark_ready(self) -> None:
+        """Mark the moment the application is ready for its first prompt."""
+        self.ready_s = self.elapsed_s
+
+    @property
+    def startup_s(self) -> float:
+        """Time to ready if marked, otherwise time elapsed so far."""
+        return self.ready_s if self.ready_s is not None else self.elapsed_s
+
+    def within_budget(self) -> bool:
+        """Whether time to ready fits the budget."""
+        return self.startup_s <= self.budget_s
+
+    def report(self, top_imports: int = 15) -> str:
+        """
+        Render the startup report.
+
+        Args:
+            top_imports: Number of slowest modules (by self time) to list.
+
+        Returns:
+            str: Human-readable report.
+        """
+        total = self.elapsed_s
+        status = 'OK' if self.within_budget() else 'OVER BUDGET'
+        lines = [
+            f"Ready after {self.startup_s:.3f} s (budget {self.budget_s:.1f} s) - {status}",
+            f"Total profiled time: {total:.3f} s",
+            "",
+        ]
+        lines.append(f"{'phase':<40} {'seconds':>8} {'share':>6}")
+        for name, seconds in self.phases:
+            lines.append(f"{name:<40} {seconds:>8.3f} {seconds / total if total else 0:>6.1%}")
+        if self.imports:
+            lines += ["", f"{'module (slowest self time)':<40} {'self s':>8} {'incl s':>8}"]
+            slowest = sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)[:top_imports]
+            for name, (inclusive, own) in slowest:
+                lines.append(f"{name:<40} {own:>8.3f} {inclusive:>8.3f}")
+        return "\n".join(lines)
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler: StartupProfiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> '_Phase':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.profiler.record(self.name, time.perf_counter() - self.start)
@@ -0,0 +1,42 @@
+"""
+Shared pytest fixtures for the NeoMate AI test suite.
+"""
+
+from typing import Any, Callable, Dict, Mapping
+
+import pytest
+
+
+class StaticConfig:
+    """
+    Stand-in for ConfigLoader serving a fixed configuration dictionary.
+
+    ConfigLoader is a process-wide singleton bound to config/settings.yaml, so tests
+    pass this instead to control the settings each component sees.
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+
+    def get_config(self) -> Mapping[str, Any]:
+        return self.config
+
+    def get(self, key_path: str, default: Any = None) -> Any:
+        value: Any = self.config
+        for part in key_path.split('.'):
+            if not isinstance(value, Mapping) or part not in value:
+                return default
+            value = value[part]
+        return value
+
+    def accessor(self, key_path: str, default: Any = None) -> Callable[[], Any]:
+        return lambda: self.get(key_path, default)
+
+    def subscribe(self, callback: Callable) -> Callable[[], None]:
+        return lambda: None
+
+
+@pytest.fixture
+def make_config() -> Callable[..., StaticConfig]:
+    """Factory building a StaticConfig from keyword sections."""
+    return lambda **sections: StaticConfig(sections)
@@ -0,0 +1,84 @@
+"""
+Tests for the online LLM API handler's pools and request coalescing.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.models.online_llm.api_handler import APIError, APIHandler, ProviderPool
+
+
+def _sse_response(request):
+    events = [json.dumps({'choices': [{'delta': {'content': word}}]}) for word in ("hello ", "there")]
+    body = ''.join(f"data: {event}\n\n" for event in events) + "data: [DONE]\n\n"
+    return httpx.Response(200, text=body, headers={'content-type': 'text/event-stream'})
+
+
+def _handler(make_config, monkeypatch, **provider):
+    monkeypatch.setenv('MOCK_API_KEY', 'test')
+    settings = {'base_url': 'http://mock/v1', 'api_key_env': 'MOCK_API_KEY', 'model': 'm', **provider}
+    client = httpx.AsyncClient(transport=httpx.MockTransport(_sse_response), base_url='http://mock/v1')
+    config = make_config(online_llm={'providers': {'mock': settings}, 'default_provider': 'mock'})
+    return APIHandler(config, client=client)
+
+
+def test_cancelled_rate_limit_wait_returns_the_slot():
+    async def run():
+        pool = ProviderPool('mock', {'max_concurrency': 2, 'requests_per_minute': 1, 'burst': 1}, 5.0)
+        await pool.acquire()
+        waiter = asyncio.create_task(pool.acquire())
+        await asyncio.sleep(0.05)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return pool
+
+    pool = asyncio.run(run())
+    # Only the first caller still holds a slot
+    assert pool.in_flight == 1
+    assert pool._semaphore._value == 1
+
+
+def test_stream_chat_returns_tokens(make_config, monkeypatch):
+    handler = _handler(make_config, monkeypatch)
+
+    async def run():
+        try:
+            return await handler.chat([{'role': 'user', 'content': 'hi'}])
+        finally:
+            await handler.close()
+
+    assert asyncio.run(run()) == "hello there"
+
+
+def test_cancelled_request_finishes_coalesced_subscribers(make_config, monkeypatch):
+    handler = _handler(make_config, monkeypatch, max_concurrency=1)
+    messages = [{'role': 'user', 'content': 'hi'}]
+
+    async def consume():
+        return ''.join([token async for token in handler.stream_chat(messages)])
+
+    async def run():
+        pool = handler.pool('mock')
+        # Hold the only slot so the request waits for it
+        await pool.acquire()
+        first = asyncio.create_task(consume())
+        second = asyncio.create_task(consume())
+        await asyncio.sleep(0.05)
+        assert pool.coalesced == 1
+        (flight,) = handler._in_flight.values()
+        flight.task.cancel()
+        results = await asyncio.wait_for(asyncio.gather(first, second, return_exceptions=True), timeout=2.0)
+        pool.release()
+        await asyncio.gather(flight.task, return_exceptions=True)
+        in_flight = pool.in_flight
+        await handler.close()
+        return results, flight.task.cancelled(), in_flight
+
+    results, cancelled, in_flight = asyncio.run(run())
+    assert all(isinstance(result, APIError) for result in results)
+    assert cancelled
+    assert in_flight == 0
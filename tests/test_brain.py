@@ -0,0 +1,69 @@
+"""
+Tests for the brain's respond path: speech failures and barge-in.
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.core.brain import Brain
+from src.core.context_manager import INTERRUPTED_MARKER
+from src.models.local_llm.model_loader import StubModelLoader
+from src.models.local_llm.query_processor import QueryProcessor
+from src.output.voice_output import SilentPlayer, StubTTSBackend, VoiceOutput
+
+ANSWER = "First sentence here. Second sentence follows. Third one ends it."
+
+
+class FailingTTS(StubTTSBackend):
+    def synthesize(self, text):
+        raise RuntimeError("synthesizer crashed")
+
+
+class RecordingPlayer(SilentPlayer):
+    """Plays instantly and lets the test barge in after the first sentence."""
+
+    def __init__(self, on_play=None):
+        super().__init__()
+        self.on_play = on_play
+        self.played = 0
+
+    def play(self, audio: np.ndarray, sample_rate: int) -> None:
+        self.played += 1
+        if self.on_play is not None:
+            self.on_play()
+
+
+def _brain(make_config, backend, player, tokens_per_s=1000.0):
+    config = make_config(llm={'primary_provider': 'local'}, local_llm={'cache': {'enabled': False}})
+    model = StubModelLoader(ANSWER, first_token_s=0.0, tokens_per_s=tokens_per_s)
+    brain = Brain(
+        config_loader=config,
+        query_processor=QueryProcessor(config, model_loader=model),
+        voice_output=VoiceOutput(config, backend=backend, player=player)
+    )
+    # Keep the test offline: answer from the stub local model only
+    brain.router.backends = [backend for backend in brain.router.backends if backend.name == 'local']
+    return brain
+
+
+def test_tts_failure_still_returns_the_answer(make_config):
+    brain = _brain(make_config, FailingTTS(), SilentPlayer())
+    response = asyncio.run(brain.respond("hello"))
+    assert response.text == ANSWER
+    assert not response.interrupted
+    assert brain.context_manager.messages[-1].content == ANSWER
+
+
+def test_barge_in_marks_the_partial_answer_interrupted(make_config):
+    backend = StubTTSBackend(realtime_factor=0.0)
+    player = RecordingPlayer()
+    # Slow generation so the rest of the answer is still pending at barge-in
+    brain = _brain(make_config, backend, player, tokens_per_s=20.0)
+    player.on_play = brain.voice_output.stop
+
+    response = asyncio.run(brain.respond("hello"))
+    assert response.interrupted
+    assert player.played == 1
+    assert response.text != ANSWER
+    assert brain.context_manager.messages[-1].content == f"First sentence here. {INTERRUPTED_MARKER}"
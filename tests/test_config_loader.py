@@ -0,0 +1,79 @@
+"""
+Tests for configuration snapshots and the on-disk configuration cache.
+"""
+
+import json
+import os
+import stat
+
+from src.utils.config_loader import ConfigLoader, ConfigSnapshot
+
+
+def test_get_config_returns_a_private_plain_dict():
+    loader = ConfigLoader()
+    config = loader.get_config()
+    assert isinstance(config, dict)
+    json.dumps(config)
+
+    config['injected'] = {'value': 1}
+    assert 'injected' not in loader.get_config()
+
+
+def test_snapshot_copy_has_plain_lists_and_dicts():
+    snapshot = ConfigSnapshot({'wake_word': {'keywords': ['hey neomate'], 'threshold': 0.5}})
+    data = snapshot.to_dict()
+    assert data == {'wake_word': {'keywords': ['hey neomate'], 'threshold': 0.5}}
+    assert isinstance(data['wake_word'], dict)
+    assert isinstance(data['wake_word']['keywords'], list)
+    assert snapshot.get('wake_word.threshold') == 0.5
+
+
+def test_cache_round_trips_as_json(tmp_path, monkeypatch):
+    loader = ConfigLoader()
+    cache_path = tmp_path / 'config_snapshot.json'
+    monkeypatch.setattr(loader, '_get_cache_path', lambda: cache_path)
+    fingerprint = (2, '/config', (('settings.yaml', 123, 45),), (('NEOMATE_X', '1'),))
+    config = {'llm': {'providers': ['a', 'b']}, 'name': 'নিওমেট'}
+
+    loader._store_cached_config(fingerprint, config)
+    assert json.loads(cache_path.read_text(encoding='utf-8'))['config'] == config
+    assert loader._load_cached_config(fingerprint) == config
+    assert loader._load_cached_config((3,) + fingerprint[1:]) is None
+
+
+def test_config_that_json_would_change_is_not_cached(tmp_path, monkeypatch):
+    loader = ConfigLoader()
+    cache_path = tmp_path / 'config_snapshot.json'
+    monkeypatch.setattr(loader, '_get_cache_path', lambda: cache_path)
+
+    # Integer keys would come back as strings
+    loader._store_cached_config((2,), {'retries': {1: 0.5}})
+    assert not cache_path.exists()
+
+
+def test_snapshot_cache_never_contains_env_values(tmp_path, monkeypatch):
+    loader = ConfigLoader()
+    cache_path = tmp_path / 'config_snapshot.json'
+    monkeypatch.setattr(loader, '_get_cache_path', lambda: cache_path)
+    monkeypatch.setattr(loader, '_load_and_validate_config', lambda: {'application': {'name': 'NeoMate AI'}})
+    monkeypatch.setenv('NEOMATE_DB_KEY', 'c2VjcmV0LWRhdGFiYXNlLWtleQ==')
+    monkeypatch.setenv('NEOMATE_APPLICATION_NAME', 'override-secret-name')
+    previous = (loader._snapshot, loader._fingerprint)
+    try:
+        assert loader.reload(force=True)
+        # The override applies in memory only
+        assert loader.get('application.name') == 'override-secret-name'
+        fingerprint = loader._fingerprint
+    finally:
+        loader._snapshot, loader._fingerprint = previous
+
+    text = cache_path.read_text(encoding='utf-8')
+    for value in ('c2VjcmV0LWRhdGFiYXNlLWtleQ==', 'override-secret-name'):
+        assert value not in text
+    assert json.loads(text)['config'] == {'application': {'name': 'NeoMate AI'}}
+    if os.name == 'posix':
+        assert stat.S_IMODE(cache_path.stat().st_mode) == 0o600
+
+    # The digest still tells env changes apart
+    monkeypatch.setenv('NEOMATE_DB_KEY', 'b3RoZXIta2V5')
+    assert loader._compute_fingerprint() != fingerprint
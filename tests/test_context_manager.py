@@ -0,0 +1,109 @@
+"""
+Tests for the context manager's budgeted history, folding and memory recall.
+"""
+
+import asyncio
+
+from src.core.context_manager import ContextManager
+
+
+def _manager(make_config, **context):
+    settings = {'max_tokens': 400, 'reserve_tokens': 100, 'summary_tokens': 40, 'recall_tokens': 80}
+    settings.update(context)
+    return ContextManager(make_config(context=settings))
+
+
+def _turn(i):
+    return f"Question {i} about the weather in Dhaka today?", f"Answer {i}: it is sunny and warm. Take water."
+
+
+def _assert_consistent(manager):
+    assert manager.window_tokens == sum(message.tokens for message in manager.messages)
+    assert manager.messages[0].role == 'user'
+
+
+def test_folded_messages_are_released(make_config):
+    manager = _manager(make_config)
+
+    async def run():
+        for i in range(300):
+            manager.add_turn(*_turn(i))
+            await asyncio.sleep(0)
+        await manager.wait_idle()
+
+    asyncio.run(run())
+    stats = manager.stats()
+    assert stats['messages'] == 600
+    assert manager.folds > 0 and manager.summary
+    # Only the unfolded window is kept
+    assert len(manager.messages) == stats['window_messages'] < 60
+    _assert_consistent(manager)
+    assert manager.build(_turn(300)[0]).tokens <= manager.max_tokens - manager.reserve_tokens
+
+
+def test_history_is_trimmed_to_budget_without_folds(make_config):
+    manager = _manager(make_config)
+    # No event loop: summarization cannot run, so only the trim bounds the history
+    for i in range(300):
+        manager.add_turn(*_turn(i))
+
+    assert manager.window_tokens <= manager.max_tokens - manager.reserve_tokens
+    assert manager.trimmed > 0
+    assert manager.stats()['messages'] == 600
+    assert manager.messages[-1].content == _turn(299)[1]
+    _assert_consistent(manager)
+
+
+def test_trim_during_a_slow_fold_keeps_the_window_consistent(make_config):
+    release = None
+
+    async def slow_summary(previous, messages, max_tokens):
+        await release.wait()
+        return f"{len(messages)} messages about the weather."
+
+    manager = _manager(make_config)
+    manager.summarizer = slow_summary
+
+    async def run():
+        nonlocal release
+        release = asyncio.Event()
+        for i in range(200):
+            manager.add_turn(*_turn(i))
+            await asyncio.sleep(0)
+        assert manager.trimmed > 0
+        release.set()
+        await manager.wait_idle()
+
+    asyncio.run(run())
+    assert manager.folds >= 1
+    assert manager.messages[-1].content == _turn(199)[1]
+    _assert_consistent(manager)
+
+
+def test_recalled_exchanges_already_in_the_window_are_skipped(make_config):
+    manager = _manager(make_config)
+    manager.add_turn("What is my name?", "Your name is Rahim.")
+
+    context = manager.build("Where do I live?", recalled=[
+        # Stored by the brain as one memory per exchange, with different spacing and case
+        "User: what is my  name?\nAssistant: Your name is Rahim.",
+        "Your name is Rahim.",
+        "User: What is my name?\nAssistant: Your name is Karim.",
+        "Rahim lives in Dhaka.",
+    ])
+
+    assert context.recalled == 2
+    memories = context.messages[0]['content']
+    assert "Karim" in memories and "Rahim lives in Dhaka." in memories
+    assert "Your name is Rahim" not in memories
+
+
+def test_build_truncates_to_budget_starting_on_a_user_message(make_config):
+    manager = _manager(make_config, fold_at=10.0)
+    for i in range(20):
+        manager.add_turn(*_turn(i))
+
+    context = manager.build("And what about tomorrow and the rest of the week in Chittagong and Sylhet? " * 3)
+    assert context.truncated > 0
+    assert context.messages[0]['role'] == 'user'
+    assert context.tokens <= manager.history_budget() + manager.prefix_tokens
@@ -0,0 +1,123 @@
+"""
+Tests for the priority event bus.
+"""
+
+import asyncio
+
+from src.core.event_bus import Event, EventBus, EventPriority, OverflowPolicy, PriorityClassQueue
+
+
+def test_urgent_events_are_handled_first():
+    handled = []
+
+    async def run():
+        bus = EventBus()
+
+        async def handler(event):
+            handled.append(event.topic)
+
+        bus.subscribe('brain', handler)
+        # Queue everything before the worker starts, lowest priority first
+        bus.publish_nowait(Event('background', priority=EventPriority.BACKGROUND))
+        bus.publish_nowait(Event('screen', priority=EventPriority.SCREEN))
+        bus.publish_nowait(Event('voice', priority=EventPriority.VOICE))
+        await bus.start()
+        while len(handled) < 3:
+            await asyncio.sleep(0.01)
+        await bus.stop()
+
+    asyncio.run(run())
+    assert handled == ['voice', 'screen', 'background']
+
+
+def test_topics_fan_out_and_handler_errors_are_survived():
+    seen = {'brain': [], 'ui': []}
+
+    async def run():
+        bus = EventBus()
+
+        async def brain(event):
+            if event.payload == 'boom':
+                raise ValueError("boom")
+            seen['brain'].append(event.payload)
+
+        async def ui(event):
+            seen['ui'].append(event.payload)
+
+        brain_group = bus.subscribe('brain', brain, topics=('transcript',))
+        bus.subscribe('ui', ui)
+        await bus.start()
+        for payload in ('boom', 'hello'):
+            await bus.publish(Event('transcript', payload=payload, priority=EventPriority.VOICE))
+        await bus.publish(Event('screen', payload='frame', priority=EventPriority.SCREEN))
+        while len(seen['ui']) < 3 or not seen['brain']:
+            await asyncio.sleep(0.01)
+        await bus.stop()
+        return brain_group
+
+    brain_group = asyncio.run(run())
+    assert seen['brain'] == ['hello']
+    assert seen['ui'] == ['boom', 'hello', 'frame']
+    assert brain_group.errors == 1
+
+
+def test_queue_overflow_policies():
+    async def run():
+        coalescing = PriorityClassQueue(2, OverflowPolicy.COALESCE)
+        for i in range(5):
+            coalescing.offer(Event('screen', payload=i, coalesce_key='frame'))
+        dropping = PriorityClassQueue(2, OverflowPolicy.DROP_OLDEST)
+        for i in range(3):
+            dropping.offer(Event('audio', payload=i))
+        blocking = PriorityClassQueue(1, OverflowPolicy.BLOCK)
+        accepted = [blocking.offer(Event('voice', payload=i)) for i in range(2)]
+        return coalescing, dropping, accepted
+
+    coalescing, dropping, accepted = asyncio.run(run())
+    assert len(coalescing) == 1 and coalescing.pop().payload == 4
+    assert coalescing.coalesced == 4
+    assert [dropping.pop().payload for _ in range(2)] == [1, 2]
+    assert dropping.dropped == 1
+    assert accepted == [True, False]
+
+
+class WorkerCrash(BaseException):
+    """Escapes the worker's error handling, so the supervisor has to restart it."""
+
+
+def test_restart_backoff_resets_after_a_healthy_run():
+    handled = {}
+
+    async def run():
+        bus = EventBus()
+        loop = asyncio.get_running_loop()
+
+        async def handler(event):
+            if event.payload == 'crash':
+                raise WorkerCrash()
+            handled[event.payload] = loop.time()
+
+        group = bus.subscribe('brain', handler)
+        group.healthy_run_s = 0.3
+        await bus.start()
+        # Three crashes in a row back off 0.1, 0.2 and 0.4 s
+        started = loop.time()
+        for payload in ('crash', 'crash', 'crash', 'a'):
+            bus.publish_nowait(Event('t', payload=payload, priority=EventPriority.VOICE))
+        while 'a' not in handled:
+            await asyncio.sleep(0.01)
+        first_wait = handled['a'] - started
+        # After a healthy run the next crash restarts after 0.1 s, not 0.8 s
+        await asyncio.sleep(0.4)
+        started = loop.time()
+        for payload in ('crash', 'b'):
+            bus.publish_nowait(Event('t', payload=payload, priority=EventPriority.VOICE))
+        while 'b' not in handled:
+            await asyncio.sleep(0.01)
+        await bus.stop()
+        return first_wait, handled['b'] - started, group.restarts
+
+    first_wait, second_wait, restarts = asyncio.run(run())
+    assert first_wait >= 0.65
+    assert second_wait < 0.4
+    assert restarts == 4
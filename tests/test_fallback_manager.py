@@ -0,0 +1,141 @@
+"""
+Tests for the fallback router: hedging, circuit breakers and deadlines.
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from src.models.online_llm.fallback_manager import (
+    BreakerState, CircuitBreaker, DeadlineExceeded, FallbackRouter, LLMRequest, RouteBackend, RoutingError
+)
+
+
+class Scripted:
+    """Backend answering after ``delay_s`` with one token, or failing / hanging."""
+
+    def __init__(self, name: str, delay_s: float = 0.01, mode: str = 'ok'):
+        self.name = name
+        self.delay_s = delay_s
+        self.mode = mode
+        self.calls = 0
+
+    async def stream(self, request):
+        self.calls += 1
+        if self.mode == 'hang':
+            await asyncio.sleep(3600)
+        await asyncio.sleep(self.delay_s)
+        if self.mode == 'error':
+            raise ConnectionError(f"{self.name} down")
+        yield f"{self.name} answer"
+
+
+def _router(make_config, *stubs, **config):
+    router = FallbackRouter(make_config(fallback=config))
+    for stub in stubs:
+        router.add_backend(RouteBackend(stub.name, stub.stream, initial_latency_s=0.02))
+    return router
+
+
+async def _ask(router, deadline_s=None):
+    request = LLMRequest("question")
+    tokens = [token async for token in router.stream(request, deadline_s)]
+    return request, tokens
+
+
+def test_slow_backend_is_hedged(make_config):
+    slow, fast = Scripted('local', delay_s=1.0), Scripted('groq', delay_s=0.02)
+    router = _router(make_config, slow, fast)
+
+    started = time.monotonic()
+    request, tokens = asyncio.run(_ask(router))
+    assert time.monotonic() - started < 0.5
+    assert tokens == ["groq answer"]
+    assert request.served_by == 'groq' and request.hedged
+    assert router.hedges == 1
+    # The abandoned attempt only raises the slow backend's latency estimate
+    assert router.backends[0].health.latency_s > 0.02
+    assert router.backends[0].breaker.state is BreakerState.CLOSED
+
+
+def test_failed_backend_falls_back_immediately(make_config):
+    broken, healthy = Scripted('local', mode='error'), Scripted('groq')
+    router = _router(make_config, broken, healthy)
+    request, tokens = asyncio.run(_ask(router))
+    assert tokens == ["groq answer"]
+    assert router.fallbacks == 1
+    assert not request.hedged
+
+
+def test_breaker_opens_and_skips_backend(make_config):
+    broken = Scripted('local', mode='error')
+    router = _router(make_config, broken, failure_threshold=2, reset_timeout_s=60.0)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(RoutingError, match="local down"):
+                await _ask(router)
+        with pytest.raises(RoutingError, match="all circuits open"):
+            await _ask(router)
+
+    asyncio.run(run())
+    assert router.backends[0].breaker.state is BreakerState.OPEN
+    # Not called again once its circuit opened
+    assert broken.calls == 2
+
+
+def test_half_open_probe_closes_breaker(make_config):
+    flaky = Scripted('local', mode='error')
+    router = _router(make_config, flaky, failure_threshold=1, reset_timeout_s=0.05)
+    breaker = router.backends[0].breaker
+
+    async def run():
+        with pytest.raises(RoutingError):
+            await _ask(router)
+        assert breaker.state is BreakerState.OPEN
+        with pytest.raises(RoutingError, match="all circuits open"):
+            await _ask(router)
+        await asyncio.sleep(0.06)
+        flaky.mode = 'ok'
+        return await _ask(router)
+
+    request, tokens = asyncio.run(run())
+    assert tokens == ["local answer"]
+    assert breaker.state is BreakerState.CLOSED
+    assert flaky.calls == 2
+
+
+def test_half_open_allows_a_single_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=0.0)
+    breaker.on_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.allow()
+    assert breaker.state is BreakerState.HALF_OPEN
+    assert not breaker.allow()
+    # A failed probe reopens the circuit with a longer back-off
+    breaker.base_reset_timeout_s = breaker.reset_timeout_s = 1.0
+    breaker.on_failure()
+    assert breaker.state is BreakerState.OPEN
+    assert breaker.reset_timeout_s == 2.0
+
+
+def test_deadline_is_enforced(make_config):
+    router = _router(make_config, Scripted('local', mode='hang'), Scripted('groq', mode='hang'))
+
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(_ask(router, deadline_s=0.2))
+    assert time.monotonic() - started < 1.0
+    assert router.deadline_misses == 1
+    assert all(backend.failures == 1 for backend in router.backends)
+
+
+def test_router_configures_only_default_breakers(make_config):
+    router = FallbackRouter(make_config(fallback={'failure_threshold': 5, 'reset_timeout_s': 9.0}))
+    default = router.add_backend(RouteBackend('local', Scripted('local').stream))
+    custom = router.add_backend(RouteBackend('groq', Scripted('groq').stream, breaker=CircuitBreaker(failure_threshold=3)))
+    assert default.breaker.failure_threshold == 5
+    assert default.breaker.reset_timeout_s == 9.0
+    assert custom.breaker.failure_threshold == 3
+    assert custom.breaker.reset_timeout_s == 5.0
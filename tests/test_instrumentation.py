@@ -0,0 +1,33 @@
+"""
+Tests for request traces and spans.
+"""
+
+from src.utils.instrumentation import MetricsRegistry, current_trace_id, span, start_trace
+
+
+def test_continued_trace_collects_spans_from_every_holder():
+    registry = MetricsRegistry(enabled=True)
+    with start_trace(registry=registry) as trace:
+        with span('wake', registry):
+            pass
+        with start_trace(trace.trace_id, registry) as continued:
+            assert continued is trace
+            assert current_trace_id() == trace.trace_id
+            with span('listen', registry):
+                pass
+    # Continued after the producer finished, e.g. by a slower consumer
+    with start_trace(trace.trace_id, registry) as late, span('respond', registry):
+        pass
+
+    assert late is trace
+    assert current_trace_id() is None
+    assert [name for name, _, _ in trace.spans] == ['wake', 'listen', 'respond']
+    assert list(registry.traces) == [trace]
+
+
+def test_unknown_trace_id_starts_a_new_trace():
+    registry = MetricsRegistry(enabled=True)
+    with start_trace('abc', registry) as trace:
+        pass
+    assert trace.trace_id == 'abc'
+    assert registry.get_trace('abc') is trace
@@ -0,0 +1,47 @@
+"""
+Tests for the tiered intent classifier.
+"""
+
+import asyncio
+
+import pytest
+
+from src.models.nlp.intent_classifier import SEED_EXAMPLES, HashedNgramModel, IntentClassifier, train_model
+
+
+@pytest.fixture(scope='module')
+def model():
+    return train_model(SEED_EXAMPLES)
+
+
+def test_fast_stage_routes_clear_utterances(make_config, model):
+    classifier = IntentClassifier(make_config(), model=model)
+    assert classifier.classify_fast("what is the weather today").agent == 'real_time_agent'
+    assert classifier.classify_fast("আজকের আবহাওয়া কেমন").intent == 'real_time'
+    assert classifier.classify_fast("open my email").intent == 'work'
+    assert classifier.classify_fast("tell me a joke").intent == 'general'
+
+
+def test_uncertain_utterances_escalate_in_one_batch(make_config, model):
+    calls = []
+
+    async def heavy(texts):
+        calls.append(list(texts))
+        return [('work', 0.9) for _ in texts]
+
+    classifier = IntentClassifier(make_config(intent_classifier={'confidence_threshold': 0.999}), model=model, heavy=heavy)
+    results = asyncio.run(classifier.classify_batch(["hmm", "what is the weather today", "xyz"]))
+    assert len(calls) == 1
+    escalated = [result for result in results if result.stage == 'heavy']
+    assert escalated and all(result.intent == 'work' for result in escalated)
+    assert classifier.escalations == len(escalated)
+
+
+def test_model_round_trips_through_disk(tmp_path, model):
+    path = tmp_path / 'intent.npz'
+    model.save(path)
+    loaded = HashedNgramModel.load(path)
+    text = "latest bitcoin price"
+    features = model.features(text.split())
+    assert loaded.intents == model.intents
+    assert (loaded.logits(features) == model.logits(features)).all()
@@ -0,0 +1,75 @@
+"""
+Tests for the translator's shared per-segment futures under cancellation and failure.
+"""
+
+import asyncio
+import gc
+
+import pytest
+
+from src.models.nlp.language_translator import (
+    LanguageTranslator, StubTranslationModel, TranslationCache, TranslationError
+)
+
+TEXT = "আমি ভাত খাই।"
+
+
+class FailingModel(StubTranslationModel):
+    def __call__(self, texts, source, target):
+        super().__call__(texts, source, target)
+        raise RuntimeError("model crashed")
+
+
+def _translator(make_config, model):
+    return LanguageTranslator(make_config(translation={'batch_window_ms': 5}), model=model, cache=TranslationCache(0))
+
+
+def test_cancelled_caller_does_not_cancel_a_shared_segment(make_config):
+    translator = _translator(make_config, StubTranslationModel(call_s=0.05, token_s=0.0))
+
+    async def run():
+        first = asyncio.create_task(translator.translate(TEXT, 'en'))
+        second = asyncio.create_task(translator.translate(TEXT, 'en'))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(run()) == f"[bn>en] {TEXT}"
+
+
+def test_failed_batch_errors_are_always_retrieved(make_config):
+    translator = _translator(make_config, FailingModel(call_s=0.03, token_s=0.0))
+    unretrieved = []
+
+    async def run():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: unretrieved.append(context))
+        # A segment whose only caller went away before its batch failed
+        translator._enqueue('bn', 'en', TEXT)
+        with pytest.raises(TranslationError):
+            await translator.translate("তুমি কেমন আছ?", 'en')
+        gc.collect()
+
+    asyncio.run(run())
+    gc.collect()
+    assert not [context for context in unretrieved if 'never retrieved' in context.get('message', '')]
+
+
+def test_flush_tasks_are_referenced_until_done(make_config):
+    translator = LanguageTranslator(
+        make_config(translation={'batch_window_ms': 5, 'max_batch': 2}),
+        model=StubTranslationModel(call_s=0.03, token_s=0.0), cache=TranslationCache(0)
+    )
+
+    async def run():
+        # One batch flushed when full, one when its window closes
+        full = [translator._enqueue('bn', 'en', text) for text in ("এক", "দুই")]
+        timed = translator._enqueue('en', 'bn', "three")
+        await asyncio.sleep(0.01)
+        assert len(translator._flush_tasks) == 2
+        await asyncio.gather(*full, timed)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+    assert not translator._flush_tasks
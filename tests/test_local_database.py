@@ -0,0 +1,47 @@
+"""
+Tests for the local database: schema scripts and per-cipher key caching.
+"""
+
+import asyncio
+import os
+
+from src.memory.local_database import FieldCipher, LocalDatabase, _split_statements
+
+SCRIPT = """
+CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT DEFAULT 'a;b', edits INTEGER DEFAULT 0);
+-- a comment; with a semicolon
+CREATE TRIGGER notes_edit AFTER UPDATE OF body ON notes BEGIN
+    UPDATE notes SET edits = edits + 1 WHERE id = NEW.id;
+END;
+"""
+
+
+def test_split_keeps_literals_and_trigger_bodies_whole():
+    statements = _split_statements(SCRIPT)
+    assert len(statements) == 2
+    assert "'a;b'" in statements[0]
+    assert statements[1].rstrip().endswith("END;")
+
+
+def test_executescript_runs_triggers_and_literals(make_config, tmp_path):
+    async def run():
+        db = LocalDatabase(make_config(), path=tmp_path / "test.db", encryption=False)
+        await db.open()
+        try:
+            await db.executescript(SCRIPT)
+            await db.execute("INSERT INTO notes (id) VALUES (1)")
+            await db.execute("UPDATE notes SET body = 'changed' WHERE id = 1")
+            return await db.fetch_one("SELECT body, edits FROM notes WHERE id = 1")
+        finally:
+            await db.close()
+
+    assert asyncio.run(run()) == {'body': 'changed', 'edits': 1}
+
+
+def test_ciphers_keep_their_own_derived_keys():
+    first, second = FieldCipher(os.urandom(32)), FieldCipher(os.urandom(32))
+    blob = first.encrypt('notes.body', "secret")
+    assert first.decrypt('notes.body', blob) == "secret"
+    assert first._aead('notes.body') is first._aead('notes.body')
+    assert second._aead('notes.body') is not first._aead('notes.body')
+    assert list(second._aeads) == ['notes.body']
@@ -0,0 +1,51 @@
+"""
+Tests for the logger's hot-loop rate limiter.
+"""
+
+import logging
+import threading
+
+from src.utils.logger import NeoMateLogger, RateLimitFilter
+
+
+def _record(lineno: int = 10, level: int = logging.DEBUG) -> logging.LogRecord:
+    return logging.LogRecord('test', level, 'loop.py', lineno, 'chunk', None, None)
+
+
+def test_rate_limiter_is_opt_in(monkeypatch):
+    monkeypatch.delenv('NEOMATE_LOG_RATE_LIMIT', raising=False)
+    logger = logging.getLogger('neomate-test-opt-in')
+    NeoMateLogger()._add_rate_limit(logger)
+    assert not any(isinstance(f, RateLimitFilter) for f in logger.filters)
+
+
+def test_suppressed_records_are_reported():
+    limiter = RateLimitFilter(rate=0.0, burst=2)
+    passed = [limiter.filter(_record()) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert limiter.pending_suppressed() == {('loop.py', 10): 3}
+    # Warnings are never limited
+    assert limiter.filter(_record(level=logging.WARNING))
+
+    limiter.burst = 3
+    limiter._buckets[('loop.py', 10)][0] = 1.0
+    record = _record()
+    assert limiter.filter(record)
+    assert record.msg.endswith('[3 similar messages suppressed]')
+    assert limiter.pending_suppressed() == {}
+
+
+def test_counts_are_exact_across_threads():
+    limiter = RateLimitFilter(rate=0.0, burst=100)
+
+    def worker():
+        for _ in range(500):
+            limiter.filter(_record())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert limiter.suppressed_total == 4 * 500 - 100
+    assert limiter.pending_suppressed()[('loop.py', 10)] == limiter.suppressed_total
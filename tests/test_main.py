@@ -0,0 +1,195 @@
+"""
+Tests for the application's event bus wiring (listen -> think -> act).
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.core.event_bus import Event, EventBus, EventPriority
+from src.main import NeoMateApp, profile_startup
+from src.utils.config_loader import ConfigLoader
+from src.utils.instrumentation import current_trace_id, metrics
+
+RESPONSES = []
+TRACE_IDS = []
+
+
+class FakeRecognizer:
+    """Speech-to-text stand-in yielding one partial and one final transcript."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def stream(self, pre_roll=None, start_frame=None):
+        self.calls.append((pre_roll, start_frame))
+        yield SimpleNamespace(text="what", is_final=False)
+        yield SimpleNamespace(text="what time is it", is_final=True)
+
+
+class FakeBrain:
+    async def respond(self, text):
+        TRACE_IDS.append(current_trace_id())
+        RESPONSES.append(text)
+
+
+class FakeWakeWord:
+    """Detector stand-in that fires once, then blocks until stopped."""
+
+    def __init__(self):
+        self.detection_event = asyncio.Event()
+        self.last_detection = {'model': 'hey_neomate', 'confidence': 0.9}
+        self.last_detection_frame = 2560
+        self.listens = 0
+        self._stopped = asyncio.Event()
+
+    async def listen(self):
+        self.listens += 1
+        if self.listens == 1:
+            self.detection_event.set()
+            return True
+        await self._stopped.wait()
+        return False
+
+    def get_pre_roll(self):
+        return np.zeros(160, dtype=np.int16)
+
+    def reset_detection_event(self):
+        self.detection_event.clear()
+
+    async def stop_listening(self):
+        self._stopped.set()
+
+
+def _app() -> NeoMateApp:
+    app = NeoMateApp()
+    app.config = {}
+    app.event_bus = EventBus()
+    app.subscribe_consumers()
+    app.subsystems.register('wake_word', 'tests.test_main:FakeWakeWord', init_method=None)
+    app.subsystems.register('speech_to_text', 'tests.test_main:FakeRecognizer', init_method=None)
+    app.subsystems.register('brain', 'tests.test_main:FakeBrain', init_method=None)
+    return app
+
+
+async def _wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def test_wake_event_runs_listen_and_respond():
+    RESPONSES.clear()
+
+    async def run():
+        app = _app()
+        await app.event_bus.start()
+        try:
+            await app.event_bus.publish(Event(
+                'wake_word',
+                payload={'frame': 1280, 'pre_roll': None},
+                priority=EventPriority.VOICE
+            ))
+            await _wait_for(lambda: RESPONSES)
+            stt = await app.subsystems.get('speech_to_text')
+            return stt.calls
+        finally:
+            await app.event_bus.stop()
+
+    calls = asyncio.run(run())
+    assert calls == [(None, 1280)]
+    # Only the final transcript is answered
+    assert RESPONSES == ["what time is it"]
+
+
+def test_wake_word_producer_publishes_detections():
+    RESPONSES.clear()
+    TRACE_IDS.clear()
+    metrics.reset()
+    metrics.enable()
+
+    async def run():
+        app = _app()
+        await app.event_bus.start()
+        producer = asyncio.create_task(app.run_wake_word())
+        try:
+            await _wait_for(lambda: RESPONSES)
+            wake_word = await app.subsystems.get('wake_word')
+            # The detector is re-armed and listening again once the utterance ended
+            await _wait_for(lambda: wake_word.listens == 2)
+            stt = await app.subsystems.get('speech_to_text')
+            return wake_word, stt.calls
+        finally:
+            await (await app.subsystems.get('wake_word')).stop_listening()
+            await app.shutdown()
+            await asyncio.wait_for(producer, timeout=2.0)
+            await app.event_bus.stop()
+            metrics.disable()
+
+    wake_word, calls = asyncio.run(run())
+    # One trace, started at the wake word, covers listening and the answer
+    trace = metrics.get_trace(TRACE_IDS[0])
+    assert trace is not None
+    assert [name for name, _, _ in trace.spans] == ['listen']
+    assert not wake_word.detection_event.is_set()
+    assert calls[0][1] == 2560
+    assert len(calls[0][0]) == 160
+    assert RESPONSES == ["what time is it"]
+
+
+class FlakyWakeWord:
+    """Detector stand-in whose listen() fails after running for the scripted times."""
+
+    run_s = [0.0, 0.0, 0.0, 0.5, 0.0]
+
+    def __init__(self):
+        self.started = []
+        self.stopped = []
+        self.app = None
+
+    async def listen(self):
+        loop = asyncio.get_running_loop()
+        self.started.append(loop.time())
+        await asyncio.sleep(self.run_s[len(self.started) - 1])
+        self.stopped.append(loop.time())
+        if len(self.started) == len(self.run_s):
+            self.app._stop_event.set()
+        return False
+
+
+def test_wake_word_backoff_resets_after_a_healthy_run():
+    async def run():
+        app = NeoMateApp()
+        app.config = {'wake_word': {'retry_s': 0.05, 'max_retry_s': 1.0, 'restart_reset_s': 0.3}}
+        app.subsystems.register('wake_word', 'tests.test_main:FlakyWakeWord', init_method=None)
+        wake_word = await app.subsystems.get('wake_word')
+        wake_word.app = app
+        await asyncio.wait_for(app.run_wake_word(), timeout=5.0)
+        return wake_word
+
+    wake_word = asyncio.run(run())
+    waits = [start - stop for stop, start in zip(wake_word.stopped, wake_word.started[1:])]
+    # Quick failures back off 0.05, 0.1, 0.2 s; after the 0.5 s healthy run the
+    # next retry starts over at 0.05 s instead of 0.4 s
+    assert waits[2] >= 0.18
+    assert waits[3] < 0.2
+
+
+def _register_stub_subsystems(app):
+    app.subsystems.register('brain', 'tests.test_main:FakeBrain', init_method=None, background=True)
+    app.subsystems.register('missing', 'tests.test_main:NoSuchSubsystem', init_method=None)
+
+
+def test_profile_startup_fails_when_over_budget(monkeypatch, capsys):
+    monkeypatch.setattr(NeoMateApp, 'register_subsystems', _register_stub_subsystems)
+    monkeypatch.setattr(ConfigLoader, 'start_watching', lambda self, poll_interval=1.0: None)
+
+    assert asyncio.run(profile_startup(budget_s=0.0)) == 1
+    report = capsys.readouterr().out
+    assert 'OVER BUDGET' in report
+    assert 'init:brain' in report and 'failed:missing' in report
+
+    assert asyncio.run(profile_startup(budget_s=3600.0)) == 0
+    assert '- OK' in capsys.readouterr().out
@@ -0,0 +1,122 @@
+"""
+Tests for the vision and translation models loaded through the model registry.
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.models.model_registry import ModelRegistry
+from src.models.nlp.language_translator import MarianTranslator
+from src.models.vision.object_detection import OnnxDetector
+from src.models.vision.text_recognition import SyntheticFont, SyntheticFontEngine, TextRecognizer
+
+
+class FakeInput:
+    name = 'images'
+    shape = [1, 3, 32, 32]
+
+
+class FakeSession:
+    def get_inputs(self):
+        return [FakeInput()]
+
+    def run(self, outputs, feeds):
+        batch = feeds['images']
+        prediction = np.zeros((len(batch), 5, 1), dtype=np.float32)
+        prediction[:, :4, 0] = (16, 16, 8, 8)
+        prediction[:, 4, 0] = 0.9
+        return [prediction]
+
+
+class FakeOnnxDetector(OnnxDetector):
+    def __init__(self, *args, **kwargs):
+        self.loads = 0
+        self.unloads = 0
+        super().__init__('model.onnx', class_names=['button'], **kwargs)
+
+    def load(self):
+        self.loads += 1
+        self._input_name, self._fixed_batch, self._fixed_size = 'images', 1, 32
+        return FakeSession()
+
+    def unload(self, session=None):
+        self.unloads += 1
+        super().unload(session)
+
+
+class FakeMarian(MarianTranslator):
+    def load(self, direction):
+        return (f'tokenizer-{direction}', f'model-{direction}')
+
+
+def _registry(make_config, budget_mb):
+    return ModelRegistry(make_config(), budget_mb=budget_mb)
+
+
+def test_detector_session_loads_and_evicts_through_the_registry(make_config):
+    async def run():
+        registry = _registry(make_config, 100)
+        detector = FakeOnnxDetector(model_registry=registry, size_mb=60)
+        assert 'object_detection' in registry
+
+        batch = np.zeros((2, 32, 32, 3), dtype=np.uint8)
+        results = await asyncio.to_thread(detector.detect_batch, batch)
+        assert [len(boxes) for boxes in results] == [1, 1]
+        assert await asyncio.to_thread(detector.supported_sizes, [320, 640]) == [32]
+        assert detector.loads == 1
+        assert registry.is_resident('object_detection')
+
+        # Another model needing the room evicts the idle session through its hook
+        registry.register('other', loader=lambda: 'other', size_mb=60)
+        async with registry.use('other'):
+            pass
+        assert detector.unloads == 1
+        assert not registry.is_resident('object_detection')
+
+    asyncio.run(run())
+
+
+def test_translator_registers_each_direction(make_config):
+    async def run():
+        registry = _registry(make_config, 1000)
+        translator = FakeMarian(model_registry=registry, size_mb=300)
+        assert {'translation.bn-en', 'translation.en-bn'} <= set(registry.specs)
+
+        def pinned():
+            with translator._pinned('bn-en') as loaded:
+                return loaded, registry.specs['translation.bn-en'].refs
+
+        loaded, refs = await asyncio.to_thread(pinned)
+        assert loaded == ('tokenizer-bn-en', 'model-bn-en')
+        assert refs == 1
+        assert registry.specs['translation.bn-en'].refs == 0
+        assert not registry.is_resident('translation.en-bn')
+
+    asyncio.run(run())
+
+
+def test_ocr_pool_is_pinned_per_call_and_stopped_on_eviction(make_config):
+    font = SyntheticFont()
+    image = np.full((60, 400), 255, dtype=np.uint8)
+    font.draw(image, 8, 8, ["hello world"])
+
+    async def run():
+        registry = _registry(make_config, 100)
+        recognizer = TextRecognizer(
+            make_config(ocr={'size_mb': 60}), engine=SyntheticFontEngine(font, call_s=0.0, pixel_s=0.0),
+            workers=1, model_registry=registry
+        )
+        result = await recognizer.recognize(image)
+        assert result.text == "hello world"
+        assert registry.is_resident('ocr')
+        assert registry.specs['ocr'].refs == 0
+        pool = registry.specs['ocr'].model
+
+        registry.register('other', loader=lambda: 'other', size_mb=60)
+        async with registry.use('other'):
+            pass
+        assert not registry.is_resident('ocr')
+        assert pool._shutdown_thread
+
+    asyncio.run(run())
@@ -0,0 +1,98 @@
+"""
+Tests for the RAM-budgeted model registry.
+"""
+
+import asyncio
+import threading
+import time
+
+from src.models.model_registry import ModelRegistry
+
+
+def _registry(make_config, budget_mb=100):
+    registry = ModelRegistry(make_config(), budget_mb=budget_mb)
+    loads, unloads = [], []
+    for name, size, priority in (('llm', 60, 100), ('stt', 30, 90), ('vision', 40, 0)):
+        registry.register(
+            name,
+            loader=lambda name=name: loads.append(name) or f"{name}-model",
+            unloader=lambda model: unloads.append(model),
+            size_mb=size,
+            priority=priority
+        )
+    return registry, loads, unloads
+
+
+def test_models_load_once_and_evict_by_priority(make_config):
+    registry, loads, unloads = _registry(make_config)
+
+    async def run():
+        async with registry.use('llm'), registry.use('llm'):
+            pass
+        async with registry.use('stt'):
+            pass
+        # 60 + 30 + 40 exceeds the budget: the lowest-priority idle model goes
+        async with registry.use('vision') as vision:
+            assert vision == 'vision-model'
+
+    asyncio.run(run())
+    assert loads == ['llm', 'stt', 'vision']
+    assert unloads == ['stt-model']
+    assert registry.is_resident('vision') and registry.is_resident('llm')
+    assert registry.used_bytes <= registry.budget_bytes
+
+
+def test_pinned_model_is_not_evicted(make_config):
+    registry, _, unloads = _registry(make_config)
+
+    async def run():
+        async with registry.use('stt'):
+            async with registry.use('llm'):
+                pass
+            await registry.acquire('vision')
+
+    asyncio.run(run())
+    # llm (idle) is evicted despite its priority; stt stays because it is in use
+    assert unloads == ['llm-model']
+    assert registry.is_resident('stt')
+
+
+def test_concurrent_acquires_share_one_load(make_config):
+    registry, loads, _ = _registry(make_config)
+
+    async def run():
+        models = await asyncio.gather(*(registry.acquire('stt') for _ in range(5)))
+        for _ in models:
+            registry.release('stt')
+        return models
+
+    assert asyncio.run(run()) == ['stt-model'] * 5
+    assert loads == ['stt']
+
+
+def test_shutdown_waits_for_cancelled_loads(make_config):
+    registry = ModelRegistry(make_config(), budget_mb=100)
+    finished, unloads = threading.Event(), []
+
+    def slow_loader():
+        time.sleep(0.2)
+        finished.set()
+        return 'llm-model'
+
+    registry.register('llm', loader=slow_loader, unloader=unloads.append, size_mb=60)
+
+    async def run():
+        caller = asyncio.create_task(registry.acquire('llm'))
+        await asyncio.sleep(0.05)
+        await registry.shutdown()
+        # Nothing is left running once shutdown returns
+        assert finished.is_set()
+        assert not registry._loading
+        return await asyncio.gather(caller, return_exceptions=True)
+
+    (outcome,) = asyncio.run(run())
+    assert isinstance(outcome, asyncio.CancelledError)
+    # The model produced by the abandoned thread was unloaded, not leaked
+    assert unloads == ['llm-model']
+    assert not registry.is_resident('llm')
+    assert registry.used_bytes == 0
@@ -0,0 +1,152 @@
+"""
+Tests for batched multi-stream wake word inference and changing streams while serving.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+
+from src.input.audio_capture import ArraySource, AudioCaptureHub
+from src.input.multi_stream_wake_word import (
+    CHUNK_SIZE, BatchedWakeWordModel, MultiStreamWakeWordServer, WakeWordStages
+)
+
+_rng = np.random.default_rng(7)
+_BIN_WEIGHTS = _rng.standard_normal(32).astype(np.float32)
+_EMBEDDING_WEIGHTS = (_rng.standard_normal((76 * 32, 96)) * 0.01).astype(np.float32)
+
+
+def _melspectrogram(raw):
+    # 8 frames per chunk + context, each a scaled copy of the bin weights
+    frames = raw.reshape(len(raw), 8, -1).mean(axis=2) / 1000.0
+    return frames[:, :, None] * _BIN_WEIGHTS
+
+
+def _embedding(mel):
+    return np.tanh(mel.reshape(len(mel), -1) @ _EMBEDDING_WEIGHTS)
+
+
+def _classifier(embeddings):
+    return 1.0 / (1.0 + np.exp(-embeddings.mean(axis=(1, 2))[:, None] * 50))
+
+
+def _stages(**overrides):
+    stages = dict(
+        melspectrogram=_melspectrogram,
+        embedding=_embedding,
+        classifiers={'hey_neomate': _classifier},
+        classifier_frames={'hey_neomate': 16}
+    )
+    stages.update(overrides)
+    return WakeWordStages(**stages)
+
+
+def _audio(chunks, seed):
+    return (np.random.default_rng(seed).standard_normal((chunks, CHUNK_SIZE)) * 3000).astype(np.int16)
+
+
+def _single_stream_scores(audio, stages=None):
+    model = BatchedWakeWordModel(stages=stages or _stages())
+    model.allocate(1)
+    return np.concatenate([model.predict_batch(chunk[None], np.array([0])) for chunk in audio])
+
+
+def test_batched_scores_match_single_stream_scores():
+    streams = [_audio(30, seed) for seed in range(3)]
+    model = BatchedWakeWordModel(stages=_stages())
+    model.allocate(3)
+
+    batched = np.stack([
+        model.predict_batch(np.stack([audio[t] for audio in streams]), np.arange(3))
+        for t in range(30)
+    ], axis=1)
+
+    for slot, audio in enumerate(streams):
+        np.testing.assert_allclose(batched[slot], _single_stream_scores(audio), rtol=1e-5, atol=1e-6)
+
+
+def test_fixed_batch_backend_falls_back_to_per_row_calls():
+    def single_row(x):
+        if len(x) != 1:
+            raise ValueError("batch size must be 1")
+        return _embedding(x)
+
+    streams = [_audio(20, seed) for seed in range(2)]
+    model = BatchedWakeWordModel(stages=_stages(embedding=single_row))
+    model.allocate(2)
+    batched = np.stack([
+        model.predict_batch(np.stack([streams[0][t], streams[1][t]]), np.arange(2)) for t in range(20)
+    ], axis=1)
+
+    assert model._batch_ok['embedding'] is False
+    np.testing.assert_allclose(batched[1], _single_stream_scores(streams[1]), rtol=1e-5, atol=1e-6)
+
+
+class ThreadRecordingModel(BatchedWakeWordModel):
+    """Records which threads touch the stream state."""
+
+    def __init__(self):
+        super().__init__(stages=_stages())
+        self.threads = set()
+
+    def allocate(self, n_streams):
+        self.threads.add(threading.get_ident())
+        super().allocate(n_streams)
+
+    def reset(self, slot):
+        self.threads.add(threading.get_ident())
+        super().reset(slot)
+
+    def predict_batch(self, chunks, slots):
+        self.threads.add(threading.get_ident())
+        return super().predict_batch(chunks, slots)
+
+
+class RecordingServer(MultiStreamWakeWordServer):
+    """Every chunk counts as a detection, so ``scores`` holds each stream's score sequence."""
+
+    def __init__(self, model):
+        super().__init__(model=model, confidence_threshold=-1.0, refractory_s=0.0)
+        self.scores = {}
+
+    def _dispatch(self, handle, model_name, confidence):
+        self.scores.setdefault(handle.stream_id, []).append(confidence)
+        super()._dispatch(handle, model_name, confidence)
+
+
+def test_streams_can_be_added_and_removed_while_serving():
+    model = ThreadRecordingModel()
+    server = RecordingServer(model)
+    live = AudioCaptureHub(ArraySource(_audio(15, 1).reshape(-1), realtime=True))
+    old = AudioCaptureHub(ArraySource(_audio(200, 2).reshape(-1)))
+    new_audio = _audio(10, 3)
+    new = AudioCaptureHub(ArraySource(new_audio.reshape(-1)))
+    server.add_stream('live', live.subscribe('live'))
+    server.add_stream('old', old.subscribe('old'))
+
+    async def run():
+        live.start()
+        old.start()
+        serving = asyncio.create_task(server.serve())
+        await asyncio.sleep(0.3)
+        server.remove_stream('old')
+        # Reuses the removed stream's slot, whose state is dirty
+        handle = server.add_stream('new', new.subscribe('new'))
+        new.start()
+        await serving
+        return handle
+
+    try:
+        handle = asyncio.run(run())
+    finally:
+        for hub in (live, old, new):
+            hub.stop()
+
+    assert handle.slot == 1
+    assert len(server.scores['old']) >= 2
+    assert handle.chunks == 10
+    # The new stream starts from clean state, exactly as if it were served alone
+    np.testing.assert_allclose(server.scores['new'], _single_stream_scores(new_audio)[:, 0], rtol=1e-5, atol=1e-6)
+    assert len(model.threads) == 1
+    assert threading.get_ident() not in model.threads
@@ -0,0 +1,127 @@
+"""
+Tests for the detection scheduler: region bookkeeping, the CPU budget and
+serialized async calls, with a stub ONNX session behind OnnxDetector.
+"""
+
+import asyncio
+import threading
+import time
+
+import numpy as np
+
+from src.models.vision.object_detection import ObjectDetector, OnnxDetector
+
+
+class StubSession:
+    """ONNX session finding one 8x8 object at (12, 12)-(20, 20) of every input."""
+
+    def __init__(self, run_s=0.0):
+        self.run_s = run_s
+        self.batches = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def run(self, outputs, feeds):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            time.sleep(self.run_s)
+            batch = next(iter(feeds.values()))
+            self.batches.append(batch.shape)
+            prediction = np.zeros((len(batch), 5, 1), dtype=np.float32)
+            prediction[:, :4, 0] = (16, 16, 8, 8)
+            prediction[:, 4, 0] = 0.9
+            return [prediction]
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def _scheduler(make_config, session=None, threads=1, **settings):
+    detector = OnnxDetector('stub.onnx', class_names=['button'], threads=threads)
+    detector._session = session or StubSession()
+    settings = {'roi_padding': 8, 'min_roi_area': 0, 'resolutions': [64, 128], **settings}
+    return ObjectDetector(make_config(object_detection=settings), detector=detector, cpu_percent=lambda: 0.0)
+
+
+def _frame():
+    return np.zeros((480, 640, 3), dtype=np.uint8)
+
+
+def test_changed_regions_are_batched_and_mapped_back_to_the_screen(make_config):
+    scheduler = _scheduler(make_config)
+
+    result = scheduler.process(_frame(), [(100, 100, 164, 164), (400, 300, 448, 348)])
+
+    assert not result.skipped
+    assert (result.processed_rois, result.pending_rois) == (2, 0)
+    assert scheduler.detector._session.batches == [(2, 3, 64, 64)]
+    assert {(d.left, d.top, d.label) for d in result.detections} == {(107, 107, 'button'), (404, 304, 'button')}
+
+
+def test_detections_outside_the_changed_regions_are_carried_forward(make_config):
+    scheduler = _scheduler(make_config)
+    scheduler.process(_frame(), [(100, 100, 164, 164), (400, 300, 448, 348)])
+
+    result = scheduler.process(_frame(), [(400, 300, 448, 348)])
+
+    assert result.processed_rois == 1
+    assert len(result.detections) == 2
+    assert any((d.left, d.top) == (107, 107) for d in result.detections)
+
+
+def test_unprocessed_regions_are_kept_unpadded_and_pruned_once_detected(make_config):
+    scheduler = _scheduler(make_config, max_batch=1)
+    small, large = (400, 300, 440, 340), (100, 100, 200, 200)
+
+    first = scheduler.process(_frame(), [small, large])
+    assert (first.processed_rois, first.pending_rois) == (1, 1)
+    assert scheduler._pending == [small]
+
+    scheduler.process(_frame(), [])
+    assert scheduler._pending == []
+
+
+def test_skipped_frames_keep_their_regions_within_the_limit(make_config):
+    scheduler = _scheduler(make_config, cpu_budget_percent=0, max_pending_rois=4)
+
+    for step in range(10):
+        result = scheduler.process(_frame(), [(step * 60, 10, step * 60 + 20, 30)])
+        assert result.skipped
+
+    assert scheduler._pending == [(0, 10, 500, 30), (540, 10, 560, 30)]
+    assert scheduler.skipped == 10
+    assert not scheduler.detector._session.batches
+
+
+def test_cpu_charge_is_the_detection_call_not_the_whole_process(make_config, monkeypatch):
+    scheduler = _scheduler(make_config, session=StubSession(run_s=0.02), threads=2)
+    # Other threads of the process burning CPU during the call
+    clock = iter(range(0, 1000, 10))
+    monkeypatch.setattr(time, 'process_time', lambda: float(next(clock)))
+
+    result = scheduler.process(_frame(), [(100, 100, 164, 164)])
+
+    threads = min(2, scheduler.cores)
+    assert result.latency_s >= 0.02
+    assert result.cpu_s == result.latency_s * threads
+    assert scheduler.inference_cpu_s == result.cpu_s
+
+
+def test_concurrent_async_calls_are_serialized(make_config):
+    session = StubSession(run_s=0.02)
+    scheduler = _scheduler(make_config, session=session)
+
+    async def run():
+        return await asyncio.gather(*(
+            scheduler.aprocess(_frame(), [(100 * i, 100, 100 * i + 64, 164)]) for i in range(4)
+        ))
+
+    results = asyncio.run(run())
+
+    assert session.max_active == 1
+    assert len(session.batches) == 4
+    assert len(results[-1].detections) == 4
+    assert scheduler.frames == 4
@@ -0,0 +1,102 @@
+"""
+Tests for the local LLM query processor's response caching.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from src.models.local_llm.model_loader import StubModelLoader
+from src.models.local_llm.query_processor import QueryProcessor
+from src.models.local_llm.response_cache import ResponseCache
+from src.models.nlp.intent_classifier import IntentClassifier
+
+
+class KeywordIntents:
+    """Intent classifier stand-in: 'weather' and 'price' queries are real-time."""
+
+    def classify_fast(self, text):
+        live = any(word in text.lower() for word in ('weather', 'price'))
+        return SimpleNamespace(intent='real_time' if live else 'general')
+
+
+def _processor(make_config, cache_config=None):
+    calls = []
+
+    async def generate(prompt, model, options):
+        calls.append(prompt)
+        return f"answer {len(calls)}"
+
+    processor = QueryProcessor(
+        config_loader=make_config(local_llm={'cache': cache_config or {}}),
+        generate=generate,
+        cache=ResponseCache(),
+        model_loader=StubModelLoader(),
+        intent_classifier=KeywordIntents()
+    )
+    return processor, calls
+
+
+def test_general_answers_are_cached(make_config):
+    processor, calls = _processor(make_config)
+
+    async def run():
+        first = await processor.process("tell me a joke")
+        second = await processor.process("Tell me a joke!")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert len(calls) == 1
+    assert second.cached and second.text == first.text
+
+
+def test_real_time_answers_are_not_cached(make_config):
+    processor, calls = _processor(make_config)
+
+    async def run():
+        first = await processor.process("what's the weather")
+        second = await processor.process("what's the weather")
+        streamed = ''.join([token async for token in processor.stream("what's the weather")])
+        return first, second, streamed
+
+    first, second, streamed = asyncio.run(run())
+    assert len(calls) == 3
+    assert not second.cached
+    assert (first.text, second.text, streamed) == ("answer 1", "answer 2", "answer 3")
+    assert processor.cache.stores == 0
+
+
+def test_intent_ttl_is_configurable(make_config):
+    processor, _ = _processor(make_config, {'intent_ttl_s': {'real_time': 60}})
+
+    async def run():
+        await processor.process("bitcoin price")
+        return await processor.cache_ttl("bitcoin price")
+
+    assert asyncio.run(run()) == 60
+    expires = next(iter(processor.cache._memory.values()))[0]
+    assert processor.cache.stores == 1
+    assert 0 < expires - time.time() <= 60
+
+
+def test_intent_classifier_is_created_on_first_lookup(make_config, tmp_path):
+    calls = []
+
+    async def generate(prompt, model, options):
+        calls.append(prompt)
+        return "sunny"
+
+    processor = QueryProcessor(
+        config_loader=make_config(intent_classifier={'model_path': str(tmp_path / 'missing.npz')}),
+        generate=generate,
+        cache=ResponseCache(),
+        model_loader=StubModelLoader()
+    )
+
+    async def run():
+        await processor.process("what is the weather today")
+        return await processor.process("what is the weather today")
+
+    assert not asyncio.run(run()).cached
+    assert len(calls) == 2
+    assert isinstance(processor.intent_classifier, IntentClassifier)
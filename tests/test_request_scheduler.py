@@ -0,0 +1,95 @@
+"""
+Tests for the local LLM scheduler: voice routing, aging and output backpressure.
+"""
+
+import asyncio
+
+from src.core.brain import Brain
+from src.models.local_llm.request_scheduler import LLMScheduler, RequestPriority
+
+
+class FakeQueryProcessor:
+    """Emits a fixed number of tokens per request and records the order of requests."""
+
+    system_prompt = "You are NeoMate."
+
+    def __init__(self, tokens=3, delay_s=0.0):
+        self.tokens = tokens
+        self.delay_s = delay_s
+        self.order = []
+
+    async def cached(self, query, context=None, **options):
+        return None
+
+    async def stream(self, query, context=None, use_cache=True, **options):
+        self.order.append(query)
+        for i in range(self.tokens):
+            await asyncio.sleep(self.delay_s)
+            yield f"{query}:{i} "
+
+
+def _scheduler(make_config, processor, **options):
+    return LLMScheduler(make_config(llm_scheduler=options), processor)
+
+
+def test_brain_local_answers_go_through_the_scheduler_as_voice(make_config):
+    config = make_config(llm={'primary_provider': 'local'})
+    processor = FakeQueryProcessor()
+    brain = Brain(config_loader=config, query_processor=processor)
+    submitted = []
+    submit = brain.scheduler.submit
+
+    def record(query, context=None, agent='default', priority=RequestPriority.AGENT, use_cache=True, **options):
+        submitted.append((agent, priority))
+        return submit(query, context, agent, priority, use_cache, **options)
+
+    brain.scheduler.submit = record
+
+    async def run():
+        backend = next(b for b in brain.router.backends if b.name == 'local')
+        request = type('Request', (), {'query': 'hi', 'context': [], 'params': {'use_cache': False}})()
+        return ''.join([token async for token in backend.stream(request)])
+
+    assert asyncio.run(run()) == "hi:0 hi:1 hi:2 "
+    assert submitted == [('voice', RequestPriority.INTERACTIVE)]
+
+
+def test_background_job_ages_past_continuous_agent_load(make_config):
+    processor = FakeQueryProcessor(tokens=2, delay_s=0.01)
+    scheduler = _scheduler(make_config, processor, max_batch=1, reserved_interactive=0, aging_s=0.05)
+
+    async def run():
+        background = asyncio.create_task(scheduler.generate('background', agent='learner', priority=RequestPriority.BACKGROUND))
+        await asyncio.sleep(0)
+        # Keep agent work queued at all times
+        jobs = [scheduler.submit(f'agent{i}', agent='general', priority=RequestPriority.AGENT) for i in range(40)]
+        await asyncio.wait_for(background, timeout=5.0)
+        # Drop the queued load before the running request so nothing new starts
+        for job in sorted(jobs, key=lambda job: job.task is not None):
+            scheduler.cancel(job)
+        await asyncio.gather(*[job.task for job in jobs if job.task is not None], return_exceptions=True)
+
+    asyncio.run(run())
+    assert 'background' in processor.order
+    assert processor.order.index('background') < 40
+
+
+def test_output_buffer_bounds_tokens_for_a_slow_reader(make_config):
+    processor = FakeQueryProcessor(tokens=50)
+    scheduler = _scheduler(make_config, processor, output_buffer=4)
+
+    async def run():
+        job = scheduler.submit('slow', agent='general')
+        for _ in range(20):
+            await asyncio.sleep(0)
+        # The producer waits on the full buffer instead of queueing every token
+        assert job.output.qsize() == 4
+        assert job.tokens <= 5
+        received = []
+        while len(received) < 50:
+            received.append(await job.output.get())
+        await job.task
+        return received
+
+    received = asyncio.run(run())
+    assert received[-1] == "slow:49 "
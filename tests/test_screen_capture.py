@@ -0,0 +1,56 @@
+"""
+Tests for the screen capture thread: grab failures are retried, exhaustion stops it.
+"""
+
+import threading
+
+import numpy as np
+
+from src.input.screen_capture import FrameSource, ScreenCapture
+
+
+class FlakySource(FrameSource):
+    """Fails a few grabs, then serves a limited number of frames."""
+
+    def __init__(self, failures=3, frames=2):
+        self.failures = failures
+        self.frames = frames
+        self.grabs = 0
+
+    def grab(self):
+        self.grabs += 1
+        if self.failures:
+            self.failures -= 1
+            raise OSError("display unavailable")
+        if not self.frames:
+            return None
+        self.frames -= 1
+        return np.full((64, 64, 4), self.frames, dtype=np.uint8)
+
+
+def test_grab_errors_are_retried_until_the_source_is_exhausted(make_config):
+    config = make_config(screen_capture={'retry_s': 0.001, 'max_retry_s': 0.004, 'max_fps': 1000.0})
+    published = []
+    capture = ScreenCapture(config, source=FlakySource(), on_regions=published.append)
+    capture.start()
+    capture._thread.join(timeout=2.0)
+
+    assert not capture._running
+    assert capture.grab_errors == 3
+    assert capture.frames == 2
+    assert published
+    assert capture.source.grabs == 6
+    capture.stop()
+
+
+def test_retry_backoff_is_capped_and_stop_ends_the_loop(make_config):
+    config = make_config(screen_capture={'retry_s': 0.01, 'max_retry_s': 0.02})
+    source = FlakySource(failures=10 ** 6)
+    capture = ScreenCapture(config, source=source)
+    capture.start()
+    threading.Event().wait(0.2)
+    capture.stop()
+
+    # Capped at 50 retries/s rather than giving up or spinning
+    assert 3 <= capture.grab_errors <= 25
+    assert capture._thread is None
@@ -0,0 +1,33 @@
+"""
+Tests for lexicon scoring: the scope of negations.
+"""
+
+from src.models.nlp.sentiment_analyzer import EMOTIONS, score_turns
+
+JOY = 1 + EMOTIONS.index('joy')
+
+
+def _score(*texts):
+    scores, _ = score_turns(texts)
+    return scores
+
+
+def test_negation_stops_at_a_contrast_word():
+    scores = _score("not good but great", "not good")
+    assert scores[0, 0] > 0.5
+    assert scores[0, JOY] > 0
+    assert scores[1, 0] < 0
+
+
+def test_negation_stops_at_punctuation():
+    scores = _score("not happy, glad", "never sad; happy", "not happy")
+    assert scores[0, JOY] > 0
+    assert scores[1, 0] > 0.5
+    assert scores[2, JOY] == 0
+    assert scores[2, 0] < 0
+
+
+def test_bengali_negation_stops_at_punctuation():
+    scores = _score("খুশি না, ভালো", "ভালো না")
+    assert scores[0, 0] > scores[1, 0]
+    assert scores[1, 0] < 0
@@ -0,0 +1,75 @@
+"""
+Tests for short-term memory: JSON partitions, retention settings and the sweeper.
+"""
+
+import json
+import threading
+import time
+
+from src.memory.short_term_memory import ShortTermMemory
+
+
+def test_partitions_round_trip_as_json(make_config, tmp_path):
+    memory = ShortTermMemory(make_config(), path=tmp_path, sweep_interval_s=0)
+    memory.add('s1', "hello", metadata={'lang': 'en'})
+    memory.add('s1', {'action': 'open', 'app': 'editor'}, kind='action')
+    assert memory.flush() == 1
+
+    files = list(tmp_path.glob('*.json'))
+    assert len(files) == 1
+    rows = json.loads(files[0].read_text(encoding='utf-8'))
+    assert rows[0][1:] == ['s1', 'message', "hello", {'lang': 'en'}]
+
+    reopened = ShortTermMemory(make_config(), path=tmp_path, sweep_interval_s=0)
+    records = reopened.recent('s1')
+    assert [record.content for record in records] == ["hello", {'action': 'open', 'app': 'editor'}]
+    assert records[1].kind == 'action'
+
+
+def test_legacy_pickle_partitions_are_not_loaded(make_config, tmp_path):
+    (tmp_path / f"{int(time.time()) // 86400 * 86400}.pickle").write_bytes(b"not trusted")
+    memory = ShortTermMemory(make_config(), path=tmp_path, sweep_interval_s=0)
+    assert memory.count == 0
+
+
+def test_zero_retention_is_not_replaced_by_the_default(make_config):
+    memory = ShortTermMemory(make_config(short_term_memory={'retention_days': 3}), retention_days=0,
+                             persist=False, sweep_interval_s=0)
+    assert memory.retention_s == 0.0
+
+    configured = ShortTermMemory(make_config(short_term_memory={'retention_days': 0}), persist=False,
+                                 sweep_interval_s=0)
+    assert configured.retention_s == 0.0
+
+
+def test_add_does_not_expire_or_spawn_threads(make_config):
+    memory = ShortTermMemory(make_config(), retention_days=1, partition='hour', persist=False, sweep_interval_s=0)
+    now = time.time()
+    memory.add('s1', "old", timestamp=now - 3 * 86400)
+    before = threading.active_count()
+    for hour in range(48):
+        memory.add('s1', "new", timestamp=now - 2 * 86400 + hour * 3600)
+    assert threading.active_count() == before
+    assert memory.count == 49
+
+    assert memory.expire(now) == 25
+    assert memory.add('s1', "late", timestamp=now - 3 * 86400) is None
+
+
+def test_one_sweeper_expires_in_the_background(make_config):
+    memory = ShortTermMemory(make_config(), retention_days=1, persist=False, sweep_interval_s=0.02)
+    try:
+        memory.add('s1', "old", timestamp=time.time() - 3 * 86400)
+        memory.add('s1', "new")
+        sweepers = [thread for thread in threading.enumerate() if thread.name == 'stm-sweeper']
+        memory.add('s1', "newer")
+        assert len([thread for thread in threading.enumerate() if thread.name == 'stm-sweeper']) == len(sweepers)
+
+        deadline = time.time() + 2.0
+        while memory.expired == 0 and time.time() < deadline:
+            time.sleep(0.01)
+        assert memory.expired == 1
+        assert [record.content for record in memory.recent('s1')] == ["new", "newer"]
+    finally:
+        memory.close()
+    assert memory._sweeper is None
@@ -0,0 +1,142 @@
+"""
+Tests for lazy subsystem loading, background warm-up and startup profiling.
+"""
+
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from src.core.subsystem_registry import SubsystemRegistry
+from src.utils.startup_profiler import StartupProfiler
+
+STUB = '''
+import asyncio
+import time
+
+time.sleep({import_s})
+loads = []
+
+
+class Service:
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.cleaned_up = False
+
+    async def initialize(self):
+        await asyncio.sleep({init_s})
+        loads.append(self)
+        return {init_result}
+
+    def cleanup(self):
+        self.cleaned_up = True
+'''
+
+
+@pytest.fixture
+def stub_module(tmp_path, monkeypatch):
+    """Write a stub subsystem module that takes import_s to import and init_s to initialize."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    names = []
+
+    def make(name, import_s=0.0, init_s=0.0, init_result=True):
+        (tmp_path / f"{name}.py").write_text(
+            textwrap.dedent(STUB.format(import_s=import_s, init_s=init_s, init_result=init_result))
+        )
+        names.append(name)
+        return f"{name}:Service"
+
+    yield make
+    for name in names:
+        sys.modules.pop(name, None)
+
+
+def test_subsystem_is_imported_and_initialized_on_first_use(stub_module):
+    profiler = StartupProfiler()
+    registry = SubsystemRegistry(profiler)
+    registry.register('hub', stub_module('stub_hub'), init_method=None)
+    registry.register('slow', stub_module('stub_slow', import_s=0.1, init_s=0.1), dependencies={'hub': 'hub'})
+
+    # Registering imports nothing
+    assert 'stub_slow' not in sys.modules and 'stub_hub' not in sys.modules
+
+    async def run():
+        first, second = await asyncio.gather(registry.get('slow'), registry.get('slow'))
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert sys.modules['stub_slow'].loads == [first]
+    assert first.kwargs['hub'] is registry.peek('hub')
+    timings = registry.timings()
+    assert timings['slow']['import_s'] >= 0.09
+    assert timings['slow']['init_s'] >= 0.09
+    phases = dict(profiler.phases)
+    assert phases['import:slow'] == timings['slow']['import_s']
+    assert phases['init:slow'] == timings['slow']['init_s']
+    assert 'import:hub' in phases
+
+
+def test_failed_initialization_raises_and_is_retried(stub_module):
+    registry = SubsystemRegistry()
+    registry.register('broken', stub_module('stub_broken', init_result=False))
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(RuntimeError, match='failed to initialize'):
+                await registry.get('broken')
+
+    asyncio.run(run())
+    assert not registry.is_loaded('broken')
+    assert len(sys.modules['stub_broken'].loads) == 2
+    with pytest.raises(KeyError):
+        asyncio.run(registry.get('missing'))
+
+
+def test_background_preload_warms_only_background_subsystems(stub_module):
+    registry = SubsystemRegistry()
+    registry.register('wake_word', stub_module('stub_wake', init_s=0.05), background=True)
+    registry.register('broken', stub_module('stub_bg_broken', init_result=False), background=True)
+    registry.register('vision', stub_module('stub_vision'))
+
+    async def run():
+        task = registry.preload_background()
+        # The caller is not blocked while the background load runs
+        assert not registry.is_loaded('wake_word')
+        await task
+        loaded = {name: registry.is_loaded(name) for name in registry.specs}
+        instance = registry.peek('wake_word')
+        await registry.shutdown()
+        return loaded, instance
+
+    loaded, instance = asyncio.run(run())
+    assert loaded == {'wake_word': True, 'broken': False, 'vision': False}
+    assert 'stub_vision' not in sys.modules
+    assert instance.cleaned_up
+
+
+def test_profiler_times_imports_and_reports_over_budget(stub_module):
+    profiler = StartupProfiler(budget_s=0.05)
+    registry = SubsystemRegistry(profiler)
+    registry.register('slow', stub_module('stub_profiled', import_s=0.1))
+
+    async def run():
+        profiler.install_import_hook()
+        try:
+            await registry.get('slow')
+        finally:
+            profiler.remove_import_hook()
+        profiler.mark_ready()
+
+    asyncio.run(run())
+    inclusive, own = profiler.imports['stub_profiled']
+    assert own >= 0.09 and inclusive >= own
+    assert not profiler.within_budget()
+    report = profiler.report()
+    assert report.startswith('Ready after') and 'OVER BUDGET' in report
+    assert 'import:slow' in report and 'stub_profiled' in report
+
+    within = StartupProfiler(budget_s=60.0)
+    within.mark_ready()
+    assert within.within_budget() and '- OK' in within.report()
@@ -0,0 +1,118 @@
+"""
+Tests for the task planner's shared cached steps, retry policy, sync timeouts and plan parsing.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from src.core.task_planner import PlanError, TaskPlan, TaskPlanner
+
+
+def test_cancelling_one_plan_does_not_fail_another_sharing_a_step(make_config):
+    planner = TaskPlanner(make_config(task_planner={'cache_ttl_s': 60}))
+    calls = []
+
+    async def lookup(query):
+        calls.append(query)
+        await asyncio.sleep(0.05)
+        return query.upper()
+
+    planner.register_action('lookup', lookup, side_effect_free=True)
+    plan = TaskPlan().add('find', 'lookup', {'query': 'weather'})
+
+    async def run():
+        owner = asyncio.create_task(planner.execute(plan))
+        await asyncio.sleep(0.01)
+        sharer = asyncio.create_task(planner.execute(plan))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        result = await sharer
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return result
+
+    result = asyncio.run(run())
+    assert result.succeeded
+    assert result.steps['find'].result == 'WEATHER'
+    assert calls == ['weather']
+
+
+def test_shared_call_is_cancelled_when_every_waiter_is_gone(make_config):
+    planner = TaskPlanner(make_config())
+    finished = []
+
+    async def lookup():
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    planner.register_action('lookup', lookup, side_effect_free=True)
+    plan = TaskPlan().add('find', 'lookup')
+
+    async def run():
+        task = asyncio.create_task(planner.execute(plan))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        await asyncio.sleep(0.08)
+
+    asyncio.run(run())
+    assert finished == []
+    assert planner._inflight == {}
+
+
+def test_actions_with_side_effects_are_retried_only_when_opted_in(make_config):
+    planner = TaskPlanner(make_config(task_planner={'retries': 2, 'retry_backoff_s': 0}))
+    sent = []
+
+    async def send(to):
+        sent.append(to)
+        raise ConnectionError("reset")
+
+    planner.register_action('send', send)
+    planner.register_action('resend', send, retryable=True)
+    result = asyncio.run(planner.execute(TaskPlan().add('mail', 'send', {'to': 'a'}).add('again', 'resend', {'to': 'b'})))
+
+    assert result.steps['mail'].status == 'failed'
+    assert result.steps['mail'].attempts == 1
+    assert result.steps['again'].attempts == 3
+    assert sent.count('a') == 1 and sent.count('b') == 3
+
+
+def test_timed_out_sync_action_is_signalled_and_not_retried(make_config):
+    planner = TaskPlanner(make_config(task_planner={'retries': 2, 'retry_backoff_s': 0}))
+    started = []
+    stopped = threading.Event()
+
+    def download(cancelled):
+        started.append(True)
+        cancelled.wait(5)
+        stopped.set()
+
+    planner.register_action('download', download, side_effect_free=True)
+    result = asyncio.run(planner.execute(TaskPlan().add('get', 'download', timeout_s=0.05)))
+
+    assert stopped.wait(1)
+    assert result.steps['get'].status == 'failed'
+    assert 'still running' in result.steps['get'].error
+    assert started == [True]
+    assert planner.stats()['abandoned_threads'] == 1
+
+
+@pytest.mark.parametrize('text', [
+    '{"plan": []}',
+    '"open browser"',
+    '[1, 2]',
+    '{"steps": {"name": "a"}}',
+    '[{"name": "a", "action": "x", "args": [1]}]',
+    '[{"name": "a", "action": "x", "depends_on": "b"}]',
+])
+def test_from_json_rejects_bad_shapes(text):
+    with pytest.raises(PlanError):
+        TaskPlan.from_json(text)
+
+
+def test_from_json_accepts_steps_object():
+    plan = TaskPlan.from_json('{"steps": [{"name": "a", "action": "x"}, {"name": "b", "action": "y", "depends_on": ["a"]}]}')
+    assert [step.name for step in plan.steps.values()] == ['a', 'b']
@@ -0,0 +1,176 @@
+"""
+Tests for the text recognizer: XY-cut segmentation, perceptual block keys, the
+LRU result cache, the layout merge and blocks shared between concurrent calls.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.models.vision.text_recognition import (
+    OCRCache, OCRWord, SyntheticFont, SyntheticFontEngine, TextRecognizer, merge_layout, segment_blocks, tile_key
+)
+
+FONT = SyntheticFont()
+
+
+def _screen(width=600, height=300):
+    return np.full((height, width), 255, dtype=np.uint8)
+
+
+class BlockingEngine(SyntheticFontEngine):
+    """Reads like SyntheticFontEngine but holds every call until released."""
+
+    def __init__(self):
+        super().__init__(FONT, call_s=0.0, pixel_s=0.0)
+        self.release = threading.Event()
+        self.calls = 0
+
+    def __call__(self, gray):
+        self.calls += 1
+        self.release.wait(5)
+        return super().__call__(gray)
+
+
+def _recognizer(make_config, engine, cache=None):
+    recognizer = TextRecognizer(make_config(ocr={}), engine=engine, cache=cache or OCRCache(), workers=1)
+    # Threads instead of processes, so the engine's state is visible to the test
+    recognizer._pool = ThreadPoolExecutor(2)
+    return recognizer
+
+
+def test_segmentation_cuts_columns_then_paragraphs_in_reading_order():
+    image = _screen()
+    FONT.draw(image, 10, 10, ["left one", "left two"])
+    FONT.draw(image, 10, 100, ["left para"])
+    FONT.draw(image, 320, 10, ["right col"])
+
+    boxes = segment_blocks(image)
+
+    assert [(top, left) for top, left, _, _ in boxes] == [(10, 10), (100, 10), (10, 320)]
+    top, left, bottom, right = boxes[0]
+    assert bottom - top == FONT.LINE_PITCH + FONT.HEIGHT + 1
+
+
+def test_segmentation_splits_blocks_taller_than_the_limit_between_lines():
+    image = _screen(height=400)
+    FONT.draw(image, 10, 10, [f"line {i}" for i in range(10)])
+
+    boxes = segment_blocks(image, max_height=50)
+
+    assert len(boxes) > 1
+    assert all(bottom - top <= 50 for top, _, bottom, _ in boxes)
+    # Cuts fall in the gaps between lines, never through a glyph
+    assert all((top - 10) % FONT.LINE_PITCH == 0 for top, _, _, _ in boxes)
+
+
+def test_block_key_ignores_position_ink_and_polarity_but_not_text():
+    def block(lines, x=10, y=10, ink=30, inverted=False):
+        image = _screen()
+        FONT.draw(image, x, y, lines, ink=ink)
+        if inverted:
+            image = 255 - image
+        top, left, bottom, right = segment_blocks(image)[0]
+        return tile_key(image[top:bottom, left:right])
+
+    key = block(["12:01 status"])
+    assert block(["12:01 status"], x=200, y=150) == key
+    assert block(["12:01 status"], ink=90) == key
+    assert block(["12:01 status"], inverted=True) == key
+    assert block(["12:02 status"]) != key
+
+
+def test_cache_hits_refresh_recency_and_evict_least_recently_used():
+    cache = OCRCache(max_entries=2)
+    words = [OCRWord(0, 0, 10, 10, "word", 0)]
+    cache.put(b'a', words)
+    cache.put(b'b', words)
+    assert cache.get(b'a') == words
+    cache.put(b'c', words)
+
+    assert cache.get(b'b') is None
+    assert cache.get(b'a') == words
+    assert cache.stats()['evictions'] == 1
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_cache_evicts_over_the_byte_bound():
+    small = [OCRWord(0, 0, 10, 10, "x", 0)]
+    cache = OCRCache(max_entries=100, max_bytes=3 * OCRCache._size(small))
+    for i in range(5):
+        cache.put(bytes([i]), small)
+
+    assert len(cache) == 3
+    assert cache.bytes <= cache.max_bytes
+    assert cache.get(bytes([0])) is None
+
+
+def test_merge_places_words_on_screen_and_joins_lines_left_to_right():
+    boxes = [(100, 50, 130, 200), (200, 50, 210, 200), (300, 50, 310, 200)]
+    results = [
+        [
+            OCRWord(40, 14, 20, 10, "line", 1),
+            OCRWord(30, 0, 20, 10, "world", 0),
+            OCRWord(0, 14, 20, 10, "second", 1),
+            OCRWord(0, 0, 20, 10, "hello", 0),
+        ],
+        [],
+        [OCRWord(0, 0, 20, 10, "tail", 0)],
+    ]
+
+    text, blocks = merge_layout(boxes, results, [False, True, True])
+
+    assert text == "hello world\nsecond line\n\ntail"
+    assert [(block.x, block.y, block.cached) for block in blocks] == [(50, 100, False), (50, 300, True)]
+    assert {(word.text, word.x, word.y) for word in blocks[0].words} >= {("hello", 50, 100), ("line", 90, 114)}
+
+
+def test_repeated_block_is_served_from_the_cache_wherever_it_moves(make_config):
+    engine = BlockingEngine()
+    engine.release.set()
+    recognizer = _recognizer(make_config, engine)
+    first, moved = _screen(), _screen()
+    FONT.draw(first, 10, 10, ["same paragraph"])
+    FONT.draw(moved, 220, 140, ["same paragraph"])
+
+    async def run():
+        return await recognizer.recognize(first), await recognizer.recognize(moved, offset=(5, 5))
+
+    try:
+        before, after = asyncio.run(run())
+    finally:
+        recognizer.close()
+
+    assert before.text == after.text == "same paragraph"
+    assert (after.cache_hits, after.ocr_calls, engine.calls) == (1, 0, 1)
+    assert (after.blocks[0].x, after.blocks[0].y) == (225, 145)
+
+
+def test_cancelled_caller_does_not_cancel_a_shared_block(make_config):
+    engine = BlockingEngine()
+    recognizer = _recognizer(make_config, engine)
+    image = _screen()
+    FONT.draw(image, 10, 10, ["shared block"])
+
+    async def run():
+        first = asyncio.create_task(recognizer.recognize(image))
+        while not recognizer._inflight:
+            await asyncio.sleep(0.005)
+        second = asyncio.create_task(recognizer.recognize(image))
+        await asyncio.sleep(0.02)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        engine.release.set()
+        return await second
+
+    try:
+        result = asyncio.run(run())
+    finally:
+        recognizer.close()
+
+    assert result.text == "shared block"
+    assert engine.calls == 1
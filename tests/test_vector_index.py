@@ -0,0 +1,60 @@
+"""
+Tests for the vector index and long-term memory after a crash (no flush or close).
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.memory.local_database import LocalDatabase
+from src.memory.user_preferences import UserPreferences
+from src.memory.vector_index import VectorIndex
+
+
+def test_reopen_after_crash_recovers_unflushed_rows(make_config, tmp_path):
+    rng = np.random.default_rng(0)
+    index = VectorIndex(tmp_path, dim=8, config_loader=make_config())
+    index.add(rng.normal(size=(3, 8)), user='a')
+    index.flush()
+    index.add(rng.normal(size=(2, 8)), user='b', kind='fact')
+    index.delete(1)
+    # Crash: the second batch and the delete were never flushed
+
+    reopened = VectorIndex(tmp_path, config_loader=make_config())
+    assert reopened.count == 5
+    assert reopened.deleted == 1
+    assert list(reopened.add(rng.normal(size=8), user='a')) == [5]
+    ids, _ = reopened.search(reopened.vector(3), 1, user='b', kinds=['fact'])
+    assert list(ids) == [3]
+
+
+def test_recovered_rows_join_trained_lists(make_config, tmp_path):
+    rng = np.random.default_rng(1)
+    index = VectorIndex(tmp_path, dim=8, config_loader=make_config(), nlist=4, nprobe=4)
+    index.add(rng.normal(size=(64, 8)))
+    assert index.centroids is not None
+    index.add(rng.normal(size=(5, 8)))
+
+    reopened = VectorIndex(tmp_path, config_loader=make_config(), nprobe=4)
+    assert reopened.count == 69
+    assert int(reopened._list_sizes.sum()) == 69
+
+
+def test_remember_after_crash_does_not_reuse_ids(make_config, tmp_path):
+    config = make_config(long_term_memory={'flush_every': 1000})
+
+    async def session(texts):
+        preferences = UserPreferences(
+            config, database=LocalDatabase(config, path=tmp_path / "memory.db", encryption=False),
+            index=VectorIndex(tmp_path / "vectors", dim=256, config_loader=config)
+        )
+        await preferences.initialize()
+        ids = [await preferences.remember(text) for text in texts]
+        # Crash: the database commits each write, the index is never flushed
+        await preferences.database.close()
+        return ids
+
+    first = asyncio.run(session(["likes green tea", "works at night"]))
+    second = asyncio.run(session(["has a cat"]))
+    assert first == [0, 1]
+    assert second == [2]
@@ -0,0 +1,104 @@
+"""
+Tests for the streaming speech-to-text segmenter.
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.input.audio_capture import ArraySource, AudioCaptureHub
+from src.input.voice_input import StreamingSpeechRecognizer
+
+CHUNK = 1280
+
+
+class RecordingTranscriber:
+    def __init__(self):
+        self.finals = []
+
+    def transcribe(self, audio, partial=False):
+        if not partial:
+            self.finals.append(audio)
+        return "hello"
+
+
+def test_onset_chunk_is_kept_without_onset_padding(make_config):
+    sr = 16000
+    # One loud chunk followed by silence: the utterance is exactly the onset chunk
+    samples = np.zeros(sr * 2, dtype=np.int16)
+    samples[CHUNK * 4:CHUNK * 5] = 8000
+    hub = AudioCaptureHub(ArraySource(samples), chunk_size=CHUNK)
+    transcriber = RecordingTranscriber()
+    recognizer = StreamingSpeechRecognizer(
+        hub,
+        transcriber=transcriber,
+        config_loader=make_config(speech_to_text={
+            'onset_pad_ms': 0, 'min_speech_ms': 60, 'end_silence_ms': 300, 'partial_interval_ms': 100000
+        })
+    )
+
+    async def run():
+        hub.start()
+        try:
+            return await recognizer.listen_once(start_frame=0)
+        finally:
+            hub.stop()
+
+    assert asyncio.run(run()) == "hello"
+    segment = transcriber.finals[0]
+    # The loud onset chunk reaches the transcriber instead of being dropped
+    assert np.count_nonzero(np.abs(segment) > 0.2) == CHUNK
+
+
+def _recognizer(hub, transcriber, make_config):
+    return StreamingSpeechRecognizer(
+        hub,
+        transcriber=transcriber,
+        config_loader=make_config(speech_to_text={
+            'onset_pad_ms': 0, 'min_speech_ms': 60, 'end_silence_ms': 300, 'partial_interval_ms': 100000
+        })
+    )
+
+
+def test_utterance_cut_off_by_end_of_audio_gets_a_final_transcript(make_config):
+    # Speech runs to the very end of the source, with no trailing silence
+    samples = np.zeros(CHUNK * 10, dtype=np.int16)
+    samples[CHUNK * 4:] = 8000
+    hub = AudioCaptureHub(ArraySource(samples), chunk_size=CHUNK)
+    transcriber = RecordingTranscriber()
+    recognizer = _recognizer(hub, transcriber, make_config)
+
+    async def run():
+        hub.start()
+        try:
+            return await recognizer.listen_once(start_frame=0)
+        finally:
+            hub.stop()
+
+    assert asyncio.run(run()) == "hello"
+    assert len(transcriber.finals) == 1
+    assert np.count_nonzero(np.abs(transcriber.finals[0]) > 0.2) == CHUNK * 6
+
+
+def test_stop_listening_mid_utterance_yields_a_final_transcript(make_config):
+    samples = np.full(CHUNK * 100, 8000, dtype=np.int16)
+    hub = AudioCaptureHub(ArraySource(samples, realtime=True), chunk_size=CHUNK)
+    transcriber = RecordingTranscriber()
+    recognizer = _recognizer(hub, transcriber, make_config)
+
+    async def stop_soon():
+        await asyncio.sleep(0.4)
+        await recognizer.stop_listening()
+
+    async def run():
+        hub.start()
+        stopper = asyncio.create_task(stop_soon())
+        try:
+            return [event async for event in recognizer.stream()]
+        finally:
+            await stopper
+            hub.stop()
+
+    events = asyncio.run(run())
+    assert [(event.text, event.is_final) for event in events] == [("hello", True)]
+    assert 0 < events[0].audio_s < 1.0
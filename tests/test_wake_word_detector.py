@@ -0,0 +1,78 @@
+"""
+Tests for the wake word detector.
+"""
+
+import asyncio
+
+import numpy as np
+
+from src.input.audio_capture import ArraySource, AudioCaptureHub
+from src.input.wake_word_detector import WakeWordDetector
+
+CHUNK = 1280
+
+
+class FakeWakeModel:
+    """Scores 1.0 on chunks whose first sample is the marker value."""
+
+    def __init__(self, marker: int = 12345):
+        self.marker = marker
+        self.resets = 0
+        self.calls = 0
+
+    def predict(self, audio):
+        self.calls += 1
+        return {'hey_neomate': 1.0 if audio[0] == self.marker else 0.0}
+
+    def reset(self):
+        self.resets += 1
+
+
+def _samples_with_markers(chunks: int, marked: list) -> np.ndarray:
+    samples = np.zeros(chunks * CHUNK, dtype=np.int16)
+    for index in marked:
+        samples[index * CHUNK] = 12345
+    return samples
+
+
+def test_listen_resets_model_and_releases_subscription(make_config):
+    hub = AudioCaptureHub(ArraySource(_samples_with_markers(40, [5, 20])), chunk_size=CHUNK)
+    detector = WakeWordDetector(make_config(wake_word={'confidence_threshold': 0.5}), audio_hub=hub)
+    model = FakeWakeModel()
+    detector.oww_model = model
+
+    async def run():
+        try:
+            first = await detector.listen()
+            first_frame = detector.last_detection_frame
+            released = detector.subscription is None
+            second = await detector.listen()
+            return first, first_frame, released, second, detector.last_detection_frame
+        finally:
+            await detector.cleanup()
+            hub.stop()
+
+    first, first_frame, released, second, second_frame = asyncio.run(run())
+    assert first and second
+    assert released
+    assert model.resets == 2
+    assert first_frame == 6 * CHUNK
+    # The second detection comes from later audio, not a replay of the first
+    assert second_frame > first_frame
+
+
+def test_reset_is_called_on_every_detection(make_config):
+    hub = AudioCaptureHub(ArraySource(_samples_with_markers(20, [3])), chunk_size=CHUNK)
+    detector = WakeWordDetector(make_config(wake_word={'confidence_threshold': 0.5}), audio_hub=hub)
+    model = FakeWakeModel()
+    detector.oww_model = model
+
+    async def run():
+        try:
+            return await detector.listen()
+        finally:
+            await detector.cleanup()
+            hub.stop()
+
+    assert asyncio.run(run())
+    assert model.resets == 1
@@ -0,0 +1,83 @@
+"""
+Tests for the wake word evaluator's activation counting, threshold sweep and WAV reading.
+"""
+
+import wave
+
+import numpy as np
+import pytest
+
+from src.input.wake_word_evaluator import (
+    CHUNK_SIZE, SAMPLE_RATE, FileScore, _read_wav, count_activations, sweep_thresholds
+)
+
+
+def _file_score(scores, positive, duration_s):
+    scores = np.asarray(scores, dtype=np.float32)
+    return FileScore('f.wav', positive, duration_s, 0.0, scores, np.zeros(len(scores)))
+
+
+def test_count_activations_ignores_retriggers_inside_refractory_window():
+    scores = np.array([0.0, 0.9, 0.9, 0.9, 0.0, 0.9, 0.0, 0.0, 0.9])
+    assert count_activations(scores, 0.5, refractory_chunks=1) == 5
+    # Indices 1, 5 and 8: 2-4 and 6-7 fall inside the window after a detection
+    assert count_activations(scores, 0.5, refractory_chunks=3) == 3
+    assert count_activations(scores, 0.5, refractory_chunks=100) == 1
+
+
+def test_count_activations_threshold_is_exclusive():
+    scores = np.array([0.5, 0.5, 0.51])
+    assert count_activations(scores, 0.5, refractory_chunks=1) == 1
+    assert count_activations(scores, 0.6, refractory_chunks=1) == 0
+
+
+def test_sweep_thresholds_reports_miss_rate_and_false_accepts_per_hour():
+    results = [
+        _file_score([0.1, 0.9, 0.2], True, 1.0),
+        _file_score([0.1, 0.45, 0.2], True, 1.0),
+        # Half an hour of negatives with two spikes far apart and one re-trigger
+        _file_score([0.0, 0.7, 0.7, 0.0] + [0.0] * 100 + [0.4], False, 1800.0),
+    ]
+    report = sweep_thresholds(results, [0.3, 0.5, 0.8], refractory_s=1.0)
+
+    assert [r.threshold for r in report] == [0.3, 0.5, 0.8]
+    low, mid, high = report
+    assert (low.false_accepts, low.false_accepts_per_hour) == (2, pytest.approx(4.0))
+    assert (mid.false_accepts, mid.false_accepts_per_hour) == (1, pytest.approx(2.0))
+    assert high.false_accepts == 0
+    assert (low.misses, low.miss_rate) == (0, 0.0)
+    assert (mid.misses, mid.miss_rate) == (1, 0.5)
+    assert (high.misses, high.miss_rate) == (1, 0.5)
+
+
+def test_sweep_thresholds_without_negatives_or_positives():
+    report = sweep_thresholds([_file_score([], True, 0.0)], [0.5])
+    assert report[0].false_accepts_per_hour == 0.0
+    assert report[0].miss_rate == 1.0
+    assert sweep_thresholds([], [0.5])[0].miss_rate == 0.0
+
+
+def _write_wav(path, samples):
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(samples.astype(np.int16).tobytes())
+
+
+def test_read_wav_pads_the_last_chunk(tmp_path):
+    samples = np.arange(1, 2 * CHUNK_SIZE + 101, dtype=np.int16)
+    _write_wav(tmp_path / 'a.wav', samples)
+
+    chunks = _read_wav(tmp_path / 'a.wav')
+    assert chunks.shape == (3, CHUNK_SIZE)
+    assert chunks.dtype == np.int16
+    np.testing.assert_array_equal(chunks.reshape(-1)[:len(samples)], samples)
+    assert not chunks[2, 100:].any()
+
+
+def test_read_wav_exact_and_empty_files(tmp_path):
+    _write_wav(tmp_path / 'exact.wav', np.ones(2 * CHUNK_SIZE))
+    _write_wav(tmp_path / 'empty.wav', np.zeros(0))
+    assert _read_wav(tmp_path / 'exact.wav').shape == (2, CHUNK_SIZE)
+    assert _read_wav(tmp_path / 'empty.wav').shape == (0, CHUNK_SIZE)